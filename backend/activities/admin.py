@@ -1,20 +1,17 @@
 from django.contrib import admin
 from django import forms
 from django.conf import settings
-from .models import Activity, ActivityDeletionRequest, Application, ActivityPosterImage, DailyCheckInCode, StudentCheckIn
-from users.models import OrganizerProfile
 
+from config.pagination import EstimatedCountPaginator
+from .models import Activity, ActivityDeletionRequest, Application, ActivityPosterImage, DailyCheckInCode, StudentCheckIn
 
-class OrganizerProfileChoiceField(forms.ModelChoiceField):
-    def label_from_instance(self, obj: OrganizerProfile) -> str:
-        # Show only the organization name in the dropdown
-        return (obj.organization_name or '').strip() or '(Unnamed organization)'
+# Changelists of tables that grow with every student and activity: related
+# rows are joined instead of fetched per row, foreign keys are picked with
+# autocomplete instead of a <select> of every row, list filters use indexed
+# columns, and pages are not counted twice (or exactly, when unfiltered).
 
 
 class ActivityAdminForm(forms.ModelForm):
-    organizer_profile = OrganizerProfileChoiceField(
-        queryset=OrganizerProfile.objects.select_related('user').order_by('organization_name').distinct('organization_name')
-    )
     categories = forms.MultipleChoiceField(
         required=False,
         choices=(),
@@ -67,7 +64,11 @@ class ActivityAdminForm(forms.ModelForm):
 class ActivityAdmin(admin.ModelAdmin):
     form = ActivityAdminForm
     list_display = ('id', 'title', 'get_organizer_name', 'status', 'current_participants', 'max_participants', 'start_at', 'end_at', 'created_at')
-    list_filter = ('status', 'start_at', 'end_at', 'created_at')
+    list_filter = ('status', 'created_at')
+    list_select_related = ('organizer_profile',)
+    autocomplete_fields = ('organizer_profile',)
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
     search_fields = (
         'title', 'description', 'location',
         'organizer_profile__organization_name', 'organizer_profile__user__email'
@@ -111,6 +112,8 @@ class ActivityDeletionRequestAdmin(admin.ModelAdmin):
     list_filter = ('status', 'requested_at', 'reviewed_at')
     search_fields = ('activity__title', 'reason', 'requested_by__email', 'reviewed_by__email')
     readonly_fields = ('requested_at',)
+    list_select_related = ('activity', 'requested_by', 'reviewed_by')
+    autocomplete_fields = ('activity', 'requested_by', 'reviewed_by')
 
     fields = (
         'activity',
@@ -143,12 +146,16 @@ class ApplicationAdmin(admin.ModelAdmin):
         'id', 'get_student_email', 'get_student_name', 'get_activity_title',
         'status', 'submitted_at', 'decision_at', 'get_decision_by_email'
     )
-    list_filter = ('status', 'submitted_at', 'decision_at')
+    list_filter = ('status', 'submitted_at')
     search_fields = (
         'student__email', 'student__first_name', 'student__last_name',
         'activity__title', 'notes', 'decision_by__email'
     )
     readonly_fields = ('submitted_at',)
+    list_select_related = ('student', 'activity', 'decision_by')
+    autocomplete_fields = ('activity', 'student', 'decision_by')
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
     
     fieldsets = (
         ('Application Info', {
@@ -191,6 +198,8 @@ class ActivityPosterImageAdmin(admin.ModelAdmin):
     list_filter = ('order', 'created_at', 'activity__status')
     search_fields = ('activity__title',)
     readonly_fields = ('created_at',)
+    list_select_related = ('activity',)
+    autocomplete_fields = ('activity',)
     
     fieldsets = (
         ('Poster Info', {
@@ -214,6 +223,8 @@ class DailyCheckInCodeAdmin(admin.ModelAdmin):
     list_filter = ('valid_date', 'created_at')
     search_fields = ('activity__title', 'code')
     readonly_fields = ('created_at',)
+    list_select_related = ('activity',)
+    autocomplete_fields = ('activity',)
     
     fieldsets = (
         ('Check-in Code Info', {
@@ -237,11 +248,15 @@ class StudentCheckInAdmin(admin.ModelAdmin):
         'id', 'get_activity_title', 'get_student_email', 'get_student_name',
         'attendance_status', 'checked_in_at', 'marked_absent_at'
     )
-    list_filter = ('attendance_status', 'checked_in_at', 'marked_absent_at')
+    list_filter = ('attendance_status', 'checked_in_at')
     search_fields = (
         'activity__title', 'student__email', 'student__first_name', 'student__last_name'
     )
     readonly_fields = ('checked_in_at', 'marked_absent_at')
+    list_select_related = ('activity', 'student')
+    autocomplete_fields = ('activity', 'student')
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
     
     fieldsets = (
         ('Check-in Info', {
@@ -0,0 +1,116 @@
+"""
+Resized variants of activity cover and poster images.
+
+Uploaded originals can be several megabytes, so every image also gets
+smaller variants for list and detail pages. Each variant is written as WebP
+and as progressive JPEG (for clients without WebP), with EXIF metadata
+stripped after the orientation it carries has been applied.
+"""
+import logging
+import os
+from io import BytesIO
+
+from django.core.files.base import ContentFile
+from PIL import Image, ImageOps
+
+logger = logging.getLogger(__name__)
+
+# Longest side in pixels; images are never upscaled
+IMAGE_VARIANTS = {
+    'thumb': 400,
+    'card': 800,
+    'full': 1600,
+}
+
+JPEG_QUALITY = 82
+WEBP_QUALITY = 80
+
+
+def _encode(image: Image.Image, image_format: str) -> bytes:
+    """Encode an RGB image as progressive JPEG or WebP without metadata."""
+    buffer = BytesIO()
+    if image_format == 'jpeg':
+        image.save(buffer, 'JPEG', quality=JPEG_QUALITY, optimize=True, progressive=True)
+    else:
+        image.save(buffer, 'WEBP', quality=WEBP_QUALITY, method=4)
+    return buffer.getvalue()
+
+
+def _to_rgb(image: Image.Image) -> Image.Image:
+    """Flatten transparency onto white and convert to RGB."""
+    if image.mode in ('RGBA', 'LA') or (image.mode == 'P' and 'transparency' in image.info):
+        image = image.convert('RGBA')
+        background = Image.new('RGB', image.size, (255, 255, 255))
+        background.paste(image, mask=image.getchannel('A'))
+        return background
+    return image.convert('RGB')
+
+
+def generate_variants(field_file) -> dict:
+    """Write the resized variants of an uploaded image next to the original.
+
+    Args:
+        field_file: Saved ImageField file (e.g. ``activity.cover_image``)
+
+    Returns:
+        Dictionary mapping variant name to ``{'width', 'height', 'webp',
+        'jpeg'}``, where the formats are storage names. Empty if the file
+        cannot be decoded, in which case clients fall back to the original.
+        Variants this replaces are not deleted; callers release them with
+        activities.storage.release_files.
+    """
+    storage = field_file.storage
+    directory, filename = os.path.split(field_file.name)
+    stem = os.path.splitext(filename)[0]
+
+    field_file.open('rb')
+    try:
+        with Image.open(field_file) as original:
+            image = _to_rgb(ImageOps.exif_transpose(original))
+    except (OSError, Image.DecompressionBombError) as e:
+        logger.warning('Could not generate variants for %s: %s', field_file.name, e)
+        return {}
+    finally:
+        field_file.close()
+
+    variants = {}
+    for name, longest_side in IMAGE_VARIANTS.items():
+        resized = image.copy()
+        resized.thumbnail((longest_side, longest_side), Image.Resampling.LANCZOS)
+        variant = {'width': resized.width, 'height': resized.height}
+        for image_format, extension in (('webp', 'webp'), ('jpeg', 'jpg')):
+            path = os.path.join(directory, 'variants', f'{stem}_{name}.{extension}')
+            variant[image_format] = storage.save(path, ContentFile(_encode(resized, image_format)))
+        variants[name] = variant
+    return variants
+
+
+def variant_names(variants: dict) -> list:
+    """Return the storage names of every file in a ``*_variants`` value."""
+    return [variant[image_format] for variant in variants.values() for image_format in ('webp', 'jpeg')]
+
+
+def variant_urls(variants: dict, storage, request=None) -> dict:
+    """Turn stored variant names into URLs for API responses.
+
+    Args:
+        variants: Value of a ``*_variants`` field
+        storage: Storage the variants were saved to
+        request: Request used to build absolute URLs, like DRF's ImageField
+
+    Returns:
+        Same structure as ``variants`` with URLs instead of storage names
+    """
+    def url(name):
+        location = storage.url(name)
+        return request.build_absolute_uri(location) if request is not None else location
+
+    return {
+        name: {
+            'width': variant['width'],
+            'height': variant['height'],
+            'webp': url(variant['webp']),
+            'jpeg': url(variant['jpeg']),
+        }
+        for name, variant in variants.items()
+    }
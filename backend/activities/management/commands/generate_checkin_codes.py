@@ -0,0 +1,47 @@
+"""
+Management command to pre-generate today's check-in codes.
+
+This command should be scheduled shortly after local (Asia/Bangkok) midnight,
+after activity statuses have been refreshed. It creates and caches today's
+code for every activity that is currently running, so the first check-ins of
+the day do not race to create codes, and prunes expired codes in bulk.
+
+Usage:
+    python manage.py generate_checkin_codes
+    python manage.py generate_checkin_codes --keep-days=7
+"""
+
+from django.core.management.base import BaseCommand
+
+from activities.models import DailyCheckInCode
+
+
+class Command(BaseCommand):
+    help = "Create and cache today's check-in codes for running activities and prune expired codes"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--keep-days',
+            type=int,
+            default=0,
+            help='Keep codes from the last N days when pruning (default: 0)'
+        )
+        parser.add_argument(
+            '--no-prune',
+            action='store_true',
+            help='Only generate codes, do not delete expired ones'
+        )
+
+    def handle(self, *args, **options):
+        generated = DailyCheckInCode.pregenerate_today_codes()
+        self.stdout.write(
+            self.style.SUCCESS(f'Cached check-in codes for {generated} running activities')
+        )
+
+        if options['no_prune']:
+            return
+
+        pruned = DailyCheckInCode.prune_expired(keep_days=options['keep_days'])
+        self.stdout.write(
+            self.style.SUCCESS(f'Pruned {pruned} expired check-in codes')
+        )
@@ -0,0 +1,48 @@
+"""
+Management command to generate resized variants for existing images.
+
+New uploads get their variants from the background worker. Run this once
+after deploying the variant pipeline, or with --force after changing the
+variant sizes in activities/images.py. Images are processed in this
+process, not queued.
+
+Usage:
+    python manage.py generate_image_variants
+    python manage.py generate_image_variants --force
+"""
+
+from django.core.management.base import BaseCommand
+
+from activities.models import Activity, ActivityPosterImage
+from activities.tasks import process_image_variants
+
+
+class Command(BaseCommand):
+    help = 'Generate resized WebP/JPEG variants for cover and poster images'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--force',
+            action='store_true',
+            help='Regenerate variants for images that already have them'
+        )
+
+    def handle(self, *args, **options):
+        force = options['force']
+
+        covers = Activity.objects.exclude(cover_image='').exclude(cover_image__isnull=True)
+        posters = ActivityPosterImage.objects.all()
+        if not force:
+            covers = covers.filter(cover_image_variants={})
+            posters = posters.filter(image_variants={})
+
+        generated = 0
+        for activity in covers.only('id', 'cover_image').iterator():
+            generated += process_image_variants(kind='cover', pk=activity.pk, name=activity.cover_image.name)
+
+        for poster in posters.only('id', 'image').iterator():
+            generated += process_image_variants(kind='poster', pk=poster.pk, name=poster.image.name)
+
+        self.stdout.write(
+            self.style.SUCCESS(f'Generated variants for {generated} images')
+        )
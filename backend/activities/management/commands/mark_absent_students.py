@@ -4,11 +4,18 @@ Management command to mark students as absent for completed activities.
 This command should be run periodically (e.g., via cron job) to automatically
 mark students who didn't check in as absent after activities end.
 
+All completed activities in the window are handled by one set-based
+statement. For very large backfills, --chunk-size splits the work into
+activity ID ranges so each statement (and its locks) stays short.
+
 Usage:
     python manage.py mark_absent_students
+    python manage.py mark_absent_students --days=365 --chunk-size=500
+    python manage.py mark_absent_students --dry-run
 """
 
-from django.core.management.base import BaseCommand
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Max, Min
 from django.utils import timezone
 
 from activities.models import Activity, StudentCheckIn
@@ -25,6 +32,12 @@ class Command(BaseCommand):
             default=7,
             help='Process activities that ended within the last N days (default: 7)'
         )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=0,
+            help='Process activities in ranges of N activity IDs per statement (default: all at once)'
+        )
         parser.add_argument(
             '--dry-run',
             action='store_true',
@@ -33,65 +46,46 @@ class Command(BaseCommand):
 
     def handle(self, *args, **options):
         days = options['days']
+        chunk_size = options['chunk_size']
         dry_run = options['dry_run']
-        
+
+        if chunk_size < 0:
+            raise CommandError('--chunk-size must not be negative.')
+
         now = timezone.now()
         cutoff_date = now - timezone.timedelta(days=days)
-        
-        # Find completed activities within the specified time range
-        completed_activities = Activity.objects.filter(
-            status=ActivityStatus.COMPLETE,
-            end_at__gte=cutoff_date,
-            end_at__lt=now
-        )
-        
-        total_marked = 0
-        activities_processed = 0
-        
+
         self.stdout.write(
             self.style.WARNING(f'Processing activities that ended in the last {days} days...')
         )
-        
+
         if dry_run:
             self.stdout.write(self.style.WARNING('DRY RUN MODE - No changes will be made'))
-        
-        for activity in completed_activities:
+
+        marked = {}
+        for id_range in self._id_ranges(cutoff_date, now, chunk_size):
+            marked.update(
+                StudentCheckIn.mark_absent_for_completed_activities(
+                    cutoff_date, now, id_range=id_range, dry_run=dry_run
+                )
+            )
+
+        titles = dict(Activity.objects.filter(id__in=marked).values_list('id', 'title'))
+        for activity_id, count in sorted(marked.items()):
             if dry_run:
-                # Count how many would be marked
-                from django.db.models import Q
-                from activities.models import Application
-                
-                approved_students = Application.objects.filter(
-                    activity=activity,
-                    status='approved'
-                ).values_list('student_id', flat=True)
-                
-                existing_checkins = StudentCheckIn.objects.filter(
-                    activity=activity
-                ).values_list('student_id', flat=True)
-                
-                students_without_checkin = set(approved_students) - set(existing_checkins)
-                count = len(students_without_checkin)
-                
-                if count > 0:
-                    self.stdout.write(
-                        f'  Would mark {count} students as absent for: {activity.title}'
-                    )
-                    total_marked += count
-                    activities_processed += 1
+                self.stdout.write(
+                    f'  Would mark {count} students as absent for: {titles.get(activity_id)}'
+                )
             else:
-                # Actually mark students absent
-                count = StudentCheckIn.mark_absent_students(activity)
-                
-                if count > 0:
-                    self.stdout.write(
-                        self.style.SUCCESS(
-                            f'  Marked {count} students as absent for: {activity.title}'
-                        )
+                self.stdout.write(
+                    self.style.SUCCESS(
+                        f'  Marked {count} students as absent for: {titles.get(activity_id)}'
                     )
-                    total_marked += count
-                    activities_processed += 1
-        
+                )
+
+        total_marked = sum(marked.values())
+        activities_processed = len(marked)
+
         # Summary
         if dry_run:
             self.stdout.write(
@@ -107,3 +101,20 @@ class Command(BaseCommand):
                     f'across {activities_processed} activities'
                 )
             )
+
+    def _id_ranges(self, ended_after, ended_before, chunk_size):
+        """Yield half-open activity ID ranges covering the window, or None for all."""
+        if not chunk_size:
+            yield None
+            return
+
+        bounds = Activity.objects.filter(
+            status=ActivityStatus.COMPLETE,
+            end_at__gte=ended_after,
+            end_at__lt=ended_before
+        ).aggregate(first=Min('id'), last=Max('id'))
+        if bounds['first'] is None:
+            return
+
+        for start in range(bounds['first'], bounds['last'] + 1, chunk_size):
+            yield (start, start + chunk_size)
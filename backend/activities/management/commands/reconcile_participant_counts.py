@@ -0,0 +1,83 @@
+"""
+Management command to reconcile Activity.current_participants counters.
+
+current_participants is a denormalized counter maintained by
+Application.approve. Cancelled or deleted applications do not decrement it,
+so it drifts over time. This command recomputes the counters from approved
+applications and writes back only the ones that drifted. Each run is recorded
+as a ParticipantCountReconciliation; --incremental runs only check activities
+touched since the latest one.
+
+Usage:
+    python manage.py reconcile_participant_counts
+    python manage.py reconcile_participant_counts --incremental
+    python manage.py reconcile_participant_counts --dry-run
+"""
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from activities.models import Activity, ParticipantCountReconciliation
+from config import metrics
+
+
+class Command(BaseCommand):
+    help = 'Recompute activity participant counters from approved applications'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--incremental',
+            action='store_true',
+            help='Only check activities touched since the last successful run'
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Show what would be done without making changes'
+        )
+
+    def handle(self, *args, **options):
+        incremental = options['incremental']
+        dry_run = options['dry_run']
+
+        # Taken before reading so that changes made during the run are picked
+        # up again by the next incremental run
+        started_at = timezone.now()
+
+        since = None
+        if incremental:
+            since = ParticipantCountReconciliation.last_started_at()
+            if since is None:
+                self.stdout.write(
+                    self.style.WARNING('No previous run recorded, checking all activities...')
+                )
+            else:
+                self.stdout.write(
+                    self.style.WARNING(f'Checking activities touched since {since.isoformat()}...')
+                )
+
+        if dry_run:
+            self.stdout.write(self.style.WARNING('DRY RUN MODE - No changes will be made'))
+
+        result = Activity.reconcile_participant_counts(since=since, dry_run=dry_run)
+
+        if dry_run:
+            self.stdout.write(
+                self.style.WARNING(
+                    f"\nDRY RUN: {result['drifted']} of {result['checked']} activities drifted "
+                    f"(total drift {result['total_drift']})"
+                )
+            )
+            return
+
+        metrics.PARTICIPANT_COUNTER_DRIFTED_ACTIVITIES.inc(result['drifted'])
+        metrics.PARTICIPANT_COUNTER_DRIFT.inc(result['total_drift'])
+        metrics.PARTICIPANT_COUNTER_LAST_RECONCILED.set(started_at.timestamp())
+        ParticipantCountReconciliation.objects.create(started_at=started_at, incremental=incremental, **result)
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"\nReconciled {result['drifted']} of {result['checked']} activities "
+                f"(total drift {result['total_drift']})"
+            )
+        )
@@ -0,0 +1,225 @@
+"""
+Serving uploaded media.
+
+Django decides whether and how a file may be served (path checks, ETag,
+cache headers) and hands the transfer to the front proxy when
+``MEDIA_ACCEL_BACKEND`` is set:
+
+- ``nginx``: ``X-Accel-Redirect`` to ``MEDIA_ACCEL_PREFIX``, an internal
+  location aliased to MEDIA_ROOT
+- ``sendfile``: ``X-Sendfile`` with the file's path (Apache mod_xsendfile,
+  lighttpd)
+
+Without a proxy the file is returned as a FileResponse, which the WSGI
+server can send with sendfile(), with single-range support so video-style
+partial requests and resumed downloads work.
+
+Activity cover and poster images (and their variants) are public. A file
+used as a user's profile image is only served to that user and to staff,
+and is never cached by shared proxies. Other paths under MEDIA_ROOT are not
+served.
+
+Content-addressed blobs (see activities.storage) never change under the
+same URL, so browsers and proxies may cache public ones for a year without
+revalidating. Files stored under their upload name are revalidated with
+their ETag.
+"""
+import mimetypes
+import os
+import re
+from urllib.parse import quote
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.exceptions import PermissionDenied, SuspiciousFileOperation
+from django.http import FileResponse, Http404, HttpResponse
+from django.utils._os import safe_join
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+from django.views.decorators.http import require_safe
+from rest_framework.exceptions import AuthenticationFailed
+
+from users.authentication import ClaimsJWTAuthentication
+from .models import Activity, ActivityPosterImage
+from .storage import BLOB_DIRECTORY, is_blob
+
+IMMUTABLE_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+REVALIDATE_CACHE_CONTROL = 'public, no-cache'
+PRIVATE_CACHE_CONTROL = 'private, no-cache'
+
+# Paths served to anyone, unless the file is also a user's profile image
+PUBLIC_PREFIXES = (f'{BLOB_DIRECTORY}/', 'activities/')
+
+RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+
+class _RangeReader:
+    """File wrapper that stops reading after ``length`` bytes."""
+
+    def __init__(self, file, start: int, length: int):
+        file.seek(start)
+        self.file = file
+        self.remaining = length
+
+    def read(self, size=-1):
+        if size < 0 or size > self.remaining:
+            size = self.remaining
+        data = self.file.read(size)
+        self.remaining -= len(data)
+        return data
+
+    def close(self):
+        self.file.close()
+
+
+def _parse_range(header: str, size: int):
+    """
+    Parse a single-range ``Range`` header.
+
+    Args:
+        header: Value of the Range header
+        size: File size in bytes
+
+    Returns:
+        ``(start, end)`` inclusive, ``None`` to send the whole file (missing,
+        malformed or multi-range headers), or ``()`` if the range cannot be
+        satisfied
+    """
+    match = RANGE_RE.match(header.strip())
+    if match is None:
+        return None
+    first, last = match.groups()
+    if not first and not last:
+        return None
+    if not first:
+        # Suffix range: the last N bytes
+        length = int(last)
+        if length == 0:
+            return ()
+        return max(size - length, 0), size - 1
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if start >= size or start > end:
+        return ()
+    return start, end
+
+
+def _etag(path: str, stat: os.stat_result) -> str:
+    if is_blob(path):
+        # The name is the content hash
+        return quote_etag(os.path.splitext(os.path.basename(path))[0])
+    return quote_etag(f'{int(stat.st_mtime):x}-{stat.st_size:x}')
+
+
+def _requesting_user(request):
+    """Return the user of the session or of a valid access token, or None."""
+    if request.user.is_authenticated:
+        return request.user
+    try:
+        authenticated = ClaimsJWTAuthentication().authenticate(request)
+    except AuthenticationFailed:
+        return None
+    return authenticated[0] if authenticated else None
+
+
+def _is_public(request, path: str) -> bool:
+    """Check that the requester may fetch ``path``.
+
+    Returns:
+        True if anyone may fetch it, False if it is a profile image the
+        requester owns (or staff is asking)
+
+    Raises:
+        PermissionDenied: If the file is another user's profile image
+        Http404: If the path is outside the served prefixes
+    """
+    owners = set(get_user_model().objects.filter(profile_image=path).values_list('pk', flat=True))
+    # Identical bytes used for an activity image are public already
+    if owners and not (
+        Activity.objects.filter(cover_image=path).exists()
+        or ActivityPosterImage.objects.filter(image=path).exists()
+    ):
+        user = _requesting_user(request)
+        if user is None or not (user.pk in owners or user.is_staff or user.is_admin_user):
+            raise PermissionDenied
+        return False
+    if not path.startswith(PUBLIC_PREFIXES):
+        raise Http404('File not found')
+    return True
+
+
+@require_safe
+def serve_media(request, path):
+    """Serve a file from MEDIA_ROOT, through the front proxy when configured."""
+    try:
+        full_path = safe_join(settings.MEDIA_ROOT, path)
+    except SuspiciousFileOperation:
+        raise Http404('File not found')
+    if any(part.startswith('.') for part in path.split('/')):
+        raise Http404('File not found')
+    try:
+        stat = os.stat(full_path)
+    except (FileNotFoundError, NotADirectoryError):
+        raise Http404('File not found')
+    if not os.path.isfile(full_path):
+        raise Http404('File not found')
+    public = _is_public(request, path)
+
+    headers = HttpResponse()
+    headers['ETag'] = _etag(path, stat)
+    headers['Last-Modified'] = http_date(stat.st_mtime)
+    if not public:
+        headers['Cache-Control'] = PRIVATE_CACHE_CONTROL
+    elif is_blob(path):
+        headers['Cache-Control'] = IMMUTABLE_CACHE_CONTROL
+    else:
+        headers['Cache-Control'] = REVALIDATE_CACHE_CONTROL
+    conditional = get_conditional_response(
+        request, etag=headers['ETag'], last_modified=int(stat.st_mtime), response=headers
+    )
+    if conditional is not headers:
+        return conditional
+
+    content_type, encoding = mimetypes.guess_type(full_path)
+    content_type = content_type or 'application/octet-stream'
+    backend = settings.MEDIA_ACCEL_BACKEND
+
+    if backend == 'nginx':
+        # nginx handles Range requests for the redirected file itself
+        response = HttpResponse(content_type=content_type)
+        response['X-Accel-Redirect'] = settings.MEDIA_ACCEL_PREFIX + quote(path)
+    elif backend == 'sendfile':
+        response = HttpResponse(content_type=content_type)
+        response['X-Sendfile'] = full_path
+    elif request.method == 'HEAD':
+        response = HttpResponse(content_type=content_type)
+        response['Content-Length'] = stat.st_size
+    else:
+        byte_range = None
+        if_range = request.headers.get('If-Range')
+        if 'Range' in request.headers and (if_range is None or if_range == headers['ETag']):
+            byte_range = _parse_range(request.headers['Range'], stat.st_size)
+
+        if byte_range == ():
+            response = HttpResponse(status=416)
+            response['Content-Range'] = f'bytes */{stat.st_size}'
+            return response
+
+        if byte_range is None:
+            response = FileResponse(open(full_path, 'rb'), content_type=content_type)
+        else:
+            start, end = byte_range
+            response = FileResponse(
+                _RangeReader(open(full_path, 'rb'), start, end - start + 1),
+                status=206,
+                content_type=content_type
+            )
+            response['Content-Range'] = f'bytes {start}-{end}/{stat.st_size}'
+            response['Content-Length'] = end - start + 1
+
+    if encoding:
+        response['Content-Encoding'] = encoding
+    response['Accept-Ranges'] = 'bytes'
+    for header in ('ETag', 'Last-Modified', 'Cache-Control'):
+        response[header] = headers[header]
+    return response
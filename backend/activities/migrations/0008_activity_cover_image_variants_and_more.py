@@ -0,0 +1,23 @@
+# Generated by Django 5.2.5 on 2026-10-19 01:57
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('activities', '0007_application_updated_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='activity',
+            name='cover_image_variants',
+            field=models.JSONField(blank=True, default=dict, help_text='Resized WebP/JPEG versions of the cover image'),
+        ),
+        migrations.AddField(
+            model_name='activityposterimage',
+            name='image_variants',
+            field=models.JSONField(blank=True, default=dict, help_text='Resized WebP/JPEG versions of the poster image'),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.5 on 2026-10-19 02:01
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('activities', '0008_activity_cover_image_variants_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='activity',
+            name='cover_image_status',
+            field=models.CharField(choices=[('pending', 'Pending'), ('ready', 'Ready'), ('failed', 'Failed')], default='ready', help_text='Whether the cover image variants are still being generated', max_length=20),
+        ),
+        migrations.AddField(
+            model_name='activityposterimage',
+            name='processing_status',
+            field=models.CharField(choices=[('pending', 'Pending'), ('ready', 'Ready'), ('failed', 'Failed')], default='ready', help_text='Whether the poster image variants are still being generated', max_length=20),
+        ),
+    ]
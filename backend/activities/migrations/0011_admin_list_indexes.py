@@ -0,0 +1,36 @@
+# Generated by Django 5.2.5 on 2026-10-19 02:22
+
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # Build the indexes without locking out writes to large tables
+    atomic = False
+
+    dependencies = [
+        ('activities', '0010_mediablob'),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='activity',
+            index=models.Index(fields=['status', '-created_at'], name='activity_status_created_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='application',
+            index=models.Index(fields=['-submitted_at'], name='application_submitted_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='application',
+            index=models.Index(fields=['status', '-submitted_at'], name='application_status_sub_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='studentcheckin',
+            index=models.Index(fields=['-checked_in_at'], name='checkin_checked_in_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='studentcheckin',
+            index=models.Index(fields=['attendance_status', '-checked_in_at'], name='checkin_status_checked_idx'),
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.5 on 2026-10-19 02:43
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('activities', '0011_admin_list_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ParticipantCountReconciliation',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('started_at', models.DateTimeField(db_index=True)),
+                ('incremental', models.BooleanField(default=False)),
+                ('checked', models.PositiveIntegerField(default=0)),
+                ('drifted', models.PositiveIntegerField(default=0)),
+                ('total_drift', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'verbose_name': 'Participant Count Reconciliation',
+                'verbose_name_plural': 'Participant Count Reconciliations',
+                'ordering': ['-started_at'],
+            },
+        ),
+    ]
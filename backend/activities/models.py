@@ -1,15 +1,23 @@
+from datetime import datetime, timezone as dt_timezone
 from typing import Optional
 import random
 import string
 
 from django.conf import settings
+from django.core.cache import cache
 from django.core.exceptions import ValidationError
 from django.core.validators import MinValueValidator, MaxLengthValidator
-from django.db import models
+from django.db import connection, models, transaction
+from django.db.models import Case, Count, F, OuterRef, Q, Subquery, Value, When
 from django.utils import timezone
+from django.utils.crypto import constant_time_compare, salted_hmac
+from django.utils.http import urlsafe_base64_encode
 
-from config.constants import ActivityStatus, ApplicationStatus, DeletionRequestStatus, ValidationLimits
-from config.utils import validate_activity_categories, validate_activity_is_happening
+from config.constants import (
+    ActivityStatus, ApplicationStatus, DeletionRequestStatus, ImageProcessingStatus, ValidationLimits
+)
+from config.utils import seconds_until_local_midnight, validate_activity_categories, validate_activity_is_happening
+from .images import variant_names
 
 
 def activity_cover_image_path(instance, filename):
@@ -22,6 +30,27 @@ def activity_poster_image_path(instance, filename):
     return f'activities/{instance.activity.id}/posters/{filename}'
 
 
+def _fields_except(instance: models.Model, excluded: tuple) -> list:
+    """Return the fields a save() should write, leaving out ``excluded``.
+
+    Used to keep fields written by the image worker out of ordinary saves,
+    so an instance loaded before the worker finished cannot overwrite them.
+    """
+    deferred = instance.get_deferred_fields()
+    return [
+        field.name for field in instance._meta.concrete_fields
+        if not field.primary_key and field.name not in excluded and field.attname not in deferred
+    ]
+
+
+def _stored_image_names(model, pk, image_field: str, variants_field: str) -> list:
+    """Return the storage names of a saved image and its variants, as stored in the database."""
+    row = model.objects.filter(pk=pk).values(image_field, variants_field).first()
+    if row is None:
+        return []
+    return [row[image_field], *variant_names(row[variants_field])]
+
+
 class Activity(models.Model):
     """Model representing a volunteer activity.
     
@@ -77,6 +106,17 @@ class Activity(models.Model):
         null=True,
         help_text="Cover image for the activity"
     )
+    cover_image_variants = models.JSONField(
+        default=dict,
+        blank=True,
+        help_text="Resized WebP/JPEG versions of the cover image"
+    )
+    cover_image_status = models.CharField(
+        max_length=20,
+        choices=ImageProcessingStatus.CHOICES,
+        default=ImageProcessingStatus.READY,
+        help_text="Whether the cover image variants are still being generated"
+    )
     
     # Admin moderation
     rejection_reason = models.TextField(
@@ -93,11 +133,39 @@ class Activity(models.Model):
         ordering = ['-created_at']
         verbose_name = "Activity"
         verbose_name_plural = "Activities"
+        indexes = [
+            models.Index(fields=['status', '-created_at'], name='activity_status_created_idx'),
+        ]
 
     def __str__(self) -> str:
         self.auto_update_status()
         return f"{self.title} ({self.get_status_display()})"
     
+    def save(self, *args, **kwargs):
+        """Save the activity, queueing variant generation for a newly uploaded cover image.
+
+        The files of a replaced or removed cover are released once the save commits.
+        """
+        from .storage import release_files
+        from .tasks import process_image_variants
+
+        update_fields = kwargs.get('update_fields')
+        new_cover = bool(self.cover_image) and not self.cover_image._committed
+        replaced = []
+        if new_cover or not self.cover_image:
+            if not self._state.adding and (update_fields is None or 'cover_image' in update_fields):
+                replaced = _stored_image_names(Activity, self.pk, 'cover_image', 'cover_image_variants')
+            self.cover_image_variants = {}
+            self.cover_image_status = (
+                ImageProcessingStatus.PENDING if new_cover else ImageProcessingStatus.READY
+            )
+        elif not self._state.adding and update_fields is None:
+            kwargs['update_fields'] = _fields_except(self, ('cover_image_variants', 'cover_image_status'))
+        super().save(*args, **kwargs)
+        release_files(self.cover_image.storage, replaced)
+        if new_cover:
+            process_image_variants.enqueue(kind='cover', pk=self.pk, name=self.cover_image.name)
+    
     def clean(self) -> None:
         """Validate the activity model."""
         super().clean()
@@ -157,6 +225,169 @@ class Activity(models.Model):
                 activity.status = ActivityStatus.FULL
                 activity.save(update_fields=['status'])
 
+    @classmethod
+    def reserve_places(cls, activity_id: int, count: int = 1) -> bool:
+        """Atomically add participants to an activity if capacity allows.
+        
+        The capacity check and the increment run as one conditional UPDATE,
+        so concurrent callers can neither lose increments nor overbook.
+        
+        Args:
+            activity_id: ID of the activity to reserve places on
+            count: Number of places to reserve
+            
+        Returns:
+            True if the places were reserved, False if capacity would be exceeded
+        """
+        return bool(
+            cls.objects.filter(pk=activity_id).filter(
+                Q(max_participants__isnull=True) |
+                Q(current_participants__lte=F('max_participants') - count)
+            ).update(current_participants=F('current_participants') + count)
+        )
+
+    @classmethod
+    def reconcile_participant_counts(cls, since=None, dry_run: bool = False) -> dict:
+        """Recompute the denormalized current_participants counters.
+        
+        Approved applications are counted with one GROUP BY aggregate and only
+        the activities whose counter drifted are written back. Drifted rows are
+        locked and recounted before the bulk update, so approvals that commit
+        in the meantime are neither lost nor double counted.
+        
+        Only activities touched since ``since`` are checked in incremental
+        runs. Deleting an approved application touches its activity (see
+        activities.signals); drift that leaves no trace, such as a queryset
+        update() that does not set updated_at, is corrected by full runs.
+
+        Args:
+            since: If given, only check activities touched (activity or one of
+                its applications updated) at or after this time
+            dry_run: Report drift without writing any changes or locking rows
+            
+        Returns:
+            Dictionary with checked, drifted and total_drift counts
+        """
+        activities = cls.objects.all()
+        if since is not None:
+            touched_ids = Application.objects.filter(
+                updated_at__gte=since
+            ).values('activity_id')
+            activities = activities.filter(Q(updated_at__gte=since) | Q(id__in=touched_ids))
+
+        def approved_counts(activity_filter):
+            return dict(
+                Application.objects.filter(
+                    status=ApplicationStatus.APPROVED,
+                    activity__in=activity_filter
+                ).order_by().values_list('activity_id').annotate(total=Count('id'))
+            )
+
+        counts = approved_counts(activities.values('id'))
+        checked = 0
+        drifted_ids = []
+        for activity_id, current in activities.order_by().values_list('id', 'current_participants'):
+            checked += 1
+            if current != counts.get(activity_id, 0):
+                drifted_ids.append(activity_id)
+
+        drifted = []
+        total_drift = 0
+        if drifted_ids:
+            with transaction.atomic():
+                candidates = cls.objects.filter(id__in=drifted_ids)
+                if not dry_run:
+                    candidates = candidates.select_for_update()
+                candidates = list(candidates.order_by('id').only('id', 'current_participants'))
+                counts = approved_counts(drifted_ids)
+                for activity in candidates:
+                    actual = counts.get(activity.id, 0)
+                    if activity.current_participants != actual:
+                        total_drift += abs(activity.current_participants - actual)
+                        activity.current_participants = actual
+                        drifted.append(activity)
+                if drifted and not dry_run:
+                    cls.objects.bulk_update(drifted, ['current_participants'], batch_size=500)
+
+        return {
+            'checked': checked,
+            'drifted': len(drifted),
+            'total_drift': total_drift,
+        }
+
+    @classmethod
+    def bulk_moderate(cls, items: list) -> dict:
+        """Approve and reject many pending activities at once.
+
+        The requested activities are locked in one query, then approvals and
+        rejections are each applied with a single UPDATE restricted to pending
+        activities. Items that cannot be applied are reported without failing
+        the batch.
+
+        Args:
+            items: List of dicts with ``id``, ``action`` ('approve' or
+                'reject') and ``reason`` (required for rejections)
+
+        Returns:
+            Dictionary with approved, rejected and failed counts and a
+            per-item ``results`` list in request order
+        """
+        now = timezone.now()
+        results = []
+        approve_ids = []
+        rejections = {}
+
+        with transaction.atomic():
+            statuses = dict(
+                # Locked in primary key order so concurrent batches cannot deadlock
+                cls.objects.select_for_update().filter(
+                    pk__in=[item['id'] for item in items]
+                ).order_by('pk').values_list('id', 'status')
+            )
+
+            for item in items:
+                action = item['action']
+                result = {'id': item['id'], 'action': action}
+                current = statuses.get(item['id'])
+
+                if current is None:
+                    result.update(success=False, detail="Activity not found.")
+                elif current != ActivityStatus.PENDING:
+                    result.update(success=False, detail="Only pending activities can be moderated.")
+                elif action == 'approve':
+                    approve_ids.append(item['id'])
+                    result.update(success=True, status=ActivityStatus.OPEN)
+                else:
+                    rejections[item['id']] = item['reason'].strip()
+                    result.update(success=True, status=ActivityStatus.REJECTED)
+
+                results.append(result)
+
+            pending = cls.objects.filter(status=ActivityStatus.PENDING)
+            if approve_ids:
+                pending.filter(pk__in=approve_ids).update(
+                    status=ActivityStatus.OPEN, rejection_reason='', updated_at=now
+                )
+            if rejections:
+                reasons = set(rejections.values())
+                if len(reasons) == 1:
+                    reason = Value(reasons.pop())
+                else:
+                    reason = Case(
+                        *[When(pk=pk, then=Value(text)) for pk, text in rejections.items()],
+                        output_field=models.TextField()
+                    )
+                pending.filter(pk__in=rejections).update(
+                    status=ActivityStatus.REJECTED, rejection_reason=reason, updated_at=now
+                )
+
+        return {
+            'approved': len(approve_ids),
+            'rejected': len(rejections),
+            'failed': len(results) - len(approve_ids) - len(rejections),
+            'results': results,
+        }
+
     def auto_update_status(self):
         """Update status based on current time and activity dates.
         
@@ -275,6 +506,10 @@ class Activity(models.Model):
             # Use Django's configured timezone (Asia/Bangkok) for determining "today"
             today = timezone.localtime().date()
             
+            cached = cache.get(DailyCheckInCode.cache_key(self.id, today))
+            if cached is not None:
+                return cached['code']
+            
             code_obj = self.daily_codes.filter(
                 valid_date=today
             ).first()
@@ -325,6 +560,17 @@ class ActivityPosterImage(models.Model):
         upload_to=activity_poster_image_path,
         help_text="Poster image for the activity"
     )
+    image_variants = models.JSONField(
+        default=dict,
+        blank=True,
+        help_text="Resized WebP/JPEG versions of the poster image"
+    )
+    processing_status = models.CharField(
+        max_length=20,
+        choices=ImageProcessingStatus.CHOICES,
+        default=ImageProcessingStatus.READY,
+        help_text="Whether the poster image variants are still being generated"
+    )
     order = models.PositiveIntegerField(
         default=1,
         help_text="Display order of the poster (1-4)"
@@ -345,6 +591,28 @@ class ActivityPosterImage(models.Model):
     def __str__(self) -> str:
         return f"{self.activity.title} - Poster {self.order}"
 
+    def save(self, *args, **kwargs):
+        """Save the poster, queueing variant generation for a newly uploaded image.
+
+        The files of a replaced image are released once the save commits.
+        """
+        from .storage import release_files
+        from .tasks import process_image_variants
+
+        new_image = bool(self.image) and not self.image._committed
+        replaced = []
+        if new_image:
+            if not self._state.adding:
+                replaced = _stored_image_names(ActivityPosterImage, self.pk, 'image', 'image_variants')
+            self.image_variants = {}
+            self.processing_status = ImageProcessingStatus.PENDING
+        elif not self._state.adding and kwargs.get('update_fields') is None:
+            kwargs['update_fields'] = _fields_except(self, ('image_variants', 'processing_status'))
+        super().save(*args, **kwargs)
+        release_files(self.image.storage, replaced)
+        if new_image:
+            process_image_variants.enqueue(kind='poster', pk=self.pk, name=self.image.name)
+
     def clean(self) -> None:
         """Validate poster image constraints."""
         super().clean()
@@ -355,12 +623,49 @@ class ActivityPosterImage(models.Model):
                 activity=self.activity
             ).exclude(pk=self.pk).count()
             
-            if existing_count >= 4:
-                raise ValidationError("Maximum 4 poster images allowed per activity.")
+            if existing_count >= ValidationLimits.MAX_POSTER_IMAGES:
+                raise ValidationError(
+                    f"Maximum {ValidationLimits.MAX_POSTER_IMAGES} poster images allowed per activity."
+                )
         
         # Validate order is between 1-4
-        if not (1 <= self.order <= 4):
-            raise ValidationError("Poster order must be between 1 and 4.")
+        if not (1 <= self.order <= ValidationLimits.MAX_POSTER_IMAGES):
+            raise ValidationError(f"Poster order must be between 1 and {ValidationLimits.MAX_POSTER_IMAGES}.")
+
+    @classmethod
+    def add_many(cls, activity: Activity, images: list) -> list:
+        """
+        Add poster images to an activity, filling the free order slots.
+
+        The posters are created in one transaction with the activity row
+        locked, so concurrent uploads cannot take the same slots.
+
+        Args:
+            activity: Activity to attach the posters to
+            images: Uploaded files, assigned to the free slots in this order
+
+        Returns:
+            List of created posters
+
+        Raises:
+            ValidationError: If the activity does not have enough free slots
+        """
+        with transaction.atomic():
+            list(Activity.objects.select_for_update().filter(pk=activity.pk).values_list('pk', flat=True))
+            taken = set(cls.objects.filter(activity=activity).values_list('order', flat=True))
+            free = [order for order in range(1, ValidationLimits.MAX_POSTER_IMAGES + 1) if order not in taken]
+            if len(images) > len(free):
+                raise ValidationError(
+                    f"Maximum {ValidationLimits.MAX_POSTER_IMAGES} poster images allowed per activity; "
+                    f"{len(free)} slot(s) available."
+                )
+
+            posters = []
+            for image, order in zip(images, free):
+                poster = cls(activity=activity, image=image, order=order)
+                poster.save()
+                posters.append(poster)
+        return posters
 
 
 class ActivityDeletionRequest(models.Model):
@@ -455,6 +760,7 @@ class Application(models.Model):
         default=ApplicationStatus.PENDING
     )
     submitted_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
     decision_at = models.DateTimeField(null=True, blank=True)
     decision_by = models.ForeignKey(
         settings.AUTH_USER_MODEL,
@@ -479,6 +785,10 @@ class Application(models.Model):
                 name='unique_activity_student_application'
             )
         ]
+        indexes = [
+            models.Index(fields=['-submitted_at'], name='application_submitted_idx'),
+            models.Index(fields=['status', '-submitted_at'], name='application_status_sub_idx'),
+        ]
 
     def __str__(self) -> str:
         title = self.activity_title or (self.activity.title if self.activity else "Deleted Activity")
@@ -507,24 +817,41 @@ class Application(models.Model):
             raise ValidationError("Notes cannot exceed 225 characters.")
 
     def approve(self, reviewer) -> None:
-        """Approve the application and increment activity capacity."""
+        """Approve the application and increment activity capacity.
+        
+        The status change and the capacity reservation commit in the same
+        transaction. The application row is claimed first so the contended
+        activity row is locked only for the final UPDATE.
+        """
         if self.status != ApplicationStatus.PENDING:
             raise ValidationError("Only pending applications can be approved.")
         
-        # Check if activity has reached capacity
-        activity = self.activity
-        if activity.max_participants is not None and activity.current_participants >= activity.max_participants:
-            raise ValidationError("Activity has reached maximum capacity.")
-        
-        # Increment the activity's current participants count
-        activity.current_participants += 1
-        activity.save(update_fields=['current_participants'])
+        decision_at = timezone.now()
+        with transaction.atomic():
+            claimed = Application.objects.filter(
+                pk=self.pk,
+                status=ApplicationStatus.PENDING
+            ).update(
+                status=ApplicationStatus.APPROVED,
+                decision_at=decision_at,
+                decision_by=reviewer,
+                notes="",  # Clear any previous notes
+                updated_at=decision_at
+            )
+            if not claimed:
+                raise ValidationError("Only pending applications can be approved.")
+            
+            # Raising here rolls back the status change above
+            if not Activity.reserve_places(self.activity_id):
+                raise ValidationError("Activity has reached maximum capacity.")
         
+        # Keep the in-memory instances in step with the database
+        if Application.activity.is_cached(self) and self.activity is not None:
+            self.activity.current_participants += 1
         self.status = ApplicationStatus.APPROVED
-        self.decision_at = timezone.now()
+        self.decision_at = decision_at
         self.decision_by = reviewer
-        self.notes = ""  # Clear any previous notes
-        self.save(update_fields=['status', 'decision_at', 'decision_by', 'notes'])
+        self.notes = ""
 
     def reject(self, reviewer, reason: str) -> None:
         """Reject the application with a reason."""
@@ -541,7 +868,7 @@ class Application(models.Model):
         self.decision_at = timezone.now()
         self.decision_by = reviewer
         self.notes = reason.strip()
-        self.save(update_fields=['status', 'decision_at', 'decision_by', 'notes'])
+        self.save(update_fields=['status', 'decision_at', 'decision_by', 'notes', 'updated_at'])
 
     def cancel(self) -> None:
         """Cancel the application (student action)."""
@@ -549,7 +876,126 @@ class Application(models.Model):
             raise ValidationError("Only pending or approved applications can be cancelled.")
         
         self.status = ApplicationStatus.CANCELLED
-        self.save(update_fields=['status'])
+        self.save(update_fields=['status', 'updated_at'])
+
+    @classmethod
+    def bulk_review(
+        cls,
+        activity: Activity,
+        reviewer,
+        items: Optional[list] = None,
+        approve_first: Optional[int] = None
+    ) -> dict:
+        """Approve and reject many applications of one activity at once.
+
+        Either ``items`` or ``approve_first`` must be given. Everything runs
+        in one transaction: the applications are locked in submission order,
+        then the activity row is locked once to read the remaining capacity,
+        the applications are updated with a single bulk_update, and the
+        participant counter is updated once. Items that cannot be applied are
+        reported without failing the batch.
+
+        Rows are locked in the same order as ``approve`` (application before
+        activity), so a single approval running at the same time waits
+        instead of deadlocking.
+
+        Args:
+            activity: Activity whose applications are reviewed
+            reviewer: User making the decision
+            items: List of dicts with ``id``, ``action`` ('approve' or
+                'reject') and ``reason`` (required for rejections)
+            approve_first: Approve the first N pending applications in
+                submission order, stopping at capacity
+
+        Returns:
+            Dictionary with approved, rejected and failed counts and a
+            per-item ``results`` list in request order
+
+        Raises:
+            ValueError: If neither or both of items and approve_first are given
+            ValidationError: If the participant counter could not be updated
+        """
+        if (items is None) == (approve_first is None):
+            raise ValueError("Provide either items or approve_first.")
+
+        decision_at = timezone.now()
+        results = []
+        reviewed = []
+        approved_count = 0
+
+        with transaction.atomic():
+            # One order for every bulk review, so overlapping batches queue up
+            candidates = cls.objects.select_for_update().filter(
+                activity_id=activity.pk
+            ).order_by('submitted_at', 'id')
+            if approve_first is not None:
+                candidates = candidates.filter(status=ApplicationStatus.PENDING)[:approve_first]
+            else:
+                candidates = candidates.filter(pk__in=[item['id'] for item in items])
+            applications = list(candidates)
+
+            locked_activity = Activity.objects.select_for_update().only(
+                'id', 'max_participants', 'current_participants'
+            ).get(pk=activity.pk)
+            remaining = None
+            if locked_activity.max_participants is not None:
+                remaining = max(
+                    locked_activity.max_participants - locked_activity.current_participants, 0
+                )
+
+            if approve_first is not None:
+                applications = applications if remaining is None else applications[:remaining]
+                items = [{'id': application.id, 'action': 'approve'} for application in applications]
+            by_id = {application.id: application for application in applications}
+
+            for item in items:
+                application = by_id.get(item['id'])
+                action = item['action']
+                result = {'id': item['id'], 'action': action}
+
+                if application is None:
+                    result.update(success=False, detail="Application not found for this activity.")
+                elif application.status != ApplicationStatus.PENDING:
+                    verb = 'approved' if action == 'approve' else 'rejected'
+                    result.update(success=False, detail=f"Only pending applications can be {verb}.")
+                elif action == 'approve' and remaining is not None and approved_count >= remaining:
+                    result.update(success=False, detail="Activity has reached maximum capacity.")
+                else:
+                    if action == 'approve':
+                        application.status = ApplicationStatus.APPROVED
+                        application.notes = ""
+                        approved_count += 1
+                    else:
+                        application.status = ApplicationStatus.REJECTED
+                        application.notes = item['reason'].strip()
+                    application.decision_at = decision_at
+                    application.decision_by = reviewer
+                    application.updated_at = decision_at
+                    reviewed.append(application)
+                    result.update(success=True, status=application.status)
+
+                results.append(result)
+
+            if reviewed:
+                cls.objects.bulk_update(
+                    reviewed,
+                    ['status', 'decision_at', 'decision_by', 'notes', 'updated_at'],
+                    batch_size=500
+                )
+            # The activity row is locked, so this cannot fail unless the
+            # capacity check above is wrong; raising rolls everything back
+            if approved_count and not Activity.reserve_places(activity.pk, approved_count):
+                raise ValidationError("Activity has reached maximum capacity.")
+
+        if approved_count:
+            activity.current_participants = locked_activity.current_participants + approved_count
+
+        return {
+            'approved': approved_count,
+            'rejected': len(reviewed) - approved_count,
+            'failed': len(results) - len(reviewed),
+            'results': results,
+        }
 
 
 class DailyCheckInCode(models.Model):
@@ -611,8 +1057,9 @@ class DailyCheckInCode(models.Model):
     def get_or_create_today_code(cls, activity: Activity) -> 'DailyCheckInCode':
         """Get or create today's check-in code for an activity.
         
-        If a code already exists for today, returns it. Otherwise, generates
-        a new code.
+        Today's code is kept in the shared cache until local midnight, so
+        organizer code fetches and student check-ins only hit the database
+        on a cache miss. If no code exists for today, generates a new one.
         
         Args:
             activity: Activity to get/create code for
@@ -622,15 +1069,94 @@ class DailyCheckInCode(models.Model):
         """
         # Use Django's configured timezone (Asia/Bangkok) for determining "today"
         today = timezone.localtime().date()
+        key = cls.cache_key(activity.id, today)
+        
+        cached = cache.get(key)
+        if cached is not None:
+            code_obj = cls(activity_id=activity.id, valid_date=today, **cached)
+            code_obj._state.adding = False
+            return code_obj
         
         code_obj, created = cls.objects.get_or_create(
             activity=activity,
             valid_date=today,
             defaults={'code': cls.generate_code()}
         )
+        code_obj._cache()
         
         return code_obj
     
+    @classmethod
+    def get_cached_today_code(cls, activity: Activity) -> str:
+        """Return today's code string, reading the shared cache first.
+        
+        Args:
+            activity: Activity to get the code for
+            
+        Returns:
+            Today's 6-character check-in code
+        """
+        return cls.get_or_create_today_code(activity).code
+    
+    @classmethod
+    def pregenerate_today_codes(cls) -> int:
+        """Create and cache today's codes for all running activities.
+        
+        Meant to run shortly after midnight so the first check-ins of the day
+        find a warm cache. Existing codes are kept as they are.
+        
+        Returns:
+            Number of activities whose code was cached
+        """
+        today = timezone.localtime().date()
+        activity_ids = list(
+            Activity.objects.filter(status=ActivityStatus.DURING).values_list('id', flat=True)
+        )
+        if not activity_ids:
+            return 0
+        
+        cls.objects.bulk_create(
+            [cls(activity_id=activity_id, valid_date=today, code=cls.generate_code())
+             for activity_id in activity_ids],
+            ignore_conflicts=True
+        )
+        codes = list(cls.objects.filter(activity_id__in=activity_ids, valid_date=today))
+        cache.set_many(
+            {cls.cache_key(c.activity_id, today): c._cache_value() for c in codes},
+            timeout=seconds_until_local_midnight()
+        )
+        return len(codes)
+    
+    @classmethod
+    def prune_expired(cls, keep_days: int = 0) -> int:
+        """Delete codes older than today (minus keep_days) in one statement.
+        
+        Args:
+            keep_days: Number of past days of codes to keep
+            
+        Returns:
+            Number of codes deleted
+        """
+        cutoff = timezone.localtime().date() - timezone.timedelta(days=keep_days)
+        deleted, _ = cls.objects.filter(valid_date__lt=cutoff).delete()
+        return deleted
+    
+    @staticmethod
+    def cache_key(activity_id: int, valid_date) -> str:
+        """Return the shared-cache key holding an activity's code for a date."""
+        return f"checkin_code:{activity_id}:{valid_date.isoformat()}"
+    
+    def _cache_value(self) -> dict:
+        return {'id': self.id, 'code': self.code, 'created_at': self.created_at}
+    
+    def _cache(self) -> None:
+        """Cache this code until local midnight, when it stops being valid."""
+        cache.set(
+            self.cache_key(self.activity_id, self.valid_date),
+            self._cache_value(),
+            timeout=seconds_until_local_midnight()
+        )
+    
     def is_valid_today(self) -> bool:
         """Check if this code is valid for today.
         
@@ -661,6 +1187,11 @@ class StudentCheckIn(models.Model):
         ('absent', 'Absent'),
     ]
     
+    # Tolerated drift of organizer device clocks for offline check-ins
+    OFFLINE_CLOCK_SKEW = timezone.timedelta(minutes=5)
+    
+    QR_TOKEN_SALT = 'activities.StudentCheckIn.qr_token'
+    
     activity = models.ForeignKey(
         Activity,
         on_delete=models.CASCADE,
@@ -698,6 +1229,10 @@ class StudentCheckIn(models.Model):
                 name='unique_activity_student_checkin'
             )
         ]
+        indexes = [
+            models.Index(fields=['-checked_in_at'], name='checkin_checked_in_idx'),
+            models.Index(fields=['attendance_status', '-checked_in_at'], name='checkin_status_checked_idx'),
+        ]
     
     def __str__(self) -> str:
         return f"{self.student.email} - {self.activity.title} - {self.attendance_status}"
@@ -706,11 +1241,12 @@ class StudentCheckIn(models.Model):
     def check_in_student(cls, activity: Activity, student, code: str) -> 'StudentCheckIn':
         """Check in a student using the daily code.
         
-        Performs comprehensive validation before marking student as present:
-        1. Verifies student has an approved application
-        2. Checks code is correct and valid for today
-        3. Ensures student hasn't already checked in
-        4. Validates activity timing (must be currently happening)
+        Validation runs cheapest first so bursts at the start of an event
+        cost a single database round trip:
+        1. Validates activity timing (must be currently happening)
+        2. Checks code against today's cached code
+        3. Records the check-in in one statement that also verifies the
+           approved application and rejects duplicate check-ins
         
         Args:
             activity: The activity to check in to
@@ -723,67 +1259,277 @@ class StudentCheckIn(models.Model):
         Raises:
             ValidationError: If any validation fails
         """
-        # Step 1: Verify approved application
-        if not cls._has_approved_application(activity, student):
+        # Step 1: Validate activity timing
+        cls._validate_activity_timing(activity)
+        
+        # Step 2: Validate the code
+        cls._validate_code(activity, code)
+        
+        # Step 3: Record check-in for approved, not yet present students
+        return cls._record_check_in(activity, student)
+    
+    @classmethod
+    def check_in_student_with_token(cls, activity: Activity, student, token: str) -> 'StudentCheckIn':
+        """Check in a student using the rotating QR token from the organizer screen.
+        
+        Same as check_in_student, but the token is verified with an HMAC in
+        memory instead of comparing against the daily code.
+        
+        Args:
+            activity: The activity to check in to
+            student: The student checking in
+            token: Token scanned from the organizer's QR code
+            
+        Returns:
+            StudentCheckIn instance with attendance_status='present'
+            
+        Raises:
+            ValidationError: If any validation fails
+        """
+        cls._validate_activity_timing(activity)
+        cls._validate_qr_token(activity, token)
+        return cls._record_check_in(activity, student)
+    
+    @staticmethod
+    def qr_rotation_seconds() -> int:
+        """Return how long each QR token slot lasts."""
+        return getattr(settings, 'CHECKIN_QR_ROTATION_SECONDS', 30)
+    
+    @classmethod
+    def generate_qr_token(cls, activity: Activity, at=None) -> dict:
+        """Build the QR check-in token for the current time slot.
+        
+        The token is "<activity_id>.<slot>.<signature>" where the signature
+        is an HMAC of the activity ID and slot number keyed with SECRET_KEY,
+        so it can be verified without any database access.
+        
+        Args:
+            activity: Activity the token is for
+            at: Time to build the token for (defaults to now)
+            
+        Returns:
+            Dictionary with token, slot, expires_at and rotation_seconds
+        """
+        rotation = cls.qr_rotation_seconds()
+        at = at or timezone.now()
+        slot = int(at.timestamp()) // rotation
+        return {
+            'token': f'{activity.id}.{slot}.{cls._sign_qr_slot(activity.id, slot)}',
+            'slot': slot,
+            'expires_at': datetime.fromtimestamp((slot + 1) * rotation, tz=dt_timezone.utc),
+            'rotation_seconds': rotation,
+        }
+    
+    @classmethod
+    def _sign_qr_slot(cls, activity_id: int, slot: int) -> str:
+        """Return the URL-safe HMAC signature for an activity and slot."""
+        digest = salted_hmac(
+            cls.QR_TOKEN_SALT, f'{activity_id}.{slot}', algorithm='sha256'
+        ).digest()
+        return urlsafe_base64_encode(digest[:16])
+    
+    @classmethod
+    def _validate_qr_token(cls, activity: Activity, token: str) -> None:
+        """Validate a QR token for the current or the previous slot.
+        
+        Accepting the previous slot covers scans made just before the
+        organizer screen rotated.
+        
+        Raises:
+            ValidationError: If the token is malformed, for another activity,
+                expired or not signed by this server
+        """
+        try:
+            activity_id, slot, signature = token.strip().split('.')
+            activity_id, slot = int(activity_id), int(slot)
+        except ValueError:
+            raise ValidationError("Invalid or expired QR code.")
+        
+        current_slot = int(timezone.now().timestamp()) // cls.qr_rotation_seconds()
+        if (
+            activity_id != activity.id
+            or slot not in (current_slot, current_slot - 1)
+            or not constant_time_compare(signature, cls._sign_qr_slot(activity_id, slot))
+        ):
+            raise ValidationError("Invalid or expired QR code.")
+    
+    @classmethod
+    def _record_check_in(cls, activity: Activity, student) -> 'StudentCheckIn':
+        """Insert or upgrade the student's check-in record in one query.
+        
+        The insert only selects a row when the student has an approved
+        application, and the conflict update only fires when the existing
+        record is not already 'present'. Which of the two stopped the write
+        tells us which error to report.
+        
+        Raises:
+            ValidationError: If the student has no approved application or
+                has already checked in
+        """
+        checked_in_at = timezone.now()
+        sql = f"""
+            WITH approved AS (
+                SELECT student_id FROM {Application._meta.db_table}
+                WHERE activity_id = %s AND student_id = %s AND status = %s
+            ), recorded AS (
+                INSERT INTO {cls._meta.db_table}
+                    (activity_id, student_id, attendance_status, checked_in_at)
+                SELECT %s, student_id, 'present', %s FROM approved
+                ON CONFLICT (activity_id, student_id) DO UPDATE
+                    SET attendance_status = EXCLUDED.attendance_status,
+                        checked_in_at = EXCLUDED.checked_in_at
+                    WHERE {cls._meta.db_table}.attendance_status <> EXCLUDED.attendance_status
+                RETURNING id, marked_absent_at
+            )
+            SELECT EXISTS (SELECT 1 FROM approved), id, marked_absent_at
+            FROM (SELECT 1) AS one LEFT JOIN recorded ON TRUE
+        """
+        with connection.cursor() as cursor:
+            cursor.execute(sql, [
+                activity.id, student.pk, ApplicationStatus.APPROVED,
+                activity.id, checked_in_at,
+            ])
+            has_approved_application, check_in_id, marked_absent_at = cursor.fetchone()
+        
+        if not has_approved_application:
             raise ValidationError(
                 "You must have an approved application to check in to this activity."
             )
-        
-        # Step 2: Check for duplicate check-in
-        if cls._already_checked_in(activity, student):
+        if check_in_id is None:
             raise ValidationError(
                 "You have already checked in to this activity."
             )
         
-        # Step 3: Validate the code
-        cls._validate_code(activity, code)
-        
-        # Step 4: Validate activity timing
-        cls._validate_activity_timing(activity)
-        
-        # All validations passed - create or update check-in record
-        check_in, created = cls.objects.update_or_create(
+        check_in = cls(
+            id=check_in_id,
             activity=activity,
             student=student,
-            defaults={
-                'attendance_status': 'present',
-                'checked_in_at': timezone.now()
-            }
+            attendance_status='present',
+            checked_in_at=checked_in_at,
+            marked_absent_at=marked_absent_at,
         )
-        
+        check_in._state.adding = False
+        check_in._state.db = connection.alias
         return check_in
     
-    @staticmethod
-    def _has_approved_application(activity: Activity, student) -> bool:
-        """Check if student has an approved application for the activity."""
-        return Application.objects.filter(
-            activity=activity,
-            student=student,
-            status=ApplicationStatus.APPROVED
-        ).exists()
-    
     @classmethod
-    def _already_checked_in(cls, activity: Activity, student) -> bool:
-        """Check if student has already checked in."""
-        return cls.objects.filter(
+    def sync_offline_check_ins(cls, activity: Activity, records: list) -> dict:
+        """Record a batch of check-ins collected offline on an organizer device.
+
+        Students are identified by user ID (``student``) or by
+        ``student_id_external``. All records are validated with one query
+        against approved applications, which also reports students that are
+        already present. Students without a record are inserted in one
+        statement and students marked absent are turned present in another.
+        A record that is already present is never overwritten, including one
+        written by an online check-in while the batch is being synced.
+
+        Args:
+            activity: The activity the check-ins were collected for
+            records: List of dicts with ``checked_in_at`` (device timestamp)
+                and either ``student`` or ``student_id_external``
+
+        Returns:
+            Dictionary with accepted and rejected counts and a per-record
+            ``results`` list in request order
+        """
+        approved = Application.objects.filter(
             activity=activity,
-            student=student,
-            attendance_status='present'
-        ).exists()
-    
+            status=ApplicationStatus.APPROVED
+        ).filter(
+            Q(student_id__in=[r['student'] for r in records if r.get('student') is not None]) |
+            Q(student__profile__student_id_external__in=[
+                r['student_id_external'] for r in records if r.get('student_id_external')
+            ])
+        ).annotate(
+            attendance_status=Subquery(
+                cls.objects.filter(
+                    activity_id=OuterRef('activity_id'),
+                    student_id=OuterRef('student_id')
+                ).values('attendance_status')[:1]
+            )
+        ).values_list('student_id', 'student__profile__student_id_external', 'attendance_status')
+
+        by_user_id = {}
+        by_external_id = {}
+        for student_id, external_id, attendance_status in approved:
+            by_user_id[student_id] = attendance_status
+            if external_id:
+                by_external_id[external_id] = student_id
+
+        now = timezone.now()
+        earliest = activity.start_at - cls.OFFLINE_CLOCK_SKEW
+        latest = min(activity.end_at + cls.OFFLINE_CLOCK_SKEW, now + cls.OFFLINE_CLOCK_SKEW)
+
+        results = []
+        seen = set()
+        to_create = []
+        to_mark_present = {}
+        for index, record in enumerate(records):
+            student_id = record.get('student')
+            if student_id is None:
+                student_id = by_external_id.get(record.get('student_id_external'))
+            result = {'index': index, 'student': student_id if student_id in by_user_id else None}
+            checked_in_at = record['checked_in_at']
+
+            if student_id not in by_user_id:
+                result.update(accepted=False, detail="No approved application for this student.")
+            elif student_id in seen:
+                result.update(accepted=False, detail="Duplicate record for this student in the batch.")
+            elif not earliest <= checked_in_at <= latest:
+                result.update(accepted=False, detail="Check-in time is outside the activity period.")
+            elif by_user_id[student_id] == 'present':
+                result.update(accepted=True, detail="Already checked in.")
+            elif by_user_id[student_id] is not None:
+                result.update(accepted=True)
+                to_mark_present[student_id] = checked_in_at
+            else:
+                result.update(accepted=True)
+                to_create.append(cls(
+                    activity=activity,
+                    student_id=student_id,
+                    attendance_status='present',
+                    checked_in_at=checked_in_at,
+                ))
+
+            if result['accepted']:
+                seen.add(student_id)
+            results.append(result)
+
+        # Rows that appeared or turned present since the validation query came
+        # from online check-ins and keep their own timestamps
+        if to_create:
+            cls.objects.bulk_create(to_create, ignore_conflicts=True)
+        if to_mark_present:
+            cls.objects.filter(
+                activity=activity,
+                student_id__in=to_mark_present
+            ).exclude(attendance_status='present').update(
+                attendance_status='present',
+                checked_in_at=Case(
+                    *[When(student_id=student_id, then=Value(checked_in_at))
+                      for student_id, checked_in_at in to_mark_present.items()],
+                    output_field=models.DateTimeField()
+                )
+            )
+
+        accepted = sum(1 for result in results if result['accepted'])
+        return {
+            'accepted': accepted,
+            'rejected': len(results) - accepted,
+            'results': results,
+        }
+
     @staticmethod
     def _validate_code(activity: Activity, code: str) -> None:
-        """Validate the check-in code.
+        """Validate the check-in code against today's cached code.
         
         Raises:
-            ValidationError: If code is invalid or not valid today
+            ValidationError: If code is invalid
         """
-        today_code = DailyCheckInCode.get_or_create_today_code(activity)
-        
-        if not today_code.is_valid_today():
-            raise ValidationError("The check-in code is not valid today.")
+        today_code = DailyCheckInCode.get_cached_today_code(activity)
         
-        if code.strip().upper() != today_code.code.upper():
+        if code.strip().upper() != today_code.upper():
             raise ValidationError("Invalid check-in code.")
     
     @staticmethod
@@ -809,32 +1555,184 @@ class StudentCheckIn(models.Model):
         Returns:
             Number of students marked absent
         """
-        # Get all approved applications for this activity
-        approved_students = Application.objects.filter(
-            activity=activity,
-            status=ApplicationStatus.APPROVED
-        ).values_list('student_id', flat=True)
+        marked = cls._mark_absent('app.activity_id = %s', [activity.id])
+        return marked.get(activity.id, 0)
+    
+    @classmethod
+    def mark_absent_for_completed_activities(
+        cls,
+        ended_after,
+        ended_before,
+        id_range: Optional[tuple] = None,
+        dry_run: bool = False
+    ) -> dict:
+        """Mark absent students across every completed activity in a window.
         
-        # Get students who already have check-in records
-        existing_checkins = cls.objects.filter(
-            activity=activity
-        ).values_list('student_id', flat=True)
+        All qualifying activities are handled by a single
+        INSERT ... SELECT ... WHERE NOT EXISTS statement instead of a pair of
+        queries per activity. A dry run runs the same selection as one
+        aggregate query without inserting anything.
         
-        # Find students who don't have check-in records
-        students_without_checkin = set(approved_students) - set(existing_checkins)
+        Args:
+            ended_after: Only include activities that ended at or after this time
+            ended_before: Only include activities that ended before this time
+            id_range: Optional (first_id, last_id) half-open range of activity
+                IDs, used to split large backfills into chunks
+            dry_run: Count the students that would be marked without writing
+            
+        Returns:
+            Dictionary mapping activity ID to the number of students marked
+            absent (or that would be marked in a dry run)
+        """
+        where = 'act.status = %s AND act.end_at >= %s AND act.end_at < %s'
+        params = [ActivityStatus.COMPLETE, ended_after, ended_before]
+        if id_range is not None:
+            where += ' AND act.id >= %s AND act.id < %s'
+            params.extend(id_range)
+        return cls._mark_absent(where, params, dry_run=dry_run)
+    
+    @classmethod
+    def _mark_absent(cls, where: str, params: list, dry_run: bool = False) -> dict:
+        """Insert absent records for approved students matching ``where``.
         
-        # Create absent records for them
-        absent_records = [
-            cls(
-                activity=activity,
-                student_id=student_id,
-                attendance_status='absent',
-                marked_absent_at=timezone.now()
-            )
-            for student_id in students_without_checkin
-        ]
+        ``where`` filters the joined application (``app``) and activity
+        (``act``) rows. Students that already have a check-in record are
+        skipped by the NOT EXISTS clause, and ON CONFLICT DO NOTHING covers
+        check-ins recorded while the statement runs.
         
-        if absent_records:
-            cls.objects.bulk_create(absent_records)
+        Returns:
+            Dictionary mapping activity ID to the number of affected students
+        """
+        candidates = f"""
+            SELECT app.activity_id, app.student_id
+            FROM {Application._meta.db_table} app
+            JOIN {Activity._meta.db_table} act ON act.id = app.activity_id
+            WHERE app.status = %s AND {where}
+              AND NOT EXISTS (
+                  SELECT 1 FROM {cls._meta.db_table} ci
+                  WHERE ci.activity_id = app.activity_id
+                    AND ci.student_id = app.student_id
+              )
+        """
+        params = [ApplicationStatus.APPROVED, *params]
+        if dry_run:
+            sql = f"""
+                SELECT activity_id, COUNT(*)
+                FROM ({candidates}) AS candidates
+                GROUP BY activity_id
+            """
+        else:
+            sql = f"""
+                WITH marked AS (
+                    INSERT INTO {cls._meta.db_table}
+                        (activity_id, student_id, attendance_status, marked_absent_at)
+                    SELECT activity_id, student_id, 'absent', %s
+                    FROM ({candidates}) AS candidates
+                    ON CONFLICT (activity_id, student_id) DO NOTHING
+                    RETURNING activity_id
+                )
+                SELECT activity_id, COUNT(*) FROM marked GROUP BY activity_id
+            """
+            params = [timezone.now(), *params]
         
-        return len(absent_records)
+        with connection.cursor() as cursor:
+            cursor.execute(sql, params)
+            return dict(cursor.fetchall())
+
+
+class MediaBlob(models.Model):
+    """A stored media file, shared by every upload with the same content.
+
+    Names are content hashes (see activities.storage.ContentAddressedStorage)
+    and ``ref_count`` is the number of image fields and variants using it.
+    """
+
+    name = models.CharField(max_length=255, unique=True)
+    size = models.PositiveBigIntegerField()
+    ref_count = models.PositiveIntegerField(default=1)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        verbose_name = "Media Blob"
+        verbose_name_plural = "Media Blobs"
+
+    def __str__(self) -> str:
+        return f"{self.name} ({self.ref_count} references)"
+
+    @classmethod
+    def acquire(cls, name: str, size: int) -> None:
+        """
+        Add a reference to a blob, creating its row on first use.
+
+        Locks the row until the surrounding transaction ends.
+
+        Args:
+            name: Storage name of the blob
+            size: File size in bytes
+        """
+        table = cls._meta.db_table
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"""
+                INSERT INTO {table} (name, size, ref_count, created_at)
+                VALUES (%s, %s, 1, %s)
+                ON CONFLICT (name) DO UPDATE SET ref_count = {table}.ref_count + 1
+                """,
+                [name, size, timezone.now()]
+            )
+
+    @classmethod
+    def release(cls, name: str) -> bool:
+        """
+        Drop a reference to a blob. Must be called inside a transaction.
+
+        Args:
+            name: Storage name of the blob
+
+        Returns:
+            True if that was the last reference and the file can be removed.
+            Blobs without a row are left alone, as a save that has not
+            committed yet may be about to use them.
+        """
+        blob = cls.objects.select_for_update().filter(name=name).first()
+        if blob is None:
+            return False
+        if blob.ref_count > 1:
+            cls.objects.filter(pk=blob.pk).update(ref_count=F('ref_count') - 1)
+            return False
+        blob.delete()
+        return True
+
+
+class ParticipantCountReconciliation(models.Model):
+    """A completed run of the reconcile_participant_counts command.
+
+    The start of the latest run is where the next ``--incremental`` run picks
+    up. It is kept in the database because every run is a new process.
+
+    Attributes:
+        started_at: When the run started reading counters
+        incremental: Whether only touched activities were checked
+        checked: Number of activities checked
+        drifted: Number of counters corrected
+        total_drift: Sum of the corrections
+    """
+
+    started_at = models.DateTimeField(db_index=True)
+    incremental = models.BooleanField(default=False)
+    checked = models.PositiveIntegerField(default=0)
+    drifted = models.PositiveIntegerField(default=0)
+    total_drift = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        ordering = ['-started_at']
+        verbose_name = "Participant Count Reconciliation"
+        verbose_name_plural = "Participant Count Reconciliations"
+
+    def __str__(self) -> str:
+        return f"Reconciliation at {self.started_at:%Y-%m-%d %H:%M} ({self.drifted} drifted)"
+
+    @classmethod
+    def last_started_at(cls) -> Optional[datetime]:
+        """Return the start time of the latest run, or None if there was none."""
+        return cls.objects.values_list('started_at', flat=True).first()
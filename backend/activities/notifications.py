@@ -0,0 +1,122 @@
+"""
+Email notifications for people affected by activity changes.
+
+Recipients are collected while handling the request and the emails are sent
+by send_notification_emails background tasks, one per batch of recipients,
+so SMTP never delays the response. Messages that share a template and
+context are grouped so the template is rendered once for all of their
+recipients.
+"""
+from django.db import transaction
+
+from config.constants import ActivityStatus, ApplicationStatus
+from .models import Activity, Application
+from .tasks import enqueue_notification_emails
+
+
+def notify_activity_deleted(activity: Activity) -> None:
+    """Email students with pending or approved applications that the activity is gone.
+
+    Must be called in the transaction that deletes the activity, before the
+    delete: the applications are kept but lose their link to the activity
+    (``on_delete=SET_NULL``). The emails are queued once that transaction
+    commits, so nobody is emailed about a delete that was rolled back.
+
+    Args:
+        activity: Activity about to be deleted
+    """
+    recipients = list(
+        Application.objects.filter(
+            activity=activity,
+            status__in=[ApplicationStatus.PENDING, ApplicationStatus.APPROVED]
+        ).values_list('student__email', flat=True)
+    )
+    if recipients:
+        messages = [{
+            'template': 'activity_deleted',
+            'context': {'activity_title': activity.title},
+            'recipients': recipients,
+        }]
+        transaction.on_commit(lambda: enqueue_notification_emails(messages))
+
+
+def _moderation_message(title: str, status: str, reason: str, recipients: list) -> dict:
+    rejected = status == ActivityStatus.REJECTED
+    return {
+        'template': 'activity_rejected' if rejected else 'activity_approved',
+        'context': {'activity_title': title, 'reason': reason},
+        'recipients': recipients,
+    }
+
+
+def notify_activity_moderated(activity: Activity) -> None:
+    """Email the organizer the moderation decision on their activity.
+
+    Args:
+        activity: Activity that was just approved (opened) or rejected
+    """
+    enqueue_notification_emails([_moderation_message(
+        activity.title,
+        activity.status,
+        activity.rejection_reason,
+        [activity.organizer_profile.user.email]
+    )])
+
+
+def notify_activities_moderated(results: list) -> None:
+    """Email organizers the decisions made by Activity.bulk_moderate.
+
+    Organizers of activities that share a title, outcome and reason get a
+    single message.
+
+    Args:
+        results: The ``results`` list returned by Activity.bulk_moderate
+    """
+    moderated_ids = [result['id'] for result in results if result['success']]
+    if not moderated_ids:
+        return
+
+    groups = {}
+    for title, status, reason, email in Activity.objects.filter(pk__in=moderated_ids).values_list(
+        'title', 'status', 'rejection_reason', 'organizer_profile__user__email'
+    ):
+        groups.setdefault((title, status, reason), []).append(email)
+
+    enqueue_notification_emails([
+        _moderation_message(title, status, reason, recipients)
+        for (title, status, reason), recipients in groups.items()
+    ])
+
+
+def notify_applications_reviewed(activity: Activity, results: list) -> None:
+    """Email students the decisions made by Application.bulk_review.
+
+    Approvals share one message; rejections are grouped by reason.
+
+    Args:
+        activity: Activity whose applications were reviewed
+        results: The ``results`` list returned by Application.bulk_review
+    """
+    reviewed_ids = [result['id'] for result in results if result['success']]
+    if not reviewed_ids:
+        return
+
+    groups = {}
+    for email, status, notes in Application.objects.filter(pk__in=reviewed_ids).values_list(
+        'student__email', 'status', 'notes'
+    ):
+        if status == ApplicationStatus.APPROVED:
+            groups.setdefault(('application_approved', ''), []).append(email)
+        elif status == ApplicationStatus.REJECTED:
+            groups.setdefault(('application_rejected', notes), []).append(email)
+
+    if not groups:
+        return
+    enqueue_notification_emails([
+        {
+            'template': template,
+            'context': {'activity_title': activity.title, 'reason': reason},
+            'recipients': recipients,
+        }
+        for (template, reason), recipients in groups.items()
+    ])
@@ -1,14 +1,36 @@
 from rest_framework import serializers
+
+from config.constants import ValidationLimits
+from config.uploads import validate_image_upload
+from .images import variant_urls
 from .models import Activity, ActivityDeletionRequest, Application, ActivityPosterImage, DailyCheckInCode, StudentCheckIn
 
 
 class ActivityPosterImageSerializer(serializers.ModelSerializer):
     """Serializer for activity poster images."""
     
+    # Checked from the header only; the worker decodes it when making variants
+    image = serializers.FileField(validators=[validate_image_upload])
+    image_variants = serializers.SerializerMethodField()
+    
     class Meta:
         model = ActivityPosterImage
-        fields = ['id', 'image', 'order', 'created_at']
-        read_only_fields = ['id', 'created_at']
+        fields = ['id', 'image', 'image_variants', 'processing_status', 'order', 'created_at']
+        read_only_fields = ['id', 'image_variants', 'processing_status', 'created_at']
+
+    def get_image_variants(self, obj):
+        """Get thumb/card/full URLs of the poster (empty until generated)."""
+        return variant_urls(obj.image_variants, obj.image.storage, self.context.get('request'))
+
+
+class ActivityPosterImageBatchSerializer(serializers.Serializer):
+    """Serializer for uploading several poster images in one multipart request."""
+
+    images = serializers.ListField(
+        child=serializers.FileField(validators=[validate_image_upload]),
+        min_length=1,
+        max_length=ValidationLimits.MAX_POSTER_IMAGES
+    )
 
 
 class ActivitySerializer(serializers.ModelSerializer):
@@ -19,21 +41,28 @@ class ActivitySerializer(serializers.ModelSerializer):
     organizer_name = serializers.CharField(source='organizer_profile.organization_name', read_only=True)
     user_application_status = serializers.SerializerMethodField()
     poster_images = ActivityPosterImageSerializer(many=True, read_only=True)
+    cover_image_variants = serializers.SerializerMethodField()
 
     class Meta:
         model = Activity
         fields = [
             'id', 'organizer_profile_id', 'organizer_email', 'organizer_name', 'categories', 'title', 'description',
             'start_at', 'end_at', 'location', 'max_participants', 'current_participants',
-            'status', 'hours_awarded', 'cover_image', 'poster_images', 'rejection_reason', 'created_at', 'updated_at', 
-            'requires_admin_for_delete', 'capacity_reached', 'user_application_status',
+            'status', 'hours_awarded', 'cover_image', 'cover_image_variants', 'cover_image_status', 'poster_images',
+            'rejection_reason', 'created_at', 'updated_at', 'requires_admin_for_delete', 'capacity_reached',
+            'user_application_status',
         ]
         read_only_fields = [
             'id', 'organizer_profile_id', 'organizer_email', 'organizer_name', 'current_participants', 'status',
             'rejection_reason', 'created_at', 'updated_at', 'requires_admin_for_delete', 
-            'capacity_reached', 'user_application_status', 'poster_images'
+            'capacity_reached', 'user_application_status', 'poster_images', 'cover_image_variants',
+            'cover_image_status'
         ]
 
+    def get_cover_image_variants(self, obj):
+        """Get thumb/card/full URLs of the cover image, so lists can skip the original."""
+        return variant_urls(obj.cover_image_variants, obj.cover_image.storage, self.context.get('request'))
+
     def get_user_application_status(self, obj):
         """Get the current user's application status for this activity."""
         request = self.context.get('request')
@@ -45,12 +74,18 @@ class ActivitySerializer(serializers.ModelSerializer):
         
         # Only return status for students
         if getattr(request.user, 'role', None) == UserRoles.STUDENT:
+            # Views that already loaded the application pass the status in
+            if 'user_application_status' in self.context:
+                return self.context['user_application_status']
             return get_student_application_status(request.user, obj)
         
         return None
 
 
 class ActivityWriteSerializer(serializers.ModelSerializer):
+    # Checked from the header only; the worker decodes it when making variants
+    cover_image = serializers.FileField(required=False, allow_null=True, validators=[validate_image_upload])
+
     class Meta:
         model = Activity
         fields = [
@@ -205,6 +240,82 @@ class ApplicationReviewSerializer(serializers.Serializer):
         return data
 
 
+class ApplicationBulkReviewItemSerializer(ApplicationReviewSerializer):
+    """Serializer for one decision in a bulk review."""
+
+    id = serializers.IntegerField(required=True)
+
+
+class ApplicationBulkReviewSerializer(serializers.Serializer):
+    """Serializer for reviewing many applications of an activity at once.
+
+    Accepts either an explicit list of decisions in ``items`` or
+    ``approve_first`` to approve the first N pending applications in
+    submission order.
+    """
+
+    MAX_ITEMS = 500
+
+    items = ApplicationBulkReviewItemSerializer(many=True, required=False, max_length=MAX_ITEMS)
+    approve_first = serializers.IntegerField(required=False, min_value=1, max_value=MAX_ITEMS)
+
+    def validate(self, data):
+        """Validate that exactly one mode is used and IDs are unique."""
+        items = data.get('items')
+        if (items is None) == (data.get('approve_first') is None):
+            raise serializers.ValidationError('Provide either items or approve_first.')
+
+        if items is not None:
+            if not items:
+                raise serializers.ValidationError({'items': 'At least one item is required.'})
+            ids = [item['id'] for item in items]
+            if len(ids) != len(set(ids)):
+                raise serializers.ValidationError({'items': 'Each application can only appear once.'})
+
+        return data
+
+
+class ActivityModerationItemSerializer(serializers.Serializer):
+    """Serializer for one decision in a bulk moderation."""
+
+    id = serializers.IntegerField(required=True)
+    action = serializers.ChoiceField(choices=['approve', 'reject'], required=True)
+    reason = serializers.CharField(required=False, allow_blank=True)
+
+
+class ActivityBulkModerationSerializer(serializers.Serializer):
+    """Serializer for approving and rejecting many pending activities at once.
+
+    Rejections use their own ``reason`` or, if they have none, the shared
+    top-level ``reason``.
+    """
+
+    MAX_ITEMS = 500
+
+    items = ActivityModerationItemSerializer(many=True, max_length=MAX_ITEMS)
+    reason = serializers.CharField(required=False, allow_blank=True)
+
+    def validate(self, data):
+        """Validate that IDs are unique and every rejection has a reason."""
+        items = data['items']
+        if not items:
+            raise serializers.ValidationError({'items': 'At least one item is required.'})
+        ids = [item['id'] for item in items]
+        if len(ids) != len(set(ids)):
+            raise serializers.ValidationError({'items': 'Each activity can only appear once.'})
+
+        shared_reason = data.get('reason', '').strip()
+        for item in items:
+            if item['action'] == 'reject':
+                item['reason'] = item.get('reason', '').strip() or shared_reason
+                if not item['reason']:
+                    raise serializers.ValidationError({
+                        'items': f"Rejection reason is required for activity {item['id']}."
+                    })
+
+        return data
+
+
 class DailyCheckInCodeSerializer(serializers.ModelSerializer):
     """Serializer for daily check-in codes (organizer view)."""
     
@@ -241,14 +352,23 @@ class StudentCheckInSerializer(serializers.ModelSerializer):
 
 
 class CheckInRequestSerializer(serializers.Serializer):
-    """Serializer for student check-in request."""
+    """Serializer for student check-in request.
+    
+    Students send either the 6-character daily code or the rotating token
+    scanned from the organizer's QR code.
+    """
     
     code = serializers.CharField(
         max_length=6,
         min_length=6,
-        required=True,
+        required=False,
         help_text="6-character check-in code"
     )
+    token = serializers.CharField(
+        max_length=128,
+        required=False,
+        help_text="Token from the organizer's check-in QR code"
+    )
     
     def validate_code(self, value):
         """Validate code format."""
@@ -260,3 +380,46 @@ class CheckInRequestSerializer(serializers.Serializer):
             raise serializers.ValidationError("Check-in code must be exactly 6 characters.")
         
         return code
+
+    def validate(self, data):
+        """Validate that exactly one of code and token is given."""
+        if 'code' in data and 'token' in data:
+            raise serializers.ValidationError('Provide either a check-in code or a QR token, not both.')
+        if 'code' not in data and 'token' not in data:
+            raise serializers.ValidationError({'code': 'A check-in code or QR token is required.'})
+        return data
+
+
+class CheckInQRTokenSerializer(serializers.Serializer):
+    """Serializer for the rotating QR check-in token (organizer view)."""
+    
+    token = serializers.CharField(read_only=True)
+    slot = serializers.IntegerField(read_only=True)
+    expires_at = serializers.DateTimeField(read_only=True)
+    rotation_seconds = serializers.IntegerField(read_only=True)
+
+
+class CheckInSyncRecordSerializer(serializers.Serializer):
+    """Serializer for one check-in collected offline on an organizer device."""
+
+    student = serializers.IntegerField(required=False, help_text="Student user ID")
+    student_id_external = serializers.CharField(required=False, max_length=50)
+    checked_in_at = serializers.DateTimeField(required=True, help_text="Device timestamp of the check-in")
+
+    def validate(self, data):
+        """Validate that exactly one student identifier is given."""
+        if ('student' in data) == ('student_id_external' in data):
+            raise serializers.ValidationError(
+                'Provide either student or student_id_external.'
+            )
+        if 'student_id_external' in data:
+            data['student_id_external'] = data['student_id_external'].strip()
+        return data
+
+
+class CheckInSyncSerializer(serializers.Serializer):
+    """Serializer for a batch of offline check-ins."""
+
+    MAX_RECORDS = 500
+
+    records = CheckInSyncRecordSerializer(many=True, min_length=1, max_length=MAX_RECORDS)
@@ -0,0 +1,38 @@
+"""
+Signal handlers for the activities app.
+"""
+from django.db.models.signals import post_delete
+from django.dispatch import receiver
+from django.utils import timezone
+
+from config.constants import ApplicationStatus
+from .images import variant_names
+from .models import Activity, ActivityPosterImage, Application
+from .storage import release_files
+
+
+@receiver(post_delete, sender=Activity)
+def release_cover_image(sender, instance: Activity, **kwargs) -> None:
+    """Release the cover image and its variants of a deleted activity."""
+    if instance.cover_image:
+        release_files(
+            instance.cover_image.storage,
+            [instance.cover_image.name, *variant_names(instance.cover_image_variants)]
+        )
+
+
+@receiver(post_delete, sender=ActivityPosterImage)
+def release_poster_image(sender, instance: ActivityPosterImage, **kwargs) -> None:
+    """Release the image and variants of a deleted poster (also when its activity is deleted)."""
+    if instance.image:
+        release_files(instance.image.storage, [instance.image.name, *variant_names(instance.image_variants)])
+
+
+@receiver(post_delete, sender=Application)
+def touch_activity_of_deleted_approval(sender, instance: Application, **kwargs) -> None:
+    """Mark the activity of a deleted approval for the next incremental reconciliation.
+
+    Its current_participants counter still includes the deleted application.
+    """
+    if instance.status == ApplicationStatus.APPROVED and instance.activity_id:
+        Activity.objects.filter(pk=instance.activity_id).update(updated_at=timezone.now())
@@ -0,0 +1,87 @@
+"""
+Content-addressed media storage.
+
+Uploads are stored under the SHA-256 of their content instead of the name
+they were uploaded with, so the same image uploaded for several activities
+is stored once. MediaBlob counts how many fields and variants refer to each
+file, and the file is removed when the last one lets go of it.
+
+The name passed to ``save()`` only contributes its extension. Because a
+blob's URL changes whenever its content does, blobs can be cached forever
+(see activities.media).
+"""
+import hashlib
+import os
+
+from django.core.files.storage import FileSystemStorage
+from django.db import transaction
+
+from .models import MediaBlob
+
+BLOB_DIRECTORY = 'blobs'
+
+
+def is_blob(name: str) -> bool:
+    """Return True if ``name`` was stored by ContentAddressedStorage."""
+    return name.startswith(f'{BLOB_DIRECTORY}/')
+
+
+class ContentAddressedStorage(FileSystemStorage):
+    """File system storage that stores identical files once."""
+
+    def get_available_name(self, name, max_length=None):
+        # The stored name comes from the content in _save(), and a name that
+        # is already taken is the same file
+        return name
+
+    def _save(self, name, content):
+        digest = hashlib.sha256()
+        content.seek(0)
+        for chunk in content.chunks():
+            digest.update(chunk)
+        content.seek(0)
+        hexdigest = digest.hexdigest()
+        extension = os.path.splitext(name)[1].lower()
+        blob_name = f'{BLOB_DIRECTORY}/{hexdigest[:2]}/{hexdigest}{extension}'
+
+        # The blob row stays locked until commit, so a concurrent delete of
+        # the same blob cannot remove the file between the check and the write
+        with transaction.atomic():
+            MediaBlob.acquire(blob_name, content.size)
+            if not self.exists(blob_name):
+                super()._save(blob_name, content)
+        return blob_name
+
+    def delete(self, name):
+        """Drop one reference to a blob, removing the file with the last one.
+
+        Files saved before content addressing are not shared and are removed
+        straight away.
+        """
+        if not is_blob(name):
+            super().delete(name)
+            return
+        with transaction.atomic():
+            if MediaBlob.release(name):
+                super().delete(name)
+
+
+def release_files(storage, names) -> None:
+    """Delete stored files once the current transaction commits.
+
+    With ContentAddressedStorage this drops one reference per name. Deferred
+    so a rolled back save or delete does not lose files still in use.
+
+    Args:
+        storage: Storage the files were saved to
+        names: Storage names; empty names are ignored
+    """
+    names = [name for name in names if name]
+    if not names:
+        return
+
+    def delete():
+        for name in names:
+            storage.delete(name)
+
+    transaction.on_commit(delete)
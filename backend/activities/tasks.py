@@ -0,0 +1,117 @@
+"""
+Background tasks and periodic jobs for the activities app.
+
+The periodic jobs replace the cron entries for the management commands of
+the same names; run_scheduler runs them on one replica.
+"""
+from django.core.management import call_command
+from django.db import transaction
+
+from config.constants import ImageProcessingStatus
+from config.emails import BulkEmail, split_batches
+from tasks.registry import task
+from tasks.scheduler import periodic
+from .images import generate_variants, variant_names
+from .models import Activity, ActivityPosterImage
+from .storage import release_files
+
+# kind -> (model, image field, variants field, status field)
+IMAGE_FIELDS = {
+    'cover': (Activity, 'cover_image', 'cover_image_variants', 'cover_image_status'),
+    'poster': (ActivityPosterImage, 'image', 'image_variants', 'processing_status'),
+}
+
+
+@task()
+def send_notification_emails(messages: list) -> None:
+    """Send one batch of notification emails over one connection.
+
+    Queue it with enqueue_notification_emails, which keeps each task to one
+    batch so that a retry only resends the batch that failed.
+
+    Args:
+        messages: List of dicts with ``template``, ``context`` and
+            ``recipients`` (see config.emails.BulkEmail.add)
+    """
+    email = BulkEmail()
+    for message in messages:
+        email.add(message['template'], message['context'], message['recipients'])
+    email.send()
+
+
+def enqueue_notification_emails(messages: list) -> None:
+    """Queue send_notification_emails once per batch of EMAIL_BATCH_SIZE recipients.
+
+    Args:
+        messages: List of dicts with ``template``, ``context`` and
+            ``recipients`` (see config.emails.BulkEmail.add)
+    """
+    for batch in split_batches(messages):
+        send_notification_emails.enqueue(messages=batch)
+
+
+@task()
+def process_image_variants(kind: str, pk: int, name: str) -> bool:
+    """Decode an uploaded image and write its resized variants.
+
+    Args:
+        kind: ``cover`` or ``poster`` (see IMAGE_FIELDS)
+        pk: Primary key of the activity or poster
+        name: Storage name of the upload the task was queued for
+
+    Returns:
+        True if variants were written
+    """
+    model, image_field, variants_field, status_field = IMAGE_FIELDS[kind]
+    instance = model.objects.filter(pk=pk).only('pk', image_field, variants_field).first()
+    # Deleted, or replaced by a newer upload that queued its own task
+    if instance is None or getattr(instance, image_field).name != name:
+        return False
+
+    field_file = getattr(instance, image_field)
+    variants = generate_variants(field_file)
+    with transaction.atomic():
+        # Re-read under a lock: an overlapping run may have written variants
+        # since, and those are the ones this run replaces and must release
+        current = model.objects.select_for_update().filter(pk=pk).values_list(
+            image_field, variants_field
+        ).first()
+        if current is None or current[0] != name:
+            release_files(field_file.storage, variant_names(variants))
+            return False
+        model.objects.filter(pk=pk).update(**{
+            variants_field: variants,
+            status_field: ImageProcessingStatus.READY if variants else ImageProcessingStatus.FAILED,
+        })
+        release_files(field_file.storage, variant_names(current[1]))
+    return bool(variants)
+
+
+@periodic(seconds=60)
+def update_activity_statuses() -> None:
+    """Move activities to during/complete as their start and end times pass."""
+    Activity.update_all_statuses()
+
+
+@periodic(seconds=10 * 60)
+def generate_checkin_codes() -> None:
+    """Create and cache today's check-in codes, pruning expired ones."""
+    call_command('generate_checkin_codes')
+
+
+@periodic(seconds=15 * 60)
+def mark_absent_students() -> None:
+    """Mark students absent for activities that ended without their check-in."""
+    call_command('mark_absent_students')
+
+
+@periodic(seconds=60 * 60)
+def reconcile_participant_counts() -> None:
+    """Fix participant counters that drifted since the last run."""
+    call_command('reconcile_participant_counts', incremental=True)
+
+
+@periodic(seconds=24 * 60 * 60)
+def reconcile_all_participant_counts() -> None:
+    """Check every participant counter, including drift incremental runs cannot see."""
+    call_command('reconcile_participant_counts')
@@ -5,6 +5,8 @@ from .test_activity_model import *
 from .test_application_model import *
 from .test_checkin_model import *
 from .test_deletion_request_model import *
+from .test_images import *
+from .test_storage import *
 
 # Serializer tests
 from .test_serializers import *
@@ -17,3 +19,10 @@ from .test_activity_views import *
 from .test_application_views import *
 from .test_checkin_views import *
 from .test_view_edge_cases import *
+from .test_media import *
+
+# Notification tests
+from .test_notifications import *
+
+# Admin tests
+from .test_admin import *
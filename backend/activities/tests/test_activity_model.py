@@ -7,14 +7,19 @@ and all business logic related to volunteer activities.
 from datetime import timedelta
 from decimal import Decimal
 
+from io import StringIO
+
 from django.contrib.auth import get_user_model
 from django.core.exceptions import ValidationError
+from django.core.management import call_command
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 from django.utils import timezone
 
 from config.constants import ActivityStatus, ValidationLimits
 from users.models import OrganizerProfile
-from activities.models import Activity
+from activities.models import Activity, Application, ParticipantCountReconciliation
 
 User = get_user_model()
 
@@ -542,3 +547,211 @@ class ActivityModelTestCase(TestCase):
         # Most recent should be first
         self.assertEqual(activities[0].id, activity2.id)
         self.assertEqual(activities[1].id, activity1.id)
+
+
+class ParticipantCountReconciliationTestCase(TestCase):
+    """Test cases for reconciling denormalized participant counters."""
+
+    def setUp(self):
+        """Set up activities with approved applications."""
+        self.organizer_user = User.objects.create_user(
+            email='organizer@test.com',
+            password='testpass123',
+            role='organizer'
+        )
+        self.organizer_profile = OrganizerProfile.objects.create(
+            user=self.organizer_user,
+            organization_name='Test Organization',
+            organization_type='nonprofit'
+        )
+        self.students = [
+            User.objects.create_user(
+                email=f'student{i}@ku.th',
+                password='testpass123',
+                role='student'
+            )
+            for i in range(3)
+        ]
+        now = timezone.now()
+        self.activity = Activity.objects.create(
+            organizer_profile=self.organizer_profile,
+            title='Drifting Activity',
+            start_at=now + timedelta(days=10),
+            end_at=now + timedelta(days=10, hours=5),
+            max_participants=10,
+            categories=['University Activities'],
+        )
+        self.in_sync_activity = Activity.objects.create(
+            organizer_profile=self.organizer_profile,
+            title='In-sync Activity',
+            start_at=now + timedelta(days=10),
+            end_at=now + timedelta(days=10, hours=5),
+            max_participants=10,
+            categories=['University Activities'],
+        )
+        for student in self.students:
+            Application.objects.create(
+                activity=self.activity, student=student
+            ).approve(self.organizer_user)
+
+    def test_reconcile_corrects_counter_after_cancellation(self):
+        """Test that cancelled approvals are no longer counted."""
+        Application.objects.filter(student=self.students[0]).get().cancel()
+
+        result = Activity.reconcile_participant_counts()
+
+        self.assertEqual(result, {'checked': 2, 'drifted': 1, 'total_drift': 1})
+        self.activity.refresh_from_db()
+        self.assertEqual(self.activity.current_participants, 2)
+
+    def test_reconcile_leaves_in_sync_counters_untouched(self):
+        """Test that nothing is written when counters are correct."""
+        with self.assertNumQueries(2):
+            result = Activity.reconcile_participant_counts()
+
+        self.assertEqual(result['drifted'], 0)
+
+    def test_reconcile_dry_run_does_not_write(self):
+        """Test that dry run reports drift without changing counters."""
+        Activity.objects.filter(pk=self.in_sync_activity.pk).update(current_participants=4)
+
+        result = Activity.reconcile_participant_counts(dry_run=True)
+
+        self.assertEqual(result['drifted'], 1)
+        self.assertEqual(result['total_drift'], 4)
+        self.in_sync_activity.refresh_from_db()
+        self.assertEqual(self.in_sync_activity.current_participants, 4)
+
+    def test_reconcile_since_only_checks_touched_activities(self):
+        """Test that incremental reconciliation skips untouched activities."""
+        since = timezone.now()
+        Activity.objects.filter(pk=self.in_sync_activity.pk).update(current_participants=4)
+        Application.objects.filter(student=self.students[0]).get().cancel()
+
+        result = Activity.reconcile_participant_counts(since=since)
+
+        # Only the activity with the cancelled application was touched
+        self.assertEqual(result['checked'], 1)
+        self.activity.refresh_from_db()
+        self.in_sync_activity.refresh_from_db()
+        self.assertEqual(self.activity.current_participants, 2)
+        self.assertEqual(self.in_sync_activity.current_participants, 4)
+
+    def test_reconcile_dry_run_does_not_lock(self):
+        """Test that dry run reads counters without taking row locks."""
+        Activity.objects.filter(pk=self.in_sync_activity.pk).update(current_participants=4)
+
+        with CaptureQueriesContext(connection) as queries:
+            Activity.reconcile_participant_counts(dry_run=True)
+
+        self.assertFalse(any('FOR UPDATE' in query['sql'] for query in queries))
+
+    def test_reconcile_since_finds_deleted_approvals(self):
+        """Test that deleting an approved application touches its activity."""
+        since = timezone.now()
+        Application.objects.filter(student=self.students[0]).delete()
+
+        result = Activity.reconcile_participant_counts(since=since)
+
+        self.assertEqual(result, {'checked': 1, 'drifted': 1, 'total_drift': 1})
+        self.activity.refresh_from_db()
+        self.assertEqual(self.activity.current_participants, 2)
+
+    def test_command_incremental_uses_last_run(self):
+        """Test that the command records its run time for incremental mode."""
+        out = StringIO()
+        call_command('reconcile_participant_counts', '--incremental', stdout=out)
+        self.assertIn('No previous run recorded', out.getvalue())
+        self.assertTrue(ParticipantCountReconciliation.objects.filter(incremental=True).exists())
+
+        Application.objects.filter(student=self.students[0]).get().cancel()
+        out = StringIO()
+        call_command('reconcile_participant_counts', '--incremental', stdout=out)
+
+        self.assertIn('Reconciled 1 of 1 activities', out.getvalue())
+        self.activity.refresh_from_db()
+        self.assertEqual(self.activity.current_participants, 2)
+
+
+class ActivityBulkModerationTestCase(TestCase):
+    """Test cases for Activity.bulk_moderate."""
+
+    def setUp(self):
+        """Set up pending activities and one that is already open."""
+        organizer_user = User.objects.create_user(
+            email='organizer@test.com',
+            password='testpass123',
+            role='organizer'
+        )
+        organizer_profile = OrganizerProfile.objects.create(
+            user=organizer_user,
+            organization_name='Test Organization',
+            organization_type='nonprofit'
+        )
+        now = timezone.now()
+        self.pending = [
+            Activity.objects.create(
+                organizer_profile=organizer_profile,
+                title=f'Pending Activity {i}',
+                start_at=now + timedelta(days=10),
+                end_at=now + timedelta(days=10, hours=5),
+                categories=['University Activities'],
+            )
+            for i in range(4)
+        ]
+        self.open_activity = Activity.objects.create(
+            organizer_profile=organizer_profile,
+            title='Open Activity',
+            start_at=now + timedelta(days=10),
+            end_at=now + timedelta(days=10, hours=5),
+            categories=['University Activities'],
+            status=ActivityStatus.OPEN
+        )
+
+    def test_bulk_moderate_applies_decisions(self):
+        """Test that approvals and rejections are applied with their reasons."""
+        summary = Activity.bulk_moderate([
+            {'id': self.pending[0].id, 'action': 'approve'},
+            {'id': self.pending[1].id, 'action': 'approve'},
+            {'id': self.pending[2].id, 'action': 'reject', 'reason': 'Missing location'},
+            {'id': self.pending[3].id, 'action': 'reject', 'reason': ' Duplicate '},
+        ])
+
+        self.assertEqual((summary['approved'], summary['rejected'], summary['failed']), (2, 2, 0))
+        self.assertEqual(
+            [result['status'] for result in summary['results']],
+            [ActivityStatus.OPEN, ActivityStatus.OPEN, ActivityStatus.REJECTED, ActivityStatus.REJECTED]
+        )
+        stored = dict(Activity.objects.values_list('id', 'rejection_reason'))
+        self.assertEqual(stored[self.pending[0].id], '')
+        self.assertEqual(stored[self.pending[2].id], 'Missing location')
+        self.assertEqual(stored[self.pending[3].id], 'Duplicate')
+
+    def test_bulk_moderate_reports_items_that_cannot_be_applied(self):
+        """Test that missing and non-pending activities fail without failing the batch."""
+        summary = Activity.bulk_moderate([
+            {'id': self.open_activity.id, 'action': 'reject', 'reason': 'Too late'},
+            {'id': 999999, 'action': 'approve'},
+            {'id': self.pending[0].id, 'action': 'approve'},
+        ])
+
+        self.assertEqual((summary['approved'], summary['rejected'], summary['failed']), (1, 0, 2))
+        self.assertEqual(
+            [result['detail'] for result in summary['results'][:2]],
+            ['Only pending activities can be moderated.', 'Activity not found.']
+        )
+        self.open_activity.refresh_from_db()
+        self.assertEqual(self.open_activity.status, ActivityStatus.OPEN)
+        self.assertIsNone(self.open_activity.rejection_reason)
+
+    def test_bulk_moderate_uses_one_update_per_action(self):
+        """Test that the number of queries does not depend on the number of items."""
+        items = [
+            {'id': activity.id, 'action': 'reject', 'reason': f'Reason {i}'}
+            for i, activity in enumerate(self.pending)
+        ]
+        # Savepoint, lock, one UPDATE per action, release savepoint
+        with self.assertNumQueries(5):
+            Activity.bulk_moderate(items[:2] + [{'id': self.pending[2].id, 'action': 'approve'}])
+        with self.assertNumQueries(4):
+            Activity.bulk_moderate([items[3]])
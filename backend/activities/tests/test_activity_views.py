@@ -7,16 +7,18 @@ For Application, CheckIn, and other views, see their respective test files:
 - test_view_edge_cases.py
 """
 from datetime import timedelta
+from unittest import mock
 
 from django.contrib.auth import get_user_model
-from django.test import TestCase
+from django.test import TestCase, override_settings
 from django.utils import timezone
 from rest_framework import status
 from rest_framework.test import APIClient
 
-from config.constants import ActivityStatus
-from users.models import OrganizerProfile
-from activities.models import Activity
+from config.constants import ActivityStatus, ApplicationStatus
+from config.pagination import NoPrevNextPagination
+from users.models import OrganizerProfile, StudentProfile
+from activities.models import Activity, Application, DailyCheckInCode, StudentCheckIn
 
 User = get_user_model()
 
@@ -91,6 +93,15 @@ class ActivityListViewTestCase(TestCase):
         self.assertEqual(len(response.data['results']), 1)
         self.assertEqual(response.data['results'][0]['status'], ActivityStatus.OPEN)
 
+    @override_settings(ACTIVITY_STATUS_REFRESH_ON_REQUEST=False)
+    def test_list_activities_leaves_status_refresh_to_scheduler(self):
+        """Test that the list does not update statuses when the scheduler does it."""
+        with mock.patch.object(Activity, 'update_all_statuses') as update_all_statuses:
+            response = self.client.get('/api/activities/list/')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        update_all_statuses.assert_not_called()
+
     def test_list_activities_search(self):
         """Test searching activities by title."""
         response = self.client.get('/api/activities/list/', {'search': 'Activity 1'})
@@ -237,6 +248,200 @@ class ActivityDetailViewTestCase(TestCase):
         self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
 
 
+class ActivityDetailBundleViewTestCase(TestCase):
+    """Test cases for the role-aware activity detail bundle endpoint."""
+
+    def setUp(self):
+        """Set up test data."""
+        self.client = APIClient()
+
+        self.organizer_user = User.objects.create_user(
+            email='organizer@test.com',
+            password='testpass123',
+            role='organizer'
+        )
+        self.organizer_profile = OrganizerProfile.objects.create(
+            user=self.organizer_user,
+            organization_name='Test Organization',
+            organization_type='nonprofit'
+        )
+        self.other_organizer = User.objects.create_user(
+            email='other@test.com',
+            password='testpass123',
+            role='organizer'
+        )
+        OrganizerProfile.objects.create(
+            user=self.other_organizer,
+            organization_name='Other Organization',
+            organization_type='nonprofit'
+        )
+        self.student_user = User.objects.create_user(
+            email='student@ku.th',
+            password='testpass123',
+            role='student'
+        )
+        StudentProfile.objects.create(
+            user=self.student_user,
+            student_id_external='6610545001'
+        )
+
+        self.now = timezone.now()
+        self.activity = Activity.objects.create(
+            organizer_profile=self.organizer_profile,
+            title='Test Activity',
+            description='Test description',
+            location='Bangkok',
+            start_at=self.now - timedelta(hours=1),
+            end_at=self.now + timedelta(hours=2),
+            max_participants=50,
+            categories=['University Activities'],
+            status=ActivityStatus.DURING
+        )
+        self.application = Application.objects.create(
+            activity=self.activity,
+            student=self.student_user,
+            status=ApplicationStatus.APPROVED
+        )
+        self.url = f'/api/activities/{self.activity.id}/bundle/'
+
+    def test_bundle_unauthenticated(self):
+        """Test that unauthenticated users cannot fetch the bundle."""
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_bundle_not_found(self):
+        """Test that non-existent activity returns 404."""
+        self.client.force_authenticate(user=self.student_user)
+        response = self.client.get('/api/activities/9999/bundle/')
+
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_bundle_as_student(self):
+        """Test that students get their application and check-in record."""
+        StudentCheckIn.objects.create(
+            activity=self.activity,
+            student=self.student_user,
+            attendance_status='present',
+            checked_in_at=self.now
+        )
+        self.client.force_authenticate(user=self.student_user)
+
+        with self.assertNumQueries(4):
+            response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['activity']['title'], 'Test Activity')
+        self.assertEqual(response.data['activity']['user_application_status'], 'present')
+        self.assertEqual(response.data['application']['id'], self.application.id)
+        self.assertEqual(response.data['check_in']['attendance_status'], 'present')
+        self.assertTrue(response.data['has_checked_in'])
+        self.assertNotIn('applications', response.data)
+        self.assertNotIn('checkin_code', response.data)
+
+    def test_bundle_as_student_without_application(self):
+        """Test that students without an application get empty sections."""
+        other_student = User.objects.create_user(
+            email='student2@ku.th',
+            password='testpass123',
+            role='student'
+        )
+        self.client.force_authenticate(user=other_student)
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIsNone(response.data['application'])
+        self.assertIsNone(response.data['check_in'])
+        self.assertFalse(response.data['has_checked_in'])
+        self.assertIsNone(response.data['activity']['user_application_status'])
+
+    def test_bundle_as_organizer(self):
+        """Test that organizers get applications and today's check-in code."""
+        self.client.force_authenticate(user=self.organizer_user)
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['applications']['count'], 1)
+        self.assertEqual(response.data['applications']['results'][0]['student_email'], 'student@ku.th')
+        self.assertEqual(
+            response.data['checkin_code']['code'],
+            DailyCheckInCode.objects.get(activity=self.activity).code
+        )
+        self.assertNotIn('application', response.data)
+
+    def test_bundle_as_organizer_query_count_is_fixed(self):
+        """Test that the number of queries does not grow with applications."""
+        self.client.force_authenticate(user=self.organizer_user)
+        self.client.get(self.url)  # Generate and cache today's code up front
+
+        for i in range(5):
+            student = User.objects.create_user(
+                email=f'extra{i}@ku.th',
+                password='testpass123',
+                role='student'
+            )
+            Application.objects.create(activity=self.activity, student=student)
+
+        # Activity, posters, application count, application page
+        with self.assertNumQueries(4):
+            response = self.client.get(self.url)
+
+        self.assertEqual(len(response.data['applications']['results']), 6)
+
+    def test_bundle_as_organizer_returns_first_page_of_applications(self):
+        """Test that large activities only get the first page of applications."""
+        self.activity.max_participants = None
+        self.activity.save(update_fields=['max_participants'])
+        students = User.objects.bulk_create([
+            User(email=f'bulk{i}@ku.th', password='!', role='student')
+            for i in range(NoPrevNextPagination.page_size + 5)
+        ])
+        Application.objects.bulk_create([
+            Application(activity=self.activity, student=student) for student in students
+        ])
+        self.client.force_authenticate(user=self.organizer_user)
+
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.data['applications']['count'], len(students) + 1)
+        self.assertEqual(len(response.data['applications']['results']), NoPrevNextPagination.page_size)
+
+    @override_settings(ACTIVITY_STATUS_REFRESH_ON_REQUEST=False)
+    def test_bundle_does_not_refresh_status_when_disabled(self):
+        """Test that the status is left to the scheduler when refresh on request is off."""
+        Activity.objects.filter(pk=self.activity.pk).update(status=ActivityStatus.OPEN)
+        self.client.force_authenticate(user=self.student_user)
+
+        self.client.get(self.url)
+
+        self.activity.refresh_from_db()
+        self.assertEqual(self.activity.status, ActivityStatus.OPEN)
+
+    def test_bundle_as_other_organization(self):
+        """Test that organizers from other organizations only get the detail."""
+        self.client.force_authenticate(user=self.other_organizer)
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['activity']['id'], self.activity.id)
+        self.assertNotIn('applications', response.data)
+        self.assertNotIn('checkin_code', response.data)
+
+    def test_bundle_no_code_outside_activity_time(self):
+        """Test that no check-in code is generated before the activity starts."""
+        self.activity.start_at = self.now + timedelta(days=10)
+        self.activity.end_at = self.now + timedelta(days=10, hours=5)
+        self.activity.status = ActivityStatus.OPEN
+        self.activity.save()
+
+        self.client.force_authenticate(user=self.organizer_user)
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIsNone(response.data['checkin_code'])
+        self.assertFalse(DailyCheckInCode.objects.filter(activity=self.activity).exists())
+
+
 class ActivityUpdateViewTestCase(TestCase):
     """Test cases for activity update endpoint."""
 
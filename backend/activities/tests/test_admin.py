@@ -0,0 +1,120 @@
+"""
+Tests for the activities admin changelists and forms.
+"""
+from datetime import timedelta
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from config.constants import ActivityStatus, ApplicationStatus
+from users.models import OrganizerProfile
+from activities.models import Activity, Application, StudentCheckIn
+
+User = get_user_model()
+
+
+class AdminChangelistTestCase(TestCase):
+    """Test cases for admin pages on large tables."""
+
+    def setUp(self):
+        """Set up an admin, an organizer and one activity."""
+        self.admin_user = User.objects.create_superuser(email='admin@test.com', password='testpass123')
+        self.client.force_login(self.admin_user)
+        organizer_user = User.objects.create_user(
+            email='organizer@test.com',
+            password='testpass123',
+            role='organizer'
+        )
+        self.organizer_profile = OrganizerProfile.objects.create(
+            user=organizer_user,
+            organization_name='Test Organization',
+            organization_type='external'
+        )
+        self.students = 0
+        self._add_rows()
+
+    def _add_rows(self, count=1):
+        """Add activities, each with a new student's application and check-in."""
+        now = timezone.now()
+        for _ in range(count):
+            self.students += 1
+            student = User.objects.create_user(
+                email=f'student{self.students}@ku.th',
+                password='testpass123',
+                first_name='Student',
+                last_name=str(self.students)
+            )
+            activity = Activity.objects.create(
+                organizer_profile=self.organizer_profile,
+                title=f'Activity {self.students}',
+                description='Test description',
+                location='Bangkok',
+                start_at=now + timedelta(days=10),
+                end_at=now + timedelta(days=10, hours=4),
+                max_participants=10,
+                categories=['University Activities'],
+                status=ActivityStatus.OPEN
+            )
+            Application.objects.create(
+                activity=activity,
+                student=student,
+                status=ApplicationStatus.APPROVED,
+                decision_by=self.admin_user,
+                decision_at=now
+            )
+            StudentCheckIn.objects.create(activity=activity, student=student, checked_in_at=now)
+
+    def _count_queries(self, url):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return len(queries)
+
+    def test_changelist_queries_do_not_grow_with_rows(self):
+        """Test that related rows shown in the list are joined, not fetched per row."""
+        urls = [
+            reverse(f'admin:activities_{model}_changelist')
+            for model in ('activity', 'application', 'studentcheckin')
+        ]
+        before = [self._count_queries(url) for url in urls]
+
+        self._add_rows(5)
+
+        self.assertEqual([self._count_queries(url) for url in urls], before)
+
+    def test_changelist_count_is_estimated_when_unfiltered(self):
+        """Test that large unfiltered changelists use the planner estimate."""
+        url = reverse('admin:activities_application_changelist')
+
+        with patch('config.pagination.estimated_row_count', return_value=1_000_000):
+            unfiltered = self.client.get(url)
+            filtered = self.client.get(url, {'status__exact': ApplicationStatus.APPROVED})
+
+        self.assertEqual(unfiltered.context['cl'].result_count, 1_000_000)
+        self.assertEqual(filtered.context['cl'].result_count, 1)
+
+    def test_activity_form_does_not_list_organizers(self):
+        """Test that the organizer is picked with autocomplete instead of a full list."""
+        response = self.client.get(reverse('admin:activities_activity_add'))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'admin-autocomplete')
+        self.assertNotContains(response, f'<option value="{self.organizer_profile.id}"')
+
+    def test_organizer_autocomplete(self):
+        """Test that organizer profiles can be searched by organization name."""
+        response = self.client.get(reverse('admin:autocomplete'), {
+            'app_label': 'activities',
+            'model_name': 'activity',
+            'field_name': 'organizer_profile',
+            'term': 'Test Org',
+        })
+
+        self.assertEqual(response.status_code, 200)
+        results = response.json()['results']
+        self.assertEqual([result['id'] for result in results], [str(self.organizer_profile.id)])
@@ -4,13 +4,17 @@ Tests for Application model.
 This module tests Application model validations, approval/rejection logic,
 and application status management.
 """
+import threading
+import time
 from datetime import timedelta
 from decimal import Decimal
+from unittest import skipUnless
 
 from django.contrib.auth import get_user_model
 from django.core.exceptions import ValidationError
-from django.db import IntegrityError
-from django.test import TestCase
+from django.db import IntegrityError, connection, connections
+from django.test import TestCase, TransactionTestCase
+from django.test.utils import CaptureQueriesContext
 from django.utils import timezone
 
 from config.constants import ActivityStatus, ApplicationStatus
@@ -293,3 +297,293 @@ class ApplicationModelTestCase(TestCase):
         self.assertIn(self.student_user.email, str_repr)
         self.assertIn(self.activity.title, str_repr)
         self.assertIn('Pending', str_repr)
+
+
+class ApplicationBulkReviewTestCase(TestCase):
+    """Test cases for Application.bulk_review."""
+
+    def setUp(self):
+        """Set up an activity with a few pending applications."""
+        self.organizer_user = User.objects.create_user(
+            email='organizer@test.com',
+            password='testpass123',
+            role='organizer'
+        )
+        self.organizer_profile = OrganizerProfile.objects.create(
+            user=self.organizer_user,
+            organization_name='Test Organization',
+            organization_type='nonprofit'
+        )
+        self.now = timezone.now()
+        self.activity = Activity.objects.create(
+            organizer_profile=self.organizer_profile,
+            title='Test Activity',
+            description='Test description',
+            location='Bangkok',
+            start_at=self.now + timedelta(days=10),
+            end_at=self.now + timedelta(days=10, hours=5),
+            max_participants=3,
+            categories=['University Activities'],
+            status=ActivityStatus.OPEN
+        )
+        students = User.objects.bulk_create([
+            User(email=f'student{i}@ku.th', password='!', role='student')
+            for i in range(5)
+        ])
+        self.applications = []
+        for i, student in enumerate(students):
+            application = Application.objects.create(activity=self.activity, student=student)
+            # Spread submissions out so submission order is well defined
+            Application.objects.filter(pk=application.pk).update(
+                submitted_at=self.now - timedelta(minutes=10 - i)
+            )
+            self.applications.append(application)
+
+    def _statuses(self):
+        return list(
+            Application.objects.filter(activity=self.activity)
+            .order_by('submitted_at').values_list('status', flat=True)
+        )
+
+    def test_items_apply_decisions_and_update_capacity_once(self):
+        """Test that approvals and rejections are applied with one counter update."""
+        first, second, third = self.applications[:3]
+        items = [
+            {'id': first.id, 'action': 'approve'},
+            {'id': second.id, 'action': 'reject', 'reason': '  Not eligible  '},
+            {'id': third.id, 'action': 'approve'},
+        ]
+
+        # Savepoint, lock applications, lock activity, bulk update, counter update, release
+        with self.assertNumQueries(6):
+            summary = Application.bulk_review(self.activity, self.organizer_user, items=items)
+
+        self.assertEqual(summary['approved'], 2)
+        self.assertEqual(summary['rejected'], 1)
+        self.assertEqual(summary['failed'], 0)
+        self.assertEqual([result['id'] for result in summary['results']], [first.id, second.id, third.id])
+        self.assertEqual(self.activity.current_participants, 2)
+
+        self.activity.refresh_from_db()
+        self.assertEqual(self.activity.current_participants, 2)
+        second.refresh_from_db()
+        self.assertEqual(second.status, ApplicationStatus.REJECTED)
+        self.assertEqual(second.notes, 'Not eligible')
+        self.assertEqual(second.decision_by, self.organizer_user)
+
+    def test_applications_are_locked_before_activity(self):
+        """Test that rows are locked in the same order as Application.approve."""
+        with CaptureQueriesContext(connection) as queries:
+            Application.bulk_review(self.activity, self.organizer_user, approve_first=2)
+
+        locks = [query['sql'] for query in queries if 'FOR UPDATE' in query['sql']]
+        self.assertEqual(len(locks), 2)
+        self.assertIn('"activities_application"', locks[0].split('FROM', 1)[1].split('WHERE')[0])
+        self.assertIn('"activities_activity"', locks[1].split('FROM', 1)[1].split('WHERE')[0])
+
+    def test_items_report_failures_per_item(self):
+        """Test that invalid items are reported without failing the batch."""
+        first, second = self.applications[:2]
+        second.status = ApplicationStatus.CANCELLED
+        second.save(update_fields=['status'])
+
+        summary = Application.bulk_review(self.activity, self.organizer_user, items=[
+            {'id': first.id, 'action': 'approve'},
+            {'id': second.id, 'action': 'approve'},
+            {'id': 999999, 'action': 'reject', 'reason': 'Nope'},
+        ])
+
+        self.assertEqual(summary['approved'], 1)
+        self.assertEqual(summary['failed'], 2)
+        self.assertTrue(summary['results'][0]['success'])
+        self.assertEqual(summary['results'][1]['detail'], 'Only pending applications can be approved.')
+        self.assertEqual(summary['results'][2]['detail'], 'Application not found for this activity.')
+
+    def test_items_stop_approving_at_capacity(self):
+        """Test that approvals beyond capacity fail while rejections still apply."""
+        items = [{'id': application.id, 'action': 'approve'} for application in self.applications[:4]]
+        items.append({'id': self.applications[4].id, 'action': 'reject', 'reason': 'Full'})
+
+        summary = Application.bulk_review(self.activity, self.organizer_user, items=items)
+
+        self.assertEqual(summary['approved'], 3)
+        self.assertEqual(summary['rejected'], 1)
+        self.assertEqual(summary['results'][3]['detail'], 'Activity has reached maximum capacity.')
+        self.assertEqual(self._statuses(), [
+            ApplicationStatus.APPROVED, ApplicationStatus.APPROVED, ApplicationStatus.APPROVED,
+            ApplicationStatus.PENDING, ApplicationStatus.REJECTED,
+        ])
+        self.activity.refresh_from_db()
+        self.assertEqual(self.activity.current_participants, 3)
+
+    def test_items_ignore_applications_of_other_activities(self):
+        """Test that applications of another activity are reported as not found."""
+        other_activity = Activity.objects.create(
+            organizer_profile=self.organizer_profile,
+            title='Other Activity',
+            start_at=self.now + timedelta(days=10),
+            end_at=self.now + timedelta(days=10, hours=5),
+            status=ActivityStatus.OPEN
+        )
+        other = Application.objects.create(activity=other_activity, student=self.applications[0].student)
+
+        summary = Application.bulk_review(self.activity, self.organizer_user, items=[
+            {'id': other.id, 'action': 'approve'},
+        ])
+
+        self.assertFalse(summary['results'][0]['success'])
+        other.refresh_from_db()
+        self.assertEqual(other.status, ApplicationStatus.PENDING)
+
+    def test_approve_first_uses_submission_order_and_capacity(self):
+        """Test that approve_first approves the earliest pending applications up to capacity."""
+        self.activity.current_participants = 1
+        self.activity.save(update_fields=['current_participants'])
+        self.applications[0].status = ApplicationStatus.REJECTED
+        self.applications[0].save(update_fields=['status'])
+
+        summary = Application.bulk_review(self.activity, self.organizer_user, approve_first=10)
+
+        self.assertEqual(summary['approved'], 2)
+        self.assertEqual(
+            [result['id'] for result in summary['results']],
+            [self.applications[1].id, self.applications[2].id]
+        )
+        self.activity.refresh_from_db()
+        self.assertEqual(self.activity.current_participants, 3)
+
+    def test_approve_first_without_capacity_limit(self):
+        """Test that approve_first only takes N when the activity has no limit."""
+        self.activity.max_participants = None
+        self.activity.save(update_fields=['max_participants'])
+
+        summary = Application.bulk_review(self.activity, self.organizer_user, approve_first=4)
+
+        self.assertEqual(summary['approved'], 4)
+        self.assertEqual(self._statuses()[4], ApplicationStatus.PENDING)
+
+    def test_requires_exactly_one_mode(self):
+        """Test that items and approve_first cannot be combined or both omitted."""
+        with self.assertRaises(ValueError):
+            Application.bulk_review(self.activity, self.organizer_user)
+        with self.assertRaises(ValueError):
+            Application.bulk_review(self.activity, self.organizer_user, items=[], approve_first=1)
+
+
+@skipUnless(connection.vendor == 'postgresql', 'Concurrency stress test requires PostgreSQL')
+class ApplicationApproveConcurrencyTestCase(TransactionTestCase):
+    """Stress tests for concurrent approvals against a real database."""
+
+    APPLICANTS = 30
+
+    def setUp(self):
+        """Set up an activity with many pending applications."""
+        self.organizer_user = User.objects.create_user(
+            email='organizer@test.com',
+            password='testpass123',
+            role='organizer'
+        )
+        self.organizer_profile = OrganizerProfile.objects.create(
+            user=self.organizer_user,
+            organization_name='Test Organization',
+            organization_type='nonprofit'
+        )
+        # Skip password hashing; these users never log in
+        User.objects.bulk_create([
+            User(email=f'student{i}@ku.th', role='student', password='!')
+            for i in range(self.APPLICANTS)
+        ])
+        self.students = list(User.objects.filter(role='student'))
+
+        now = timezone.now()
+        self.activity = Activity.objects.create(
+            organizer_profile=self.organizer_profile,
+            title='Popular Activity',
+            start_at=now + timedelta(days=10),
+            end_at=now + timedelta(days=10, hours=5),
+            max_participants=10,
+            categories=['University Activities'],
+            status=ActivityStatus.OPEN
+        )
+
+    def _create_applications(self):
+        return [
+            Application.objects.create(activity=self.activity, student=student)
+            for student in self.students
+        ]
+
+    def _approve_concurrently(self, application_ids):
+        """Approve every application from its own thread and connection at once."""
+        barrier = threading.Barrier(len(application_ids))
+        results = {'approved': 0, 'rejected': 0, 'errors': []}
+        lock = threading.Lock()
+
+        def worker(application_id):
+            try:
+                application = Application.objects.get(pk=application_id)
+                barrier.wait()
+                try:
+                    application.approve(self.organizer_user)
+                    outcome = 'approved'
+                except ValidationError:
+                    outcome = 'rejected'
+                with lock:
+                    results[outcome] += 1
+            except Exception as exc:  # pragma: no cover - surfaced by assertion below
+                with lock:
+                    results['errors'].append(exc)
+            finally:
+                connections.close_all()
+
+        threads = [threading.Thread(target=worker, args=(pk,)) for pk in application_ids]
+        started = time.monotonic()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        results['elapsed'] = time.monotonic() - started
+        return results
+
+    def test_concurrent_approvals_never_overbook(self):
+        """Test that concurrent approvals stop exactly at max_participants."""
+        applications = self._create_applications()
+
+        results = self._approve_concurrently([a.pk for a in applications])
+
+        self.assertEqual(results['errors'], [])
+        self.assertEqual(results['approved'], 10)
+        self.assertEqual(results['rejected'], self.APPLICANTS - 10)
+        self.activity.refresh_from_db()
+        self.assertEqual(self.activity.current_participants, 10)
+        self.assertEqual(
+            Application.objects.filter(
+                activity=self.activity, status=ApplicationStatus.APPROVED
+            ).count(),
+            10
+        )
+
+    def test_concurrent_approvals_do_not_lose_updates(self):
+        """Test that every concurrent approval is counted when there is no cap."""
+        self.activity.max_participants = None
+        self.activity.save(update_fields=['max_participants'])
+        applications = self._create_applications()
+
+        results = self._approve_concurrently([a.pk for a in applications])
+
+        self.assertEqual(results['errors'], [])
+        self.assertEqual(results['approved'], self.APPLICANTS)
+        self.activity.refresh_from_db()
+        self.assertEqual(self.activity.current_participants, self.APPLICANTS)
+        # Row locks are held only for the final UPDATE, so the burst stays short
+        self.assertLess(results['elapsed'], 30)
+
+    def test_concurrent_duplicate_approvals_count_once(self):
+        """Test that approving the same application concurrently counts it once."""
+        application = self._create_applications()[0]
+
+        results = self._approve_concurrently([application.pk] * 8)
+
+        self.assertEqual(results['errors'], [])
+        self.assertEqual(results['approved'], 1)
+        self.activity.refresh_from_db()
+        self.assertEqual(self.activity.current_participants, 1)
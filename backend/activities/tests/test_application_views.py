@@ -6,8 +6,10 @@ HTTP methods, query parameters, and response validation.
 """
 from datetime import timedelta
 from decimal import Decimal
+from unittest import mock
 
 from django.contrib.auth import get_user_model
+from django.db import OperationalError
 from django.test import TestCase
 from django.utils import timezone
 from rest_framework import status
@@ -229,6 +231,143 @@ class ApplicationReviewViewTestCase(TestCase):
         self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
 
 
+class ApplicationBulkReviewViewTestCase(TestCase):
+    """Test cases for the bulk application review endpoint."""
+
+    def setUp(self):
+        """Set up test data."""
+        self.client = APIClient()
+
+        self.organizer_user = User.objects.create_user(
+            email='organizer@test.com',
+            password='testpass123',
+            role='organizer'
+        )
+        self.organizer_profile = OrganizerProfile.objects.create(
+            user=self.organizer_user,
+            organization_name='Test Organization',
+            organization_type='nonprofit'
+        )
+        self.other_organizer = User.objects.create_user(
+            email='other@test.com',
+            password='testpass123',
+            role='organizer'
+        )
+        OrganizerProfile.objects.create(
+            user=self.other_organizer,
+            organization_name='Other Organization',
+            organization_type='nonprofit'
+        )
+
+        self.now = timezone.now()
+        self.activity = Activity.objects.create(
+            organizer_profile=self.organizer_profile,
+            title='Test Activity',
+            description='Test description',
+            location='Bangkok',
+            start_at=self.now + timedelta(days=10),
+            end_at=self.now + timedelta(days=10, hours=5),
+            max_participants=50,
+            categories=['University Activities'],
+            status=ActivityStatus.OPEN
+        )
+        self.applications = [
+            Application.objects.create(
+                activity=self.activity,
+                student=User.objects.create_user(
+                    email=f'student{i}@ku.th',
+                    password='testpass123',
+                    role='student'
+                )
+            )
+            for i in range(3)
+        ]
+        self.url = f'/api/activities/{self.activity.id}/applications/bulk-review/'
+
+    def test_bulk_review_items(self):
+        """Test that organizers can approve and reject several applications at once."""
+        self.client.force_authenticate(user=self.organizer_user)
+        response = self.client.post(self.url, {
+            'items': [
+                {'id': self.applications[0].id, 'action': 'approve'},
+                {'id': self.applications[1].id, 'action': 'reject', 'reason': 'Not qualified'},
+            ]
+        }, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['approved'], 1)
+        self.assertEqual(response.data['rejected'], 1)
+        self.assertEqual(response.data['failed'], 0)
+        self.assertEqual(response.data['current_participants'], 1)
+        self.assertEqual(len(response.data['results']), 2)
+
+        self.applications[1].refresh_from_db()
+        self.assertEqual(self.applications[1].status, ApplicationStatus.REJECTED)
+
+    def test_bulk_review_approve_first(self):
+        """Test that approve_first approves pending applications in submission order."""
+        self.client.force_authenticate(user=self.organizer_user)
+        response = self.client.post(self.url, {'approve_first': 2}, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['approved'], 2)
+        self.assertEqual(
+            [result['id'] for result in response.data['results']],
+            [self.applications[0].id, self.applications[1].id]
+        )
+
+    def test_bulk_review_requires_reason_for_rejections(self):
+        """Test that each rejection item must include a reason."""
+        self.client.force_authenticate(user=self.organizer_user)
+        response = self.client.post(self.url, {
+            'items': [{'id': self.applications[0].id, 'action': 'reject'}]
+        }, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(Application.objects.exclude(status=ApplicationStatus.PENDING).exists())
+
+    def test_bulk_review_rejects_invalid_payloads(self):
+        """Test that exactly one mode and unique IDs are required."""
+        self.client.force_authenticate(user=self.organizer_user)
+        item = {'id': self.applications[0].id, 'action': 'approve'}
+
+        for payload in ({}, {'items': [item], 'approve_first': 1}, {'items': [item, item]}, {'items': []}):
+            response = self.client.post(self.url, payload, format='json')
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST, payload)
+
+    def test_bulk_review_other_organization_forbidden(self):
+        """Test that organizers from another organization cannot bulk review."""
+        self.client.force_authenticate(user=self.other_organizer)
+        response = self.client.post(self.url, {'approve_first': 1}, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_bulk_review_as_student_forbidden(self):
+        """Test that students cannot bulk review."""
+        self.client.force_authenticate(user=self.applications[0].student)
+        response = self.client.post(self.url, {'approve_first': 1}, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_bulk_review_unknown_activity(self):
+        """Test that a missing activity returns 404."""
+        self.client.force_authenticate(user=self.organizer_user)
+        response = self.client.post(
+            '/api/activities/999999/applications/bulk-review/', {'approve_first': 1}, format='json'
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_bulk_review_database_errors_are_not_client_errors(self):
+        """Test that a failed transaction is not reported as a 400."""
+        self.client.force_authenticate(user=self.organizer_user)
+        error = OperationalError('deadlock detected')
+
+        with mock.patch.object(Application, 'bulk_review', side_effect=error):
+            with self.assertRaises(OperationalError):
+                self.client.post(self.url, {'approve_first': 1}, format='json')
+
+
 class ApplicationCancelViewTestCase(TestCase):
     """Test cases for application cancel endpoint."""
 
@@ -540,6 +679,52 @@ class ActivityModerationViewTestCase(TestCase):
         self.assertEqual(self.pending_activity.status, ActivityStatus.REJECTED)
         self.assertIn('Does not meet guidelines', self.pending_activity.rejection_reason)
 
+    def test_bulk_moderation_as_admin(self):
+        """Test that admins can moderate several activities with a shared reason."""
+        other_pending = Activity.objects.create(
+            organizer_profile=self.organizer_profile,
+            title='Other Pending Activity',
+            start_at=self.now + timedelta(days=10),
+            end_at=self.now + timedelta(days=10, hours=5),
+            categories=['University Activities']
+        )
+        self.client.force_authenticate(user=self.admin_user)
+        response = self.client.post('/api/activities/moderation/bulk-review/', {
+            'items': [
+                {'id': self.pending_activity.id, 'action': 'reject'},
+                {'id': other_pending.id, 'action': 'reject', 'reason': 'Wrong category'},
+            ],
+            'reason': 'Does not meet guidelines'
+        }, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['rejected'], 2)
+        self.assertEqual(
+            dict(Activity.objects.values_list('id', 'rejection_reason')),
+            {self.pending_activity.id: 'Does not meet guidelines', other_pending.id: 'Wrong category'}
+        )
+
+    def test_bulk_moderation_rejects_invalid_payloads(self):
+        """Test that rejections need a reason and IDs must be unique."""
+        self.client.force_authenticate(user=self.admin_user)
+        approve = {'id': self.pending_activity.id, 'action': 'approve'}
+        reject = {'id': self.pending_activity.id, 'action': 'reject', 'reason': ' '}
+
+        for payload in ({}, {'items': []}, {'items': [approve, approve]}, {'items': [reject]}):
+            response = self.client.post('/api/activities/moderation/bulk-review/', payload, format='json')
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST, payload)
+        self.pending_activity.refresh_from_db()
+        self.assertEqual(self.pending_activity.status, ActivityStatus.PENDING)
+
+    def test_bulk_moderation_as_organizer(self):
+        """Test that organizers cannot moderate activities."""
+        self.client.force_authenticate(user=self.organizer_user)
+        response = self.client.post('/api/activities/moderation/bulk-review/', {
+            'items': [{'id': self.pending_activity.id, 'action': 'approve'}]
+        }, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
 
 class ActivityDeletionRequestViewTestCase(TestCase):
     """Test cases for activity deletion request endpoints."""
@@ -3,13 +3,19 @@ Tests for StudentCheckIn model.
 This module tests StudentCheckIn model validations, check-in logic,
 and attendance tracking.
 """
+import threading
+import time
 from datetime import timedelta
 from decimal import Decimal
+from io import StringIO
+from unittest import mock, skipUnless
 
 from django.contrib.auth import get_user_model
+from django.core.cache import cache
 from django.core.exceptions import ValidationError
-from django.db import IntegrityError
-from django.test import TestCase
+from django.core.management import call_command
+from django.db import IntegrityError, connection, connections
+from django.test import TestCase, TransactionTestCase
 from django.utils import timezone
 
 from config.constants import ActivityStatus, ApplicationStatus
@@ -166,6 +172,37 @@ class StudentCheckInTestCase(TestCase):
         
         self.assertIn('Invalid check-in code', str(context.exception))
 
+    def test_check_in_is_single_query_when_code_is_cached(self):
+        """Test that a check-in costs one query once today's code is cached."""
+        DailyCheckInCode.get_cached_today_code(self.activity)
+
+        with self.assertNumQueries(1):
+            StudentCheckIn.check_in_student(self.activity, self.student_user, 'ABC123')
+
+    def test_check_in_upgrades_absent_record(self):
+        """Test that an absent record is turned into a present check-in."""
+        marked_at = timezone.now()
+        StudentCheckIn.objects.create(
+            activity=self.activity,
+            student=self.student_user,
+            attendance_status='absent',
+            marked_absent_at=marked_at
+        )
+
+        check_in = StudentCheckIn.check_in_student(self.activity, self.student_user, 'ABC123')
+
+        record = StudentCheckIn.objects.get(activity=self.activity, student=self.student_user)
+        self.assertEqual(record.pk, check_in.pk)
+        self.assertEqual(record.attendance_status, 'present')
+        self.assertEqual(check_in.marked_absent_at, marked_at)
+
+    def test_failed_check_in_writes_nothing(self):
+        """Test that rejected check-ins leave no record behind."""
+        with self.assertRaises(ValidationError):
+            StudentCheckIn.check_in_student(self.activity, self.student_user2, 'ABC123')
+
+        self.assertFalse(StudentCheckIn.objects.filter(student=self.student_user2).exists())
+
     def test_cannot_check_in_before_activity_starts(self):
         """Test that check-in is not allowed before activity starts."""
         # Create future activity
@@ -287,3 +324,623 @@ class StudentCheckInTestCase(TestCase):
                 attendance_status='present',
                 checked_in_at=timezone.now()
             )
+
+
+class DailyCheckInCodeCacheTestCase(TestCase):
+    """Test cases for cached daily check-in codes."""
+
+    def setUp(self):
+        """Set up running and upcoming activities."""
+        organizer_user = User.objects.create_user(
+            email='organizer@test.com',
+            password='testpass123',
+            role='organizer'
+        )
+        organizer_profile = OrganizerProfile.objects.create(
+            user=organizer_user,
+            organization_name='Test Organization',
+            organization_type='nonprofit'
+        )
+        now = timezone.now()
+        self.today = timezone.localtime().date()
+        self.running = [
+            Activity.objects.create(
+                organizer_profile=organizer_profile,
+                title=f'Running Activity {i}',
+                start_at=now - timedelta(hours=1),
+                end_at=now + timedelta(days=2),
+                categories=['University Activities'],
+                status=ActivityStatus.DURING
+            )
+            for i in range(3)
+        ]
+        self.upcoming = Activity.objects.create(
+            organizer_profile=organizer_profile,
+            title='Upcoming Activity',
+            start_at=now + timedelta(days=3),
+            end_at=now + timedelta(days=3, hours=2),
+            categories=['University Activities'],
+            status=ActivityStatus.UPCOMING
+        )
+
+    def test_code_is_served_from_cache(self):
+        """Test that repeated fetches do not hit the database."""
+        code = DailyCheckInCode.get_or_create_today_code(self.running[0])
+
+        with self.assertNumQueries(0):
+            cached = DailyCheckInCode.get_or_create_today_code(self.running[0])
+
+        self.assertEqual(cached.pk, code.pk)
+        self.assertEqual(cached.code, code.code)
+        self.assertEqual(cached.valid_date, self.today)
+
+    def test_pregenerate_today_codes(self):
+        """Test that codes are created and cached for running activities only."""
+        existing = DailyCheckInCode.objects.create(
+            activity=self.running[0], code='KEEP01', valid_date=self.today
+        )
+
+        with self.assertNumQueries(3):
+            count = DailyCheckInCode.pregenerate_today_codes()
+
+        self.assertEqual(count, 3)
+        self.assertEqual(DailyCheckInCode.objects.filter(valid_date=self.today).count(), 3)
+        self.assertFalse(DailyCheckInCode.objects.filter(activity=self.upcoming).exists())
+        # Existing codes are kept and served from the cache afterwards
+        with self.assertNumQueries(0):
+            self.assertEqual(DailyCheckInCode.get_cached_today_code(self.running[0]), 'KEEP01')
+            self.assertEqual(self.running[0].get_today_checkin_code(), 'KEEP01')
+        self.assertEqual(DailyCheckInCode.objects.get(pk=existing.pk).code, 'KEEP01')
+
+    def test_pregenerate_today_codes_is_idempotent(self):
+        """Test that running the job twice keeps the first codes."""
+        DailyCheckInCode.pregenerate_today_codes()
+        first = dict(DailyCheckInCode.objects.values_list('activity_id', 'code'))
+        cache.clear()
+
+        DailyCheckInCode.pregenerate_today_codes()
+
+        self.assertEqual(dict(DailyCheckInCode.objects.values_list('activity_id', 'code')), first)
+
+    def test_prune_expired(self):
+        """Test that codes from previous days are deleted in bulk."""
+        for days_ago in (0, 1, 5):
+            DailyCheckInCode.objects.create(
+                activity=self.running[0],
+                code=f'OLD00{days_ago}',
+                valid_date=self.today - timedelta(days=days_ago)
+            )
+
+        self.assertEqual(DailyCheckInCode.prune_expired(keep_days=1), 1)
+        self.assertEqual(DailyCheckInCode.prune_expired(), 1)
+        self.assertEqual(
+            list(DailyCheckInCode.objects.values_list('valid_date', flat=True)),
+            [self.today]
+        )
+
+
+class QRCheckInTokenTestCase(TestCase):
+    """Test cases for rotating HMAC-signed QR check-in tokens."""
+
+    def setUp(self):
+        """Set up a running activity with an approved student."""
+        organizer_user = User.objects.create_user(
+            email='organizer@test.com',
+            password='testpass123',
+            role='organizer'
+        )
+        organizer_profile = OrganizerProfile.objects.create(
+            user=organizer_user,
+            organization_name='Test Organization',
+            organization_type='nonprofit'
+        )
+        self.now = timezone.now()
+        self.activity = Activity.objects.create(
+            organizer_profile=organizer_profile,
+            title='Ongoing Activity',
+            description='Test description',
+            location='Bangkok',
+            start_at=self.now - timedelta(hours=1),
+            end_at=self.now + timedelta(hours=2),
+            max_participants=50,
+            categories=['University Activities'],
+            status=ActivityStatus.DURING
+        )
+        self.other_activity = Activity.objects.create(
+            organizer_profile=organizer_profile,
+            title='Other Activity',
+            start_at=self.now - timedelta(hours=1),
+            end_at=self.now + timedelta(hours=2),
+            status=ActivityStatus.DURING
+        )
+        self.student_user = User.objects.create_user(
+            email='student@ku.th',
+            password='testpass123',
+            role='student'
+        )
+        Application.objects.create(
+            activity=self.activity,
+            student=self.student_user,
+            status=ApplicationStatus.APPROVED
+        )
+
+    def test_token_checks_in_without_code_lookup(self):
+        """Test that a valid token checks in with a single query and no daily code."""
+        token = StudentCheckIn.generate_qr_token(self.activity)['token']
+
+        with self.assertNumQueries(1):
+            check_in = StudentCheckIn.check_in_student_with_token(self.activity, self.student_user, token)
+
+        self.assertEqual(check_in.attendance_status, 'present')
+        self.assertFalse(DailyCheckInCode.objects.exists())
+
+    def test_token_describes_its_slot(self):
+        """Test that the token reports its slot and expiry."""
+        rotation = StudentCheckIn.qr_rotation_seconds()
+        data = StudentCheckIn.generate_qr_token(self.activity, at=self.now)
+
+        self.assertEqual(data['rotation_seconds'], rotation)
+        self.assertTrue(data['token'].startswith(f"{self.activity.id}.{data['slot']}."))
+        self.assertGreater(data['expires_at'], self.now)
+        self.assertLessEqual(data['expires_at'], self.now + timedelta(seconds=rotation))
+
+    def test_previous_slot_is_accepted(self):
+        """Test that a token from the previous rotation is still accepted."""
+        rotation = StudentCheckIn.qr_rotation_seconds()
+        token = StudentCheckIn.generate_qr_token(
+            self.activity, at=timezone.now() - timedelta(seconds=rotation)
+        )['token']
+
+        StudentCheckIn._validate_qr_token(self.activity, token)
+
+    def test_expired_token_is_rejected(self):
+        """Test that tokens older than two rotations are rejected."""
+        rotation = StudentCheckIn.qr_rotation_seconds()
+        token = StudentCheckIn.generate_qr_token(
+            self.activity, at=timezone.now() - timedelta(seconds=rotation * 2)
+        )['token']
+
+        with self.assertRaisesMessage(ValidationError, 'Invalid or expired QR code.'):
+            StudentCheckIn.check_in_student_with_token(self.activity, self.student_user, token)
+        self.assertFalse(StudentCheckIn.objects.exists())
+
+    def test_token_for_other_activity_is_rejected(self):
+        """Test that a token cannot be reused for a different activity."""
+        token = StudentCheckIn.generate_qr_token(self.other_activity)['token']
+
+        with self.assertRaises(ValidationError):
+            StudentCheckIn._validate_qr_token(self.activity, token)
+
+    def test_tampered_or_malformed_tokens_are_rejected(self):
+        """Test that forged signatures and malformed tokens are rejected."""
+        activity_id, slot, signature = StudentCheckIn.generate_qr_token(self.activity)['token'].split('.')
+        forged = f'{activity_id}.{slot}.{signature[:-1]}{"A" if signature[-1] != "A" else "B"}'
+
+        for token in (forged, 'garbage', f'{activity_id}.{slot}', f'x.{slot}.{signature}'):
+            with self.assertRaises(ValidationError, msg=token):
+                StudentCheckIn._validate_qr_token(self.activity, token)
+
+    def test_token_check_in_validates_timing_first(self):
+        """Test that tokens do not allow check-in outside the activity period."""
+        self.activity.end_at = self.now - timedelta(minutes=1)
+        self.activity.save(update_fields=['end_at'])
+        token = StudentCheckIn.generate_qr_token(self.activity)['token']
+
+        with self.assertRaisesMessage(ValidationError, 'This activity has already ended.'):
+            StudentCheckIn.check_in_student_with_token(self.activity, self.student_user, token)
+
+
+class OfflineCheckInSyncTestCase(TestCase):
+    """Test cases for StudentCheckIn.sync_offline_check_ins."""
+
+    def setUp(self):
+        """Set up a running activity with approved and pending students."""
+        organizer_user = User.objects.create_user(
+            email='organizer@test.com',
+            password='testpass123',
+            role='organizer'
+        )
+        organizer_profile = OrganizerProfile.objects.create(
+            user=organizer_user,
+            organization_name='Test Organization',
+            organization_type='nonprofit'
+        )
+        self.now = timezone.now()
+        self.activity = Activity.objects.create(
+            organizer_profile=organizer_profile,
+            title='Off-campus Activity',
+            description='Test description',
+            location='Kanchanaburi',
+            start_at=self.now - timedelta(hours=3),
+            end_at=self.now + timedelta(hours=1),
+            max_participants=50,
+            categories=['University Activities'],
+            status=ActivityStatus.DURING
+        )
+        self.students = []
+        for i in range(4):
+            student = User.objects.create_user(
+                email=f'student{i}@ku.th',
+                password='testpass123',
+                role='student'
+            )
+            StudentProfile.objects.create(user=student, student_id_external=f'66105450{i:02d}')
+            Application.objects.create(
+                activity=self.activity,
+                student=student,
+                status=ApplicationStatus.PENDING if i == 3 else ApplicationStatus.APPROVED
+            )
+            self.students.append(student)
+        self.device_time = self.now - timedelta(hours=2)
+
+    def test_sync_validates_in_one_query_and_inserts_once(self):
+        """Test that a batch costs one validation query and one insert."""
+        records = [
+            {'student': self.students[0].id, 'checked_in_at': self.device_time},
+            {'student_id_external': '6610545001', 'checked_in_at': self.device_time},
+        ]
+
+        with self.assertNumQueries(2):
+            summary = StudentCheckIn.sync_offline_check_ins(self.activity, records)
+
+        self.assertEqual(summary['accepted'], 2)
+        self.assertEqual(summary['rejected'], 0)
+        self.assertEqual([r['student'] for r in summary['results']], [self.students[0].id, self.students[1].id])
+        check_ins = StudentCheckIn.objects.filter(activity=self.activity, attendance_status='present')
+        self.assertEqual(check_ins.count(), 2)
+        self.assertEqual(check_ins.first().checked_in_at, self.device_time)
+
+    def test_sync_upgrades_absent_records(self):
+        """Test that students already marked absent are turned present."""
+        StudentCheckIn.objects.create(
+            activity=self.activity,
+            student=self.students[0],
+            attendance_status='absent',
+            marked_absent_at=self.now
+        )
+
+        summary = StudentCheckIn.sync_offline_check_ins(self.activity, [
+            {'student': self.students[0].id, 'checked_in_at': self.device_time},
+        ])
+
+        self.assertEqual(summary['accepted'], 1)
+        check_in = StudentCheckIn.objects.get(activity=self.activity, student=self.students[0])
+        self.assertEqual(check_in.attendance_status, 'present')
+        self.assertEqual(check_in.checked_in_at, self.device_time)
+
+    def test_sync_keeps_existing_present_records(self):
+        """Test that earlier online check-ins are reported and not overwritten."""
+        online_time = self.now - timedelta(hours=2, minutes=30)
+        StudentCheckIn.objects.create(
+            activity=self.activity,
+            student=self.students[0],
+            attendance_status='present',
+            checked_in_at=online_time
+        )
+
+        with self.assertNumQueries(1):
+            summary = StudentCheckIn.sync_offline_check_ins(self.activity, [
+                {'student': self.students[0].id, 'checked_in_at': self.device_time},
+            ])
+
+        self.assertTrue(summary['results'][0]['accepted'])
+        self.assertEqual(summary['results'][0]['detail'], 'Already checked in.')
+        check_in = StudentCheckIn.objects.get(activity=self.activity, student=self.students[0])
+        self.assertEqual(check_in.checked_in_at, online_time)
+
+    def test_sync_inserts_and_upgrades_in_one_statement_each(self):
+        """Test that a batch mixing new and absent students costs three queries."""
+        StudentCheckIn.objects.create(
+            activity=self.activity,
+            student=self.students[0],
+            attendance_status='absent',
+            marked_absent_at=self.now
+        )
+        other_time = self.device_time + timedelta(minutes=10)
+
+        with self.assertNumQueries(3):
+            StudentCheckIn.sync_offline_check_ins(self.activity, [
+                {'student': self.students[0].id, 'checked_in_at': self.device_time},
+                {'student': self.students[1].id, 'checked_in_at': other_time},
+            ])
+
+        check_ins = dict(StudentCheckIn.objects.filter(
+            activity=self.activity, attendance_status='present'
+        ).values_list('student_id', 'checked_in_at'))
+        self.assertEqual(check_ins, {self.students[0].id: self.device_time, self.students[1].id: other_time})
+
+    def test_sync_keeps_online_check_in_made_during_sync(self):
+        """Test that a check-in written after validation is not overwritten."""
+        online_time = self.now - timedelta(minutes=30)
+        bulk_create = StudentCheckIn.objects.bulk_create
+
+        def check_in_online_first(*args, **kwargs):
+            StudentCheckIn.objects.create(
+                activity=self.activity,
+                student=self.students[0],
+                attendance_status='present',
+                checked_in_at=online_time
+            )
+            return bulk_create(*args, **kwargs)
+
+        with mock.patch.object(StudentCheckIn.objects, 'bulk_create', side_effect=check_in_online_first):
+            summary = StudentCheckIn.sync_offline_check_ins(self.activity, [
+                {'student': self.students[0].id, 'checked_in_at': self.device_time},
+            ])
+
+        self.assertTrue(summary['results'][0]['accepted'])
+        check_in = StudentCheckIn.objects.get(activity=self.activity, student=self.students[0])
+        self.assertEqual(check_in.checked_in_at, online_time)
+
+    def test_sync_does_not_upgrade_record_turned_present_during_sync(self):
+        """Test that an absent record checked in online after validation keeps its time."""
+        check_in = StudentCheckIn.objects.create(
+            activity=self.activity,
+            student=self.students[0],
+            attendance_status='absent',
+            marked_absent_at=self.now
+        )
+        online_time = self.now - timedelta(minutes=30)
+        filter_check_ins = StudentCheckIn.objects.filter
+
+        def check_in_online_before_update(*args, **kwargs):
+            if 'student_id__in' in kwargs:
+                StudentCheckIn.objects.all().filter(pk=check_in.pk).update(
+                    attendance_status='present',
+                    checked_in_at=online_time
+                )
+            return filter_check_ins(*args, **kwargs)
+
+        with mock.patch.object(StudentCheckIn.objects, 'filter', side_effect=check_in_online_before_update):
+            StudentCheckIn.sync_offline_check_ins(self.activity, [
+                {'student': self.students[0].id, 'checked_in_at': self.device_time},
+            ])
+
+        check_in.refresh_from_db()
+        self.assertEqual(check_in.checked_in_at, online_time)
+
+    def test_sync_rejects_invalid_records(self):
+        """Test per-record rejections for unknown, unapproved, duplicate and out-of-window records."""
+        summary = StudentCheckIn.sync_offline_check_ins(self.activity, [
+            {'student_id_external': '0000000000', 'checked_in_at': self.device_time},
+            {'student': self.students[3].id, 'checked_in_at': self.device_time},
+            {'student': self.students[0].id, 'checked_in_at': self.now - timedelta(hours=5)},
+            {'student': self.students[0].id, 'checked_in_at': self.device_time},
+            {'student_id_external': '6610545000', 'checked_in_at': self.device_time},
+            {'student': self.students[1].id, 'checked_in_at': self.now + timedelta(minutes=30)},
+        ])
+
+        details = [result.get('detail') for result in summary['results']]
+        self.assertEqual(details, [
+            'No approved application for this student.',
+            'No approved application for this student.',
+            'Check-in time is outside the activity period.',
+            None,
+            'Duplicate record for this student in the batch.',
+            'Check-in time is outside the activity period.',
+        ])
+        self.assertEqual(summary['accepted'], 1)
+        self.assertEqual(summary['rejected'], 5)
+        self.assertIsNone(summary['results'][0]['student'])
+        self.assertEqual(StudentCheckIn.objects.filter(activity=self.activity).count(), 1)
+
+    def test_sync_tolerates_device_clock_skew(self):
+        """Test that timestamps slightly before the start are accepted."""
+        summary = StudentCheckIn.sync_offline_check_ins(self.activity, [
+            {'student': self.students[0].id, 'checked_in_at': self.activity.start_at - timedelta(minutes=2)},
+        ])
+
+        self.assertEqual(summary['accepted'], 1)
+
+    def test_sync_is_idempotent(self):
+        """Test that re-sending a batch does not change the stored check-ins."""
+        records = [{'student': self.students[0].id, 'checked_in_at': self.device_time}]
+        StudentCheckIn.sync_offline_check_ins(self.activity, records)
+        summary = StudentCheckIn.sync_offline_check_ins(self.activity, records)
+
+        self.assertEqual(summary['results'][0]['detail'], 'Already checked in.')
+        self.assertEqual(StudentCheckIn.objects.filter(activity=self.activity).count(), 1)
+
+
+@skipUnless(connection.vendor == 'postgresql', 'Burst benchmark requires PostgreSQL')
+class MarkAbsentCompletedActivitiesTestCase(TestCase):
+    """Test cases for set-based absent marking across completed activities."""
+
+    def setUp(self):
+        """Set up three completed activities and one still running."""
+        organizer = User.objects.create_user(
+            email='organizer@test.com',
+            password='testpass123',
+            role='organizer'
+        )
+        organizer_profile = OrganizerProfile.objects.create(
+            user=organizer,
+            organization_name='Test Organization',
+            organization_type='nonprofit'
+        )
+        self.students = [
+            User.objects.create_user(
+                email=f'student{i}@ku.th',
+                password='testpass123',
+                role='student'
+            )
+            for i in range(3)
+        ]
+        self.now = timezone.now()
+
+        def make_activity(title, ended_ago, status=ActivityStatus.COMPLETE):
+            activity = Activity.objects.create(
+                organizer_profile=organizer_profile,
+                title=title,
+                description='Test Description',
+                location='Bangkok',
+                start_at=self.now - ended_ago - timedelta(hours=2),
+                end_at=self.now - ended_ago,
+                max_participants=10,
+                categories=['University Activities'],
+                status=status
+            )
+            for student in self.students:
+                Application.objects.create(
+                    activity=activity,
+                    student=student,
+                    status=ApplicationStatus.APPROVED
+                )
+            return activity
+
+        self.first = make_activity('First Activity', timedelta(days=1))
+        self.second = make_activity('Second Activity', timedelta(days=2))
+        self.old = make_activity('Old Activity', timedelta(days=30))
+        self.running = make_activity(
+            'Running Activity', -timedelta(hours=1), status=ActivityStatus.DURING
+        )
+
+        StudentCheckIn.objects.create(
+            activity=self.first,
+            student=self.students[0],
+            attendance_status='present',
+            checked_in_at=self.now - timedelta(days=1, hours=1)
+        )
+        Application.objects.filter(activity=self.second, student=self.students[2]).update(
+            status=ApplicationStatus.CANCELLED
+        )
+
+    def test_marks_all_activities_in_one_query(self):
+        """Test that every completed activity in the window is handled by one statement."""
+        with self.assertNumQueries(1):
+            marked = StudentCheckIn.mark_absent_for_completed_activities(
+                self.now - timedelta(days=7), self.now
+            )
+
+        self.assertEqual(marked, {self.first.id: 2, self.second.id: 2})
+        absent = StudentCheckIn.objects.filter(attendance_status='absent')
+        self.assertEqual(absent.count(), 4)
+        self.assertFalse(absent.filter(marked_absent_at__isnull=True).exists())
+        self.assertFalse(StudentCheckIn.objects.filter(activity__in=[self.old, self.running]).exists())
+        self.assertEqual(
+            StudentCheckIn.objects.get(activity=self.first, student=self.students[0]).attendance_status,
+            'present'
+        )
+
+    def test_second_run_marks_nobody(self):
+        """Test that students who already have a record are skipped."""
+        window = (self.now - timedelta(days=7), self.now)
+        StudentCheckIn.mark_absent_for_completed_activities(*window)
+
+        self.assertEqual(StudentCheckIn.mark_absent_for_completed_activities(*window), {})
+
+    def test_dry_run_reports_counts_without_writing(self):
+        """Test that dry run returns per-activity counts and inserts nothing."""
+        with self.assertNumQueries(1):
+            marked = StudentCheckIn.mark_absent_for_completed_activities(
+                self.now - timedelta(days=7), self.now, dry_run=True
+            )
+
+        self.assertEqual(marked, {self.first.id: 2, self.second.id: 2})
+        self.assertEqual(StudentCheckIn.objects.count(), 1)
+
+    def test_id_range_limits_activities(self):
+        """Test that an activity ID range only covers activities inside it."""
+        marked = StudentCheckIn.mark_absent_for_completed_activities(
+            self.now - timedelta(days=7),
+            self.now,
+            id_range=(self.second.id, self.second.id + 1)
+        )
+
+        self.assertEqual(marked, {self.second.id: 2})
+
+    def test_command_chunks_by_activity_id(self):
+        """Test that the chunked command gives the same result as one statement."""
+        out = StringIO()
+        call_command('mark_absent_students', '--days=60', '--chunk-size=1', stdout=out)
+
+        output = out.getvalue()
+        self.assertIn('Marked 3 students as absent for: Old Activity', output)
+        self.assertIn('Successfully marked 7 students as absent across 3 activities', output)
+        self.assertEqual(StudentCheckIn.objects.filter(attendance_status='absent').count(), 7)
+
+    def test_command_dry_run(self):
+        """Test that the command dry run reports per-activity counts."""
+        out = StringIO()
+        call_command('mark_absent_students', '--dry-run', stdout=out)
+
+        output = out.getvalue()
+        self.assertIn('Would mark 2 students as absent for: First Activity', output)
+        self.assertIn('DRY RUN: Would mark 4 students as absent across 2 activities', output)
+        self.assertEqual(StudentCheckIn.objects.count(), 1)
+
+
+class StudentCheckInBurstTestCase(TransactionTestCase):
+    """Burst benchmark: many students checking in at the same moment."""
+
+    STUDENTS = 40
+
+    def setUp(self):
+        """Set up an ongoing activity with many approved students."""
+        organizer_user = User.objects.create_user(
+            email='organizer@test.com',
+            password='testpass123',
+            role='organizer'
+        )
+        organizer_profile = OrganizerProfile.objects.create(
+            user=organizer_user,
+            organization_name='Test Organization',
+            organization_type='nonprofit'
+        )
+        now = timezone.now()
+        self.activity = Activity.objects.create(
+            organizer_profile=organizer_profile,
+            title='Large Event',
+            start_at=now - timedelta(minutes=5),
+            end_at=now + timedelta(hours=3),
+            categories=['University Activities'],
+            status=ActivityStatus.DURING
+        )
+        # Skip password hashing; these users never log in
+        User.objects.bulk_create([
+            User(email=f'student{i}@ku.th', role='student', password='!')
+            for i in range(self.STUDENTS)
+        ])
+        self.students = list(User.objects.filter(role='student'))
+        Application.objects.bulk_create([
+            Application(activity=self.activity, student=student, status=ApplicationStatus.APPROVED)
+            for student in self.students
+        ])
+        self.code = DailyCheckInCode.get_or_create_today_code(self.activity).code
+
+    def test_burst_check_in(self):
+        """Test that a simultaneous burst (with retries) records each student once."""
+        # Every student submits twice, as impatient users do
+        attempts = self.students * 2
+        barrier = threading.Barrier(len(attempts))
+        outcomes = []
+        lock = threading.Lock()
+
+        def worker(student):
+            try:
+                barrier.wait()
+                try:
+                    StudentCheckIn.check_in_student(self.activity, student, self.code)
+                    outcome = 'checked_in'
+                except ValidationError as exc:
+                    outcome = 'duplicate' if 'already checked in' in str(exc) else str(exc)
+                with lock:
+                    outcomes.append(outcome)
+            finally:
+                connections.close_all()
+
+        threads = [threading.Thread(target=worker, args=(student,)) for student in attempts]
+        started = time.monotonic()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.monotonic() - started
+
+        self.assertEqual(outcomes.count('checked_in'), self.STUDENTS)
+        self.assertEqual(outcomes.count('duplicate'), self.STUDENTS)
+        self.assertEqual(
+            StudentCheckIn.objects.filter(activity=self.activity, attendance_status='present').count(),
+            self.STUDENTS
+        )
+        self.assertLess(elapsed, 30)
@@ -335,3 +335,194 @@ class CheckInCodeManagementTestCase(TestCase):
         ])
 
 
+class ActivityCheckInSyncViewTestCase(TestCase):
+    """Test cases for the offline check-in sync endpoint."""
+
+    def setUp(self):
+        """Set up test data."""
+        self.client = APIClient()
+
+        self.organizer_user = User.objects.create_user(
+            email='organizer@test.com',
+            password='testpass123',
+            role='organizer'
+        )
+        self.organizer_profile = OrganizerProfile.objects.create(
+            user=self.organizer_user,
+            organization_name='Test Organization',
+            organization_type='nonprofit'
+        )
+        self.student_user = User.objects.create_user(
+            email='student@ku.th',
+            password='testpass123',
+            role='student'
+        )
+        StudentProfile.objects.create(
+            user=self.student_user,
+            student_id_external='6610545001'
+        )
+
+        self.now = timezone.now()
+        self.activity = Activity.objects.create(
+            organizer_profile=self.organizer_profile,
+            title='Test Activity',
+            description='Test description',
+            location='Bangkok',
+            start_at=self.now - timedelta(hours=1),
+            end_at=self.now + timedelta(hours=2),
+            max_participants=50,
+            categories=['University Activities'],
+            status=ActivityStatus.DURING
+        )
+        Application.objects.create(
+            activity=self.activity,
+            student=self.student_user,
+            status=ApplicationStatus.APPROVED
+        )
+        self.url = f'/api/activities/{self.activity.id}/checkin-sync/'
+        self.device_time = (self.now - timedelta(minutes=30)).isoformat()
+
+    def test_sync_as_organizer(self):
+        """Test that organizers can upload offline check-ins."""
+        self.client.force_authenticate(user=self.organizer_user)
+        response = self.client.post(self.url, {
+            'records': [
+                {'student_id_external': '6610545001', 'checked_in_at': self.device_time},
+                {'student_id_external': '6610545999', 'checked_in_at': self.device_time},
+            ]
+        }, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['accepted'], 1)
+        self.assertEqual(response.data['rejected'], 1)
+        self.assertEqual(response.data['results'][0]['student'], self.student_user.id)
+        self.assertTrue(
+            StudentCheckIn.objects.filter(
+                activity=self.activity, student=self.student_user, attendance_status='present'
+            ).exists()
+        )
+
+    def test_sync_requires_one_identifier_per_record(self):
+        """Test that each record needs exactly one student identifier."""
+        self.client.force_authenticate(user=self.organizer_user)
+        for record in (
+            {'checked_in_at': self.device_time},
+            {'student': self.student_user.id, 'student_id_external': '6610545001', 'checked_in_at': self.device_time},
+            {'student': self.student_user.id},
+        ):
+            response = self.client.post(self.url, {'records': [record]}, format='json')
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST, record)
+
+    def test_sync_requires_records(self):
+        """Test that an empty batch is rejected."""
+        self.client.force_authenticate(user=self.organizer_user)
+        response = self.client.post(self.url, {'records': []}, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_sync_as_student_forbidden(self):
+        """Test that students cannot upload check-ins."""
+        self.client.force_authenticate(user=self.student_user)
+        response = self.client.post(self.url, {
+            'records': [{'student': self.student_user.id, 'checked_in_at': self.device_time}]
+        }, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+        self.assertFalse(StudentCheckIn.objects.exists())
+
+
+class ActivityCheckInQRViewTestCase(TestCase):
+    """Test cases for QR token check-in endpoints."""
+
+    def setUp(self):
+        """Set up test data."""
+        self.client = APIClient()
+
+        self.organizer_user = User.objects.create_user(
+            email='organizer@test.com',
+            password='testpass123',
+            role='organizer'
+        )
+        self.organizer_profile = OrganizerProfile.objects.create(
+            user=self.organizer_user,
+            organization_name='Test Organization',
+            organization_type='nonprofit'
+        )
+        self.student_user = User.objects.create_user(
+            email='student@ku.th',
+            password='testpass123',
+            role='student'
+        )
+
+        self.now = timezone.now()
+        self.activity = Activity.objects.create(
+            organizer_profile=self.organizer_profile,
+            title='Test Activity',
+            description='Test description',
+            location='Bangkok',
+            start_at=self.now - timedelta(hours=1),
+            end_at=self.now + timedelta(hours=2),
+            max_participants=50,
+            categories=['University Activities'],
+            status=ActivityStatus.DURING
+        )
+        Application.objects.create(
+            activity=self.activity,
+            student=self.student_user,
+            status=ApplicationStatus.APPROVED
+        )
+        self.qr_url = f'/api/activities/{self.activity.id}/checkin-qr/'
+
+    def test_organizer_gets_token(self):
+        """Test that organizers get a rotating token that is not cached."""
+        self.client.force_authenticate(user=self.organizer_user)
+        response = self.client.get(self.qr_url)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn('token', response.data)
+        self.assertIn('expires_at', response.data)
+        self.assertEqual(response['Cache-Control'], 'no-store')
+
+    def test_student_cannot_get_token(self):
+        """Test that students cannot fetch the QR token."""
+        self.client.force_authenticate(user=self.student_user)
+        response = self.client.get(self.qr_url)
+
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_token_not_available_before_start(self):
+        """Test that no token is issued before the activity starts."""
+        self.activity.start_at = self.now + timedelta(hours=1)
+        self.activity.save(update_fields=['start_at'])
+        self.client.force_authenticate(user=self.organizer_user)
+        response = self.client.get(self.qr_url)
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_student_checks_in_with_scanned_token(self):
+        """Test the full flow: organizer displays a token and the student scans it."""
+        self.client.force_authenticate(user=self.organizer_user)
+        token = self.client.get(self.qr_url).data['token']
+
+        self.client.force_authenticate(user=self.student_user)
+        response = self.client.post(
+            f'/api/activities/{self.activity.id}/checkin/',
+            {'token': token},
+            format='json'
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['check_in']['attendance_status'], 'present')
+
+    def test_student_check_in_with_invalid_token(self):
+        """Test that invalid tokens are rejected like invalid codes."""
+        self.client.force_authenticate(user=self.student_user)
+        response = self.client.post(
+            f'/api/activities/{self.activity.id}/checkin/',
+            {'token': f'{self.activity.id}.1.forged'},
+            format='json'
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(StudentCheckIn.objects.exists())
+
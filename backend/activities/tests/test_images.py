@@ -0,0 +1,459 @@
+"""
+Tests for cover and poster image variants.
+
+Variants are generated by the background worker, so tests that check them
+run the worker once after saving the image.
+"""
+import shutil
+import tempfile
+from datetime import timedelta
+from io import BytesIO, StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.files.base import ContentFile
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from PIL import Image
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from config.constants import ActivityStatus, ImageProcessingStatus
+from users.models import OrganizerProfile
+from activities.images import IMAGE_VARIANTS
+from activities.models import Activity, ActivityPosterImage
+from activities.tasks import process_image_variants
+from tasks.models import Task
+
+User = get_user_model()
+
+MEDIA_ROOT = tempfile.mkdtemp()
+
+
+def make_image(size=(3000, 2000), image_format='JPEG', exif_orientation=None, mode='RGB'):
+    """Return image bytes, optionally tagged with an EXIF orientation."""
+    image = Image.new(mode, size, (200, 30, 30) if mode == 'RGB' else (200, 30, 30, 128))
+    buffer = BytesIO()
+    if exif_orientation is not None:
+        exif = Image.Exif()
+        exif[0x0112] = exif_orientation
+        exif[0x010F] = 'Test Camera'
+        image.save(buffer, image_format, exif=exif)
+    else:
+        image.save(buffer, image_format)
+    return buffer.getvalue()
+
+
+def run_worker():
+    call_command('run_worker', '--once', '--concurrency=1', stdout=StringIO())
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT)
+class ImageVariantTestCase(TestCase):
+    """Test cases for generating image variants on upload."""
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        """Set up an activity and its organizer."""
+        self.organizer_user = User.objects.create_user(
+            email='organizer@test.com',
+            password='testpass123',
+            role='organizer'
+        )
+        self.organizer_profile = OrganizerProfile.objects.create(
+            user=self.organizer_user,
+            organization_name='Test Organization',
+            organization_type='nonprofit'
+        )
+        now = timezone.now()
+        self.activity = Activity.objects.create(
+            organizer_profile=self.organizer_profile,
+            title='Beach Cleanup',
+            description='Test description',
+            location='Bangkok',
+            start_at=now + timedelta(days=10),
+            end_at=now + timedelta(days=10, hours=4),
+            max_participants=10,
+            categories=['University Activities'],
+            status=ActivityStatus.OPEN
+        )
+
+    def _open_variant(self, field_file, name):
+        return Image.open(field_file.storage.open(name))
+
+    def test_cover_upload_generates_variants(self):
+        """Test that every variant is written as WebP and progressive JPEG."""
+        self.activity.cover_image = ContentFile(make_image(), name='cover.jpg')
+        self.activity.save()
+        run_worker()
+
+        self.activity.refresh_from_db()
+        variants = self.activity.cover_image_variants
+        self.assertEqual(set(variants), set(IMAGE_VARIANTS))
+        for name, longest_side in IMAGE_VARIANTS.items():
+            self.assertEqual(max(variants[name]['width'], variants[name]['height']), longest_side)
+            with self._open_variant(self.activity.cover_image, variants[name]['webp']) as webp:
+                self.assertEqual(webp.format, 'WEBP')
+            with self._open_variant(self.activity.cover_image, variants[name]['jpeg']) as jpeg:
+                self.assertEqual(jpeg.format, 'JPEG')
+                self.assertTrue(jpeg.info.get('progressive'))
+                self.assertEqual(jpeg.size, (variants[name]['width'], variants[name]['height']))
+
+    def test_exif_is_applied_and_stripped(self):
+        """Test that EXIF orientation is applied and metadata is not copied."""
+        # Orientation 6 means the camera was rotated 90 degrees
+        self.activity.cover_image = ContentFile(
+            make_image(size=(1200, 600), exif_orientation=6), name='rotated.jpg'
+        )
+        self.activity.save()
+        run_worker()
+
+        self.activity.refresh_from_db()
+        thumb = self.activity.cover_image_variants['thumb']
+        self.assertEqual((thumb['width'], thumb['height']), (200, 400))
+        with self._open_variant(self.activity.cover_image, thumb['jpeg']) as jpeg:
+            self.assertEqual(len(jpeg.getexif()), 0)
+
+    def test_small_images_are_not_upscaled(self):
+        """Test that images smaller than a variant keep their size."""
+        self.activity.cover_image = ContentFile(make_image(size=(300, 200)), name='small.jpg')
+        self.activity.save()
+        run_worker()
+
+        self.activity.refresh_from_db()
+        full = self.activity.cover_image_variants['full']
+        self.assertEqual((full['width'], full['height']), (300, 200))
+
+    def test_transparent_png_is_flattened(self):
+        """Test that transparent images can be encoded as JPEG."""
+        self.activity.cover_image = ContentFile(
+            make_image(size=(500, 500), image_format='PNG', mode='RGBA'), name='logo.png'
+        )
+        self.activity.save()
+        run_worker()
+
+        self.activity.refresh_from_db()
+        self.assertEqual(set(self.activity.cover_image_variants), set(IMAGE_VARIANTS))
+        self.assertEqual(self.activity.cover_image_status, ImageProcessingStatus.READY)
+
+    def test_unreadable_image_has_no_variants(self):
+        """Test that a file Pillow cannot decode falls back to the original."""
+        self.activity.cover_image = ContentFile(b'not an image', name='broken.jpg')
+        self.activity.save()
+
+        with self.assertLogs('activities.images', level='WARNING'):
+            run_worker()
+
+        self.activity.refresh_from_db()
+        self.assertEqual(self.activity.cover_image_variants, {})
+        self.assertEqual(self.activity.cover_image_status, ImageProcessingStatus.FAILED)
+
+    def test_saving_cover_queues_processing(self):
+        """Test that the image is not decoded while saving."""
+        self.activity.cover_image = ContentFile(make_image(), name='cover.jpg')
+        self.activity.save()
+
+        self.activity.refresh_from_db()
+        self.assertEqual(self.activity.cover_image_variants, {})
+        self.assertEqual(self.activity.cover_image_status, ImageProcessingStatus.PENDING)
+        queued = Task.objects.get()
+        self.assertEqual(queued.name, process_image_variants.task_name)
+        self.assertEqual(queued.payload, {'kind': 'cover', 'pk': self.activity.pk, 'name': self.activity.cover_image.name})
+
+    def test_replaced_cover_skips_stale_task(self):
+        """Test that a task queued for an earlier upload does not overwrite the new one."""
+        self.activity.cover_image = ContentFile(make_image(), name='first.jpg')
+        self.activity.save()
+        first_name = self.activity.cover_image.name
+        self.activity.cover_image = ContentFile(make_image(size=(300, 200)), name='second.jpg')
+        self.activity.save()
+
+        process_image_variants(kind='cover', pk=self.activity.pk, name=first_name)
+
+        self.activity.refresh_from_db()
+        self.assertEqual(self.activity.cover_image_status, ImageProcessingStatus.PENDING)
+        run_worker()
+        self.activity.refresh_from_db()
+        self.assertEqual(self.activity.cover_image_variants['full']['width'], 300)
+
+    def test_unchanged_cover_is_not_reprocessed(self):
+        """Test that saving other fields does not regenerate or overwrite variants."""
+        self.activity.cover_image = ContentFile(make_image(), name='cover.jpg')
+        self.activity.save()
+        stale = Activity.objects.get(pk=self.activity.pk)
+        run_worker()
+        self.activity.refresh_from_db()
+        variants = self.activity.cover_image_variants
+
+        self.activity.title = 'Renamed'
+        self.activity.save()
+        # Loaded before the worker finished; must not write back empty variants
+        stale.location = 'Chiang Mai'
+        stale.save()
+
+        self.activity.refresh_from_db()
+        self.assertEqual(self.activity.cover_image_variants, variants)
+
+    def test_removing_cover_clears_variants(self):
+        """Test that variants are dropped with the cover image."""
+        self.activity.cover_image = ContentFile(make_image(), name='cover.jpg')
+        self.activity.save()
+        run_worker()
+
+        self.activity.cover_image = None
+        self.activity.save()
+
+        self.activity.refresh_from_db()
+        self.assertEqual(self.activity.cover_image_variants, {})
+
+    def test_poster_upload_exposes_variant_urls(self):
+        """Test that uploaded posters return absolute variant URLs."""
+        client = APIClient()
+        client.force_authenticate(user=self.organizer_user)
+        response = client.post(
+            f'/api/activities/{self.activity.id}/posters/',
+            {'image': SimpleUploadedFile('poster.jpg', make_image(), content_type='image/jpeg')},
+            format='multipart'
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data['processing_status'], ImageProcessingStatus.PENDING)
+        self.assertEqual(response.data['image_variants'], {})
+        run_worker()
+
+        poster = ActivityPosterImage.objects.get()
+        self.assertEqual(set(poster.image_variants), set(IMAGE_VARIANTS))
+        response = client.get(f'/api/activities/{self.activity.id}/posters/{poster.id}/')
+        self.assertEqual(response.data['processing_status'], ImageProcessingStatus.READY)
+        thumb = response.data['image_variants']['thumb']
+        self.assertTrue(thumb['webp'].startswith('http://testserver/media/blobs/'))
+        self.assertTrue(thumb['webp'].endswith('.webp'))
+
+    def test_activity_list_exposes_cover_variants(self):
+        """Test that list responses include thumbnail URLs for the cover."""
+        self.activity.cover_image = ContentFile(make_image(), name='cover.jpg')
+        self.activity.save()
+        run_worker()
+
+        response = APIClient().get('/api/activities/list/')
+
+        activity = response.data['results'][0]
+        self.assertTrue(activity['cover_image_variants']['thumb']['jpeg'].endswith('.jpg'))
+
+    def test_command_backfills_missing_variants(self):
+        """Test that the command generates variants for images saved before the pipeline."""
+        self.activity.cover_image = ContentFile(make_image(), name='cover.jpg')
+        self.activity.save()
+        run_worker()
+        Activity.objects.filter(pk=self.activity.pk).update(cover_image_variants={})
+        out = StringIO()
+
+        call_command('generate_image_variants', stdout=out)
+
+        self.activity.refresh_from_db()
+        self.assertEqual(set(self.activity.cover_image_variants), set(IMAGE_VARIANTS))
+        self.assertIn('Generated variants for 1 images', out.getvalue())
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT)
+class ImageUploadValidationTestCase(TestCase):
+    """Test cases for the size and header checks on image uploads."""
+
+    def setUp(self):
+        """Set up an organizer and an activity to attach posters to."""
+        self.client = APIClient()
+        self.organizer_user = User.objects.create_user(
+            email='organizer@test.com',
+            password='testpass123',
+            role='organizer'
+        )
+        organizer_profile = OrganizerProfile.objects.create(
+            user=self.organizer_user,
+            organization_name='Test Organization',
+            organization_type='nonprofit'
+        )
+        now = timezone.now()
+        self.activity = Activity.objects.create(
+            organizer_profile=organizer_profile,
+            title='Beach Cleanup',
+            description='Test description',
+            location='Bangkok',
+            start_at=now + timedelta(days=10),
+            end_at=now + timedelta(days=10, hours=4),
+            max_participants=10,
+            categories=['University Activities'],
+            status=ActivityStatus.OPEN
+        )
+        self.client.force_authenticate(user=self.organizer_user)
+
+    def _upload_poster(self, content, filename='poster.jpg'):
+        return self.client.post(
+            f'/api/activities/{self.activity.id}/posters/',
+            {'image': SimpleUploadedFile(filename, content)},
+            format='multipart'
+        )
+
+    @override_settings(IMAGE_UPLOAD_MAX_SIZE=1024 * 1024)
+    def test_oversized_upload_is_rejected(self):
+        """Test that a file over the size limit is rejected with 413."""
+        response = self._upload_poster(b'\xff\xd8' + b'0' * (2 * 1024 * 1024))
+
+        self.assertEqual(response.status_code, status.HTTP_413_REQUEST_ENTITY_TOO_LARGE)
+        self.assertIn('1 MB', response.data['detail'])
+        self.assertFalse(ActivityPosterImage.objects.exists())
+
+    def test_non_image_is_rejected(self):
+        """Test that files without an image header are rejected."""
+        response = self._upload_poster(b'not an image', filename='poster.txt')
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('image', response.data)
+        self.assertFalse(Task.objects.exists())
+
+    def test_unsupported_format_is_rejected(self):
+        """Test that only the configured formats are accepted."""
+        response = self._upload_poster(make_image(size=(100, 100), image_format='GIF'), filename='poster.gif')
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('JPEG, PNG, WEBP', response.data['image'][0])
+
+    @override_settings(IMAGE_UPLOAD_MAX_PIXELS=1_000_000)
+    def test_too_many_pixels_is_rejected(self):
+        """Test that the pixel limit is checked from the header."""
+        response = self._upload_poster(make_image(size=(2000, 1000)))
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('1 megapixels', response.data['image'][0])
+
+    def test_cover_upload_on_update_is_validated(self):
+        """Test that cover images sent to the update endpoint are checked too."""
+        response = self.client.patch(
+            f'/api/activities/{self.activity.id}/update/',
+            {'cover_image': SimpleUploadedFile('cover.jpg', b'not an image')},
+            format='multipart'
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('cover_image', response.data)
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT)
+class PosterBatchUploadTestCase(TestCase):
+    """Test cases for uploading several posters in one request."""
+
+    def setUp(self):
+        """Set up an activity, its organizer and an organizer from another organization."""
+        self.client = APIClient()
+        self.organizer_user = User.objects.create_user(
+            email='organizer@test.com',
+            password='testpass123',
+            role='organizer'
+        )
+        organizer_profile = OrganizerProfile.objects.create(
+            user=self.organizer_user,
+            organization_name='Test Organization',
+            organization_type='nonprofit'
+        )
+        self.other_organizer = User.objects.create_user(
+            email='other@test.com',
+            password='testpass123',
+            role='organizer'
+        )
+        OrganizerProfile.objects.create(
+            user=self.other_organizer,
+            organization_name='Other Organization',
+            organization_type='nonprofit'
+        )
+        now = timezone.now()
+        self.activity = Activity.objects.create(
+            organizer_profile=organizer_profile,
+            title='Beach Cleanup',
+            description='Test description',
+            location='Bangkok',
+            start_at=now + timedelta(days=10),
+            end_at=now + timedelta(days=10, hours=4),
+            max_participants=10,
+            categories=['University Activities'],
+            status=ActivityStatus.OPEN
+        )
+        self.url = f'/api/activities/{self.activity.id}/posters/batch/'
+
+    def _files(self, count):
+        return [
+            SimpleUploadedFile(f'poster{i}.jpg', make_image(size=(100 + i, 100)), content_type='image/jpeg')
+            for i in range(count)
+        ]
+
+    def test_upload_fills_free_slots(self):
+        """Test that files take the free orders in upload order."""
+        ActivityPosterImage.objects.create(
+            activity=self.activity, order=2, image=ContentFile(make_image(size=(50, 50)), name='existing.jpg')
+        )
+        self.client.force_authenticate(user=self.organizer_user)
+
+        response = self.client.post(self.url, {'images': self._files(3)}, format='multipart')
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual([poster['order'] for poster in response.data], [1, 3, 4])
+        self.assertTrue(all(poster['processing_status'] == ImageProcessingStatus.PENDING for poster in response.data))
+        self.assertEqual(Task.objects.filter(name=process_image_variants.task_name).count(), 4)
+
+    def test_lookups_run_once_per_request(self):
+        """Test that the activity and order lookups are not repeated per file."""
+        self.client.force_authenticate(user=self.organizer_user)
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(self.url, {'images': self._files(4)}, format='multipart')
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        selects = [query['sql'] for query in queries if query['sql'].startswith('SELECT')]
+        self.assertEqual(len([sql for sql in selects if 'FROM "activities_activity"' in sql]), 2)  # fetch + lock
+        self.assertEqual(len([sql for sql in selects if 'FROM "activities_activityposterimage"' in sql]), 1)
+
+    def test_too_many_files_for_free_slots(self):
+        """Test that nothing is saved when the files do not fit."""
+        ActivityPosterImage.objects.create(
+            activity=self.activity, order=1, image=ContentFile(make_image(size=(50, 50)), name='existing.jpg')
+        )
+        self.client.force_authenticate(user=self.organizer_user)
+
+        response = self.client.post(self.url, {'images': self._files(4)}, format='multipart')
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('3 slot(s) available', response.data['detail'])
+        self.assertEqual(ActivityPosterImage.objects.count(), 1)
+
+    def test_more_than_four_files_rejected(self):
+        """Test that a request cannot carry more files than an activity can hold."""
+        self.client.force_authenticate(user=self.organizer_user)
+
+        response = self.client.post(self.url, {'images': self._files(5)}, format='multipart')
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('images', response.data)
+
+    def test_invalid_file_rejects_whole_batch(self):
+        """Test that one bad file fails the request before anything is stored."""
+        self.client.force_authenticate(user=self.organizer_user)
+        files = self._files(1) + [SimpleUploadedFile('notes.txt', b'not an image')]
+
+        response = self.client.post(self.url, {'images': files}, format='multipart')
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(ActivityPosterImage.objects.exists())
+
+    def test_other_organization_cannot_upload(self):
+        """Test that organizers from other organizations are rejected."""
+        self.client.force_authenticate(user=self.other_organizer)
+
+        response = self.client.post(self.url, {'images': self._files(1)}, format='multipart')
+
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+        self.assertFalse(ActivityPosterImage.objects.exists())
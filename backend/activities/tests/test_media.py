@@ -0,0 +1,192 @@
+"""
+Tests for the media serving view.
+"""
+import os
+import shutil
+import tempfile
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.test import TestCase, override_settings
+
+from activities.media import IMMUTABLE_CACHE_CONTROL, PRIVATE_CACHE_CONTROL, REVALIDATE_CACHE_CONTROL
+from users.authentication import ClaimsRefreshToken
+from users.models import User
+
+MEDIA_ROOT = tempfile.mkdtemp()
+
+CONTENT = b'0123456789abcdefghij'
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT, MEDIA_ACCEL_BACKEND='')
+class ServeMediaTestCase(TestCase):
+    """Test cases for GET /media/<path>."""
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        """Store one blob and one file saved before content addressing."""
+        self.name = default_storage.save('poster.jpg', ContentFile(CONTENT))
+        self.url = f'/media/{self.name}'
+        legacy = os.path.join(MEDIA_ROOT, 'activities', '1', 'cover', 'legacy.jpg')
+        os.makedirs(os.path.dirname(legacy), exist_ok=True)
+        with open(legacy, 'wb') as f:
+            f.write(CONTENT)
+
+    def test_blob_is_served_with_immutable_headers(self):
+        """Test that blobs are streamed with a content-hash ETag and a year-long cache."""
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(b''.join(response.streaming_content), CONTENT)
+        self.assertEqual(response['Content-Type'], 'image/jpeg')
+        self.assertEqual(response['Content-Length'], str(len(CONTENT)))
+        self.assertEqual(response['Accept-Ranges'], 'bytes')
+        self.assertEqual(response['Cache-Control'], IMMUTABLE_CACHE_CONTROL)
+        self.assertIn(os.path.splitext(os.path.basename(self.name))[0], response['ETag'])
+
+    def test_legacy_file_is_revalidated(self):
+        """Test that files stored under their upload name are not cached as immutable."""
+        response = self.client.get('/media/activities/1/cover/legacy.jpg')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Cache-Control'], REVALIDATE_CACHE_CONTROL)
+
+    def test_matching_etag_returns_not_modified(self):
+        """Test that If-None-Match with the current ETag returns 304 without a body."""
+        etag = self.client.get(self.url)['ETag']
+
+        response = self.client.get(self.url, headers={'If-None-Match': etag})
+
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b'')
+        self.assertEqual(response['ETag'], etag)
+        self.assertEqual(response['Cache-Control'], IMMUTABLE_CACHE_CONTROL)
+
+    def test_range_request_returns_partial_content(self):
+        """Test that a byte range is returned with 206 and Content-Range."""
+        response = self.client.get(self.url, headers={'Range': 'bytes=5-9'})
+
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(b''.join(response.streaming_content), CONTENT[5:10])
+        self.assertEqual(response['Content-Range'], f'bytes 5-9/{len(CONTENT)}')
+        self.assertEqual(response['Content-Length'], '5')
+
+    def test_suffix_and_open_ended_ranges(self):
+        """Test ranges for the last N bytes and from an offset to the end."""
+        suffix = self.client.get(self.url, headers={'Range': 'bytes=-4'})
+        open_ended = self.client.get(self.url, headers={'Range': 'bytes=15-'})
+
+        self.assertEqual(b''.join(suffix.streaming_content), CONTENT[-4:])
+        self.assertEqual(b''.join(open_ended.streaming_content), CONTENT[15:])
+        self.assertEqual(open_ended['Content-Range'], f'bytes 15-19/{len(CONTENT)}')
+
+    def test_unsatisfiable_range(self):
+        """Test that a range past the end of the file returns 416."""
+        response = self.client.get(self.url, headers={'Range': 'bytes=100-200'})
+
+        self.assertEqual(response.status_code, 416)
+        self.assertEqual(response['Content-Range'], f'bytes */{len(CONTENT)}')
+
+    def test_stale_if_range_returns_whole_file(self):
+        """Test that If-Range with an old ETag ignores the Range header."""
+        response = self.client.get(self.url, headers={'Range': 'bytes=0-3', 'If-Range': '"old"'})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(b''.join(response.streaming_content), CONTENT)
+
+    def test_multiple_ranges_return_whole_file(self):
+        """Test that multi-range requests fall back to the whole file."""
+        response = self.client.get(self.url, headers={'Range': 'bytes=0-1,5-6'})
+
+        self.assertEqual(response.status_code, 200)
+
+    @override_settings(MEDIA_ACCEL_BACKEND='nginx', MEDIA_ACCEL_PREFIX='/protected-media/')
+    def test_nginx_backend_hands_off_transfer(self):
+        """Test that nginx gets an X-Accel-Redirect and Django sends no bytes."""
+        response = self.client.get(self.url, headers={'Range': 'bytes=0-3'})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.content, b'')
+        self.assertEqual(response['X-Accel-Redirect'], f'/protected-media/{self.name}')
+        self.assertEqual(response['Cache-Control'], IMMUTABLE_CACHE_CONTROL)
+
+    @override_settings(MEDIA_ACCEL_BACKEND='sendfile')
+    def test_sendfile_backend_hands_off_transfer(self):
+        """Test that X-Sendfile points at the file on disk."""
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.content, b'')
+        self.assertEqual(response['X-Sendfile'], os.path.join(MEDIA_ROOT, self.name))
+
+    def test_head_does_not_open_file(self):
+        """Test that HEAD returns the headers only."""
+        response = self.client.head(self.url)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Length'], str(len(CONTENT)))
+        self.assertFalse(response.streaming)
+
+    def test_paths_outside_media_root_are_not_served(self):
+        """Test that traversal, hidden files, directories and missing files return 404."""
+        with open(os.path.join(MEDIA_ROOT, '.hidden'), 'wb') as f:
+            f.write(b'secret')
+
+        for path in ('../etc/passwd', '.hidden', 'activities/1/cover/', 'missing.jpg'):
+            with self.subTest(path=path):
+                self.assertEqual(self.client.get(f'/media/{path}').status_code, 404)
+
+    def test_only_safe_methods_are_allowed(self):
+        """Test that media cannot be written through the view."""
+        response = self.client.post(self.url)
+
+        self.assertEqual(response.status_code, 405)
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT, MEDIA_ACCEL_BACKEND='')
+class MediaAuthorizationTestCase(TestCase):
+    """Test cases for who may fetch which media."""
+
+    def setUp(self):
+        """Store a student's profile image."""
+        self.student = User.objects.create_user(email='student@ku.th', password='testpass123', role='student')
+        self.other = User.objects.create_user(email='other@ku.th', password='testpass123', role='student')
+        self.name = default_storage.save('users/1/profile/me.jpg', ContentFile(b'profile image bytes'))
+        User.objects.filter(pk=self.student.pk).update(profile_image=self.name)
+        self.url = f'/media/{self.name}'
+
+    def _get_as(self, user):
+        access = ClaimsRefreshToken.for_user(user).access_token
+        return self.client.get(self.url, headers={'Authorization': f'Bearer {access}'})
+
+    def test_anonymous_request_for_profile_image_is_refused(self):
+        """Test that profile images are not served without authentication."""
+        self.assertEqual(self.client.get(self.url).status_code, 403)
+
+    def test_other_user_cannot_fetch_profile_image(self):
+        """Test that another user's profile image is refused."""
+        self.assertEqual(self._get_as(self.other).status_code, 403)
+
+    def test_owner_and_staff_get_private_response(self):
+        """Test that the owner and staff get the file, never cached by shared proxies."""
+        admin = User.objects.create_superuser(email='admin@ku.th', password='testpass123')
+        self.client.force_login(admin)
+        by_staff = self.client.get(self.url)
+        self.client.logout()
+        by_owner = self._get_as(self.student)
+
+        for response in (by_owner, by_staff):
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response['Cache-Control'], PRIVATE_CACHE_CONTROL)
+
+    def test_paths_outside_public_prefixes_are_not_served(self):
+        """Test that files that are neither activity media nor blobs return 404."""
+        legacy = os.path.join(MEDIA_ROOT, 'users', '2', 'profile', 'legacy.jpg')
+        os.makedirs(os.path.dirname(legacy), exist_ok=True)
+        with open(legacy, 'wb') as f:
+            f.write(CONTENT)
+
+        self.assertEqual(self.client.get('/media/users/2/profile/legacy.jpg').status_code, 404)
@@ -0,0 +1,256 @@
+"""
+Tests for activity notification emails.
+
+Notifications are queued as background tasks by the views and delivered by
+the worker, so each test runs the worker once before checking the outbox.
+"""
+from datetime import timedelta
+from io import StringIO
+from smtplib import SMTPException
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core import mail
+from django.core.mail.backends import locmem
+from django.core.management import call_command
+from django.db import DatabaseError
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from config.constants import ActivityStatus, ApplicationStatus
+from users.models import OrganizerProfile
+from activities.models import Activity, ActivityDeletionRequest, Application
+from tasks.models import Task
+
+User = get_user_model()
+
+
+def run_worker():
+    call_command('run_worker', '--once', '--concurrency=1', stdout=StringIO())
+
+
+class ActivityNotificationTestCase(TestCase):
+    """Test cases for emails sent when activities change."""
+
+    def setUp(self):
+        """Set up an activity with applications in every status."""
+        self.client = APIClient()
+        self.admin_user = User.objects.create_user(
+            email='admin@test.com',
+            password='testpass123',
+            role='admin'
+        )
+        self.organizer_user = User.objects.create_user(
+            email='organizer@test.com',
+            password='testpass123',
+            role='organizer'
+        )
+        self.organizer_profile = OrganizerProfile.objects.create(
+            user=self.organizer_user,
+            organization_name='Test Organization',
+            organization_type='nonprofit'
+        )
+        now = timezone.now()
+        self.activity = Activity.objects.create(
+            organizer_profile=self.organizer_profile,
+            title='Beach Cleanup',
+            description='Test description',
+            location='Bangkok',
+            start_at=now + timedelta(days=10),
+            end_at=now + timedelta(days=10, hours=4),
+            max_participants=10,
+            current_participants=1,
+            categories=['University Activities'],
+            status=ActivityStatus.OPEN
+        )
+        self.applications = {}
+        for application_status in (
+            ApplicationStatus.PENDING,
+            ApplicationStatus.APPROVED,
+            ApplicationStatus.REJECTED,
+        ):
+            student = User.objects.create_user(
+                email=f'{application_status}@ku.th',
+                password='testpass123',
+                role='student'
+            )
+            self.applications[application_status] = Application.objects.create(
+                activity=self.activity,
+                student=student,
+                status=application_status
+            )
+
+    def test_admin_delete_emails_active_applicants(self):
+        """Test that deleting an activity emails pending and approved applicants only."""
+        self.client.force_authenticate(user=self.admin_user)
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.delete(f'/api/activities/delete/{self.activity.id}/')
+
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+        self.assertEqual(len(mail.outbox), 0)
+        run_worker()
+
+        self.assertEqual(
+            sorted(message.to[0] for message in mail.outbox),
+            ['approved@ku.th', 'pending@ku.th']
+        )
+        self.assertIn('Beach Cleanup', mail.outbox[0].subject)
+
+    def test_failed_delete_emails_nobody(self):
+        """Test that applicants are only emailed once the delete has committed."""
+        self.client.force_authenticate(user=self.admin_user)
+
+        with mock.patch.object(Activity, 'delete', side_effect=DatabaseError('deadlock detected')):
+            with self.captureOnCommitCallbacks(execute=True) as callbacks:
+                with self.assertRaises(DatabaseError):
+                    self.client.delete(f'/api/activities/delete/{self.activity.id}/')
+
+        self.assertEqual(callbacks, [])
+        self.assertFalse(Task.objects.exists())
+        self.assertEqual(
+            Application.objects.filter(activity=self.activity).count(),
+            len(self.applications)
+        )
+
+    @override_settings(EMAIL_BATCH_SIZE=1)
+    def test_failed_batch_is_retried_alone(self):
+        """Test that each batch is its own task and a retry does not resend the others."""
+        self.client.force_authenticate(user=self.admin_user)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.delete(f'/api/activities/delete/{self.activity.id}/')
+        self.assertEqual(Task.objects.count(), 2)
+
+        send_messages = locmem.EmailBackend.send_messages
+
+        def fail_for_pending(backend, messages):
+            if messages[0].to == ['pending@ku.th']:
+                raise SMTPException('Connection lost')
+            return send_messages(backend, messages)
+
+        with mock.patch.object(locmem.EmailBackend, 'send_messages', autospec=True, side_effect=fail_for_pending):
+            with self.assertLogs('tasks.registry', level='ERROR'):
+                run_worker()
+        self.assertEqual([message.to for message in mail.outbox], [['approved@ku.th']])
+
+        Task.objects.update(run_at=timezone.now())
+        run_worker()
+        self.assertEqual(
+            sorted(message.to[0] for message in mail.outbox),
+            ['approved@ku.th', 'pending@ku.th']
+        )
+
+    def test_approved_deletion_request_emails_applicants(self):
+        """Test that approving a deletion request notifies applicants before deleting."""
+        deletion_request = ActivityDeletionRequest.objects.create(
+            activity=self.activity,
+            reason='Venue unavailable',
+            requested_by=self.organizer_user
+        )
+        self.client.force_authenticate(user=self.admin_user)
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(
+                f'/api/activities/deletion-requests/{deletion_request.id}/review/',
+                {'action': 'approve'},
+                format='json'
+            )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        run_worker()
+        self.assertEqual(len(mail.outbox), 2)
+
+    def test_moderation_rejection_emails_organizer(self):
+        """Test that the organizer is told why their activity was rejected."""
+        Activity.objects.filter(pk=self.activity.pk).update(status=ActivityStatus.PENDING)
+        self.client.force_authenticate(user=self.admin_user)
+        response = self.client.post(
+            f'/api/activities/moderation/{self.activity.id}/review/',
+            {'action': 'reject', 'reason': 'Missing location details'},
+            format='json'
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        run_worker()
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(mail.outbox[0].to, ['organizer@test.com'])
+        self.assertIn('Missing location details', mail.outbox[0].body)
+
+    def test_bulk_moderation_emails_organizers_in_one_task(self):
+        """Test that every organizer is told the decision on their activity."""
+        other_user = User.objects.create_user(
+            email='other@test.com',
+            password='testpass123',
+            role='organizer'
+        )
+        other_profile = OrganizerProfile.objects.create(
+            user=other_user,
+            organization_name='Other Organization',
+            organization_type='nonprofit'
+        )
+        Activity.objects.filter(pk=self.activity.pk).update(status=ActivityStatus.PENDING)
+        other_activity = Activity.objects.create(
+            organizer_profile=other_profile,
+            title='River Cleanup',
+            start_at=self.activity.start_at,
+            end_at=self.activity.end_at,
+            categories=['University Activities']
+        )
+        self.client.force_authenticate(user=self.admin_user)
+        response = self.client.post('/api/activities/moderation/bulk-review/', {
+            'items': [
+                {'id': self.activity.id, 'action': 'approve'},
+                {'id': other_activity.id, 'action': 'reject', 'reason': 'Missing location details'},
+            ]
+        }, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        queued = Task.objects.get()
+        self.assertEqual(len(queued.payload['messages']), 2)
+
+        run_worker()
+        by_recipient = {message.to[0]: message for message in mail.outbox}
+        self.assertEqual(sorted(by_recipient), ['organizer@test.com', 'other@test.com'])
+        self.assertIn('Beach Cleanup', by_recipient['organizer@test.com'].body)
+        self.assertIn('Missing location details', by_recipient['other@test.com'].body)
+
+    def test_bulk_review_emails_each_decision(self):
+        """Test that bulk decisions are sent in one task, grouped by outcome."""
+        students = [
+            User.objects.create_user(email=f'extra{i}@ku.th', password='testpass123', role='student')
+            for i in range(3)
+        ]
+        extra = [
+            Application.objects.create(activity=self.activity, student=student)
+            for student in students
+        ]
+        self.client.force_authenticate(user=self.organizer_user)
+        response = self.client.post(
+            f'/api/activities/{self.activity.id}/applications/bulk-review/',
+            {'items': [
+                {'id': self.applications[ApplicationStatus.PENDING].id, 'action': 'approve'},
+                {'id': extra[0].id, 'action': 'approve'},
+                {'id': extra[1].id, 'action': 'reject', 'reason': 'Full schedule'},
+                {'id': extra[2].id, 'action': 'reject', 'reason': 'Full schedule'},
+                {'id': self.applications[ApplicationStatus.REJECTED].id, 'action': 'approve'},
+            ]},
+            format='json'
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        queued = Task.objects.get()
+        self.assertEqual(len(queued.payload['messages']), 2)
+
+        run_worker()
+        by_recipient = {message.to[0]: message for message in mail.outbox}
+        self.assertEqual(sorted(by_recipient), ['extra0@ku.th', 'extra1@ku.th', 'extra2@ku.th', 'pending@ku.th'])
+        self.assertIn('approved', by_recipient['extra0@ku.th'].subject)
+        self.assertIn('Full schedule', by_recipient['extra2@ku.th'].body)
+
+    def test_delete_without_applicants_queues_nothing(self):
+        """Test that no task is queued when nobody needs to be told."""
+        Application.objects.all().delete()
+        self.client.force_authenticate(user=self.admin_user)
+        self.client.delete(f'/api/activities/delete/{self.activity.id}/')
+
+        self.assertFalse(Task.objects.exists())
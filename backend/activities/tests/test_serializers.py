@@ -92,7 +92,8 @@ class ActivitySerializerTestCase(TestCase):
             'id', 'organizer_profile_id', 'organizer_email', 'organizer_name',
             'categories', 'title', 'description', 'start_at', 'end_at', 'location',
             'max_participants', 'current_participants', 'status', 'hours_awarded',
-            'cover_image', 'poster_images', 'rejection_reason', 'created_at', 'updated_at',
+            'cover_image', 'cover_image_variants', 'cover_image_status', 'poster_images', 'rejection_reason',
+            'created_at', 'updated_at',
             'requires_admin_for_delete', 'capacity_reached', 'user_application_status'
         }
         self.assertEqual(set(data.keys()), expected_fields)
@@ -660,6 +661,21 @@ class CheckInRequestSerializerTestCase(TestCase):
         self.assertIn('code', serializer.errors)
 
 
+    def test_checkin_request_serializer_token(self):
+        """Test that a QR token can be sent instead of a code."""
+        serializer = CheckInRequestSerializer(data={'token': '1.2.signature'})
+
+        self.assertTrue(serializer.is_valid())
+        self.assertEqual(serializer.validated_data['token'], '1.2.signature')
+        self.assertNotIn('code', serializer.validated_data)
+
+    def test_checkin_request_serializer_code_and_token(self):
+        """Test that code and token cannot be sent together."""
+        serializer = CheckInRequestSerializer(data={'code': 'ABC123', 'token': '1.2.signature'})
+
+        self.assertFalse(serializer.is_valid())
+
+
 class DailyCheckInCodeSerializerTestCase(TestCase):
     """Test cases for DailyCheckInCodeSerializer."""
 
@@ -0,0 +1,197 @@
+"""
+Tests for content-addressed media storage.
+"""
+import os
+import shutil
+import tempfile
+from collections import Counter
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from config.constants import ActivityStatus
+from users.models import OrganizerProfile
+from activities.images import generate_variants, variant_names
+from activities.models import Activity, ActivityPosterImage, MediaBlob
+from activities.tasks import process_image_variants
+from activities.tests.test_images import make_image
+
+User = get_user_model()
+
+MEDIA_ROOT = tempfile.mkdtemp()
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT)
+class ContentAddressedStorageTestCase(TestCase):
+    """Test cases for storing and releasing blobs."""
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+
+    def test_identical_content_is_stored_once(self):
+        """Test that saving the same bytes twice shares one file."""
+        first = default_storage.save('activities/1/cover/beach.jpg', ContentFile(b'same bytes'))
+        second = default_storage.save('activities/2/cover/other.JPG', ContentFile(b'same bytes'))
+
+        self.assertEqual(first, second)
+        self.assertTrue(first.startswith('blobs/'))
+        self.assertTrue(first.endswith('.jpg'))
+        self.assertEqual(MediaBlob.objects.get(name=first).ref_count, 2)
+
+    def test_different_content_gets_different_names(self):
+        """Test that the name changes with the content."""
+        first = default_storage.save('cover.jpg', ContentFile(b'version 1'))
+        second = default_storage.save('cover.jpg', ContentFile(b'version 2'))
+
+        self.assertNotEqual(first, second)
+
+    def test_file_is_removed_with_last_reference(self):
+        """Test that delete drops one reference at a time."""
+        name = default_storage.save('cover.jpg', ContentFile(b'shared'))
+        default_storage.save('cover.jpg', ContentFile(b'shared'))
+
+        default_storage.delete(name)
+        self.assertTrue(default_storage.exists(name))
+        self.assertEqual(MediaBlob.objects.get(name=name).ref_count, 1)
+
+        default_storage.delete(name)
+        self.assertFalse(default_storage.exists(name))
+        self.assertFalse(MediaBlob.objects.filter(name=name).exists())
+
+    def test_files_saved_before_content_addressing_are_deleted(self):
+        """Test that files outside the blob directory are deleted directly."""
+        path = os.path.join(MEDIA_ROOT, 'activities', '1', 'cover', 'legacy.jpg')
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'wb') as f:
+            f.write(b'legacy')
+
+        default_storage.delete('activities/1/cover/legacy.jpg')
+
+        self.assertFalse(os.path.exists(path))
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT)
+class ImageReferenceTestCase(TestCase):
+    """Test cases for releasing images when records change."""
+
+    def setUp(self):
+        """Set up two activities from the same organizer."""
+        organizer_user = User.objects.create_user(
+            email='organizer@test.com',
+            password='testpass123',
+            role='organizer'
+        )
+        organizer_profile = OrganizerProfile.objects.create(
+            user=organizer_user,
+            organization_name='Test Organization',
+            organization_type='nonprofit'
+        )
+        now = timezone.now()
+        self.activities = [
+            Activity.objects.create(
+                organizer_profile=organizer_profile,
+                title=f'Beach Cleanup {i}',
+                description='Test description',
+                location='Bangkok',
+                start_at=now + timedelta(days=10 + i),
+                end_at=now + timedelta(days=10 + i, hours=4),
+                max_participants=10,
+                categories=['University Activities'],
+                status=ActivityStatus.OPEN
+            )
+            for i in range(2)
+        ]
+        self.image = make_image(size=(600, 400))
+
+    def _set_cover(self, activity, content, name='cover.jpg'):
+        activity.cover_image = ContentFile(content, name=name)
+        with self.captureOnCommitCallbacks(execute=True):
+            activity.save()
+
+    def test_recurring_activities_share_cover(self):
+        """Test that reusing a cover for another activity does not store it again."""
+        for activity in self.activities:
+            self._set_cover(activity, self.image)
+
+        self.assertEqual(self.activities[0].cover_image.name, self.activities[1].cover_image.name)
+        self.assertEqual(MediaBlob.objects.get().ref_count, 2)
+
+    def test_deleting_activity_keeps_shared_cover(self):
+        """Test that a cover used by another activity survives deletion."""
+        for activity in self.activities:
+            self._set_cover(activity, self.image)
+        name = self.activities[0].cover_image.name
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.activities[0].delete()
+        self.assertTrue(default_storage.exists(name))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.activities[1].delete()
+        self.assertFalse(default_storage.exists(name))
+
+    def test_replacing_cover_releases_old_image_and_variants(self):
+        """Test that the old cover and its variants are removed when replaced."""
+        activity = self.activities[0]
+        self._set_cover(activity, self.image)
+        with self.captureOnCommitCallbacks(execute=True):
+            call_command('run_worker', '--once', '--concurrency=1', stdout=StringIO())
+        activity.refresh_from_db()
+        old_names = [activity.cover_image.name] + [
+            variant[image_format]
+            for variant in activity.cover_image_variants.values()
+            for image_format in ('webp', 'jpeg')
+        ]
+
+        self._set_cover(activity, make_image(size=(500, 500)))
+
+        for name in old_names:
+            self.assertFalse(default_storage.exists(name))
+
+    def test_overlapping_variant_runs_release_each_others_variants(self):
+        """Test that a run finishing second releases the variants of the run it replaced."""
+        activity = self.activities[0]
+        self._set_cover(activity, self.image)
+        name = activity.cover_image.name
+        runs = []
+
+        def generate_with_overlap(field_file):
+            if not runs:
+                runs.append('outer')
+                process_image_variants(kind='cover', pk=activity.pk, name=name)
+            return generate_variants(field_file)
+
+        with mock.patch('activities.tasks.generate_variants', side_effect=generate_with_overlap):
+            with self.captureOnCommitCallbacks(execute=True):
+                self.assertTrue(process_image_variants(kind='cover', pk=activity.pk, name=name))
+
+        activity.refresh_from_db()
+        references = Counter(variant_names(activity.cover_image_variants))
+        self.assertEqual(
+            dict(MediaBlob.objects.filter(name__in=references).values_list('name', 'ref_count')),
+            dict(references)
+        )
+        self.assertEqual(MediaBlob.objects.count(), len(references) + 1)
+
+    def test_deleting_poster_releases_image(self):
+        """Test that a deleted poster's file is removed."""
+        poster = ActivityPosterImage(activity=self.activities[0])
+        poster.image = ContentFile(self.image, name='poster.jpg')
+        with self.captureOnCommitCallbacks(execute=True):
+            poster.save()
+        name = poster.image.name
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.activities[0].delete()
+
+        self.assertFalse(default_storage.exists(name))
+        self.assertFalse(MediaBlob.objects.exists())
@@ -10,6 +10,7 @@ from activities.views import (
     ActivityListOnlyView,
     ActivityCreateOnlyView,
     ActivityDetailOnlyView,
+    ActivityDetailBundleView,
     ActivityUpdateOnlyView,
     ActivityDeleteView,
     ActivityRequestDeleteView,
@@ -18,17 +19,22 @@ from activities.views import (
     ActivityMetadataView,
     ActivityModerationListView,
     ActivityModerationReviewView,
+    ActivityBulkModerationView,
     ApplicationCreateView,
     ApplicationListView,
     ApplicationDetailView,
     ApplicationsByActivityView,
     ApplicationCancelView,
     ApplicationReviewView,
+    ApplicationBulkReviewView,
     StudentApprovedActivitiesView,
     ActivityPosterImageListCreateView,
+    ActivityPosterImageBatchUploadView,
     ActivityPosterImageDetailView,
     ActivityCheckInCodeView,
+    ActivityCheckInQRView,
     StudentCheckInView,
+    ActivityCheckInSyncView,
     ActivityCheckInListView,
     StudentCheckInStatusView,
 )
@@ -55,6 +61,12 @@ class ActivityURLTestCase(TestCase):
         self.assertEqual(url, '/api/activities/1/')
         self.assertEqual(resolve(url).func.view_class, ActivityDetailOnlyView)
 
+    def test_activity_detail_bundle_url(self):
+        """Test activity detail bundle URL."""
+        url = reverse('activity-detail-bundle', kwargs={'pk': 1})
+        self.assertEqual(url, '/api/activities/1/bundle/')
+        self.assertEqual(resolve(url).func.view_class, ActivityDetailBundleView)
+
     def test_activity_update_url(self):
         """Test activity update URL."""
         url = reverse('activity-update', kwargs={'pk': 1})
@@ -103,6 +115,12 @@ class ActivityURLTestCase(TestCase):
         self.assertEqual(url, '/api/activities/moderation/1/review/')
         self.assertEqual(resolve(url).func.view_class, ActivityModerationReviewView)
 
+    def test_activity_moderation_bulk_review_url(self):
+        """Test activity bulk moderation URL."""
+        url = reverse('activity-moderation-bulk-review')
+        self.assertEqual(url, '/api/activities/moderation/bulk-review/')
+        self.assertEqual(resolve(url).func.view_class, ActivityBulkModerationView)
+
 
 class ApplicationURLTestCase(TestCase):
     """Test cases for application-related URLs."""
@@ -143,6 +161,12 @@ class ApplicationURLTestCase(TestCase):
         self.assertEqual(url, '/api/activities/1/applications/')
         self.assertEqual(resolve(url).func.view_class, ApplicationsByActivityView)
 
+    def test_application_bulk_review_url(self):
+        """Test application bulk review URL."""
+        url = reverse('application-bulk-review', kwargs={'activity_id': 1})
+        self.assertEqual(url, '/api/activities/1/applications/bulk-review/')
+        self.assertEqual(resolve(url).func.view_class, ApplicationBulkReviewView)
+
     def test_student_approved_activities_url(self):
         """Test student approved activities URL."""
         url = reverse('student-approved-activities')
@@ -159,6 +183,12 @@ class PosterImageURLTestCase(TestCase):
         self.assertEqual(url, '/api/activities/1/posters/')
         self.assertEqual(resolve(url).func.view_class, ActivityPosterImageListCreateView)
 
+    def test_activity_poster_images_batch_url(self):
+        """Test poster images batch upload URL."""
+        url = reverse('activity-poster-images-batch', kwargs={'activity_id': 1})
+        self.assertEqual(url, '/api/activities/1/posters/batch/')
+        self.assertEqual(resolve(url).func.view_class, ActivityPosterImageBatchUploadView)
+
     def test_activity_poster_image_detail_url(self):
         """Test poster image detail URL."""
         url = reverse('activity-poster-image-detail', kwargs={'activity_id': 1, 'pk': 2})
@@ -175,12 +205,24 @@ class CheckInURLTestCase(TestCase):
         self.assertEqual(url, '/api/activities/1/checkin-code/')
         self.assertEqual(resolve(url).func.view_class, ActivityCheckInCodeView)
 
+    def test_activity_checkin_qr_url(self):
+        """Test check-in QR token URL."""
+        url = reverse('activity-checkin-qr', kwargs={'activity_id': 1})
+        self.assertEqual(url, '/api/activities/1/checkin-qr/')
+        self.assertEqual(resolve(url).func.view_class, ActivityCheckInQRView)
+
     def test_student_checkin_url(self):
         """Test student check-in URL."""
         url = reverse('student-checkin', kwargs={'activity_id': 1})
         self.assertEqual(url, '/api/activities/1/checkin/')
         self.assertEqual(resolve(url).func.view_class, StudentCheckInView)
 
+    def test_activity_checkin_sync_url(self):
+        """Test activity check-in sync URL."""
+        url = reverse('activity-checkin-sync', kwargs={'activity_id': 1})
+        self.assertEqual(url, '/api/activities/1/checkin-sync/')
+        self.assertEqual(resolve(url).func.view_class, ActivityCheckInSyncView)
+
     def test_activity_checkin_list_url(self):
         """Test activity check-in list URL."""
         url = reverse('activity-checkin-list', kwargs={'activity_id': 1})
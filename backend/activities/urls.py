@@ -3,6 +3,7 @@ from .views import (
     ActivityListOnlyView,
     ActivityCreateOnlyView,
     ActivityDetailOnlyView,
+    ActivityDetailBundleView,
     ActivityUpdateOnlyView,
     ActivityDeleteView,
     ActivityRequestDeleteView,
@@ -11,17 +12,22 @@ from .views import (
     ActivityMetadataView,
     ActivityModerationListView,
     ActivityModerationReviewView,
+    ActivityBulkModerationView,
     ApplicationCreateView,
     ApplicationListView,
     ApplicationDetailView,
     ApplicationsByActivityView,
     ApplicationCancelView,
     ApplicationReviewView,
+    ApplicationBulkReviewView,
     StudentApprovedActivitiesView,
     ActivityPosterImageListCreateView,
+    ActivityPosterImageBatchUploadView,
     ActivityPosterImageDetailView,
     ActivityCheckInCodeView,
+    ActivityCheckInQRView,
     StudentCheckInView,
+    ActivityCheckInSyncView,
     ActivityCheckInListView,
     StudentCheckInStatusView,
 )
@@ -32,6 +38,7 @@ urlpatterns = [
     path('list/', ActivityListOnlyView.as_view(), name='activity-list'),
     path('create/', ActivityCreateOnlyView.as_view(), name='activity-create'),
     path('<int:pk>/', ActivityDetailOnlyView.as_view(), name='activity-detail'),
+    path('<int:pk>/bundle/', ActivityDetailBundleView.as_view(), name='activity-detail-bundle'),
     path('<int:pk>/update/', ActivityUpdateOnlyView.as_view(), name='activity-update'),
     path('delete/<int:pk>/', ActivityDeleteView.as_view(), name='activity-delete'),
     # Deletion request workflow (admin moderation)
@@ -43,6 +50,7 @@ urlpatterns = [
     # Admin moderation of activities
     path('moderation/pending/', ActivityModerationListView.as_view(), name='activity-moderation-list'),
     path('moderation/<int:pk>/review/', ActivityModerationReviewView.as_view(), name='activity-moderation-review'),
+    path('moderation/bulk-review/', ActivityBulkModerationView.as_view(), name='activity-moderation-bulk-review'),
     # Application endpoints
     path('applications/create/', ApplicationCreateView.as_view(), name='application-create'),
     path('applications/list/', ApplicationListView.as_view(), name='application-list'),
@@ -50,14 +58,18 @@ urlpatterns = [
     path('applications/<int:pk>/cancel/', ApplicationCancelView.as_view(), name='application-cancel'),
     path('applications/<int:pk>/review/', ApplicationReviewView.as_view(), name='application-review'),
     path('<int:activity_id>/applications/', ApplicationsByActivityView.as_view(), name='applications-by-activity'),
+    path('<int:activity_id>/applications/bulk-review/', ApplicationBulkReviewView.as_view(), name='application-bulk-review'),
     # Student's approved activities
     path('my-approved-activities/', StudentApprovedActivitiesView.as_view(), name='student-approved-activities'),
     # Poster image endpoints
     path('<int:activity_id>/posters/', ActivityPosterImageListCreateView.as_view(), name='activity-poster-images'),
+    path('<int:activity_id>/posters/batch/', ActivityPosterImageBatchUploadView.as_view(), name='activity-poster-images-batch'),
     path('<int:activity_id>/posters/<int:pk>/', ActivityPosterImageDetailView.as_view(), name='activity-poster-image-detail'),
     # Check-in endpoints
     path('<int:activity_id>/checkin-code/', ActivityCheckInCodeView.as_view(), name='activity-checkin-code'),
+    path('<int:activity_id>/checkin-qr/', ActivityCheckInQRView.as_view(), name='activity-checkin-qr'),
     path('<int:activity_id>/checkin/', StudentCheckInView.as_view(), name='student-checkin'),
+    path('<int:activity_id>/checkin-sync/', ActivityCheckInSyncView.as_view(), name='activity-checkin-sync'),
     path('<int:activity_id>/checkin-list/', ActivityCheckInListView.as_view(), name='activity-checkin-list'),
     path('<int:activity_id>/checkin-status/', StudentCheckInStatusView.as_view(), name='student-checkin-status'),
 ]
\ No newline at end of file
@@ -1,3 +1,6 @@
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db import transaction
 from django.shortcuts import get_object_or_404
 from rest_framework import generics, permissions, status
 from rest_framework.parsers import MultiPartParser, FormParser, JSONParser
@@ -6,24 +9,54 @@ from rest_framework.response import Response
 from rest_framework.views import APIView
 
 from config.constants import ActivityStatus, ApplicationStatus, StatusMessages, UserRoles
+from config.pagination import NoPrevNextPagination
 from config.permissions import IsAdmin, IsStudent
-from config.utils import get_activity_category_groups, get_student_approved_activities, is_admin_user, validate_activity_is_happening
+from config.throttling import CheckInActivityThrottle, CheckInUserThrottle
+from config.uploads import StreamedUploadMixin
+from config.utils import (
+    derive_application_status,
+    get_activity_category_groups,
+    get_student_approved_activities,
+    is_admin_user,
+    validate_activity_is_happening,
+)
 from .models import Activity, ActivityDeletionRequest, Application, ActivityPosterImage, DailyCheckInCode, StudentCheckIn
+from .notifications import (
+    notify_activities_moderated,
+    notify_activity_deleted,
+    notify_activity_moderated,
+    notify_applications_reviewed,
+)
 from .serializers import (
+    ActivityBulkModerationSerializer,
     ActivityDeletionRequestSerializer,
     ActivitySerializer,
     ActivityWriteSerializer,
     ApplicationSerializer,
     ApplicationCreateSerializer,
     ApplicationReviewSerializer,
+    ApplicationBulkReviewSerializer,
     ActivityPosterImageSerializer,
+    ActivityPosterImageBatchSerializer,
     DailyCheckInCodeSerializer,
     StudentCheckInSerializer,
     CheckInRequestSerializer,
+    CheckInQRTokenSerializer,
+    CheckInSyncSerializer,
 )
 
 
-class ActivityListCreateView(generics.ListCreateAPIView):
+def _can_manage_activity(user, activity: Activity) -> bool:
+    """Return True if user is an admin or an organizer of the activity's organization."""
+    if getattr(user, 'role', None) == UserRoles.ORGANIZER:
+        try:
+            return user.organizer_profile.organization_name == activity.organizer_profile.organization_name
+        except AttributeError:
+            return False
+    return is_admin_user(user)
+
+
+class ActivityListCreateView(StreamedUploadMixin, generics.ListCreateAPIView):
     """API view for listing and creating activities."""
 
     queryset = Activity.objects.all().select_related(
@@ -34,7 +67,8 @@ class ActivityListCreateView(generics.ListCreateAPIView):
     def get_queryset(self):
         """Filter queryset based on user role and update activity statuses."""
         # Update all activity statuses efficiently before filtering
-        Activity.update_all_statuses()
+        if settings.ACTIVITY_STATUS_REFRESH_ON_REQUEST:
+            Activity.update_all_statuses()
         
         # Get the base queryset after status updates
         queryset = super().get_queryset()
@@ -90,7 +124,8 @@ class ActivityListOnlyView(ActivityListCreateView):
     def get_queryset(self):
         """Filter queryset based on user authentication and role."""
         # Update all activity statuses efficiently before filtering
-        Activity.update_all_statuses()
+        if settings.ACTIVITY_STATUS_REFRESH_ON_REQUEST:
+            Activity.update_all_statuses()
         
         # Get the base queryset after status updates
         queryset = super().get_queryset()
@@ -108,7 +143,7 @@ class ActivityCreateOnlyView(ActivityListCreateView):
     http_method_names = ['post']
 
 
-class ActivityRetrieveUpdateView(generics.RetrieveUpdateAPIView):
+class ActivityRetrieveUpdateView(StreamedUploadMixin, generics.RetrieveUpdateAPIView):
     """API view for retrieving and updating activities."""
 
     queryset = Activity.objects.all().select_related(
@@ -165,6 +200,78 @@ class ActivityUpdateOnlyView(ActivityRetrieveUpdateView):
     http_method_names = ['put', 'patch']
 
 
+class ActivityDetailBundleView(APIView):
+    """API view returning everything the event-detail page needs in one response.
+
+    - Everyone gets the activity detail including poster images
+    - Students also get their application and check-in record
+    - Organizers (same organization) and admins also get the first page of
+      the activity's applications (the same page as ApplicationsByActivityView,
+      which serves the rest) and today's check-in code while the activity is
+      happening
+    """
+
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request: Request, pk: int) -> Response:
+        """Return the role-aware detail bundle for an activity."""
+        activity = get_object_or_404(
+            Activity.objects.select_related(
+                'organizer_profile', 'organizer_profile__user'
+            ).prefetch_related('poster_images'),
+            pk=pk
+        )
+        if settings.ACTIVITY_STATUS_REFRESH_ON_REQUEST:
+            activity.auto_update_status()
+        user = request.user
+        context = {'request': request}
+        payload = {}
+
+        if getattr(user, 'role', None) == UserRoles.STUDENT:
+            application = Application.objects.filter(
+                activity=activity, student=user
+            ).select_related('student', 'student__profile', 'decision_by').first()
+            check_in = StudentCheckIn.objects.filter(activity=activity, student=user).first()
+
+            # Reuse the loaded rows instead of letting serializers re-fetch them
+            if application is not None:
+                application.activity = activity
+            if check_in is not None:
+                check_in.activity = activity
+                check_in.student = user
+
+            context['user_application_status'] = derive_application_status(
+                activity, application, check_in
+            )
+            payload['application'] = ApplicationSerializer(application).data if application else None
+            payload['check_in'] = StudentCheckInSerializer(check_in).data if check_in else None
+            payload['has_checked_in'] = bool(check_in and check_in.attendance_status == 'present')
+
+        elif _can_manage_activity(user, activity):
+            applications = Application.objects.filter(activity=activity).select_related(
+                'student', 'student__profile', 'decision_by'
+            )
+            paginator = NoPrevNextPagination()
+            page = paginator.paginate_queryset(applications, request, view=self)
+            for application in page:
+                application.activity = activity
+
+            checkin_code = None
+            if activity.is_ongoing:
+                checkin_code = DailyCheckInCodeSerializer(
+                    DailyCheckInCode.get_or_create_today_code(activity)
+                ).data
+
+            payload['applications'] = {
+                'count': paginator.page.paginator.count,
+                'results': ApplicationSerializer(page, many=True).data,
+            }
+            payload['checkin_code'] = checkin_code
+
+        payload['activity'] = ActivitySerializer(activity, context=context).data
+        return Response(payload, status=status.HTTP_200_OK)
+
+
 class ActivityDeleteView(APIView):
     """API view for deleting activities."""
 
@@ -178,7 +285,9 @@ class ActivityDeleteView(APIView):
 
         # Admin can always delete
         if is_admin_user(user):
-            activity.delete()
+            with transaction.atomic():
+                notify_activity_deleted(activity)
+                activity.delete()
             return Response(status=status.HTTP_204_NO_CONTENT)
 
         # Organizer deletion rules - check if user belongs to same organization
@@ -203,7 +312,9 @@ class ActivityDeleteView(APIView):
             )
 
         if activity.current_participants == 0:
-            activity.delete()
+            with transaction.atomic():
+                notify_activity_deleted(activity)
+                activity.delete()
             return Response(status=status.HTTP_204_NO_CONTENT)
 
         # If participants >= 1, require deletion request
@@ -318,10 +429,13 @@ class ActivityDeletionRequestReviewView(APIView):
         if action == 'approve':
             # Approve the request then delete the activity
             activity = deletion_request.activity
-            deletion_request.approve(request.user, note)
-            # Serialize before deletion for response compatibility
-            serialized = ActivityDeletionRequestSerializer(deletion_request).data
-            activity.delete()
+            with transaction.atomic():
+                deletion_request.approve(request.user, note)
+                # Serialize before deletion for response compatibility
+                serialized = ActivityDeletionRequestSerializer(deletion_request).data
+                if activity is not None:
+                    notify_activity_deleted(activity)
+                    activity.delete()
             return Response({
                 'detail': 'Deletion request approved and activity deleted.',
                 'request': serialized,
@@ -415,6 +529,7 @@ class ActivityModerationReviewView(APIView):
             activity.status = ActivityStatus.OPEN
             activity.rejection_reason = ''
             activity.save(update_fields=['status', 'rejection_reason'])
+            notify_activity_moderated(activity)
             return Response({'detail': 'Activity set to open.'})
         else:
             reason = (request.data.get('reason') or '').strip()
@@ -426,11 +541,31 @@ class ActivityModerationReviewView(APIView):
             activity.status = ActivityStatus.REJECTED
             activity.rejection_reason = reason
             activity.save(update_fields=['status', 'rejection_reason'])
+            notify_activity_moderated(activity)
             return Response(
                 {'detail': 'Activity rejected with reason provided.'}
             )
 
 
+class ActivityBulkModerationView(APIView):
+    """Approve or reject many pending activities at once (admin only).
+
+    Approvals and rejections are applied with one UPDATE each, and a
+    per-item result summary is returned. Organizers of moderated activities
+    are emailed by a single background task.
+    """
+    permission_classes = [permissions.IsAuthenticated, IsAdmin]
+
+    def post(self, request: Request) -> Response:
+        serializer = ActivityBulkModerationSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        summary = Activity.bulk_moderate(serializer.validated_data['items'])
+        notify_activities_moderated(summary['results'])
+        return Response(summary, status=status.HTTP_200_OK)
+
+
 class ApplicationCreateView(generics.CreateAPIView):
     """API view for students to create applications."""
     
@@ -630,6 +765,50 @@ class ApplicationReviewView(APIView):
             )
 
 
+class ApplicationBulkReviewView(APIView):
+    """API view for organizers to approve/reject many applications of an activity.
+
+    Accepts either a list of decisions or "approve the first N pending
+    applications in submission order", stopping at capacity. All decisions are
+    applied in one transaction and a per-item result summary is returned.
+    """
+
+    permission_classes = [permissions.IsAuthenticated]
+
+    def post(self, request: Request, activity_id: int) -> Response:
+        """Review applications of an activity in bulk."""
+        activity = get_object_or_404(
+            Activity.objects.select_related('organizer_profile'),
+            pk=activity_id
+        )
+        if not _can_manage_activity(request.user, activity):
+            return Response(
+                {'detail': StatusMessages.PERMISSION_DENIED},
+                status=status.HTTP_403_FORBIDDEN
+            )
+
+        serializer = ApplicationBulkReviewSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            summary = Application.bulk_review(
+                activity,
+                request.user,
+                items=serializer.validated_data.get('items'),
+                approve_first=serializer.validated_data.get('approve_first')
+            )
+        except ValidationError as e:
+            return Response(
+                {'detail': e.messages[0]},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        notify_applications_reviewed(activity, summary['results'])
+        summary['current_participants'] = activity.current_participants
+        return Response(summary, status=status.HTTP_200_OK)
+
+
 class StudentApprovedActivitiesView(generics.ListAPIView):
     """API view for students to get their approved activities.
     
@@ -643,7 +822,8 @@ class StudentApprovedActivitiesView(generics.ListAPIView):
     def get_queryset(self):
         """Get all activities where student has approved applications."""
         # Update all activity statuses efficiently
-        Activity.update_all_statuses()
+        if settings.ACTIVITY_STATUS_REFRESH_ON_REQUEST:
+            Activity.update_all_statuses()
         
         queryset = get_student_approved_activities(self.request.user).select_related(
             'organizer_profile', 'organizer_profile__user'
@@ -652,7 +832,7 @@ class StudentApprovedActivitiesView(generics.ListAPIView):
         return queryset
 
 
-class ActivityPosterImageListCreateView(generics.ListCreateAPIView):
+class ActivityPosterImageListCreateView(StreamedUploadMixin, generics.ListCreateAPIView):
     """API view for managing activity poster images."""
     
     serializer_class = ActivityPosterImageSerializer
@@ -721,7 +901,47 @@ class ActivityPosterImageListCreateView(generics.ListCreateAPIView):
         serializer.save(activity=activity)
 
 
-class ActivityPosterImageDetailView(generics.RetrieveUpdateDestroyAPIView):
+class ActivityPosterImageBatchUploadView(StreamedUploadMixin, APIView):
+    """API view for uploading up to four poster images in one request.
+
+    Permission is checked once and the files are assigned the free order
+    slots and saved in one transaction.
+    """
+
+    permission_classes = [permissions.IsAuthenticated]
+    parser_classes = [MultiPartParser]
+
+    def post(self, request: Request, activity_id: int) -> Response:
+        """Upload poster images for an activity."""
+        activity = get_object_or_404(
+            Activity.objects.select_related('organizer_profile'),
+            pk=activity_id
+        )
+        if not _can_manage_activity(request.user, activity):
+            return Response(
+                {'detail': StatusMessages.PERMISSION_DENIED},
+                status=status.HTTP_403_FORBIDDEN
+            )
+
+        serializer = ActivityPosterImageBatchSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            posters = ActivityPosterImage.add_many(activity, serializer.validated_data['images'])
+        except ValidationError as e:
+            return Response(
+                {'detail': e.messages[0]},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        return Response(
+            ActivityPosterImageSerializer(posters, many=True, context={'request': request}).data,
+            status=status.HTTP_201_CREATED
+        )
+
+
+class ActivityPosterImageDetailView(StreamedUploadMixin, generics.RetrieveUpdateDestroyAPIView):
     """API view for retrieving, updating, and deleting individual poster images."""
     
     serializer_class = ActivityPosterImageSerializer
@@ -818,13 +1038,52 @@ class ActivityCheckInCodeView(APIView):
         )
 
 
+class ActivityCheckInQRView(APIView):
+    """API view for organizers to display the rotating check-in QR token.
+
+    The organizer screen polls this endpoint and renders the token as a QR
+    code. Tokens rotate every CHECKIN_QR_ROTATION_SECONDS, so a photo of the
+    screen stops working shortly after it is taken.
+    """
+
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request: Request, activity_id: int) -> Response:
+        """Get the QR check-in token for the current time slot."""
+        activity = get_object_or_404(
+            Activity.objects.select_related('organizer_profile'),
+            pk=activity_id
+        )
+        if not _can_manage_activity(request.user, activity):
+            return Response(
+                {'detail': StatusMessages.PERMISSION_DENIED},
+                status=status.HTTP_403_FORBIDDEN
+            )
+
+        try:
+            validate_activity_is_happening(activity)
+        except Exception as e:
+            return Response(
+                {'detail': str(e)},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        response = Response(
+            CheckInQRTokenSerializer(StudentCheckIn.generate_qr_token(activity)).data,
+            status=status.HTTP_200_OK
+        )
+        response['Cache-Control'] = 'no-store'
+        return response
+
+
 class StudentCheckInView(APIView):
     """API view for students to check in to an activity."""
     
     permission_classes = [permissions.IsAuthenticated, IsStudent]
+    throttle_classes = [CheckInUserThrottle, CheckInActivityThrottle]
 
     def post(self, request: Request, activity_id: int) -> Response:
-        """Check in to an activity using the daily code."""
+        """Check in to an activity using the daily code or a QR token."""
         activity = get_object_or_404(Activity, pk=activity_id)
         
         # Validate request data
@@ -832,11 +1091,15 @@ class StudentCheckInView(APIView):
         if not serializer.is_valid():
             return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
         
-        code = serializer.validated_data['code']
+        code = serializer.validated_data.get('code')
+        token = serializer.validated_data.get('token')
         
         try:
-            # Perform check-in
-            check_in = StudentCheckIn.check_in_student(activity, request.user, code)
+            # Perform check-in, QR tokens are verified without a code lookup
+            if token is not None:
+                check_in = StudentCheckIn.check_in_student_with_token(activity, request.user, token)
+            else:
+                check_in = StudentCheckIn.check_in_student(activity, request.user, code)
             
             return Response(
                 {
@@ -852,6 +1115,38 @@ class StudentCheckInView(APIView):
             )
 
 
+class ActivityCheckInSyncView(APIView):
+    """API view for organizers to upload check-ins collected offline.
+
+    Organizer devices record check-ins while the venue has no connectivity
+    and send them in one batch later. Each record is accepted or rejected
+    individually.
+    """
+
+    permission_classes = [permissions.IsAuthenticated]
+
+    def post(self, request: Request, activity_id: int) -> Response:
+        """Record a batch of offline check-ins."""
+        activity = get_object_or_404(
+            Activity.objects.select_related('organizer_profile'),
+            pk=activity_id
+        )
+        if not _can_manage_activity(request.user, activity):
+            return Response(
+                {'detail': StatusMessages.PERMISSION_DENIED},
+                status=status.HTTP_403_FORBIDDEN
+            )
+
+        serializer = CheckInSyncSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        summary = StudentCheckIn.sync_offline_check_ins(
+            activity, serializer.validated_data['records']
+        )
+        return Response(summary, status=status.HTTP_200_OK)
+
+
 class ActivityCheckInListView(generics.ListAPIView):
     """API view for organizers to see all check-ins for their activity."""
     
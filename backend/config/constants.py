@@ -74,6 +74,32 @@ class DeletionRequestStatus:
         (REJECTED, 'Rejected'),
     ]
 
+# Background task statuses
+class TaskStatus:
+    QUEUED = 'queued'
+    RUNNING = 'running'
+    SUCCEEDED = 'succeeded'
+    DEAD = 'dead'
+
+    CHOICES = [
+        (QUEUED, 'Queued'),
+        (RUNNING, 'Running'),
+        (SUCCEEDED, 'Succeeded'),
+        (DEAD, 'Dead'),
+    ]
+
+# Background processing of uploaded images (resized variants)
+class ImageProcessingStatus:
+    PENDING = 'pending'
+    READY = 'ready'
+    FAILED = 'failed'
+
+    CHOICES = [
+        (PENDING, 'Pending'),
+        (READY, 'Ready'),
+        (FAILED, 'Failed'),
+    ]
+
 # Category configuration
 DEFAULT_ACTIVITY_CATEGORY_GROUPS = {
     'University Activities': [],
@@ -97,6 +123,7 @@ class ValidationLimits:
     MAX_USER_TITLE_LENGTH = 20
     MAX_STUDENT_ID_LENGTH = 50
     MAX_LOCATION_LENGTH = 255
+    MAX_POSTER_IMAGES = 4
 
 # HTTP Status messages
 class StatusMessages:
@@ -0,0 +1,117 @@
+"""
+Batched sending of templated notification emails.
+
+Notifications such as "your application was approved" go to many recipients
+at once. BulkEmail renders each template once per language and sends the
+messages over one connection per batch, instead of opening a new SMTP
+connection per recipient like send_mail does. It works with any email
+backend, so it can be tried against the locmem or file-based backends or a
+local debug SMTP server (see EMAIL_BACKEND in settings).
+
+Templates are looked up as ``emails/<name>_subject.txt`` and
+``emails/<name>.txt`` in the apps' template directories.
+
+Background tasks are retried as a whole, so callers that queue emails split
+them with split_batches and queue one task per batch: a failed batch is then
+retried without emailing the recipients of batches that were already sent.
+"""
+from typing import Iterable, Optional
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.template.loader import render_to_string
+from django.utils import translation
+
+
+def split_batches(messages: list, batch_size: Optional[int] = None) -> list:
+    """Split message specs into batches of at most ``batch_size`` recipients.
+
+    Args:
+        messages: List of dicts with ``template``, ``context`` and
+            ``recipients`` (see BulkEmail.add)
+        batch_size: Recipients per batch (defaults to EMAIL_BATCH_SIZE)
+
+    Returns:
+        List of batches, each a list of message dicts in the same format
+    """
+    batch_size = batch_size or getattr(settings, 'EMAIL_BATCH_SIZE', 50)
+    batches = []
+    batch, count = [], 0
+    for message in messages:
+        recipients = list(message['recipients'])
+        while recipients:
+            taken, recipients = recipients[:batch_size - count], recipients[batch_size - count:]
+            batch.append({**message, 'recipients': taken})
+            count += len(taken)
+            if count == batch_size:
+                batches.append(batch)
+                batch, count = [], 0
+    if batch:
+        batches.append(batch)
+    return batches
+
+
+class BulkEmail:
+    """Collects templated messages and sends them in batches.
+
+    Every recipient gets an individual message, so addresses are never
+    disclosed to other recipients.
+
+    Args:
+        batch_size: Messages sent per connection (defaults to EMAIL_BATCH_SIZE)
+        from_email: Sender address (defaults to DEFAULT_FROM_EMAIL)
+    """
+
+    def __init__(self, batch_size: Optional[int] = None, from_email: Optional[str] = None):
+        self.batch_size = batch_size or getattr(settings, 'EMAIL_BATCH_SIZE', 50)
+        self.from_email = from_email or settings.DEFAULT_FROM_EMAIL
+        self.messages = []
+
+    def add(self, template_name: str, context: dict, recipients: Iterable) -> None:
+        """Add one message per recipient, rendering the template once per language.
+
+        Args:
+            template_name: Template name without the ``emails/`` prefix and suffix
+            context: Template context shared by all recipients
+            recipients: Email addresses, or ``(email, language)`` pairs for
+                recipients who should not get LANGUAGE_CODE
+        """
+        rendered = {}
+        for recipient in recipients:
+            if isinstance(recipient, str):
+                email, language = recipient, settings.LANGUAGE_CODE
+            else:
+                email, language = recipient
+            if not email:
+                continue
+            if language not in rendered:
+                rendered[language] = self.render(template_name, context, language)
+            subject, body = rendered[language]
+            self.messages.append(EmailMessage(subject, body, self.from_email, [email]))
+
+    @staticmethod
+    def render(template_name: str, context: dict, language: str) -> tuple:
+        """Render a template's subject and body in the given language.
+
+        Returns:
+            Tuple of (subject, body)
+        """
+        with translation.override(language):
+            subject = render_to_string(f'emails/{template_name}_subject.txt', context)
+            body = render_to_string(f'emails/{template_name}.txt', context)
+        # Header values cannot contain newlines
+        return ' '.join(subject.split()), body
+
+    def send(self) -> int:
+        """Send the collected messages, one connection per batch.
+
+        Returns:
+            Number of messages sent
+        """
+        sent = 0
+        for start in range(0, len(self.messages), self.batch_size):
+            batch = self.messages[start:start + self.batch_size]
+            with get_connection(fail_silently=False) as connection:
+                sent += connection.send_messages(batch) or 0
+        self.messages = []
+        return sent
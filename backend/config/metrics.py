@@ -0,0 +1,77 @@
+"""
+Application-level Prometheus metrics.
+
+Metrics registered here are exported alongside the django-prometheus ones on
+the /metrics endpoint of the process that records them. Processes without
+that endpoint (the worker and the scheduler) serve them with
+start_metrics_server.
+"""
+import os
+
+from prometheus_client import REGISTRY, CollectorRegistry, Counter, Gauge, Histogram, multiprocess, start_http_server
+
+
+PARTICIPANT_COUNTER_DRIFTED_ACTIVITIES = Counter(
+    'ku_participant_counter_drifted_activities_total',
+    'Activities whose current_participants counter was found out of sync',
+)
+PARTICIPANT_COUNTER_DRIFT = Counter(
+    'ku_participant_counter_drift_total',
+    'Sum of absolute differences corrected in current_participants counters',
+)
+PARTICIPANT_COUNTER_LAST_RECONCILED = Gauge(
+    'ku_participant_counter_last_reconciled_timestamp_seconds',
+    'Unix time of the last completed participant counter reconciliation',
+)
+IDEMPOTENT_REPLAYS = Counter(
+    'ku_idempotent_replays_total',
+    'Requests answered from a stored response for a repeated Idempotency-Key',
+)
+THROTTLED_REQUESTS = Counter(
+    'ku_throttled_requests_total',
+    'Requests rejected by a sliding window throttle',
+    ['scope'],
+)
+TASKS_PROCESSED = Counter(
+    'ku_tasks_processed_total',
+    'Background task runs by outcome (succeeded, queued for retry, dead)',
+    ['name', 'outcome'],
+)
+SCHEDULER_LEADER = Gauge(
+    'ku_scheduler_leader',
+    '1 while this scheduler process holds the leader lock',
+)
+SCHEDULER_JOB_RUNS = Counter(
+    'ku_scheduler_job_runs_total',
+    'Periodic job runs by outcome (succeeded, failed, skipped)',
+    ['job', 'outcome'],
+)
+SCHEDULER_JOB_DURATION = Histogram(
+    'ku_scheduler_job_duration_seconds',
+    'Time taken by periodic job runs',
+    ['job'],
+    buckets=(0.1, 0.5, 1, 5, 15, 30, 60, 300, 900),
+)
+SCHEDULER_JOB_LAG = Gauge(
+    'ku_scheduler_job_lag_seconds',
+    'Delay between when a periodic job was due and when its last run started',
+    ['job'],
+)
+
+
+def start_metrics_server(port: int) -> None:
+    """Serve this process's metrics on ``port`` in a background thread.
+
+    When several processes record metrics for one endpoint, set
+    PROMETHEUS_MULTIPROC_DIR to a directory shared by all of them (and
+    emptied before they start); the endpoint then reports their combined
+    values.
+
+    Args:
+        port: TCP port to listen on
+    """
+    registry = REGISTRY
+    if os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    start_http_server(port, registry=registry)
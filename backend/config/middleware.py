@@ -0,0 +1,272 @@
+"""
+Shared middleware for the application.
+"""
+import hashlib
+import time
+from typing import Any, Callable, Optional
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpRequest, HttpResponse, JsonResponse
+from django.utils.http import parse_header_parameters
+from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+
+from config import metrics
+from users.authentication import ClaimsJWTAuthentication
+
+IDEMPOTENCY_HEADER = 'Idempotency-Key'
+IDEMPOTENCY_REPLAYED_HEADER = 'Idempotent-Replayed'
+IDEMPOTENCY_KEY_MAX_LENGTH = 255
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS', 'TRACE')
+# Client errors that may not happen again on retry, so they are never replayed
+TRANSIENT_CLIENT_ERRORS = frozenset({401, 403, 408, 409, 429})
+BODY_CHUNK_SIZE = 64 * 1024
+# Response headers that belong to one connection or are recomputed on replay.
+# Cookies are not headers in Django (response.cookies) and are never stored.
+UNSTORED_RESPONSE_HEADERS = frozenset({
+    'connection', 'keep-alive', 'proxy-authenticate', 'proxy-authorization', 'te',
+    'trailer', 'transfer-encoding', 'upgrade', 'content-length', 'date',
+    IDEMPOTENCY_REPLAYED_HEADER.lower(),
+})
+
+
+class FingerprintStream:
+    """Request body stream that hashes everything read through it.
+
+    Multipart boundaries are left out of the hash, since many clients pick a
+    new one each time they send the same form.
+
+    Args:
+        stream: The request's underlying stream
+        boundary: Multipart boundary, or empty for other bodies
+    """
+
+    def __init__(self, stream, boundary: bytes = b''):
+        self.stream = stream
+        self.boundary = boundary
+        self.bytes_read = 0
+        self._digest = hashlib.sha256()
+        # Tail of the data read so far that may be the start of a boundary
+        self._pending = b''
+
+    def _update(self, data: bytes) -> None:
+        self.bytes_read += len(data)
+        if not self.boundary:
+            self._digest.update(data)
+            return
+        buffer = self._pending + data
+        # A boundary starting at or after cut may continue in the next chunk
+        cut = max(len(buffer) - len(self.boundary) + 1, 0)
+        position = 0
+        while True:
+            index = buffer.find(self.boundary, position)
+            if index == -1 or index >= cut:
+                break
+            self._digest.update(buffer[position:index])
+            position = index + len(self.boundary)
+        end = max(position, cut)
+        self._digest.update(buffer[position:end])
+        self._pending = buffer[end:]
+
+    def read(self, *args) -> bytes:
+        data = self.stream.read(*args)
+        self._update(data)
+        return data
+
+    def readline(self, *args) -> bytes:
+        data = self.stream.readline(*args)
+        self._update(data)
+        return data
+
+    def drain(self) -> None:
+        """Read and hash the rest of the body."""
+        while self.read(BODY_CHUNK_SIZE):
+            pass
+
+    def hexdigest(self) -> str:
+        """Return the hash of the body read so far."""
+        digest = self._digest.copy()
+        digest.update(self._pending.replace(self.boundary, b'') if self.boundary else self._pending)
+        return digest.hexdigest()
+
+
+class IdempotencyKeyMiddleware:
+    """Replay the first response to requests retried with the same Idempotency-Key.
+
+    Only unsafe requests to the URL names listed in IDEMPOTENCY_ROUTES are
+    handled, and only for clients sending a valid JWT: keys are scoped per
+    (user, key, method, path), so two users can never see each other's
+    responses. The first request takes an in-flight lock in the shared cache;
+    concurrent duplicates wait for its response instead of re-running the view.
+
+    Successful responses and client errors that would happen again are stored
+    for IDEMPOTENCY_KEY_TTL seconds with a hash of the request body. Server
+    errors and TRANSIENT_CLIENT_ERRORS (throttled, in flight, not authorized
+    yet, ...) are not stored, so that the client can retry them. Reusing a
+    key with a different body is rejected with 422 instead of replaying the
+    response to the other body.
+    """
+
+    def __init__(self, get_response: Callable[[HttpRequest], HttpResponse]):
+        self.get_response = get_response
+        self.routes = frozenset(getattr(settings, 'IDEMPOTENCY_ROUTES', ()))
+        self.ttl = getattr(settings, 'IDEMPOTENCY_KEY_TTL', 3600)
+        self.lock_timeout = getattr(settings, 'IDEMPOTENCY_LOCK_TIMEOUT', 30)
+        self.wait_timeout = getattr(settings, 'IDEMPOTENCY_WAIT_TIMEOUT', 10)
+        self.poll_interval = getattr(settings, 'IDEMPOTENCY_POLL_INTERVAL', 0.05)
+        self.jwt_authentication = ClaimsJWTAuthentication()
+
+    def __call__(self, request: HttpRequest) -> HttpResponse:
+        response = self.get_response(request)
+
+        state = getattr(request, '_idempotency', None)
+        if state is not None:
+            response_key, lock_key, body = state
+            try:
+                if self._is_replayable(response) and self._finish_reading(request, body):
+                    cache.set(response_key, self._serialize(response, body.hexdigest()), self.ttl)
+            finally:
+                cache.delete(lock_key)
+
+        return response
+
+    def process_view(
+        self,
+        request: HttpRequest,
+        view_func: Callable[..., HttpResponse],
+        view_args: tuple,
+        view_kwargs: dict[str, Any],
+    ) -> Optional[HttpResponse]:
+        """Replay a stored response or take the in-flight lock for this key."""
+        if request.method in SAFE_METHODS:
+            return None
+
+        key = request.headers.get(IDEMPOTENCY_HEADER)
+        if key is None or request.resolver_match.url_name not in self.routes:
+            return None
+
+        if not key or len(key) > IDEMPOTENCY_KEY_MAX_LENGTH:
+            return JsonResponse(
+                {'detail': f'{IDEMPOTENCY_HEADER} must be between 1 and {IDEMPOTENCY_KEY_MAX_LENGTH} characters.'},
+                status=400
+            )
+
+        user_id = self._get_user_id(request)
+        if user_id is None:
+            # Let the view reject unauthenticated requests as usual
+            return None
+
+        response_key, lock_key = self._cache_keys(user_id, key, request)
+        body = FingerprintStream(request._stream, self._multipart_boundary(request))
+        request._stream = body
+        deadline = time.monotonic() + self.wait_timeout
+
+        while True:
+            stored = cache.get(response_key)
+            if stored is not None:
+                body.drain()
+                if stored.get('fingerprint') not in (None, body.hexdigest()):
+                    return JsonResponse(
+                        {'detail': f'This {IDEMPOTENCY_HEADER} was already used with a different request body.'},
+                        status=422
+                    )
+                metrics.IDEMPOTENT_REPLAYS.inc()
+                return self._replay(stored)
+
+            if cache.add(lock_key, True, self.lock_timeout):
+                request._idempotency = (response_key, lock_key, body)
+                return None
+
+            if time.monotonic() >= deadline:
+                response = JsonResponse(
+                    {'detail': f'A request with this {IDEMPOTENCY_HEADER} is still being processed.'},
+                    status=409
+                )
+                response['Retry-After'] = '1'
+                return response
+
+            time.sleep(self.poll_interval)
+
+    def _get_user_id(self, request: HttpRequest) -> Optional[str]:
+        """Read the user id claim from the bearer token without a database query."""
+        header = self.jwt_authentication.get_header(request)
+        if header is None:
+            return None
+
+        raw_token = self.jwt_authentication.get_raw_token(header)
+        if raw_token is None:
+            return None
+
+        try:
+            validated_token = self.jwt_authentication.get_validated_token(raw_token)
+        except (InvalidToken, TokenError):
+            return None
+
+        user_id = validated_token.get(jwt_settings.USER_ID_CLAIM)
+        return None if user_id is None else str(user_id)
+
+    @staticmethod
+    def _is_replayable(response: HttpResponse) -> bool:
+        """Return True for responses that a retry of the same request would get again."""
+        if response.streaming:
+            return False
+        code = response.status_code
+        return 200 <= code < 300 or (400 <= code < 500 and code not in TRANSIENT_CLIENT_ERRORS)
+
+    @staticmethod
+    def _finish_reading(request: HttpRequest, body: FingerprintStream) -> bool:
+        """Hash the part of the body the view did not read.
+
+        Returns:
+            False if the unread part is larger than DATA_UPLOAD_MAX_MEMORY_SIZE;
+            the response is then not stored rather than reading it all
+        """
+        remaining = int(request.META.get('CONTENT_LENGTH') or 0) - body.bytes_read
+        limit = settings.DATA_UPLOAD_MAX_MEMORY_SIZE
+        if limit is not None and remaining > limit:
+            return False
+        body.drain()
+        return True
+
+    @staticmethod
+    def _multipart_boundary(request: HttpRequest) -> bytes:
+        content_type, params = parse_header_parameters(request.META.get('CONTENT_TYPE', ''))
+        if content_type != 'multipart/form-data':
+            return b''
+        return params.get('boundary', '').encode()
+
+    @staticmethod
+    def _cache_keys(user_id: str, key: str, request: HttpRequest) -> tuple[str, str]:
+        """Build the (response, lock) cache keys for a user, key and route."""
+        scope = '\n'.join((user_id, key, request.method, request.path))
+        digest = hashlib.sha256(scope.encode()).hexdigest()
+        return f'idempotency:response:{digest}', f'idempotency:lock:{digest}'
+
+    @staticmethod
+    def _serialize(response: HttpResponse, fingerprint: str) -> dict[str, Any]:
+        """Keep the parts of a response needed to replay it, and the request body hash."""
+        return {
+            'status': response.status_code,
+            'content': response.content,
+            'content_type': response.get('Content-Type'),
+            'headers': [
+                (name, value) for name, value in response.items()
+                if name.lower() not in UNSTORED_RESPONSE_HEADERS
+            ],
+            'fingerprint': fingerprint,
+        }
+
+    @staticmethod
+    def _replay(stored: dict[str, Any]) -> HttpResponse:
+        """Rebuild a stored response and mark it as replayed."""
+        response = HttpResponse(
+            stored['content'],
+            status=stored['status'],
+            content_type=stored['content_type']
+        )
+        # Location, Retry-After, Cache-Control, ... as sent the first time
+        for name, value in stored.get('headers', ()):
+            response[name] = value
+        response[IDEMPOTENCY_REPLAYED_HEADER] = 'true'
+        return response
@@ -1,3 +1,9 @@
+from typing import Optional
+
+from django.core.paginator import Paginator
+from django.db import connections
+from django.db.models import QuerySet
+from django.utils.functional import cached_property
 from rest_framework.pagination import PageNumberPagination
 from rest_framework.response import Response
 
@@ -11,3 +17,50 @@ class NoPrevNextPagination(PageNumberPagination):
             'count': self.page.paginator.count,
             'results': data,
         })
+
+
+def estimated_row_count(model, using: str) -> Optional[int]:
+    """
+    Return the planner's estimate of a table's row count.
+
+    Args:
+        model: Model whose table to look up
+        using: Database alias
+
+    Returns:
+        Estimated number of rows, or None when no estimate is available
+        (not PostgreSQL, or the table has not been analyzed yet)
+    """
+    connection = connections[using]
+    if connection.vendor != 'postgresql':
+        return None
+    with connection.cursor() as cursor:
+        cursor.execute(
+            'SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass',
+            [model._meta.db_table]
+        )
+        row = cursor.fetchone()
+    if row is None or row[0] < 0:
+        return None
+    return row[0]
+
+
+class EstimatedCountPaginator(Paginator):
+    """Paginator for admin changelists of large tables.
+
+    An exact COUNT(*) reads the whole table. Unfiltered changelists of tables
+    with more than ``estimate_threshold`` rows use the planner's estimate
+    instead, so the page count there is approximate. Filtered and searched
+    changelists are counted exactly.
+    """
+
+    estimate_threshold = 100_000
+
+    @cached_property
+    def count(self) -> int:
+        queryset = self.object_list
+        if isinstance(queryset, QuerySet) and not queryset.query.where:
+            estimate = estimated_row_count(queryset.model, queryset.db)
+            if estimate is not None and estimate > self.estimate_threshold:
+                return estimate
+        return super().count
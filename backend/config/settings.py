@@ -15,6 +15,7 @@ import logging
 from datetime import timedelta
 from pathlib import Path
 
+from corsheaders.defaults import default_headers
 from dotenv import load_dotenv
 
 from .constants import DEFAULT_ACTIVITY_CATEGORY_GROUPS
@@ -60,14 +61,30 @@ INSTALLED_APPS = [
     'config',
     'social_django',
     'activities',
+    'tasks',
 ]
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'users.authentication.ClaimsJWTAuthentication',
     ),
     'DEFAULT_PAGINATION_CLASS': 'config.pagination.NoPrevNextPagination',  # use custom paginator (count + results only)
     'PAGE_SIZE': 20,
+    # Number of reverse proxies in front of the backend. DRF takes the client IP
+    # from the X-Forwarded-For entry added by the outermost of them; with 0 it
+    # uses REMOTE_ADDR, so a client cannot pick its own throttling identity
+    'NUM_PROXIES': int(os.getenv('NUM_PROXIES', '0')),
+    # Sliding window rates for config.throttling ("<requests>/<period>"); an
+    # empty value disables a scope
+    'DEFAULT_THROTTLE_RATES': {
+        'login_ip': os.getenv('THROTTLE_LOGIN_IP', '60/min') or None,  # campus NAT shares IPs
+        'login_email': os.getenv('THROTTLE_LOGIN_EMAIL', '10/min') or None,
+        'checkin_user': os.getenv('THROTTLE_CHECKIN_USER', '10/min') or None,
+        # Shared by everyone checking in to one activity: size it to the largest
+        # event's rush at the door, e.g. 3000 students within 5 minutes needs
+        # at least 600/min, plus headroom for retries of wrong codes
+        'checkin_activity': os.getenv('THROTTLE_CHECKIN_ACTIVITY', '1200/min') or None,
+    },
 }
 
 # JWT Settings
@@ -85,7 +102,12 @@ SIMPLE_JWT = {
     'USER_ID_CLAIM': 'user_id',
     'AUTH_TOKEN_CLASSES': ('rest_framework_simplejwt.tokens.AccessToken',),
     'TOKEN_TYPE_CLAIM': 'token_type',
+    # Access tokens carry role and profile claims (users.authentication)
+    'TOKEN_OBTAIN_SERIALIZER': 'users.serializers.ClaimsTokenObtainPairSerializer',
+    'TOKEN_REFRESH_SERIALIZER': 'users.serializers.ClaimsTokenRefreshSerializer',
 }
+# How long the user rows behind access tokens are cached, in seconds
+AUTH_USER_CACHE_TIMEOUT = int(os.getenv('AUTH_USER_CACHE_TIMEOUT', '300'))
 
 # Authentication backends
 AUTHENTICATION_BACKENDS = (
@@ -136,6 +158,7 @@ MIDDLEWARE = [
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
     'social_django.middleware.SocialAuthExceptionMiddleware',
+    'config.middleware.IdempotencyKeyMiddleware',
     'django_prometheus.middleware.PrometheusAfterMiddleware',
 ]
 
@@ -179,12 +202,26 @@ DATABASES = {
 }
 
 # Cache configuration (for password reset tokens)
-CACHES = {
-    'default': {
-        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
-        'LOCATION': 'unique-snowflake',
+# The cache must be shared by every process (web, worker, scheduler): it
+# holds the markers that invalidate access token claims, refresh token
+# revocations, throttle counters and Idempotency-Key responses. The local
+# memory fallback is only suitable for tests and a single development process
+# (`manage.py check --deploy` reports it, see users.checks).
+REDIS_URL = os.getenv('REDIS_URL')
+if REDIS_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': REDIS_URL,
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'unique-snowflake',
+        }
     }
-}
 
 
 # Password validation
@@ -221,6 +258,26 @@ STATIC_URL = 'static/'
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
+# Media is served by activities.media.serve_media. Set the backend to hand the
+# transfer to the front proxy: 'nginx' (X-Accel-Redirect to MEDIA_ACCEL_PREFIX,
+# an internal location aliased to MEDIA_ROOT) or 'sendfile' (X-Sendfile).
+# Empty means Django returns the file itself.
+MEDIA_ACCEL_BACKEND = os.getenv('MEDIA_ACCEL_BACKEND', '')
+MEDIA_ACCEL_PREFIX = os.getenv('MEDIA_ACCEL_PREFIX', '/protected-media/')
+
+# Uploads are stored once per distinct content (activities.storage)
+STORAGES = {
+    'default': {'BACKEND': 'activities.storage.ContentAddressedStorage'},
+    'staticfiles': {'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage'},
+}
+
+# Image uploads (config.uploads). Files are spooled to disk while they are
+# received and rejected once they go over the size limit; decoding happens
+# in the background worker.
+IMAGE_UPLOAD_MAX_SIZE = int(os.getenv('IMAGE_UPLOAD_MAX_SIZE', str(10 * 1024 * 1024)))
+IMAGE_UPLOAD_MAX_PIXELS = int(os.getenv('IMAGE_UPLOAD_MAX_PIXELS', str(40_000_000)))
+IMAGE_UPLOAD_FORMATS = ['JPEG', 'PNG', 'WEBP']
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
@@ -237,6 +294,25 @@ CORS_ALLOWED_ORIGINS = [
 ]
 
 CORS_ALLOW_CREDENTIALS = True
+CORS_ALLOW_HEADERS = (*default_headers, 'idempotency-key')
+CORS_EXPOSE_HEADERS = ['Idempotent-Replayed']
+
+# Idempotency-Key handling (config.middleware.IdempotencyKeyMiddleware)
+# Unsafe requests to these URL names replay the first response for a key
+IDEMPOTENCY_ROUTES = (
+    'application-create',
+    'application-review',
+    'application-bulk-review',
+    'activity-moderation-bulk-review',
+    'student-checkin',
+    'activity-checkin-sync',
+    'activity-poster-images',
+    'activity-poster-images-batch',
+    'activity-poster-image-detail',
+)
+IDEMPOTENCY_KEY_TTL = 60 * 60  # how long a stored response is replayed, in seconds
+IDEMPOTENCY_LOCK_TIMEOUT = 30  # upper bound for a request to hold the in-flight lock
+IDEMPOTENCY_WAIT_TIMEOUT = 10  # how long a concurrent duplicate waits before a 409
 
 # Email Settings
 EMAIL_BACKEND = os.getenv('EMAIL_BACKEND', 'django.core.mail.backends.console.EmailBackend')
@@ -246,9 +322,33 @@ EMAIL_USE_TLS = os.getenv('EMAIL_USE_TLS', 'True') == 'True'
 EMAIL_HOST_USER = os.getenv('EMAIL_HOST_USER', '')
 EMAIL_HOST_PASSWORD = os.getenv('EMAIL_HOST_PASSWORD', '')
 DEFAULT_FROM_EMAIL = os.getenv('DEFAULT_FROM_EMAIL', 'noreply@ku-volunteer.com')
+# Used by django.core.mail.backends.filebased.EmailBackend
+EMAIL_FILE_PATH = os.getenv('EMAIL_FILE_PATH', os.path.join(BASE_DIR, 'sent_emails'))
+# Notification emails sent per SMTP connection (config.emails.BulkEmail)
+EMAIL_BATCH_SIZE = int(os.getenv('EMAIL_BATCH_SIZE', '50'))
+
+# Check-in QR tokens rotate every N seconds; the previous token stays valid
+# for one more period to cover scans made as the organizer screen rotates
+CHECKIN_QR_ROTATION_SECONDS = int(os.getenv('CHECKIN_QR_ROTATION_SECONDS', '30'))
+
+# Background tasks (tasks app, processed by `python manage.py run_worker`)
+TASKS_MAX_ATTEMPTS = 5  # attempts before a task is marked dead
+TASKS_RETRY_BASE_SECONDS = 10  # first retry delay, doubled on every attempt
+TASKS_RETRY_MAX_SECONDS = 60 * 60  # upper bound for the retry delay
+
+# Periodic jobs (run by `python manage.py run_scheduler`). Override a job's
+# interval in seconds by name, or set it to 0 to disable the job, e.g.
+# {'activities.tasks.mark_absent_students': 30 * 60}
+SCHEDULER_INTERVALS = {}
+
+# List views refresh activity statuses on every request. Turn this off when
+# run_scheduler is deployed, it updates statuses every minute instead.
+ACTIVITY_STATUS_REFRESH_ON_REQUEST = os.getenv('ACTIVITY_STATUS_REFRESH_ON_REQUEST', 'True') == 'True'
 
 # Password reset settings
 PASSWORD_RESET_TIMEOUT = 3600  # 1 hour in seconds
+# How long the signed OAuth details stay valid for completing registration
+OAUTH_REGISTRATION_TIMEOUT = 30 * 60
 
 # Sentry Configuration
 import sentry_sdk
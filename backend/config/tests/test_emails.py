@@ -0,0 +1,118 @@
+"""
+Tests for batched notification emails.
+"""
+import os
+import tempfile
+from unittest import mock
+
+from django.core import mail
+from django.core.mail import get_connection
+from django.template.loader import render_to_string
+from django.test import TestCase, override_settings
+
+from config import emails
+from config.emails import BulkEmail, split_batches
+
+
+class BulkEmailTest(TestCase):
+    """Test cases for BulkEmail."""
+
+    def test_one_message_per_recipient(self):
+        """Test that every recipient gets their own message."""
+        email = BulkEmail()
+        email.add('activity_deleted', {'activity_title': 'Beach Cleanup'}, ['a@ku.th', 'b@ku.th'])
+
+        self.assertEqual(email.send(), 2)
+        self.assertEqual([message.to for message in mail.outbox], [['a@ku.th'], ['b@ku.th']])
+        self.assertEqual(mail.outbox[0].subject, 'Activity cancelled: Beach Cleanup - KU Volunteer')
+        self.assertIn('"Beach Cleanup"', mail.outbox[0].body)
+
+    def test_one_connection_per_batch(self):
+        """Test that messages are sent over one connection per batch."""
+        email = BulkEmail(batch_size=2)
+        email.add('activity_deleted', {'activity_title': 'Beach Cleanup'}, [f's{i}@ku.th' for i in range(5)])
+
+        with mock.patch.object(emails, 'get_connection', wraps=get_connection) as connect:
+            sent = email.send()
+
+        self.assertEqual(sent, 5)
+        self.assertEqual(connect.call_count, 3)
+        self.assertEqual(len(mail.outbox), 5)
+        self.assertEqual(email.messages, [])
+
+    def test_templates_rendered_once_per_language(self):
+        """Test that the subject and body are rendered once per language, not per recipient."""
+        recipients = ['a@ku.th', 'b@ku.th', ('c@ku.th', 'th'), ('d@ku.th', 'th')]
+
+        with mock.patch.object(emails, 'render_to_string', wraps=render_to_string) as render:
+            BulkEmail().add('activity_deleted', {'activity_title': 'Beach Cleanup'}, recipients)
+
+        self.assertEqual(render.call_count, 4)
+
+    def test_text_templates_are_not_html_escaped(self):
+        """Test that titles with HTML characters are sent as written."""
+        email = BulkEmail()
+        email.add('activity_deleted', {'activity_title': 'Rock & Roll <Cleanup>'}, ['a@ku.th'])
+        email.send()
+
+        self.assertIn('Rock & Roll <Cleanup>', mail.outbox[0].subject)
+        self.assertIn('Rock & Roll <Cleanup>', mail.outbox[0].body)
+
+    def test_blank_recipients_are_skipped(self):
+        """Test that empty addresses do not produce messages."""
+        email = BulkEmail()
+        email.add('activity_deleted', {'activity_title': 'Beach Cleanup'}, ['', 'a@ku.th'])
+
+        self.assertEqual(len(email.messages), 1)
+
+    def test_file_based_backend(self):
+        """Test that messages can be inspected with the file-based backend."""
+        with tempfile.TemporaryDirectory() as directory:
+            with override_settings(
+                EMAIL_BACKEND='django.core.mail.backends.filebased.EmailBackend',
+                EMAIL_FILE_PATH=directory
+            ):
+                email = BulkEmail(batch_size=2)
+                email.add('activity_deleted', {'activity_title': 'Beach Cleanup'}, ['a@ku.th', 'b@ku.th', 'c@ku.th'])
+                email.send()
+
+            files = os.listdir(directory)
+            content = ''.join(open(os.path.join(directory, name)).read() for name in files)
+
+        # The file backend writes one file per connection
+        self.assertEqual(len(files), 2)
+        self.assertEqual(content.count('Subject: Activity cancelled: Beach Cleanup'), 3)
+
+
+class SplitBatchesTest(TestCase):
+    """Test cases for split_batches."""
+
+    def test_batches_are_filled_across_messages(self):
+        """Test that batches hold batch_size recipients, splitting messages where needed."""
+        messages = [
+            {'template': 'activity_approved', 'context': {'n': 1}, 'recipients': ['a@ku.th', 'b@ku.th', 'c@ku.th']},
+            {'template': 'activity_rejected', 'context': {'n': 2}, 'recipients': ['d@ku.th', 'e@ku.th']},
+        ]
+
+        batches = split_batches(messages, batch_size=2)
+
+        self.assertEqual(
+            [[(message['template'], message['recipients']) for message in batch] for batch in batches],
+            [
+                [('activity_approved', ['a@ku.th', 'b@ku.th'])],
+                [('activity_approved', ['c@ku.th']), ('activity_rejected', ['d@ku.th'])],
+                [('activity_rejected', ['e@ku.th'])],
+            ]
+        )
+        self.assertEqual(batches[1][1]['context'], {'n': 2})
+
+    @override_settings(EMAIL_BATCH_SIZE=3)
+    def test_default_batch_size(self):
+        """Test that EMAIL_BATCH_SIZE is used when no size is given."""
+        messages = [{'template': 'activity_deleted', 'context': {}, 'recipients': ['a', 'b', 'c', 'd']}]
+
+        self.assertEqual([len(batch[0]['recipients']) for batch in split_batches(messages)], [3, 1])
+
+    def test_no_recipients_no_batches(self):
+        """Test that messages without recipients produce no batches."""
+        self.assertEqual(split_batches([{'template': 'activity_deleted', 'context': {}, 'recipients': []}]), [])
@@ -0,0 +1,279 @@
+"""
+Tests for shared middleware.
+"""
+import io
+import threading
+from datetime import timedelta
+
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.test import RequestFactory, TestCase, override_settings
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from activities.models import Activity, Application
+from config.constants import ActivityStatus, UserRoles
+from config.middleware import FingerprintStream, IdempotencyKeyMiddleware
+from users.models import OrganizerProfile, User
+
+CREATE_URL = '/api/activities/applications/create/'
+
+
+class IdempotencyKeyMiddlewareTest(TestCase):
+    """Test cases for IdempotencyKeyMiddleware."""
+
+    def setUp(self):
+        cache.clear()
+        self.organizer = User.objects.create_user(
+            email='organizer@example.com',
+            password='testpass123',
+            role=UserRoles.ORGANIZER
+        )
+        organizer_profile = OrganizerProfile.objects.create(
+            user=self.organizer,
+            organization_name='Test Organization',
+            organization_type='nonprofit'
+        )
+        self.student = User.objects.create_user(
+            email='student@ku.th',
+            password='testpass123',
+            role=UserRoles.STUDENT
+        )
+        self.other_student = User.objects.create_user(
+            email='other@ku.th',
+            password='testpass123',
+            role=UserRoles.STUDENT
+        )
+        now = timezone.now()
+        self.activity = Activity.objects.create(
+            organizer_profile=organizer_profile,
+            title='Test Activity',
+            description='Test description',
+            location='Bangkok',
+            start_at=now + timedelta(days=10),
+            end_at=now + timedelta(days=10, hours=5),
+            max_participants=50,
+            categories=['University Activities'],
+            status=ActivityStatus.OPEN
+        )
+
+    def tearDown(self):
+        cache.clear()
+
+    def _client_for(self, user):
+        client = APIClient()
+        access = RefreshToken.for_user(user).access_token
+        client.credentials(HTTP_AUTHORIZATION=f'Bearer {access}')
+        return client
+
+    def _apply(self, client, key=None):
+        headers = {'Idempotency-Key': key} if key is not None else {}
+        return client.post(CREATE_URL, {'activity': self.activity.id}, format='json', headers=headers)
+
+    def test_retry_replays_first_response(self):
+        """Test that a retried request gets the first response without re-running the view."""
+        client = self._client_for(self.student)
+        first = self._apply(client, key='retry-1')
+        self.assertEqual(first.status_code, status.HTTP_201_CREATED)
+        self.assertNotIn('Idempotent-Replayed', first)
+
+        with self.assertNumQueries(0):
+            second = self._apply(client, key='retry-1')
+
+        self.assertEqual(second.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(second.content, first.content)
+        self.assertEqual(second['Idempotent-Replayed'], 'true')
+        self.assertEqual(Application.objects.filter(student=self.student).count(), 1)
+
+    def test_key_reused_with_different_body_is_rejected(self):
+        """Test that a key cannot replay the response to another request body."""
+        client = self._client_for(self.student)
+        self._apply(client, key='retry-1')
+
+        response = client.post(
+            CREATE_URL, {'activity': self.activity.id, 'note': 'changed'},
+            format='json', headers={'Idempotency-Key': 'retry-1'}
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_422_UNPROCESSABLE_ENTITY)
+        self.assertNotIn('Idempotent-Replayed', response)
+
+    def test_transient_errors_are_not_stored(self):
+        """Test that responses such as 403 or 429 can be retried with the same key."""
+        response = self._apply(self._client_for(self.organizer), key='not-yet')
+
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+        response_key, lock_key = self._cache_keys(self.organizer, 'not-yet')
+        self.assertIsNone(cache.get(response_key))
+        self.assertIsNone(cache.get(lock_key))
+
+    def test_only_repeatable_responses_are_replayable(self):
+        """Test which status codes are stored for replay."""
+        for code, replayable in ((200, True), (201, True), (302, False), (400, True), (404, True),
+                                 (401, False), (403, False), (408, False), (409, False),
+                                 (429, False), (500, False), (503, False)):
+            with self.subTest(code=code):
+                response = HttpResponse(status=code)
+                self.assertEqual(IdempotencyKeyMiddleware._is_replayable(response), replayable)
+
+    def test_replay_keeps_response_headers(self):
+        """Test that a replayed response carries the original headers but no cookies."""
+        original = HttpResponse(b'{"id": 1}', status=202, content_type='application/json')
+        original['Location'] = '/api/activities/applications/1/'
+        original['Retry-After'] = '30'
+        original['Cache-Control'] = 'no-store'
+        original['Connection'] = 'keep-alive'
+        original.set_cookie('sessionid', 'secret')
+
+        replayed = IdempotencyKeyMiddleware._replay(
+            IdempotencyKeyMiddleware._serialize(original, 'fingerprint')
+        )
+
+        self.assertEqual(replayed.status_code, 202)
+        self.assertEqual(replayed['Content-Type'], 'application/json')
+        self.assertEqual(replayed['Location'], '/api/activities/applications/1/')
+        self.assertEqual(replayed['Retry-After'], '30')
+        self.assertEqual(replayed['Cache-Control'], 'no-store')
+        self.assertEqual(replayed['Idempotent-Replayed'], 'true')
+        self.assertNotIn('Connection', replayed)
+        self.assertFalse(replayed.cookies)
+
+    def test_retry_without_key_runs_view_again(self):
+        """Test that requests without the header are not affected."""
+        client = self._client_for(self.student)
+        self._apply(client)
+        second = self._apply(client)
+
+        self.assertEqual(second.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertNotIn('Idempotent-Replayed', second)
+
+    def test_new_key_runs_view_again(self):
+        """Test that a different key is treated as a new request."""
+        client = self._client_for(self.student)
+        self._apply(client, key='retry-1')
+        second = self._apply(client, key='retry-2')
+
+        self.assertEqual(second.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_keys_are_scoped_per_user(self):
+        """Test that the same key from another user does not replay a response."""
+        self._apply(self._client_for(self.student), key='shared')
+        response = self._apply(self._client_for(self.other_student), key='shared')
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertNotIn('Idempotent-Replayed', response)
+        self.assertTrue(Application.objects.filter(student=self.other_student).exists())
+
+    def test_unauthenticated_request_is_not_stored(self):
+        """Test that requests without a valid token reach the view unchanged."""
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION='Bearer not-a-token')
+        response = self._apply(client, key='anon')
+
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertEqual(self._apply(self._client_for(self.student), key='anon').status_code,
+                         status.HTTP_201_CREATED)
+
+    def test_unlisted_route_is_ignored(self):
+        """Test that routes outside IDEMPOTENCY_ROUTES are not replayed."""
+        client = self._client_for(self.student)
+        application = Application.objects.create(activity=self.activity, student=self.student)
+        url = f'/api/activities/applications/{application.id}/cancel/'
+
+        client.post(url, headers={'Idempotency-Key': 'cancel-1'})
+        second = client.post(url, headers={'Idempotency-Key': 'cancel-1'})
+
+        self.assertNotIn('Idempotent-Replayed', second)
+
+    def test_oversized_key_is_rejected(self):
+        """Test that keys longer than 255 characters are rejected."""
+        response = self._apply(self._client_for(self.student), key='k' * 256)
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(Application.objects.exists())
+
+    @override_settings(IDEMPOTENCY_WAIT_TIMEOUT=0)
+    def test_in_flight_duplicate_gets_conflict(self):
+        """Test that a duplicate gives up with 409 while the first request holds the lock."""
+        _, lock_key = self._cache_keys(self.student, 'busy')
+        cache.add(lock_key, True)
+
+        response = self._apply(self._client_for(self.student), key='busy')
+
+        self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
+        self.assertEqual(response['Retry-After'], '1')
+        self.assertFalse(Application.objects.exists())
+
+    def test_in_flight_duplicate_waits_for_response(self):
+        """Test that a duplicate waits for the in-flight request and replays its response."""
+        response_key, lock_key = self._cache_keys(self.student, 'busy')
+        cache.add(lock_key, True)
+
+        def finish_first_request():
+            cache.set(response_key, {
+                'status': 201,
+                'content': b'{"id": 1}',
+                'content_type': 'application/json',
+            })
+            cache.delete(lock_key)
+
+        timer = threading.Timer(0.2, finish_first_request)
+        timer.start()
+        try:
+            response = self._apply(self._client_for(self.student), key='busy')
+        finally:
+            timer.join()
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.content, b'{"id": 1}')
+        self.assertEqual(response['Idempotent-Replayed'], 'true')
+        self.assertFalse(Application.objects.exists())
+
+    def test_lock_released_after_response(self):
+        """Test that the in-flight lock is released once the response is stored."""
+        self._apply(self._client_for(self.student), key='done')
+
+        response_key, lock_key = self._cache_keys(self.student, 'done')
+        self.assertIsNone(cache.get(lock_key))
+        self.assertEqual(cache.get(response_key)['status'], status.HTTP_201_CREATED)
+
+    def _cache_keys(self, user, key):
+        request = RequestFactory().post(CREATE_URL)
+        return IdempotencyKeyMiddleware._cache_keys(str(user.id), key, request)
+
+
+class FingerprintStreamTest(TestCase):
+    """Test cases for hashing request bodies."""
+
+    FORM = (
+        b'--{b}\r\nContent-Disposition: form-data; name="images"; filename="a.jpg"\r\n\r\n'
+        b'image-bytes\r\n--{b}--\r\n'
+    )
+
+    def _hash(self, body: bytes, boundary: bytes = b'', chunk_size: int = 3) -> str:
+        stream = FingerprintStream(io.BytesIO(body), boundary)
+        while stream.read(chunk_size):
+            pass
+        return stream.hexdigest()
+
+    def test_multipart_boundary_is_ignored(self):
+        """Test that the same form sent with another boundary has the same hash."""
+        first = self.FORM.replace(b'{b}', b'boundary-one')
+        second = self.FORM.replace(b'{b}', b'other-boundary-2')
+
+        self.assertEqual(
+            self._hash(first, b'boundary-one'),
+            self._hash(second, b'other-boundary-2', chunk_size=5)
+        )
+        self.assertNotEqual(
+            self._hash(first, b'boundary-one'),
+            self._hash(first.replace(b'image-bytes', b'other-bytes'), b'boundary-one')
+        )
+
+    def test_hash_does_not_depend_on_chunk_size(self):
+        """Test that the hash only depends on the bytes read."""
+        body = b'{"activity": 1}'
+
+        self.assertEqual(self._hash(body, chunk_size=1), self._hash(body, chunk_size=1024))
@@ -0,0 +1,45 @@
+from unittest.mock import patch
+
+from django.db import connection
+from django.test import TestCase
+
+from config.pagination import EstimatedCountPaginator, estimated_row_count
+from users.models import User
+
+
+class EstimatedCountPaginatorTest(TestCase):
+    """Test cases for the admin changelist paginator."""
+
+    def setUp(self):
+        for i in range(3):
+            User.objects.create_user(email=f'user{i}@example.com', password='testpass123')
+
+    def test_small_table_is_counted_exactly(self):
+        """Test that tables below the threshold use COUNT(*)."""
+        with patch('config.pagination.estimated_row_count', return_value=50):
+            paginator = EstimatedCountPaginator(User.objects.order_by('id'), 10)
+            self.assertEqual(paginator.count, 3)
+
+    def test_large_unfiltered_table_uses_estimate(self):
+        """Test that unfiltered querysets on large tables use the estimate."""
+        with patch('config.pagination.estimated_row_count', return_value=250_000):
+            paginator = EstimatedCountPaginator(User.objects.order_by('id'), 10)
+            self.assertEqual(paginator.count, 250_000)
+            self.assertEqual(paginator.num_pages, 25_000)
+
+    def test_filtered_queryset_is_counted_exactly(self):
+        """Test that filters are never estimated."""
+        queryset = User.objects.filter(email='user0@example.com').order_by('id')
+        with patch('config.pagination.estimated_row_count', return_value=250_000) as estimate:
+            paginator = EstimatedCountPaginator(queryset, 10)
+            self.assertEqual(paginator.count, 1)
+        estimate.assert_not_called()
+
+    def test_estimated_row_count(self):
+        """Test that the estimate is a row count or None."""
+        estimate = estimated_row_count(User, 'default')
+
+        if connection.vendor == 'postgresql':
+            self.assertTrue(estimate is None or estimate >= 0)
+        else:
+            self.assertIsNone(estimate)
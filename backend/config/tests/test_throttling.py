@@ -0,0 +1,281 @@
+"""
+Tests for the sliding window throttles.
+"""
+from datetime import timedelta
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from prometheus_client import REGISTRY
+from rest_framework import status
+from rest_framework.test import APIClient, APIRequestFactory
+
+from activities.models import Activity
+from config.constants import ActivityStatus, UserRoles
+from config.throttling import LoginIPThrottle, SlidingWindowThrottle
+from users.models import OrganizerProfile, User
+
+LOGIN_URL = '/api/users/login/'
+
+
+def throttle_rates(**rates):
+    """Override DEFAULT_THROTTLE_RATES, leaving the other DRF settings alone."""
+    from django.conf import settings
+    return override_settings(REST_FRAMEWORK={
+        **settings.REST_FRAMEWORK,
+        'DEFAULT_THROTTLE_RATES': rates,
+    })
+
+
+def throttled_count(scope):
+    return REGISTRY.get_sample_value('ku_throttled_requests_total', {'scope': scope}) or 0
+
+
+class SlidingWindowThrottleTest(TestCase):
+    """Test cases for the sliding window algorithm."""
+
+    def setUp(self):
+        cache.clear()
+        self.request = APIRequestFactory().post(LOGIN_URL, REMOTE_ADDR='10.0.0.1')
+
+    def tearDown(self):
+        cache.clear()
+
+    def _allow(self, now, request=None):
+        with mock.patch.object(SlidingWindowThrottle, 'timer', return_value=now):
+            throttle = LoginIPThrottle()
+            return throttle, throttle.allow_request(request or self.request, None)
+
+    @throttle_rates(login_ip='3/min')
+    def test_burst_up_to_limit_then_reject(self):
+        """Test that a burst of the configured size is allowed and then rejected."""
+        results = [self._allow(1000.0)[1] for _ in range(4)]
+
+        self.assertEqual(results, [True, True, True, False])
+
+    @throttle_rates(login_ip='3/min')
+    def test_wait_reports_time_to_next_request(self):
+        """Test that wait() returns the time until the window has room again."""
+        for _ in range(3):
+            self._allow(1000.0)
+        throttle, allowed = self._allow(1000.0)
+
+        self.assertFalse(allowed)
+        self.assertAlmostEqual(throttle.wait(), 40.0)
+
+    @throttle_rates(login_ip='3/min')
+    def test_previous_window_fades_out(self):
+        """Test that requests in the previous period count less as it slides away."""
+        for _ in range(3):
+            self._allow(1000.0)
+
+        self.assertFalse(self._allow(1039.0)[1])
+        self.assertTrue(self._allow(1041.0)[1])
+        throttle, allowed = self._allow(1041.0)
+        self.assertFalse(allowed)
+        self.assertAlmostEqual(throttle.wait(), 19.0)
+        self.assertTrue(self._allow(1060.0)[1])
+
+    @throttle_rates(login_ip='3/min')
+    def test_rejected_requests_are_not_counted(self):
+        """Test that retrying while throttled does not push the next slot back."""
+        for _ in range(3):
+            self._allow(1000.0)
+        for _ in range(10):
+            self.assertFalse(self._allow(1000.0)[1])
+
+        self.assertTrue(self._allow(1040.0)[1])
+
+    @throttle_rates(login_ip='3/min')
+    def test_idle_client_gets_only_one_burst(self):
+        """Test that idle periods do not accumulate more than the limit."""
+        self._allow(1000.0)
+        results = [self._allow(5000.0)[1] for _ in range(4)]
+
+        self.assertEqual(results, [True, True, True, False])
+
+    @throttle_rates(login_ip='3/min')
+    def test_counter_expiring_between_add_and_incr(self):
+        """Test that a counter evicted after add() found it is started again."""
+        self._allow(1000.0)
+
+        with mock.patch.object(cache, 'incr', side_effect=ValueError('Key not found')):
+            throttle, allowed = self._allow(1000.0)
+
+        self.assertTrue(allowed)
+        key = throttle.cache_format % {'scope': 'login_ip', 'ident': '10.0.0.1', 'window': 16}
+        self.assertEqual(cache.get(key), 1)
+
+    @throttle_rates(login_ip='1/min')
+    def test_counter_expiring_before_rejection_is_undone(self):
+        """Test that a rejection still succeeds when the counter is already gone."""
+        self._allow(1000.0)
+
+        with mock.patch.object(cache, 'decr', side_effect=ValueError('Key not found')):
+            self.assertFalse(self._allow(1000.0)[1])
+
+    @throttle_rates(login_ip='3/min')
+    def test_client_cannot_choose_its_address(self):
+        """Test that X-Forwarded-For is ignored when no proxies are configured."""
+        factory = APIRequestFactory()
+        results = [
+            self._allow(1000.0, factory.post(
+                LOGIN_URL, REMOTE_ADDR='10.0.0.1', HTTP_X_FORWARDED_FOR=f'192.0.2.{i}'
+            ))[1]
+            for i in range(4)
+        ]
+
+        self.assertEqual(results, [True, True, True, False])
+
+    def test_proxy_address_is_used_when_configured(self):
+        """Test that the address added by a trusted proxy is used."""
+        from django.conf import settings
+        factory = APIRequestFactory()
+        with override_settings(REST_FRAMEWORK={
+            **settings.REST_FRAMEWORK,
+            'NUM_PROXIES': 1,
+            'DEFAULT_THROTTLE_RATES': {'login_ip': '1/min'},
+        }):
+            results = [
+                self._allow(1000.0, factory.post(
+                    LOGIN_URL, REMOTE_ADDR='10.0.0.1', HTTP_X_FORWARDED_FOR=f'192.0.2.{i}'
+                ))[1]
+                for i in (1, 2, 1)
+            ]
+
+        self.assertEqual(results, [True, True, False])
+
+    @throttle_rates()
+    def test_unconfigured_scope_is_not_throttled(self):
+        """Test that a scope without a rate never rejects."""
+        self.assertTrue(all(self._allow(1000.0)[1] for _ in range(20)))
+
+
+class LoginThrottleTest(TestCase):
+    """Test cases for LoginView throttling."""
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        User.objects.create_user(
+            email='student@ku.th',
+            password='testpass123',
+            role=UserRoles.STUDENT
+        )
+
+    def tearDown(self):
+        cache.clear()
+
+    def _login(self, email='student@ku.th', password='wrongpass'):
+        return self.client.post(LOGIN_URL, {'email': email, 'password': password}, format='json')
+
+    @throttle_rates(login_ip='100/min', login_email='2/min')
+    def test_email_scope_rejects_without_database_work(self):
+        """Test that excess attempts for one email get 429 before authentication runs."""
+        self._login()
+        self._login()
+        before = throttled_count('login_email')
+
+        with self.assertNumQueries(0):
+            response = self._login(password='testpass123')
+
+        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertIn('Retry-After', response)
+        self.assertEqual(throttled_count('login_email'), before + 1)
+
+    @throttle_rates(login_ip='100/min', login_email='2/min')
+    def test_email_scope_ignores_case_and_whitespace(self):
+        """Test that email variants share one counter."""
+        self._login(email='student@ku.th')
+        self._login(email='STUDENT@ku.th')
+        response = self._login(email=' Student@KU.th ')
+
+        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+
+    @throttle_rates(login_ip='3/min', login_email='100/min')
+    def test_ip_scope_covers_all_emails(self):
+        """Test that one client IP is limited across different emails."""
+        for i in range(3):
+            self._login(email=f'user{i}@ku.th')
+        response = self._login(email='another@ku.th')
+
+        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+
+    @throttle_rates(login_ip='100/min', login_email='1/min')
+    def test_other_emails_are_not_affected(self):
+        """Test that throttling one email does not block another."""
+        self._login()
+        self.assertEqual(self._login().status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+
+        response = self._login(email='other@ku.th')
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+
+class CheckInThrottleTest(TestCase):
+    """Test cases for StudentCheckInView throttling."""
+
+    def setUp(self):
+        cache.clear()
+        organizer = User.objects.create_user(
+            email='organizer@example.com',
+            password='testpass123',
+            role=UserRoles.ORGANIZER
+        )
+        organizer_profile = OrganizerProfile.objects.create(
+            user=organizer,
+            organization_name='Test Organization',
+            organization_type='nonprofit'
+        )
+        now = timezone.now()
+        self.activity = Activity.objects.create(
+            organizer_profile=organizer_profile,
+            title='Running Activity',
+            description='Test description',
+            location='Bangkok',
+            start_at=now - timedelta(hours=1),
+            end_at=now + timedelta(hours=2),
+            max_participants=50,
+            categories=['University Activities'],
+            status=ActivityStatus.DURING
+        )
+        self.students = [
+            User.objects.create_user(
+                email=f'student{i}@ku.th',
+                password='testpass123',
+                role=UserRoles.STUDENT
+            )
+            for i in range(3)
+        ]
+        self.url = f'/api/activities/{self.activity.id}/checkin/'
+
+    def tearDown(self):
+        cache.clear()
+
+    def _check_in(self, student):
+        client = APIClient()
+        client.force_authenticate(user=student)
+        return client.post(self.url, {'code': 'ZZZZZZ'}, format='json')
+
+    @throttle_rates(checkin_user='2/min', checkin_activity='100/min')
+    def test_user_scope_limits_code_guesses(self):
+        """Test that a student cannot keep guessing codes."""
+        self.assertEqual(self._check_in(self.students[0]).status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self._check_in(self.students[0]).status_code, status.HTTP_400_BAD_REQUEST)
+
+        with self.assertNumQueries(0):
+            response = self._check_in(self.students[0])
+
+        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertEqual(self._check_in(self.students[1]).status_code, status.HTTP_400_BAD_REQUEST)
+
+    @throttle_rates(checkin_user='100/min', checkin_activity='2/min')
+    def test_activity_scope_sheds_load_across_users(self):
+        """Test that one activity's limit is shared by all students."""
+        before = throttled_count('checkin_activity')
+        self._check_in(self.students[0])
+        self._check_in(self.students[1])
+        response = self._check_in(self.students[2])
+
+        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertEqual(throttled_count('checkin_activity'), before + 1)
@@ -7,7 +7,8 @@ from config.utils import (
     validate_activity_categories,
     is_user_role,
     is_admin_user,
-    get_client_url
+    get_client_url,
+    seconds_until_local_midnight
 )
 from users.models import User
 
@@ -156,3 +157,14 @@ class PermissionsTest(TestCase):
         self.assertIsNotNone(IsOrganizer())
         self.assertIsNotNone(IsAdmin())
         self.assertIsNotNone(IsOrganizerOrAdmin())
+
+    def test_seconds_until_local_midnight(self):
+        """Test seconds_until_local_midnight ends at the next local midnight."""
+        from django.utils import timezone
+
+        seconds = seconds_until_local_midnight()
+        self.assertGreaterEqual(seconds, 1)
+        self.assertLessEqual(seconds, 24 * 60 * 60)
+
+        expires_at = timezone.localtime() + timezone.timedelta(seconds=seconds + 1)
+        self.assertEqual(expires_at.date(), timezone.localtime().date() + timezone.timedelta(days=1))
@@ -0,0 +1,169 @@
+"""
+Shared throttle classes for the application.
+
+The throttles count requests in a sliding window kept in the shared cache.
+Each scope's rate is read from REST_FRAMEWORK['DEFAULT_THROTTLE_RATES'] using
+DRF's "<requests>/<period>" format: a request is allowed while the requests
+counted in the current period, plus the previous period's count weighted by
+how much of it still falls within the last <period>, stay within <requests>.
+Bursts up to <requests> are allowed and the sustained rate stays bounded. A
+scope without a configured rate (or set to None) is not throttled.
+
+Counters are only changed with the cache's atomic add/incr/decr, so
+concurrent requests in any process cannot lose updates, and the limit holds
+across all processes as long as the cache is shared (see CACHES). Rejected
+requests are not counted. Every check is at most four cache operations and
+no database work.
+"""
+import hashlib
+import time
+from typing import Optional
+
+from django.core.cache import cache as default_cache
+from django.core.exceptions import ImproperlyConfigured
+from rest_framework.request import Request
+from rest_framework.settings import api_settings
+from rest_framework.throttling import BaseThrottle
+from rest_framework.views import APIView
+
+from config import metrics
+
+
+class SlidingWindowThrottle(BaseThrottle):
+    """Base class for cache-backed sliding window throttles.
+
+    Subclasses set ``scope`` and implement ``get_ident_for_scope``.
+    """
+
+    scope: Optional[str] = None
+    cache = default_cache
+    timer = time.time
+    cache_format = 'throttle:window:%(scope)s:%(ident)s:%(window)d'
+
+    def __init__(self):
+        if not self.scope:
+            raise ImproperlyConfigured(f'{self.__class__.__name__} must define a scope.')
+        self._wait: Optional[float] = None
+
+    def get_rate(self) -> Optional[str]:
+        """Return the configured rate for this scope, read at request time."""
+        return api_settings.DEFAULT_THROTTLE_RATES.get(self.scope)
+
+    @staticmethod
+    def parse_rate(rate: str) -> tuple[int, int]:
+        """Parse a DRF rate string.
+
+        Args:
+            rate: Rate such as "10/min" or "600/hour".
+
+        Returns:
+            Tuple of (requests allowed, period in seconds).
+        """
+        num, period = rate.split('/')
+        duration = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}[period[0]]
+        return int(num), duration
+
+    def get_ident_for_scope(self, request: Request, view: APIView) -> Optional[str]:
+        """Return what the requests are counted by, or None to skip throttling."""
+        raise NotImplementedError('.get_ident_for_scope() must be overridden')
+
+    def allow_request(self, request: Request, view: APIView) -> bool:
+        """Count the request, rejecting it when the window is full."""
+        rate = self.get_rate()
+        if rate is None:
+            return True
+
+        ident = self.get_ident_for_scope(request, view)
+        if ident is None:
+            return True
+
+        limit, duration = self.parse_rate(rate)
+        window, offset = divmod(self.timer(), duration)
+        key_args = {'scope': self.scope, 'ident': ident}
+        current_key = self.cache_format % {**key_args, 'window': window}
+        previous = self.cache.get(self.cache_format % {**key_args, 'window': window - 1}, 0)
+
+        # Kept for two periods, since the next window still weighs it
+        count = self._increment(current_key, 2 * duration)
+        if previous * (1 - offset / duration) + count <= limit:
+            return True
+
+        try:
+            self.cache.decr(current_key)
+        except ValueError:
+            pass  # Expired already; there is nothing left to undo
+        self._wait = self._wait_time(previous, count - 1, limit, duration, offset)
+        metrics.THROTTLED_REQUESTS.labels(scope=self.scope).inc()
+        return False
+
+    def _increment(self, key: str, timeout: int) -> int:
+        """Count one request in the counter at ``key``, creating it if needed."""
+        if self.cache.add(key, 1, timeout):
+            return 1
+        try:
+            return self.cache.incr(key)
+        except ValueError:
+            # Expired or evicted since add() found it; start it again
+            self.cache.add(key, 1, timeout)
+            return 1
+
+    @staticmethod
+    def _wait_time(previous: int, count: int, limit: int, duration: int, offset: float) -> float:
+        """Seconds until one more request fits, if no other requests arrive."""
+        room = limit - 1 - count
+        if previous and room >= 0:
+            # The previous window's weight fades until the request fits
+            wait = duration * (1 - room / previous) - offset
+            if wait <= duration - offset:
+                return max(wait, 0.0)
+        # In the next window it is this window's count that fades
+        fade = duration * (1 - (limit - 1) / count) if count else 0.0
+        return duration - offset + max(fade, 0.0)
+
+    def wait(self) -> Optional[float]:
+        """Seconds until the next request would be allowed after a rejection."""
+        return self._wait
+
+
+class LoginIPThrottle(SlidingWindowThrottle):
+    """Limit login attempts per client IP address."""
+
+    scope = 'login_ip'
+
+    def get_ident_for_scope(self, request: Request, view: APIView) -> Optional[str]:
+        # REMOTE_ADDR, or the address added by the last of NUM_PROXIES proxies;
+        # X-Forwarded-For entries added by the client itself are never used
+        return self.get_ident(request)
+
+
+class LoginEmailThrottle(SlidingWindowThrottle):
+    """Limit login attempts per submitted email, across all client IPs."""
+
+    scope = 'login_email'
+
+    def get_ident_for_scope(self, request: Request, view: APIView) -> Optional[str]:
+        email = request.data.get('email')
+        if not isinstance(email, str) or not email.strip():
+            return None
+        return hashlib.sha256(email.strip().lower().encode()).hexdigest()
+
+
+class CheckInUserThrottle(SlidingWindowThrottle):
+    """Limit check-in attempts (code guesses) per authenticated user."""
+
+    scope = 'checkin_user'
+
+    def get_ident_for_scope(self, request: Request, view: APIView) -> Optional[str]:
+        if not request.user or not request.user.is_authenticated:
+            return None
+        return str(request.user.pk)
+
+
+class CheckInActivityThrottle(SlidingWindowThrottle):
+    """Shed check-in load per activity, whoever is sending it."""
+
+    scope = 'checkin_activity'
+
+    def get_ident_for_scope(self, request: Request, view: APIView) -> Optional[str]:
+        activity_id = view.kwargs.get('activity_id')
+        return None if activity_id is None else str(activity_id)
@@ -0,0 +1,91 @@
+"""
+Streamed image uploads.
+
+Multipart uploads are written to temporary files as they arrive instead of
+being held in memory, and a request is rejected as soon as one of its files
+goes over ``IMAGE_UPLOAD_MAX_SIZE``. Uploaded images are only checked from
+their headers here; decoding and resizing happen in the background worker
+(see activities.tasks.process_image_variants).
+"""
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.core.files.uploadhandler import FileUploadHandler, TemporaryFileUploadHandler
+from PIL import Image
+from rest_framework import status
+from rest_framework.exceptions import APIException
+
+
+class UploadTooLarge(APIException):
+    status_code = status.HTTP_413_REQUEST_ENTITY_TOO_LARGE
+    default_detail = 'Uploaded file is too large.'
+    default_code = 'upload_too_large'
+
+
+def _max_size_message() -> str:
+    return f'Uploaded files must be {settings.IMAGE_UPLOAD_MAX_SIZE // (1024 * 1024)} MB or smaller.'
+
+
+class MaxSizeUploadHandler(FileUploadHandler):
+    """Stop reading an upload once a file goes over the size limit.
+
+    Passes the data on unchanged, so it must come before the handler that
+    stores the file.
+    """
+
+    def new_file(self, *args, **kwargs):
+        super().new_file(*args, **kwargs)
+        self.received = 0
+
+    def receive_data_chunk(self, raw_data, start):
+        self.received += len(raw_data)
+        if self.received > settings.IMAGE_UPLOAD_MAX_SIZE:
+            raise UploadTooLarge(_max_size_message())
+        return raw_data
+
+    def file_complete(self, file_size):
+        return None
+
+
+class StreamedUploadMixin:
+    """Spool multipart uploads to disk with a per-file size limit.
+
+    For API views that accept image uploads.
+    """
+
+    def initialize_request(self, request, *args, **kwargs):
+        request.upload_handlers = [
+            MaxSizeUploadHandler(request),
+            TemporaryFileUploadHandler(request),
+        ]
+        return super().initialize_request(request, *args, **kwargs)
+
+
+def validate_image_upload(file) -> None:
+    """
+    Check an uploaded image from its header without decoding it.
+
+    Args:
+        file: Uploaded file
+
+    Raises:
+        ValidationError: If the file is too large, is not an image in one of
+            ``IMAGE_UPLOAD_FORMATS`` or has more than ``IMAGE_UPLOAD_MAX_PIXELS``
+    """
+    if file.size > settings.IMAGE_UPLOAD_MAX_SIZE:
+        raise ValidationError(_max_size_message())
+
+    try:
+        # Image.open only parses the header; pixel data is read on first access
+        with Image.open(file) as image:
+            image_format, (width, height) = image.format, image.size
+    except (OSError, Image.DecompressionBombError):
+        raise ValidationError('Upload a valid image. The file you uploaded was either not an image or a corrupted image.')
+    finally:
+        file.seek(0)
+
+    if image_format not in settings.IMAGE_UPLOAD_FORMATS:
+        raise ValidationError(f'Images must be one of: {", ".join(settings.IMAGE_UPLOAD_FORMATS)}.')
+    if width * height > settings.IMAGE_UPLOAD_MAX_PIXELS:
+        raise ValidationError(
+            f'Images must be at most {settings.IMAGE_UPLOAD_MAX_PIXELS // 1_000_000} megapixels.'
+        )
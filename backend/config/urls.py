@@ -8,8 +8,8 @@ from rest_framework_simplejwt.views import (
 from social_django.views import complete as social_complete
 from users.views import google_login
 from django.conf import settings
-from django.conf.urls.static import static
 from django_prometheus import exports as prometheus_exports
+from activities.media import serve_media
 import sentry_sdk
 
 def trigger_error(request):
@@ -33,7 +33,6 @@ urlpatterns = [
     path('metrics', prometheus_exports.ExportToDjangoView, name='prometheus-metrics'),
     # Sentry test endpoint
     path('sentry-debug/', trigger_error),
+    # Uploaded media; the bytes are sent by the front proxy when MEDIA_ACCEL_BACKEND is set
+    path(f"{settings.MEDIA_URL.lstrip('/')}<path:path>", serve_media, name='media'),
 ]
-
-if settings.DEBUG:
-    urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
@@ -184,25 +184,63 @@ def get_student_application_status(student, activity):
     
     try:
         application = Application.objects.get(student=student, activity=activity)
-        
-        # Check if activity has started (based on time, not status field)
-        now = timezone.now()
-        activity_has_started = now >= activity.start_at
-        
-        # Only show check-in status if activity has started
-        if activity_has_started:
-            try:
-                checkin = StudentCheckIn.objects.get(student=student, activity=activity)
-                return checkin.attendance_status  # Returns 'present' or 'absent'
-            except StudentCheckIn.DoesNotExist:
-                # Activity started but no check-in record yet, return application status
-                return application.status
-        
-        # Activity hasn't started yet, return application status only
-        return application.status
     except Application.DoesNotExist:
         return None
 
+    # Only look up the check-in record once the activity has started
+    check_in = None
+    if timezone.now() >= activity.start_at:
+        check_in = StudentCheckIn.objects.filter(student=student, activity=activity).first()
+
+    return derive_application_status(activity, application, check_in)
+
+
+def derive_application_status(activity, application, check_in=None):
+    """
+    Derive the student-facing application status from already loaded records.
+    
+    Once the activity has started (based on time, not status field), a check-in
+    record takes precedence and its attendance status ('present' or 'absent')
+    is returned instead of the application status.
+    
+    Args:
+        activity: Activity object
+        application: Application object or None
+        check_in: StudentCheckIn object or None
+        
+    Returns:
+        str: Application or attendance status, or None if no application
+    """
+    from django.utils import timezone
+
+    if application is None:
+        return None
+
+    if check_in is not None and timezone.now() >= activity.start_at:
+        return check_in.attendance_status
+
+    return application.status
+
+
+def seconds_until_local_midnight() -> int:
+    """
+    Get the number of seconds until the next midnight in the configured timezone.
+    
+    Used as cache timeout for values that are only valid for the current local
+    day (e.g., daily check-in codes).
+    
+    Returns:
+        int: Seconds until local midnight, at least 1
+    """
+    from django.utils import timezone
+
+    now = timezone.localtime()
+    tomorrow = now.date() + timezone.timedelta(days=1)
+    midnight = timezone.make_aware(
+        timezone.datetime.combine(tomorrow, timezone.datetime.min.time())
+    )
+    return max(1, int((midnight - now).total_seconds()))
+
 
 def validate_activity_is_happening(activity):
     """
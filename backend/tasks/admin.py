@@ -0,0 +1,26 @@
+from django.contrib import admin
+from django.utils import timezone
+
+from config.constants import TaskStatus
+from .models import Task
+
+
+@admin.register(Task)
+class TaskAdmin(admin.ModelAdmin):
+    list_display = ('id', 'name', 'status', 'attempts', 'max_attempts', 'run_at', 'locked_by', 'created_at', 'finished_at')
+    list_filter = ('status', 'name', 'created_at')
+    search_fields = ('name', 'last_error')
+    readonly_fields = ('created_at', 'finished_at', 'locked_at', 'locked_by', 'last_error')
+
+    actions = ['retry_tasks']
+
+    def retry_tasks(self, request, queryset):
+        updated = queryset.filter(status=TaskStatus.DEAD).update(
+            status=TaskStatus.QUEUED,
+            attempts=0,
+            run_at=timezone.now(),
+            finished_at=None
+        )
+        self.message_user(request, f"Requeued {updated} dead task(s).")
+
+    retry_tasks.short_description = 'Retry selected dead tasks'
@@ -0,0 +1,109 @@
+"""
+Management command to run periodic jobs.
+
+Every replica can run this command: the replicas elect a leader with a
+Postgres advisory lock and only the leader runs jobs. The others retry the
+lock every --poll-interval seconds and take over if the leader goes away.
+Jobs are registered with tasks.scheduler.periodic in each app's tasks.py.
+
+Usage:
+    python manage.py run_scheduler
+    python manage.py run_scheduler --metrics-port=9100
+"""
+
+import signal
+import threading
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand
+from django.db import DatabaseError, connection
+
+from config import metrics
+from tasks.scheduler import LeaderLock, PeriodicJob, Scheduler, get_jobs
+
+LEADER_LOCK_KEY = zlib.crc32(b'tasks.run_scheduler')
+
+
+class Command(BaseCommand):
+    help = 'Run periodic jobs on the elected leader replica'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--poll-interval',
+            type=float,
+            default=5.0,
+            help='Seconds between leader lock checks (default: 5)'
+        )
+        parser.add_argument(
+            '--metrics-port',
+            type=int,
+            default=0,
+            help='Serve Prometheus metrics on this port (default: disabled)'
+        )
+
+    def handle(self, *args, **options):
+        poll_interval = options['poll_interval']
+        if options['metrics_port']:
+            metrics.start_metrics_server(options['metrics_port'])
+
+        jobs = get_jobs()
+
+        self.stopping = threading.Event()
+        previous_handlers = {}
+        if threading.current_thread() is threading.main_thread():
+            for signum in (signal.SIGTERM, signal.SIGINT):
+                previous_handlers[signum] = signal.signal(signum, self._stop)
+
+        lock = LeaderLock(LEADER_LOCK_KEY)
+        pool = ThreadPoolExecutor(max(1, len(jobs)), thread_name_prefix='job')
+        scheduler = Scheduler(jobs, submit=lambda job: pool.submit(self._run_in_thread, job))
+        self.stdout.write(self.style.SUCCESS(f'Scheduler started with {len(jobs)} jobs'))
+        for job in jobs:
+            self.stdout.write(f'  {job.name} every {job.interval}s')
+
+        try:
+            while not self.stopping.is_set():
+                if not lock.held:
+                    if not self._try_acquire(lock):
+                        self.stopping.wait(poll_interval)
+                        continue
+                    self.stdout.write(self.style.SUCCESS('Became leader, running jobs'))
+                    metrics.SCHEDULER_LEADER.set(1)
+                    scheduler.reset()
+                elif not lock.is_held():
+                    self.stdout.write(self.style.WARNING('Lost the leader lock, stopped running jobs'))
+                    metrics.SCHEDULER_LEADER.set(0)
+                    continue
+
+                wait = scheduler.run_pending()
+                self.stopping.wait(min(wait, poll_interval))
+        finally:
+            pool.shutdown(wait=True)
+            lock.release()
+            metrics.SCHEDULER_LEADER.set(0)
+            for signum, handler in previous_handlers.items():
+                signal.signal(signum, handler)
+
+        self.stdout.write(self.style.SUCCESS('Scheduler stopped'))
+
+    def _stop(self, signum, frame):
+        self.stdout.write(self.style.WARNING('Stopping after running jobs finish...'))
+        self.stopping.set()
+
+    def _try_acquire(self, lock: LeaderLock) -> bool:
+        """Try to take the leader lock, surviving database restarts."""
+        try:
+            return lock.acquire()
+        except DatabaseError as e:
+            self.stderr.write(f'Leader election failed: {e}')
+            connection.close()
+            return False
+
+    @staticmethod
+    def _run_in_thread(job: PeriodicJob) -> bool:
+        try:
+            return job.run()
+        finally:
+            # Each pool thread has its own connection, don't leave it open
+            connection.close()
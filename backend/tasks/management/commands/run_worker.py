@@ -0,0 +1,159 @@
+"""
+Management command to run queued background tasks.
+
+Workers poll the task table and claim ready tasks with
+SELECT ... FOR UPDATE SKIP LOCKED, so several worker processes can run side
+by side. Failed tasks are retried with exponential backoff and marked dead
+once they run out of attempts. SIGTERM/SIGINT stop claiming new tasks and
+let running ones finish.
+
+Usage:
+    python manage.py run_worker
+    python manage.py run_worker --concurrency=8
+    python manage.py run_worker --once
+    python manage.py run_worker --metrics-port=9101
+"""
+
+import os
+import signal
+import socket
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import DatabaseError, connection
+
+from config import metrics
+from tasks.models import Task
+from tasks.registry import run_task
+
+
+class Command(BaseCommand):
+    help = 'Run queued background tasks'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--concurrency',
+            type=int,
+            default=4,
+            help='Number of tasks to run at the same time (default: 4)'
+        )
+        parser.add_argument(
+            '--poll-interval',
+            type=float,
+            default=1.0,
+            help='Seconds to wait between polls when the queue is empty (default: 1)'
+        )
+        parser.add_argument(
+            '--stale-after',
+            type=int,
+            default=900,
+            help='Requeue tasks left running for more than N seconds by a dead worker (default: 900)'
+        )
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Exit once no task is ready instead of polling forever'
+        )
+        parser.add_argument(
+            '--metrics-port',
+            type=int,
+            default=0,
+            help='Serve Prometheus metrics on this port (default: disabled)'
+        )
+
+    def handle(self, *args, **options):
+        concurrency = max(1, options['concurrency'])
+        poll_interval = options['poll_interval']
+        stale_after = timedelta(seconds=options['stale_after'])
+        once = options['once']
+        if options['metrics_port']:
+            metrics.start_metrics_server(options['metrics_port'])
+
+        worker = f'{socket.gethostname()}:{os.getpid()}'
+        self.stopping = threading.Event()
+        previous_handlers = {}
+        if threading.current_thread() is threading.main_thread():
+            for signum in (signal.SIGTERM, signal.SIGINT):
+                previous_handlers[signum] = signal.signal(signum, self._stop)
+
+        self.stdout.write(
+            self.style.SUCCESS(f'Worker {worker} started with concurrency {concurrency}')
+        )
+
+        self.succeeded = 0
+        self.failed = 0
+        next_stale_check = 0.0
+
+        pool = ThreadPoolExecutor(concurrency, thread_name_prefix='task') if concurrency > 1 else None
+        in_flight = set()
+        try:
+            while True:
+                if not self.stopping.is_set() and time.monotonic() >= next_stale_check:
+                    recovered = self._safely(Task.requeue_stale, stale_after) or 0
+                    if recovered:
+                        self.stdout.write(self.style.WARNING(f'Recovered {recovered} stale tasks'))
+                    next_stale_check = time.monotonic() + stale_after.total_seconds() / 2
+
+                claimed = []
+                if not self.stopping.is_set() and len(in_flight) < concurrency:
+                    claimed = self._safely(Task.claim, worker, concurrency - len(in_flight)) or []
+
+                if pool is None:
+                    for task in claimed:
+                        self._record(run_task(task))
+                else:
+                    in_flight.update(pool.submit(self._run_in_thread, task) for task in claimed)
+
+                if in_flight:
+                    done, in_flight = wait(in_flight, timeout=poll_interval, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        self._record(future.result())
+                    continue
+
+                if claimed:
+                    continue
+                if once or self.stopping.is_set():
+                    break
+                self.stopping.wait(poll_interval)
+        finally:
+            if pool is not None:
+                pool.shutdown(wait=True)
+            for signum, handler in previous_handlers.items():
+                signal.signal(signum, handler)
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'Worker {worker} stopped: {self.succeeded} succeeded, {self.failed} failed'
+            )
+        )
+
+    def _stop(self, signum, frame):
+        self.stdout.write(self.style.WARNING('Stopping after running tasks finish...'))
+        self.stopping.set()
+
+    def _record(self, succeeded: bool) -> None:
+        if succeeded:
+            self.succeeded += 1
+        else:
+            self.failed += 1
+
+    @staticmethod
+    def _run_in_thread(task: Task) -> bool:
+        try:
+            return run_task(task)
+        finally:
+            # Each pool thread has its own connection, don't leave it open
+            connection.close()
+
+    def _safely(self, func, *args):
+        """Run a queue query, surviving database restarts between polls."""
+        try:
+            return func(*args)
+        except DatabaseError as e:
+            self.stderr.write(f'Task queue query failed: {e}')
+            connection.close()
+            self.stopping.wait(1)
+            return None
@@ -0,0 +1,212 @@
+import random
+from typing import Optional
+
+from django.conf import settings
+from django.db import models, transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from config.constants import TaskStatus
+
+
+class Task(models.Model):
+    """A unit of background work stored in the database.
+
+    Tasks are claimed by ``run_worker`` processes with
+    SELECT ... FOR UPDATE SKIP LOCKED, so any number of workers can poll the
+    same table without a message broker and without handing a task to two
+    workers. Failed tasks are retried with exponential backoff and end up in
+    the DEAD state once they run out of attempts.
+
+    Attributes:
+        name: Registered task name (see tasks.registry)
+        payload: JSON keyword arguments for the task function
+        status: Queued, running, succeeded or dead
+        attempts: Number of times the task has been started
+        max_attempts: Attempts allowed before the task is marked dead
+        run_at: Earliest time the task may run
+        locked_by: Worker that claimed the task while it is running
+        last_error: Error from the most recent failed attempt
+    """
+
+    name = models.CharField(max_length=200)
+    payload = models.JSONField(default=dict, blank=True)
+    status = models.CharField(
+        max_length=20,
+        choices=TaskStatus.CHOICES,
+        default=TaskStatus.QUEUED
+    )
+    attempts = models.PositiveIntegerField(default=0)
+    max_attempts = models.PositiveIntegerField(default=5)
+    run_at = models.DateTimeField(default=timezone.now)
+    locked_at = models.DateTimeField(null=True, blank=True)
+    locked_by = models.CharField(max_length=100, blank=True)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['run_at', 'id']
+        verbose_name = "Task"
+        verbose_name_plural = "Tasks"
+        indexes = [
+            # Only queued tasks are polled, keep that index small
+            models.Index(
+                fields=['run_at', 'id'],
+                condition=Q(status=TaskStatus.QUEUED),
+                name='tasks_task_ready_idx'
+            ),
+            models.Index(
+                fields=['locked_at'],
+                condition=Q(status=TaskStatus.RUNNING),
+                name='tasks_task_running_idx'
+            ),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.name} #{self.pk} ({self.get_status_display()})"
+
+    @classmethod
+    def enqueue(
+        cls,
+        name: str,
+        payload: Optional[dict] = None,
+        run_at=None,
+        max_attempts: Optional[int] = None
+    ) -> 'Task':
+        """Add a task to the queue.
+
+        The task is inserted in the caller's transaction, so it only becomes
+        visible to workers once that transaction commits.
+
+        Args:
+            name: Registered task name
+            payload: JSON-serializable keyword arguments for the task
+            run_at: Earliest time to run the task (defaults to now)
+            max_attempts: Attempts before the task is marked dead
+
+        Returns:
+            The created Task
+        """
+        return cls.objects.create(
+            name=name,
+            payload=payload or {},
+            run_at=run_at or timezone.now(),
+            max_attempts=max_attempts or getattr(settings, 'TASKS_MAX_ATTEMPTS', 5)
+        )
+
+    @classmethod
+    def claim(cls, worker: str, limit: int) -> list:
+        """Claim up to ``limit`` tasks that are ready to run.
+
+        Rows locked by other workers are skipped instead of waited on, and
+        the claimed rows are switched to RUNNING before the lock is released.
+
+        Args:
+            worker: Identifier of the claiming worker
+            limit: Maximum number of tasks to claim
+
+        Returns:
+            List of claimed Task instances
+        """
+        now = timezone.now()
+        with transaction.atomic():
+            tasks = list(
+                cls.objects.select_for_update(skip_locked=True).filter(
+                    status=TaskStatus.QUEUED,
+                    run_at__lte=now
+                ).order_by('run_at', 'id')[:limit]
+            )
+            if tasks:
+                cls.objects.filter(id__in=[task.id for task in tasks]).update(
+                    status=TaskStatus.RUNNING,
+                    attempts=F('attempts') + 1,
+                    locked_at=now,
+                    locked_by=worker
+                )
+        for task in tasks:
+            task.status = TaskStatus.RUNNING
+            task.attempts += 1
+            task.locked_at = now
+            task.locked_by = worker
+        return tasks
+
+    @classmethod
+    def requeue_stale(cls, older_than) -> int:
+        """Recover tasks left RUNNING by a worker that died mid-task.
+
+        Stale tasks with attempts left go back to the queue, the others are
+        marked dead so a task that keeps killing its worker is not retried
+        forever.
+
+        Args:
+            older_than: timedelta after which a running task is considered lost
+
+        Returns:
+            Number of stale tasks recovered
+        """
+        now = timezone.now()
+        error = 'Worker stopped while running the task.'
+        stale = cls.objects.filter(status=TaskStatus.RUNNING, locked_at__lt=now - older_than)
+        dead = stale.filter(attempts__gte=F('max_attempts')).update(
+            status=TaskStatus.DEAD, finished_at=now, locked_at=None, locked_by='', last_error=error
+        )
+        requeued = stale.update(
+            status=TaskStatus.QUEUED, run_at=now, locked_at=None, locked_by='', last_error=error
+        )
+        return dead + requeued
+
+    @classmethod
+    def prune_finished(cls, older_than) -> int:
+        """Delete succeeded tasks that finished before ``now - older_than``.
+
+        Returns:
+            Number of tasks deleted
+        """
+        deleted, _ = cls.objects.filter(
+            status=TaskStatus.SUCCEEDED,
+            finished_at__lt=timezone.now() - older_than
+        ).delete()
+        return deleted
+
+    def mark_succeeded(self) -> None:
+        """Record a successful run."""
+        self.status = TaskStatus.SUCCEEDED
+        self.finished_at = timezone.now()
+        self.locked_at = None
+        self.locked_by = ''
+        self.last_error = ''
+        self.save(update_fields=['status', 'finished_at', 'locked_at', 'locked_by', 'last_error'])
+
+    def mark_failed(self, error: str, retry: bool = True) -> None:
+        """Record a failed run and schedule a retry or mark the task dead.
+
+        Args:
+            error: Description of the failure
+            retry: False to mark the task dead regardless of attempts left
+        """
+        self.last_error = error
+        self.locked_at = None
+        self.locked_by = ''
+        if retry and self.attempts < self.max_attempts:
+            self.status = TaskStatus.QUEUED
+            self.run_at = timezone.now() + timezone.timedelta(seconds=self.retry_delay(self.attempts))
+        else:
+            self.status = TaskStatus.DEAD
+            self.finished_at = timezone.now()
+        self.save(update_fields=['status', 'run_at', 'finished_at', 'locked_at', 'locked_by', 'last_error'])
+
+    @staticmethod
+    def retry_delay(attempts: int) -> float:
+        """Exponential backoff with jitter for the given number of attempts.
+
+        Args:
+            attempts: Attempts made so far (1 after the first failure)
+
+        Returns:
+            Seconds to wait before the next attempt
+        """
+        base = getattr(settings, 'TASKS_RETRY_BASE_SECONDS', 10)
+        cap = getattr(settings, 'TASKS_RETRY_MAX_SECONDS', 3600)
+        delay = min(cap, base * 2 ** (attempts - 1))
+        return delay * random.uniform(0.8, 1.2)
@@ -0,0 +1,100 @@
+"""
+Registry of background task functions.
+
+Functions become tasks with the ``@task`` decorator, usually in an app's
+``tasks.py`` (those modules are imported when the tasks app is ready):
+
+    @task()
+    def send_welcome_email(user_id):
+        ...
+
+    send_welcome_email.enqueue(user_id=user.id)
+
+Payloads are stored as JSON, so task arguments must be JSON-serializable
+keyword arguments. Tasks may run more than once (a worker can die after the
+work is done but before it is recorded), so they should be idempotent.
+"""
+import logging
+import traceback
+from typing import Callable, Optional
+
+from config import metrics
+from .models import Task
+
+logger = logging.getLogger(__name__)
+
+_registry: dict[str, Callable] = {}
+
+
+class TaskNotRegistered(LookupError):
+    """Raised when a task name has no registered function."""
+
+
+def task(name: Optional[str] = None, max_attempts: Optional[int] = None) -> Callable:
+    """Register a function as a background task.
+
+    Args:
+        name: Task name stored in the queue (defaults to module.function)
+        max_attempts: Attempts before the task is marked dead
+
+    Returns:
+        Decorator that registers the function and adds an ``enqueue`` helper
+    """
+    def decorator(func: Callable) -> Callable:
+        task_name = name or f'{func.__module__}.{func.__name__}'
+        if task_name in _registry and _registry[task_name] is not func:
+            raise ValueError(f'Task {task_name!r} is already registered.')
+        _registry[task_name] = func
+
+        def enqueue(run_at=None, **payload) -> Task:
+            return Task.enqueue(task_name, payload, run_at=run_at, max_attempts=max_attempts)
+
+        func.task_name = task_name
+        func.enqueue = enqueue
+        return func
+
+    return decorator
+
+
+def get_task(name: str) -> Callable:
+    """Return the function registered under ``name``.
+
+    Raises:
+        TaskNotRegistered: If no function is registered under that name
+    """
+    try:
+        return _registry[name]
+    except KeyError:
+        raise TaskNotRegistered(name) from None
+
+
+def run_task(claimed: Task) -> bool:
+    """Run a claimed task and record the outcome.
+
+    Unknown task names are marked dead straight away, other failures are
+    retried with backoff until the task runs out of attempts.
+
+    Args:
+        claimed: Task returned by Task.claim
+
+    Returns:
+        True if the task succeeded
+    """
+    try:
+        func = get_task(claimed.name)
+    except TaskNotRegistered:
+        claimed.mark_failed(f'Task {claimed.name!r} is not registered.', retry=False)
+        metrics.TASKS_PROCESSED.labels(name=claimed.name, outcome=claimed.status).inc()
+        return False
+
+    try:
+        func(**claimed.payload)
+    except Exception:
+        logger.exception('Task %s #%s failed (attempt %s)', claimed.name, claimed.pk, claimed.attempts)
+        claimed.mark_failed(traceback.format_exc(limit=20))
+        metrics.TASKS_PROCESSED.labels(name=claimed.name, outcome=claimed.status).inc()
+        return False
+
+    claimed.mark_succeeded()
+    metrics.TASKS_PROCESSED.labels(name=claimed.name, outcome=claimed.status).inc()
+    return True
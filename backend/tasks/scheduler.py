@@ -0,0 +1,217 @@
+"""
+Periodic jobs run by the ``run_scheduler`` command.
+
+Functions become periodic jobs with the ``@periodic`` decorator, usually in an
+app's ``tasks.py`` next to its background tasks:
+
+    @periodic(seconds=60)
+    def update_activity_statuses():
+        ...
+
+Intervals can be overridden (or set to 0 to disable a job) per deployment
+with the ``SCHEDULER_INTERVALS`` setting, keyed by job name. Only the
+scheduler process holding the leader lock runs jobs, but a job may still run
+twice around a leadership change, so jobs should be idempotent.
+"""
+import logging
+import time
+from typing import Callable, Optional
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, connections
+
+from config import metrics
+
+logger = logging.getLogger(__name__)
+
+
+class PeriodicJob:
+    """A function registered to run every ``interval`` seconds."""
+
+    def __init__(self, name: str, func: Callable, interval: float):
+        self.name = name
+        self.func = func
+        self.interval = interval
+
+    def __repr__(self) -> str:
+        return f'<PeriodicJob {self.name} every {self.interval}s>'
+
+    def run(self) -> bool:
+        """Run the job once, recording its duration and outcome.
+
+        Returns:
+            True if the job succeeded
+        """
+        started = time.monotonic()
+        try:
+            self.func()
+        except Exception:
+            logger.exception('Periodic job %s failed', self.name)
+            outcome = 'failed'
+        else:
+            outcome = 'succeeded'
+        metrics.SCHEDULER_JOB_DURATION.labels(job=self.name).observe(time.monotonic() - started)
+        metrics.SCHEDULER_JOB_RUNS.labels(job=self.name, outcome=outcome).inc()
+        return outcome == 'succeeded'
+
+
+_jobs: dict[str, PeriodicJob] = {}
+
+
+def periodic(seconds: float, name: Optional[str] = None) -> Callable:
+    """Register a function as a periodic job.
+
+    Args:
+        seconds: Default interval between runs
+        name: Job name used in settings and metrics (defaults to module.function)
+
+    Returns:
+        Decorator that registers the function
+    """
+    def decorator(func: Callable) -> Callable:
+        job_name = name or f'{func.__module__}.{func.__name__}'
+        if job_name in _jobs and _jobs[job_name].func is not func:
+            raise ValueError(f'Periodic job {job_name!r} is already registered.')
+        _jobs[job_name] = PeriodicJob(job_name, func, seconds)
+        func.job_name = job_name
+        return func
+
+    return decorator
+
+
+def get_jobs() -> list:
+    """Return the enabled periodic jobs with their configured intervals.
+
+    Returns:
+        List of PeriodicJob, sorted by name
+    """
+    overrides = getattr(settings, 'SCHEDULER_INTERVALS', {})
+    jobs = []
+    for name, job in sorted(_jobs.items()):
+        interval = overrides.get(name, job.interval)
+        if interval:
+            jobs.append(PeriodicJob(name, job.func, interval))
+    return jobs
+
+
+class Scheduler:
+    """Decides which periodic jobs are due and hands them to an executor.
+
+    A job that is still running when it comes due again is skipped rather
+    than started a second time, and a scheduler that fell behind does not
+    replay the runs it missed.
+
+    Args:
+        jobs: PeriodicJob instances to schedule
+        submit: Callable that starts a job and returns a Future
+        clock: Monotonic clock, replaceable in tests
+    """
+
+    def __init__(self, jobs: list, submit: Callable, clock: Callable = time.monotonic):
+        self.jobs = jobs
+        self.submit = submit
+        self.clock = clock
+        self.running = {}
+        self.next_run = {}
+
+    def reset(self) -> None:
+        """Make every job due now, e.g. after becoming leader."""
+        now = self.clock()
+        self.next_run = {job.name: now for job in self.jobs}
+
+    def run_pending(self) -> float:
+        """Start the jobs that are due.
+
+        Returns:
+            Seconds until the next job is due
+        """
+        now = self.clock()
+        for job in self.jobs:
+            due = self.next_run.setdefault(job.name, now)
+            if due > now:
+                continue
+
+            future = self.running.get(job.name)
+            if future is not None and not future.done():
+                logger.warning('Skipping %s, the previous run is still going', job.name)
+                metrics.SCHEDULER_JOB_RUNS.labels(job=job.name, outcome='skipped').inc()
+            else:
+                metrics.SCHEDULER_JOB_LAG.labels(job=job.name).set(now - due)
+                self.running[job.name] = self.submit(job)
+
+            # Don't replay missed runs after a long job or a pause
+            next_due = due + job.interval
+            self.next_run[job.name] = next_due if next_due > now else now + job.interval
+
+        if not self.jobs:
+            return float('inf')
+        return max(0.0, min(self.next_run.values()) - self.clock())
+
+
+class LeaderLock:
+    """Leader election with a Postgres advisory lock.
+
+    The lock is taken with pg_try_advisory_xact_lock in a transaction that
+    stays open for as long as this process leads. An open transaction keeps
+    its server connection under PgBouncer transaction pooling, where a
+    session-level advisory lock could be left on a server connection that is
+    then handed to another client. Postgres drops the lock when the
+    transaction ends or the connection dies, so a crashed leader is replaced
+    without any cleanup.
+
+    The connection holding the lock must not be used for anything else while
+    the lock is held; jobs run on other threads with their own connections.
+
+    Args:
+        key: Advisory lock key shared by all scheduler replicas
+        using: Database alias to take the lock on
+    """
+
+    def __init__(self, key: int, using: str = DEFAULT_DB_ALIAS):
+        self.key = key
+        self.using = using
+        self.held = False
+
+    def acquire(self) -> bool:
+        """Try to become leader without waiting.
+
+        Returns:
+            True if this process now holds the lock
+        """
+        connection = connections[self.using]
+        connection.set_autocommit(False)
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute('SELECT pg_try_advisory_xact_lock(%s)', [self.key])
+                self.held = cursor.fetchone()[0]
+        except DatabaseError:
+            self.release()
+            raise
+        if not self.held:
+            self.release()
+        return self.held
+
+    def is_held(self) -> bool:
+        """Check that the lock's connection and transaction are still alive.
+
+        Also keeps the transaction from being closed by
+        idle_in_transaction_session_timeout between checks.
+        """
+        if not self.held:
+            return False
+        try:
+            with connections[self.using].cursor() as cursor:
+                cursor.execute('SELECT 1')
+        except DatabaseError:
+            self.release()
+        return self.held
+
+    def release(self) -> None:
+        """End the transaction, releasing the lock if it is held."""
+        self.held = False
+        connection = connections[self.using]
+        try:
+            connection.rollback()
+            connection.set_autocommit(True)
+        except DatabaseError:
+            connection.close()
@@ -0,0 +1,13 @@
+"""
+Periodic jobs for the tasks app.
+"""
+from datetime import timedelta
+
+from .models import Task
+from .scheduler import periodic
+
+
+@periodic(seconds=24 * 60 * 60)
+def prune_finished_tasks() -> None:
+    """Delete tasks that succeeded more than a week ago."""
+    Task.prune_finished(timedelta(days=7))
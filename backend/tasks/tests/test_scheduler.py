@@ -0,0 +1,231 @@
+"""
+Tests for periodic jobs and the run_scheduler command.
+"""
+import threading
+import time
+from io import StringIO
+from unittest import mock, skipUnless
+
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, TransactionTestCase, override_settings
+from prometheus_client import REGISTRY
+
+from tasks.management.commands.run_scheduler import Command, LEADER_LOCK_KEY
+from tasks.scheduler import LeaderLock, PeriodicJob, Scheduler, get_jobs, periodic
+
+
+@periodic(seconds=60, name='tasks.tests.every_minute')
+def every_minute():
+    pass
+
+
+def job_runs(job, outcome):
+    return REGISTRY.get_sample_value(
+        'ku_scheduler_job_runs_total', {'job': job, 'outcome': outcome}
+    ) or 0
+
+
+class FakeFuture:
+    def __init__(self):
+        self.finished = False
+
+    def done(self):
+        return self.finished
+
+
+class PeriodicRegistryTest(TestCase):
+    """Test cases for the @periodic decorator and configured intervals."""
+
+    def test_registered_jobs_use_default_interval(self):
+        """Test that registered jobs are returned with their default interval."""
+        jobs = {job.name: job for job in get_jobs()}
+
+        self.assertEqual(jobs['tasks.tests.every_minute'].interval, 60)
+        self.assertEqual(every_minute.job_name, 'tasks.tests.every_minute')
+
+    def test_app_jobs_are_discovered(self):
+        """Test that the jobs in each app's tasks.py are registered."""
+        names = {job.name for job in get_jobs()}
+
+        self.assertIn('activities.tasks.update_activity_statuses', names)
+        self.assertIn('activities.tasks.mark_absent_students', names)
+        self.assertIn('tasks.tasks.prune_finished_tasks', names)
+
+    @override_settings(SCHEDULER_INTERVALS={'tasks.tests.every_minute': 5})
+    def test_interval_can_be_overridden(self):
+        """Test that SCHEDULER_INTERVALS overrides a job's interval."""
+        jobs = {job.name: job for job in get_jobs()}
+
+        self.assertEqual(jobs['tasks.tests.every_minute'].interval, 5)
+
+    @override_settings(SCHEDULER_INTERVALS={'tasks.tests.every_minute': 0})
+    def test_zero_interval_disables_job(self):
+        """Test that an interval of 0 disables a job."""
+        self.assertNotIn('tasks.tests.every_minute', {job.name for job in get_jobs()})
+
+    def test_duplicate_name_is_rejected(self):
+        """Test that two functions cannot share a job name."""
+        with self.assertRaises(ValueError):
+            periodic(seconds=1, name='tasks.tests.every_minute')(lambda: None)
+
+    def test_failed_run_is_logged_and_counted(self):
+        """Test that a failing job reports failure instead of raising."""
+        def explode():
+            raise RuntimeError('boom')
+
+        job = PeriodicJob('tasks.tests.explode', explode, 60)
+        before = job_runs(job.name, 'failed')
+
+        with self.assertLogs('tasks.scheduler', level='ERROR'):
+            self.assertFalse(job.run())
+
+        self.assertEqual(job_runs(job.name, 'failed'), before + 1)
+
+
+class SchedulerTest(TestCase):
+    """Test cases for deciding which jobs are due."""
+
+    def setUp(self):
+        self.now = 1000.0
+        self.started = []
+        self.futures = []
+        self.fast = PeriodicJob('tasks.tests.fast', lambda: None, 10)
+        self.slow = PeriodicJob('tasks.tests.slow', lambda: None, 60)
+        self.scheduler = Scheduler([self.fast, self.slow], self._submit, clock=lambda: self.now)
+        self.scheduler.reset()
+
+    def _submit(self, job):
+        self.started.append(job.name)
+        future = FakeFuture()
+        self.futures.append(future)
+        return future
+
+    def _finish_all(self):
+        for future in self.futures:
+            future.finished = True
+
+    def test_all_jobs_run_after_reset(self):
+        """Test that every job runs as soon as the scheduler becomes leader."""
+        wait = self.scheduler.run_pending()
+
+        self.assertEqual(self.started, ['tasks.tests.fast', 'tasks.tests.slow'])
+        self.assertEqual(wait, 10)
+
+    def test_jobs_run_on_their_own_interval(self):
+        """Test that jobs only start again once their interval has passed."""
+        self.scheduler.run_pending()
+        self._finish_all()
+
+        self.now += 9
+        self.scheduler.run_pending()
+        self.now += 1
+        self.scheduler.run_pending()
+
+        self.assertEqual(self.started, ['tasks.tests.fast', 'tasks.tests.slow', 'tasks.tests.fast'])
+
+    def test_overlapping_run_is_skipped(self):
+        """Test that a job still running when due again is not started twice."""
+        before = job_runs('tasks.tests.fast', 'skipped')
+        self.scheduler.run_pending()
+
+        self.now += 10
+        with self.assertLogs('tasks.scheduler', level='WARNING'):
+            self.scheduler.run_pending()
+
+        self.assertEqual(self.started.count('tasks.tests.fast'), 1)
+        self.assertEqual(job_runs('tasks.tests.fast', 'skipped'), before + 1)
+
+        self._finish_all()
+        self.now += 10
+        self.scheduler.run_pending()
+        self.assertEqual(self.started.count('tasks.tests.fast'), 2)
+
+    def test_missed_runs_are_not_replayed(self):
+        """Test that a scheduler that fell behind runs each job once."""
+        self.scheduler.run_pending()
+        self._finish_all()
+
+        self.now += 45
+        self.scheduler.run_pending()
+        self._finish_all()
+        self.scheduler.run_pending()
+
+        self.assertEqual(self.started.count('tasks.tests.fast'), 2)
+        self.assertEqual(self.scheduler.next_run['tasks.tests.fast'], self.now + 10)
+
+    def test_lag_is_recorded(self):
+        """Test that the delay between due time and start is exported."""
+        self.scheduler.run_pending()
+        self._finish_all()
+
+        self.now += 13
+        self.scheduler.run_pending()
+
+        lag = REGISTRY.get_sample_value('ku_scheduler_job_lag_seconds', {'job': 'tasks.tests.fast'})
+        self.assertEqual(lag, 3)
+
+
+@skipUnless(connection.vendor == 'postgresql', 'Advisory locks require PostgreSQL')
+class LeaderElectionTest(TransactionTestCase):
+    """Test cases for advisory lock leader election."""
+
+    def _in_thread(self, func):
+        result = []
+
+        def target():
+            try:
+                result.append(func())
+            finally:
+                connection.close()
+
+        thread = threading.Thread(target=target)
+        thread.start()
+        thread.join()
+        return result[0]
+
+    def test_only_one_replica_leads(self):
+        """Test that a second replica cannot take the lock while it is held."""
+        leader = LeaderLock(LEADER_LOCK_KEY)
+        self.assertTrue(leader.acquire())
+        try:
+            self.assertTrue(leader.is_held())
+            self.assertFalse(self._in_thread(lambda: LeaderLock(LEADER_LOCK_KEY).acquire()))
+        finally:
+            leader.release()
+
+        self.assertFalse(leader.is_held())
+
+        def take_over():
+            follower = LeaderLock(LEADER_LOCK_KEY)
+            try:
+                return follower.acquire()
+            finally:
+                follower.release()
+
+        self.assertTrue(self._in_thread(take_over))
+
+    def test_leader_runs_jobs_until_stopped(self):
+        """Test that the command becomes leader, runs jobs and releases the lock."""
+        ran = threading.Event()
+        job = PeriodicJob('tasks.tests.command', ran.set, 60)
+        command = Command()
+        out = StringIO()
+
+        with mock.patch('tasks.management.commands.run_scheduler.get_jobs', return_value=[job]):
+            thread = threading.Thread(
+                target=self._in_thread,
+                args=(lambda: call_command(command, '--poll-interval=0.05', stdout=out),)
+            )
+            thread.start()
+            try:
+                self.assertTrue(ran.wait(10))
+            finally:
+                while not hasattr(command, 'stopping'):
+                    time.sleep(0.01)
+                command.stopping.set()
+                thread.join(10)
+
+        self.assertIn('Became leader', out.getvalue())
+        self.assertIn('Scheduler stopped', out.getvalue())
+        self.assertTrue(self._in_thread(lambda: LeaderLock(LEADER_LOCK_KEY).acquire()))
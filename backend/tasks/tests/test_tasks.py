@@ -0,0 +1,289 @@
+"""
+Tests for the background task queue and the run_worker command.
+"""
+import os
+import tempfile
+import threading
+from datetime import timedelta
+from io import StringIO
+from unittest import mock, skipUnless
+
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.utils import timezone
+from prometheus_client import REGISTRY
+
+from config.constants import TaskStatus
+from config.metrics import start_metrics_server
+from tasks.models import Task
+from tasks.registry import get_task, run_task, task, TaskNotRegistered
+
+calls = []
+calls_lock = threading.Lock()
+
+
+@task(name='tasks.tests.record')
+def record(value):
+    with calls_lock:
+        calls.append(value)
+
+
+@task(name='tasks.tests.explode', max_attempts=2)
+def explode():
+    raise RuntimeError('boom')
+
+
+def run_worker(*args):
+    out = StringIO()
+    call_command('run_worker', '--once', '--poll-interval=0.01', *args, stdout=out)
+    return out.getvalue()
+
+
+class TaskRegistryTest(TestCase):
+    """Test cases for the @task decorator and enqueue helper."""
+
+    def setUp(self):
+        calls.clear()
+
+    def test_enqueue_stores_payload(self):
+        """Test that enqueue stores a queued task with JSON keyword arguments."""
+        queued = record.enqueue(value=42)
+
+        self.assertEqual(queued.name, 'tasks.tests.record')
+        self.assertEqual(queued.payload, {'value': 42})
+        self.assertEqual(queued.status, TaskStatus.QUEUED)
+        self.assertEqual(calls, [])
+
+    def test_decorator_max_attempts(self):
+        """Test that the decorator's max_attempts is stored on enqueued tasks."""
+        self.assertEqual(explode.enqueue().max_attempts, 2)
+
+    def test_default_name_is_module_path(self):
+        """Test that tasks are registered under module.function by default."""
+        from users.tasks import send_password_reset_email
+
+        self.assertEqual(send_password_reset_email.task_name, 'users.tasks.send_password_reset_email')
+        self.assertIs(get_task('users.tasks.send_password_reset_email'), send_password_reset_email)
+
+    def test_unknown_task_raises(self):
+        """Test that looking up an unregistered name fails."""
+        with self.assertRaises(TaskNotRegistered):
+            get_task('tasks.tests.missing')
+
+    def test_duplicate_name_rejected(self):
+        """Test that two functions cannot share a task name."""
+        with self.assertRaises(ValueError):
+            @task(name='tasks.tests.record')
+            def other(value):
+                pass
+
+
+class TaskQueueTest(TestCase):
+    """Test cases for claiming and finishing tasks."""
+
+    def setUp(self):
+        calls.clear()
+
+    def test_claim_takes_ready_tasks_in_order(self):
+        """Test that claim marks the oldest ready tasks as running."""
+        first = record.enqueue(value=1)
+        second = record.enqueue(value=2)
+        record.enqueue(run_at=timezone.now() + timedelta(hours=1), value=3)
+
+        claimed = Task.claim('worker-1', limit=5)
+
+        self.assertEqual([t.id for t in claimed], [first.id, second.id])
+        self.assertTrue(all(t.status == TaskStatus.RUNNING and t.attempts == 1 for t in claimed))
+        first.refresh_from_db()
+        self.assertEqual(first.status, TaskStatus.RUNNING)
+        self.assertEqual(first.locked_by, 'worker-1')
+        self.assertEqual(Task.claim('worker-2', limit=5), [])
+
+    def test_claim_respects_limit(self):
+        """Test that claim never takes more than the limit."""
+        for value in range(3):
+            record.enqueue(value=value)
+
+        self.assertEqual(len(Task.claim('worker-1', limit=2)), 2)
+
+    def test_run_task_success(self):
+        """Test that a successful run is recorded."""
+        record.enqueue(value='ok')
+        [claimed] = Task.claim('worker-1', limit=1)
+
+        self.assertTrue(run_task(claimed))
+
+        claimed.refresh_from_db()
+        self.assertEqual(claimed.status, TaskStatus.SUCCEEDED)
+        self.assertIsNotNone(claimed.finished_at)
+        self.assertEqual(calls, ['ok'])
+
+    @override_settings(TASKS_RETRY_BASE_SECONDS=10)
+    def test_failure_is_retried_with_backoff(self):
+        """Test that a failed run is requeued for later with the error kept."""
+        explode.enqueue()
+        [claimed] = Task.claim('worker-1', limit=1)
+        before = timezone.now()
+
+        with self.assertLogs('tasks.registry', level='ERROR'):
+            self.assertFalse(run_task(claimed))
+
+        claimed.refresh_from_db()
+        self.assertEqual(claimed.status, TaskStatus.QUEUED)
+        self.assertIn('RuntimeError: boom', claimed.last_error)
+        self.assertGreaterEqual(claimed.run_at, before + timedelta(seconds=8))
+        self.assertEqual(claimed.locked_by, '')
+
+    def test_failure_without_attempts_left_is_dead(self):
+        """Test that a task is dead-lettered after its last attempt."""
+        explode.enqueue()
+        Task.objects.update(attempts=1)
+        [claimed] = Task.claim('worker-1', limit=1)
+
+        with self.assertLogs('tasks.registry', level='ERROR'):
+            run_task(claimed)
+
+        claimed.refresh_from_db()
+        self.assertEqual(claimed.status, TaskStatus.DEAD)
+        self.assertEqual(claimed.attempts, 2)
+
+    def test_unregistered_task_is_dead(self):
+        """Test that unknown task names are not retried."""
+        Task.enqueue('tasks.tests.missing')
+        [claimed] = Task.claim('worker-1', limit=1)
+
+        self.assertFalse(run_task(claimed))
+
+        claimed.refresh_from_db()
+        self.assertEqual(claimed.status, TaskStatus.DEAD)
+        self.assertIn('not registered', claimed.last_error)
+
+    @override_settings(TASKS_RETRY_BASE_SECONDS=10, TASKS_RETRY_MAX_SECONDS=60)
+    def test_retry_delay_grows_and_is_capped(self):
+        """Test that the retry delay doubles per attempt up to the maximum."""
+        self.assertTrue(8 <= Task.retry_delay(1) <= 12)
+        self.assertTrue(16 <= Task.retry_delay(2) <= 24)
+        self.assertTrue(48 <= Task.retry_delay(10) <= 72)
+
+    def test_requeue_stale(self):
+        """Test that tasks abandoned by a dead worker are requeued or dead-lettered."""
+        retryable = record.enqueue(value=1)
+        exhausted = explode.enqueue()
+        Task.objects.update(
+            status=TaskStatus.RUNNING,
+            locked_at=timezone.now() - timedelta(hours=1),
+            locked_by='dead-worker'
+        )
+        Task.objects.filter(pk=exhausted.pk).update(attempts=2)
+        fresh = record.enqueue(value=2)
+        Task.objects.filter(pk=fresh.pk).update(status=TaskStatus.RUNNING, locked_at=timezone.now())
+
+        self.assertEqual(Task.requeue_stale(timedelta(minutes=15)), 2)
+
+        statuses = dict(Task.objects.values_list('id', 'status'))
+        self.assertEqual(statuses[retryable.pk], TaskStatus.QUEUED)
+        self.assertEqual(statuses[exhausted.pk], TaskStatus.DEAD)
+        self.assertEqual(statuses[fresh.pk], TaskStatus.RUNNING)
+
+    def test_prune_finished(self):
+        """Test that old succeeded tasks are deleted and others kept."""
+        old = record.enqueue(value=1)
+        dead = explode.enqueue()
+        Task.objects.update(finished_at=timezone.now() - timedelta(days=30))
+        Task.objects.filter(pk=old.pk).update(status=TaskStatus.SUCCEEDED)
+        Task.objects.filter(pk=dead.pk).update(status=TaskStatus.DEAD)
+
+        self.assertEqual(Task.prune_finished(timedelta(days=7)), 1)
+        self.assertTrue(Task.objects.filter(pk=dead.pk).exists())
+
+
+class RunWorkerCommandTest(TestCase):
+    """Test cases for the run_worker command in single-threaded mode."""
+
+    def setUp(self):
+        calls.clear()
+
+    def test_processes_queue_and_exits(self):
+        """Test that --once runs all ready tasks and reports the outcome."""
+        for value in range(3):
+            record.enqueue(value=value)
+        explode.enqueue()
+
+        with self.assertLogs('tasks.registry', level='ERROR'):
+            output = run_worker('--concurrency=1')
+
+        self.assertEqual(sorted(calls), [0, 1, 2])
+        self.assertIn('3 succeeded, 1 failed', output)
+        self.assertEqual(Task.objects.filter(status=TaskStatus.SUCCEEDED).count(), 3)
+        self.assertEqual(Task.objects.filter(status=TaskStatus.QUEUED).count(), 1)
+
+    def test_empty_queue(self):
+        """Test that the worker exits cleanly when nothing is queued."""
+        output = run_worker('--concurrency=1')
+
+        self.assertIn('0 succeeded, 0 failed', output)
+
+    def test_metrics_port_serves_metrics(self):
+        """Test that --metrics-port exports the worker's metrics."""
+        with mock.patch('config.metrics.start_http_server') as serve:
+            run_worker('--concurrency=1', '--metrics-port=9101')
+
+        serve.assert_called_once_with(9101, registry=REGISTRY)
+
+    def test_metrics_are_combined_across_processes(self):
+        """Test that PROMETHEUS_MULTIPROC_DIR serves a multiprocess registry."""
+        with tempfile.TemporaryDirectory() as directory, \
+                mock.patch.dict(os.environ, {'PROMETHEUS_MULTIPROC_DIR': directory}), \
+                mock.patch('config.metrics.start_http_server') as serve:
+            start_metrics_server(9101)
+
+        registry = serve.call_args.kwargs['registry']
+        self.assertIsNot(registry, REGISTRY)
+
+
+@skipUnless(connection.vendor == 'postgresql', 'SKIP LOCKED requires PostgreSQL')
+class RunWorkerConcurrencyTest(TransactionTestCase):
+    """Stress tests for concurrent workers against a real database."""
+
+    TASKS = 60
+
+    def setUp(self):
+        calls.clear()
+        Task.objects.bulk_create([
+            Task(name='tasks.tests.record', payload={'value': value})
+            for value in range(self.TASKS)
+        ])
+
+    def test_threaded_worker_runs_each_task_once(self):
+        """Test that a worker with several threads runs every task exactly once."""
+        run_worker('--concurrency=6')
+
+        self.assertEqual(sorted(calls), list(range(self.TASKS)))
+        self.assertEqual(Task.objects.filter(status=TaskStatus.SUCCEEDED).count(), self.TASKS)
+
+    def test_parallel_workers_never_share_tasks(self):
+        """Test that SKIP LOCKED hands each task to one of several workers."""
+        barrier = threading.Barrier(4)
+        errors = []
+
+        def worker():
+            try:
+                barrier.wait()
+                run_worker('--concurrency=2')
+            except Exception as e:  # pragma: no cover - reported below
+                errors.append(e)
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=worker) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(errors, [])
+        self.assertEqual(sorted(calls), list(range(self.TASKS)))
+        self.assertEqual(
+            Task.objects.filter(status=TaskStatus.SUCCEEDED, attempts=1).count(), self.TASKS
+        )
@@ -33,9 +33,18 @@ class StudentProfileAdmin(admin.ModelAdmin):
     list_display = ['user', 'student_id_external', 'year', 'faculty', 'major']
     search_fields = ['user__email', 'student_id_external']
     list_filter = ['year']
+    list_select_related = ['user']
+    autocomplete_fields = ['user']
 
 
 @admin.register(OrganizerProfile)
 class OrganizerProfileAdmin(admin.ModelAdmin):
     list_display = ['user', 'organization_type', 'organization_name']
     search_fields = ['user__email', 'organization_name']
+    ordering = ['organization_name', 'id']
+    list_select_related = ['user']
+    autocomplete_fields = ['user']
+
+    def get_queryset(self, request):
+        # The __str__ used for autocomplete results shows the user's email
+        return super().get_queryset(request).select_related('user')
@@ -0,0 +1,210 @@
+"""
+JWT authentication backed by claims instead of a user query.
+
+Access tokens carry the user's role, admin flags and organizer profile as
+signed claims (see ``ClaimsRefreshToken``), and ``ClaimsJWTAuthentication``
+builds ``request.user`` from them without touching the database. Fields that
+are not in the token (names, profile image, ...) are loaded on first access
+from a short-lived cache of the user row.
+
+Claims are only trusted while nothing has changed: saving or deleting a user
+or one of their profiles (see users.signals) records the time of the change,
+and tokens issued before it fall back to the cached user row, which the same
+signal has just cleared. This is also how deactivation takes effect before
+the access token expires. The check costs one cache read per request.
+
+Both the change times and the cached rows live in the default cache, which
+must be shared by every process that can change users (REDIS_URL, see
+users.checks). With a per-process cache a change made elsewhere would not be
+seen until the access token expires.
+"""
+import time
+from typing import Any, Optional
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import router
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken, TokenError
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import RefreshToken
+from rest_framework_simplejwt.utils import datetime_from_epoch
+
+from .models import ClaimsUser, OrganizerProfile, User
+from .revocation import is_revoked, revoke
+
+USER_CACHE_KEY = 'users:user:{}'
+USER_CHANGED_CACHE_KEY = 'users:changed:{}'
+
+# User fields carried in access tokens, besides the user ID
+CLAIM_FIELDS = ('email', 'role', 'is_staff', 'is_superuser')
+ORGANIZER_PROFILE_CLAIM_FIELDS = ('id', 'organization_type', 'organization_name')
+
+# Never cached, loaded from the database when needed
+UNCACHED_FIELDS = ('password',)
+
+
+def user_claims(user: User) -> dict:
+    """
+    Build the claims describing ``user`` for an access token.
+
+    Args:
+        user: User the token is issued to
+
+    Returns:
+        Claims to add to the token payload
+    """
+    claims = {field: getattr(user, field) for field in CLAIM_FIELDS}
+    organizer_profile = getattr(user, 'organizer_profile', None)
+    claims['organizer_profile'] = organizer_profile and {
+        field: getattr(organizer_profile, field) for field in ORGANIZER_PROFILE_CLAIM_FIELDS
+    }
+    student_profile = getattr(user, 'profile', None)
+    claims['student_profile_id'] = student_profile and student_profile.id
+    return claims
+
+
+def cached_user_fields(user_id: Any) -> Optional[dict]:
+    """
+    Return the stored field values of a user, from the cache when possible.
+
+    Args:
+        user_id: Primary key of the user
+
+    Returns:
+        Mapping of attribute names to values without the password, or None if
+        the user does not exist
+    """
+    key = USER_CACHE_KEY.format(user_id)
+    values = cache.get(key)
+    if values is None:
+        attnames = [
+            field.attname for field in User._meta.concrete_fields
+            if field.attname not in UNCACHED_FIELDS
+        ]
+        values = User.objects.filter(pk=user_id).values(*attnames).first()
+        if values is None:
+            return None
+        cache.set(key, values, settings.AUTH_USER_CACHE_TIMEOUT)
+    return values
+
+
+def invalidate_user(user_id: Any) -> None:
+    """
+    Drop the cached row of a user and stop trusting their issued claims.
+
+    Args:
+        user_id: Primary key of the user
+    """
+    cache.delete(USER_CACHE_KEY.format(user_id))
+    # Kept for as long as an access token issued before the change can live
+    cache.set(
+        USER_CHANGED_CACHE_KEY.format(user_id),
+        time.time(),
+        int(api_settings.ACCESS_TOKEN_LIFETIME.total_seconds())
+    )
+
+
+def _from_values(model, values: dict):
+    """Build a model instance as loaded from the database, deferring missing fields."""
+    attnames = [field.attname for field in model._meta.concrete_fields if field.attname in values]
+    return model.from_db(router.db_for_read(model), attnames, [values[attname] for attname in attnames])
+
+
+def user_from_claims(token) -> ClaimsUser:
+    """
+    Build the user an access token was issued to from its claims.
+
+    The organizer profile is attached as well, so ``user.organizer_profile``
+    does not query either. Users without a student or organizer profile get
+    the missing relation cached as absent.
+
+    Args:
+        token: Validated access token with claims from ``user_claims``
+
+    Returns:
+        User with the claimed fields loaded and the rest deferred
+    """
+    values = {'id': token[api_settings.USER_ID_CLAIM], 'is_active': True}
+    values.update((field, token[field]) for field in CLAIM_FIELDS)
+    user = _from_values(ClaimsUser, values)
+
+    organizer_profile = token['organizer_profile']
+    if organizer_profile is not None:
+        organizer_profile = _from_values(OrganizerProfile, {**organizer_profile, 'user_id': user.pk})
+        organizer_profile._state.fields_cache['user'] = user
+    user._state.fields_cache['organizer_profile'] = organizer_profile
+    if token['student_profile_id'] is None:
+        user._state.fields_cache['profile'] = None
+    return user
+
+
+class ClaimsJWTAuthentication(JWTAuthentication):
+    """JWT authentication that builds the user from token claims."""
+
+    def get_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken('Token contained no recognizable user identification')
+
+        changed_at = cache.get(USER_CHANGED_CACHE_KEY.format(user_id))
+        stale = changed_at is not None and changed_at >= validated_token.get('iat', 0)
+        # Tokens issued before claims were added carry only the user ID
+        if 'role' in validated_token and not stale:
+            return user_from_claims(validated_token)
+
+        values = cached_user_fields(user_id)
+        if values is None:
+            raise AuthenticationFailed('User not found', code='user_not_found')
+        if not values['is_active']:
+            raise AuthenticationFailed('User is inactive', code='user_inactive')
+        return _from_values(ClaimsUser, values)
+
+
+class ClaimsRefreshToken(RefreshToken):
+    """Refresh token whose access tokens carry the user's claims.
+
+    Claims are read from the database every time an access token is issued,
+    so refreshing picks up changes and fails for deactivated users. Tokens
+    can be revoked (see users.revocation), which also happens to the old
+    token when it is rotated.
+    """
+
+    def verify(self) -> None:
+        super().verify()
+        if is_revoked(self[api_settings.JTI_CLAIM]):
+            raise TokenError('Token is blacklisted')
+
+    def blacklist(self) -> None:
+        """Revoke this token until it expires.
+
+        Raises:
+            TokenError: If the token was revoked in the meantime, e.g. by a
+                concurrent refresh that rotated it first
+        """
+        if not revoke(self[api_settings.JTI_CLAIM], datetime_from_epoch(self['exp'])):
+            raise TokenError('Token is blacklisted')
+
+    @classmethod
+    def for_user(cls, user: User) -> 'ClaimsRefreshToken':
+        token = super().for_user(user)
+        token._user = user
+        return token
+
+    @property
+    def access_token(self):
+        access = super().access_token
+        user = getattr(self, '_user', None)
+        if user is None:
+            user = (
+                User.objects
+                .select_related('organizer_profile', 'profile')
+                .filter(pk=self[api_settings.USER_ID_CLAIM], is_active=True)
+                .first()
+            )
+            if user is None:
+                raise TokenError('User is inactive or deleted')
+            self._user = user
+        access.payload.update(user_claims(user))
+        return access
@@ -0,0 +1,32 @@
+"""
+System checks for the users app.
+"""
+from django.conf import settings
+from django.core.checks import Error, Tags, register
+
+# Backends whose entries are only visible to the process that wrote them
+PROCESS_LOCAL_CACHES = (
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+)
+
+
+@register(Tags.caches, Tags.security, deploy=True)
+def check_shared_cache(app_configs, **kwargs):
+    """Require a cache shared between processes in deployments.
+
+    Changed-user markers (users.authentication) and refresh token
+    revocations (users.revocation) are read from the default cache by every
+    web process, so a change made in one process must be visible to all.
+    """
+    backend = settings.CACHES.get('default', {}).get('BACKEND')
+    if backend not in PROCESS_LOCAL_CACHES:
+        return []
+    return [Error(
+        f'The default cache ({backend}) is not shared between processes.',
+        hint=(
+            'Set REDIS_URL. Otherwise deactivations, role changes and logouts '
+            'are not seen by other processes until access tokens expire.'
+        ),
+        id='users.E001',
+    )]
@@ -0,0 +1,21 @@
+"""
+Management command to delete revoked refresh tokens that have expired.
+
+An expired token is rejected without looking at the revocation list, so its
+RevokedToken row is no longer needed. Runs daily under run_scheduler.
+
+Usage:
+    python manage.py prune_revoked_tokens
+"""
+
+from django.core.management.base import BaseCommand
+
+from users.models import RevokedToken
+
+
+class Command(BaseCommand):
+    help = 'Delete revoked refresh tokens that have expired'
+
+    def handle(self, *args, **options):
+        deleted = RevokedToken.prune_expired()
+        self.stdout.write(self.style.SUCCESS(f'Pruned {deleted} expired revoked tokens'))
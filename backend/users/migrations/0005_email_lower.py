@@ -0,0 +1,41 @@
+# Generated by Django 5.2.5 on 2026-10-19 02:17
+
+import django.db.models.functions.text
+from django.db import migrations, models
+from django.db.models import Count
+from django.db.models.functions import Lower, Trim
+
+
+def normalize_emails(apps, schema_editor):
+    """Lowercase stored emails, refusing to merge accounts that collide."""
+    User = apps.get_model('users', 'User')
+    collisions = list(
+        User.objects
+        .values(normalized=Lower(Trim('email')))
+        .annotate(accounts=Count('id'))
+        .filter(accounts__gt=1)
+        .values_list('normalized', flat=True)
+    )
+    if collisions:
+        emails = ', '.join(sorted(collisions))
+        raise RuntimeError(
+            f'Users share these emails when case is ignored: {emails}. '
+            'Merge or rename the duplicate accounts, then run the migration again.'
+        )
+    User.objects.exclude(email=Lower(Trim('email'))).update(email=Lower(Trim('email')))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+        ('users', '0004_revokedtoken'),
+    ]
+
+    operations = [
+        migrations.RunPython(normalize_emails, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='user',
+            constraint=models.UniqueConstraint(django.db.models.functions.text.Lower('email'), name='unique_user_email_lower'),
+        ),
+    ]
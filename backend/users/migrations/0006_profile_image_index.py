@@ -0,0 +1,20 @@
+# Generated by Django 5.2.5 on 2026-10-19 04:10
+
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # Build the index without locking out writes to the users table
+    atomic = False
+
+    dependencies = [
+        ('users', '0005_email_lower'),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='user',
+            index=models.Index(fields=['profile_image'], name='user_profile_image_idx'),
+        ),
+    ]
@@ -2,6 +2,7 @@ from typing import Optional
 
 from django.contrib.auth.models import AbstractBaseUser, BaseUserManager, PermissionsMixin
 from django.db import models
+from django.db.models.functions import Lower
 from django.utils import timezone
 
 from config.constants import OrganizationType, UserRoles, ValidationLimits
@@ -16,6 +17,29 @@ def user_profile_image_path(instance, filename):
 class UserManager(BaseUserManager):
     """Custom user manager for email-based authentication."""
 
+    @classmethod
+    def normalize_email(cls, email: Optional[str]) -> str:
+        """Return the email as stored: trimmed and lowercased."""
+        return (email or '').strip().lower()
+
+    def with_email(self, email: Optional[str]) -> models.QuerySet:
+        """
+        Filter users by email, ignoring case and surrounding whitespace.
+
+        Every lookup by email goes through here, so it matches the
+        ``lower(email)`` index whatever case the user typed.
+
+        Args:
+            email: Email address as entered
+
+        Returns:
+            QuerySet with at most one user
+        """
+        return self.alias(email_lower=Lower('email')).filter(email_lower=self.normalize_email(email))
+
+    def get_by_natural_key(self, username: str) -> 'User':
+        return self.with_email(username).get()
+
     def create_user(self, email: str, password: Optional[str] = None, **extra_fields) -> 'User':
         """Create and save a regular user with the given email and password."""
         if not email:
@@ -75,9 +99,24 @@ class User(AbstractBaseUser, PermissionsMixin):
 
     objects = UserManager()
 
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(Lower('email'), name='unique_user_email_lower')
+        ]
+        indexes = [
+            # activities.media looks up who owns a requested file
+            models.Index(fields=['profile_image'], name='user_profile_image_idx'),
+        ]
+
     def __str__(self) -> str:
         return self.email
 
+    def save(self, *args, **kwargs):
+        """Save the user with the email normalized (see UserManager.normalize_email)."""
+        if 'email' not in self.get_deferred_fields():
+            self.email = User.objects.normalize_email(self.email)
+        super().save(*args, **kwargs)
+
     @property
     def full_name(self) -> str:
         """Return the user's full name."""
@@ -101,6 +140,30 @@ class User(AbstractBaseUser, PermissionsMixin):
         return self.role == UserRoles.ADMIN or self.is_superuser
 
 
+class ClaimsUser(User):
+    """User built from access token claims by users.authentication.
+
+    Only the claimed fields are loaded. The first access to any other field
+    loads all of them from the shared user cache instead of querying one
+    field at a time.
+    """
+
+    class Meta:
+        proxy = True
+
+    def refresh_from_db(self, using=None, fields=None, from_queryset=None) -> None:
+        deferred = self.get_deferred_fields()
+        if fields is not None and from_queryset is None and set(fields) <= deferred:
+            from .authentication import cached_user_fields
+
+            values = cached_user_fields(self.pk)
+            if values is not None and all(field in values for field in fields):
+                for attname in deferred & values.keys():
+                    setattr(self, attname, values[attname])
+                return
+        super().refresh_from_db(using=using, fields=fields, from_queryset=from_queryset)
+
+
 class StudentProfile(models.Model):
     """Profile for students with additional information."""
 
@@ -138,3 +201,34 @@ class OrganizerProfile(models.Model):
 
     def __str__(self) -> str:
         return f"{self.user.email} - {self.organization_name} ({self.get_organization_type_display()})"
+
+
+class RevokedToken(models.Model):
+    """A refresh token that may no longer be used, by its JTI.
+
+    Lookups go through users.revocation, which keeps the revoked JTIs in the
+    cache and an in-process Bloom filter; this table makes revocations survive
+    a cache flush. Rows are useless once the token has expired and are removed
+    by ``prune_expired``.
+    """
+
+    jti = models.CharField(max_length=255, unique=True)
+    expires_at = models.DateTimeField(db_index=True)
+    revoked_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    class Meta:
+        verbose_name = "Revoked Token"
+        verbose_name_plural = "Revoked Tokens"
+
+    def __str__(self) -> str:
+        return f"{self.jti} (expires {self.expires_at:%Y-%m-%d %H:%M})"
+
+    @classmethod
+    def prune_expired(cls) -> int:
+        """Delete tokens that have expired and would be rejected anyway.
+
+        Returns:
+            Number of tokens deleted
+        """
+        deleted, _ = cls.objects.filter(expires_at__lte=timezone.now()).delete()
+        return deleted
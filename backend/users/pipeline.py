@@ -1,7 +1,8 @@
+from urllib.parse import urlencode
+
 from django.conf import settings
-from django.core.cache import cache
 from .models import User
-import uuid
+from .tokens import make_oauth_registration_token
 
 # Check that user email exist in database
 # If not, redirect to frontend register page
@@ -28,20 +29,16 @@ def require_existing_user(strategy, details, backend, user=None, *args, **kwargs
         return strategy.redirect(f"{get_client_url()}/role")
 
     try:
-        existing = User.objects.get(email=email)
+        existing = User.objects.with_email(email).get()
         return {"user": existing}
     except User.DoesNotExist:
-        # Store OAuth session data temporarily for registration completion
-        session_key = str(uuid.uuid4())
-        cache.set(f"oauth_session_{session_key}", {
-            'email': email,
-            'details': details,
-            'backend': backend.name,
-            'strategy': strategy.__class__.__name__
-        }, timeout=1800)  # 30 minutes
+        # Sign the OAuth details for registration completion, so no server
+        # side session is needed
+        session_token = make_oauth_registration_token(email, details, backend.name)
 
-        # Send them to role selection page with session key and prefilled email
-        return strategy.redirect(f"{get_client_url()}/role?email={email}&oauth_session={session_key}")
+        # Send them to role selection page with the token and prefilled email
+        query = urlencode({'email': email, 'oauth_session': session_token})
+        return strategy.redirect(f"{get_client_url()}/role?{query}")
 
 
 def ensure_user_role(strategy, details, backend, user=None, *args, **kwargs):
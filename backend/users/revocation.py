@@ -0,0 +1,162 @@
+"""
+Refresh token revocation.
+
+Revoked tokens are recorded by JTI in three places:
+
+- RevokedToken rows, which survive a cache flush and restart
+- the shared cache, one key per JTI that expires with the token
+- a Bloom filter in each process, loaded from the table and topped up with
+  newer rows every ``FILTER_SYNC_INTERVAL`` seconds
+
+Nearly every token checked was not revoked. For those the Bloom filter rules
+out everything loaded from the table, and one cache read covers tokens
+revoked by other processes since the last sync. That relies on the default
+cache being shared by all processes (REDIS_URL, see users.checks); with a
+per-process cache a token revoked elsewhere would be accepted until the next
+sync. Only JTIs the filter matches (revoked, or a rare false positive) are
+looked up in the table.
+
+A token can only be revoked once: ``revoke`` reports whether this call
+revoked it, which is what makes a rotated refresh token single-use even when
+two refreshes of it race.
+
+Rows are deleted once the token has expired (``prune_revoked_tokens``).
+"""
+import hashlib
+import math
+import threading
+import time
+from datetime import datetime, timedelta
+
+from django.core.cache import cache
+from django.utils import timezone
+
+from .models import RevokedToken
+
+REVOKED_CACHE_KEY = 'users:revoked:{}'
+
+FILTER_SYNC_INTERVAL = 60
+# Rows inserted by transactions still open at sync time get a later sync
+FILTER_SYNC_OVERLAP = timedelta(minutes=5)
+FILTER_MIN_CAPACITY = 1024
+FILTER_ERROR_RATE = 0.01
+
+
+class BloomFilter:
+    """Set of strings that may report false positives but no false negatives."""
+
+    def __init__(self, capacity: int, error_rate: float = FILTER_ERROR_RATE):
+        self.capacity = capacity
+        self.size = math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2)
+        self.hash_count = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def _positions(self, item: str):
+        digest = hashlib.blake2b(item.encode(), digest_size=16).digest()
+        first = int.from_bytes(digest[:8], 'big')
+        step = int.from_bytes(digest[8:], 'big') | 1
+        return [(first + i * step) % self.size for i in range(self.hash_count)]
+
+    def add(self, item: str) -> None:
+        for position in self._positions(item):
+            self.bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, item: str) -> bool:
+        return all(self.bits[position >> 3] & (1 << (position & 7)) for position in self._positions(item))
+
+
+class _RevokedFilter:
+    """Per-process Bloom filter of revoked JTIs kept in step with the table."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.bloom = None
+        self.synced_at = None
+        self.checked_at = 0.0
+
+    def _rebuild(self, now: datetime) -> None:
+        jtis = list(
+            RevokedToken.objects.filter(expires_at__gt=now).values_list('jti', flat=True)
+        )
+        bloom = BloomFilter(max(2 * len(jtis), FILTER_MIN_CAPACITY))
+        for jti in jtis:
+            bloom.add(jti)
+        self.bloom = bloom
+
+    def sync(self) -> BloomFilter:
+        """Return the filter, loading rows added since the last sync if it is due."""
+        with self.lock:
+            if self.bloom is not None and time.monotonic() - self.checked_at < FILTER_SYNC_INTERVAL:
+                return self.bloom
+            now = timezone.now()
+            if self.bloom is None or self.bloom.count > self.bloom.capacity:
+                # Also drops expired tokens from the filter
+                self._rebuild(now)
+            else:
+                for jti in RevokedToken.objects.filter(
+                    revoked_at__gte=self.synced_at - FILTER_SYNC_OVERLAP,
+                    expires_at__gt=now
+                ).values_list('jti', flat=True):
+                    self.bloom.add(jti)
+            self.synced_at = now
+            self.checked_at = time.monotonic()
+            return self.bloom
+
+    def add(self, jti: str) -> None:
+        with self.lock:
+            if self.bloom is not None:
+                self.bloom.add(jti)
+
+    def reset(self) -> None:
+        with self.lock:
+            self.bloom = None
+
+
+_revoked_filter = _RevokedFilter()
+
+
+def revoke(jti: str, expires_at: datetime) -> bool:
+    """
+    Revoke a token until it expires.
+
+    Args:
+        jti: The token's JTI claim
+        expires_at: When the token expires
+
+    Returns:
+        True if this call revoked the token, False if it was already revoked
+        or has expired
+    """
+    ttl = (expires_at - timezone.now()).total_seconds()
+    if ttl <= 0:
+        return False
+    # The unique jti makes concurrent callers agree on a single winner
+    _, created = RevokedToken.objects.get_or_create(jti=jti, defaults={'expires_at': expires_at})
+    cache.set(REVOKED_CACHE_KEY.format(jti), True, math.ceil(ttl))
+    _revoked_filter.add(jti)
+    return created
+
+
+def is_revoked(jti: str) -> bool:
+    """
+    Check whether a token has been revoked.
+
+    Args:
+        jti: The token's JTI claim
+
+    Returns:
+        True if the token was revoked
+    """
+    if cache.get(REVOKED_CACHE_KEY.format(jti)):
+        return True
+    if jti not in _revoked_filter.sync():
+        return False
+    # Matched by the filter but not cached: a cache flush or a false positive
+    revoked = RevokedToken.objects.filter(jti=jti, expires_at__gt=timezone.now()).first()
+    if revoked is None:
+        return False
+    ttl = (revoked.expires_at - timezone.now()).total_seconds()
+    cache.set(REVOKED_CACHE_KEY.format(jti), True, max(math.ceil(ttl), 1))
+    return True
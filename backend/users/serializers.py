@@ -1,4 +1,7 @@
 from rest_framework import serializers
+from rest_framework_simplejwt.serializers import TokenObtainPairSerializer, TokenRefreshSerializer
+
+from .authentication import ClaimsRefreshToken
 from .models import User, StudentProfile, OrganizerProfile
 
 
@@ -29,6 +32,16 @@ class UserSerializer(serializers.ModelSerializer):
         fields = ["id", "email", "title", "first_name", "last_name", "role", "profile_image", "created_at", "updated_at",
                  "profile", "organizer_profile", "year", "faculty", "major", "organization_type", "organization_name"]
 
+    def validate_email(self, value):
+        """Normalize the email and reject addresses that differ from another user's only by case."""
+        value = User.objects.normalize_email(value)
+        others = User.objects.with_email(value)
+        if self.instance is not None:
+            others = others.exclude(pk=self.instance.pk)
+        if others.exists():
+            raise serializers.ValidationError('A user with this email already exists.')
+        return value
+
     def update(self, instance, validated_data):
         year = validated_data.pop('year', None)
         faculty = validated_data.pop('faculty', None)
@@ -92,6 +105,10 @@ class UserRegisterSerializer(serializers.ModelSerializer):
                  "student_id_external", "year", "faculty", "major",
                  "organization", "organization_name"]
 
+    def validate_email(self, value):
+        """Store emails lowercased (see UserManager.normalize_email)."""
+        return User.objects.normalize_email(value)
+
     def validate_password(self, value):
         """Validate password is not empty."""
         if not value or not value.strip():
@@ -111,7 +128,7 @@ class UserRegisterSerializer(serializers.ModelSerializer):
         
         # Ensure email is unique to avoid IntegrityError on create
         email = attrs.get('email')
-        if email and User.objects.filter(email=email).exists():
+        if email and User.objects.with_email(email).exists():
             raise serializers.ValidationError({'email': 'A user with this email already exists.'})
 
         return attrs
@@ -161,3 +178,11 @@ class UserRegisterSerializer(serializers.ModelSerializer):
             )
 
         return user
+
+
+class ClaimsTokenObtainPairSerializer(TokenObtainPairSerializer):
+    token_class = ClaimsRefreshToken
+
+
+class ClaimsTokenRefreshSerializer(TokenRefreshSerializer):
+    token_class = ClaimsRefreshToken
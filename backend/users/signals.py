@@ -0,0 +1,33 @@
+"""
+Signal handlers for the users app.
+"""
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .authentication import invalidate_user
+from .models import ClaimsUser, OrganizerProfile, StudentProfile, User
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+@receiver(post_save, sender=ClaimsUser)
+@receiver(post_delete, sender=ClaimsUser)
+def invalidate_changed_user(sender, instance: User, update_fields=None, **kwargs) -> None:
+    """Stop trusting cached data and token claims of a changed or deleted user."""
+    if update_fields is not None and set(update_fields) == {'last_login'}:
+        # Saved on every login, right after the new tokens were issued
+        return
+    invalidate_user(instance.pk)
+    # Again after commit, in case a request cached the old row in between
+    transaction.on_commit(lambda: invalidate_user(instance.pk))
+
+
+@receiver(post_save, sender=StudentProfile)
+@receiver(post_delete, sender=StudentProfile)
+@receiver(post_save, sender=OrganizerProfile)
+@receiver(post_delete, sender=OrganizerProfile)
+def invalidate_profile_user(sender, instance, **kwargs) -> None:
+    """Profiles are part of the token claims, so a change invalidates their user."""
+    invalidate_user(instance.user_id)
+    transaction.on_commit(lambda: invalidate_user(instance.user_id))
@@ -0,0 +1,62 @@
+"""
+Background tasks and periodic jobs for the users app.
+"""
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.contrib.auth.tokens import default_token_generator
+from django.core.mail import send_mail
+from django.core.management import call_command
+
+from tasks.registry import task
+from tasks.scheduler import periodic
+from .models import User
+
+
+@task()
+def send_password_reset_email(user_id: int) -> None:
+    """Send a password reset link to a user.
+
+    The token is made here rather than when the task is queued, so it is
+    never stored with the task.
+
+    Args:
+        user_id: User who asked for the reset
+    """
+    user = User.objects.filter(pk=user_id, is_active=True).first()
+    if user is None:
+        return
+    token = default_token_generator.make_token(user)
+    client_url = getattr(settings, 'CLIENT_URL_DEV', 'http://localhost:3000')
+    reset_url = f"{client_url}/reset-password?{urlencode({'token': token, 'email': user.email})}"
+
+    subject = "Reset Your Password - KU Volunteer"
+    message = f"""
+Hello,
+
+You have requested to reset your password for your KU Volunteer account.
+
+Click the link below to reset your password:
+{reset_url}
+
+This link will expire in 1 hour.
+
+If you did not request this password reset, please ignore this email.
+
+Best regards,
+KU Volunteer Team
+"""
+
+    send_mail(
+        subject=subject,
+        message=message,
+        from_email=settings.DEFAULT_FROM_EMAIL,
+        recipient_list=[user.email],
+        fail_silently=False,
+    )
+
+
+@periodic(seconds=24 * 60 * 60)
+def prune_revoked_tokens() -> None:
+    """Delete revoked refresh tokens that have expired."""
+    call_command('prune_revoked_tokens')
@@ -0,0 +1,162 @@
+"""
+Test cases for claims-based JWT authentication.
+"""
+from django.contrib.auth.models import update_last_login
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient, APIRequestFactory
+from rest_framework_simplejwt.tokens import AccessToken, RefreshToken
+
+from config.constants import OrganizationType, UserRoles
+from users.authentication import ClaimsJWTAuthentication, ClaimsRefreshToken
+from users.models import ClaimsUser, OrganizerProfile, StudentProfile, User
+
+
+class ClaimsAuthenticationTestCase(TestCase):
+    """Test cases for building request.user from access token claims."""
+
+    def setUp(self):
+        """Set up an organizer, a student and an empty user cache."""
+        cache.clear()
+        self.organizer = User.objects.create_user(
+            email='organizer@test.com',
+            password='testpass123',
+            role=UserRoles.ORGANIZER,
+            first_name='Olivia'
+        )
+        self.organizer_profile = OrganizerProfile.objects.create(
+            user=self.organizer,
+            organization_name='Test Organization',
+            organization_type=OrganizationType.EXTERNAL
+        )
+        self.student = User.objects.create_user(email='student@test.com', password='testpass123')
+        self.student_profile = StudentProfile.objects.create(user=self.student, student_id_external='6610545545')
+        # Changes made above would mark tokens issued in the same second as stale
+        cache.clear()
+        self.client = APIClient()
+
+    def _authenticate(self, access):
+        request = APIRequestFactory().get('/', HTTP_AUTHORIZATION=f'Bearer {access}')
+        return ClaimsJWTAuthentication().authenticate(request)[0]
+
+    def test_access_token_carries_claims(self):
+        """Test that login issues access tokens with role and profile claims."""
+        response = self.client.post(
+            reverse('user-login'),
+            {'email': 'organizer@test.com', 'password': 'testpass123'},
+            format='json'
+        )
+
+        access = AccessToken(response.data['access'])
+        self.assertEqual(access['role'], UserRoles.ORGANIZER)
+        self.assertEqual(access['email'], 'organizer@test.com')
+        self.assertFalse(access['is_superuser'])
+        self.assertEqual(access['organizer_profile'], {
+            'id': self.organizer_profile.id,
+            'organization_type': OrganizationType.EXTERNAL,
+            'organization_name': 'Test Organization',
+        })
+        self.assertIsNone(access['student_profile_id'])
+        self.assertNotIn('role', RefreshToken(response.data['refresh']))
+
+    def test_authentication_does_not_query(self):
+        """Test that the user and organizer profile come from the token."""
+        access = ClaimsRefreshToken.for_user(self.organizer).access_token
+
+        with self.assertNumQueries(0):
+            user = self._authenticate(access)
+            self.assertEqual(user, self.organizer)
+            self.assertIsInstance(user, ClaimsUser)
+            self.assertEqual(user.role, UserRoles.ORGANIZER)
+            self.assertEqual(user.organizer_profile.organization_name, 'Test Organization')
+            self.assertEqual(user.organizer_profile.user, user)
+            self.assertFalse(hasattr(user, 'profile'))
+
+    def test_other_fields_are_loaded_once_from_cache(self):
+        """Test that deferred fields are loaded together and shared between requests."""
+        access = ClaimsRefreshToken.for_user(self.organizer).access_token
+
+        with self.assertNumQueries(1):
+            user = self._authenticate(access)
+            self.assertEqual(user.first_name, 'Olivia')
+            self.assertIsNotNone(user.created_at)
+        with self.assertNumQueries(0):
+            self.assertEqual(self._authenticate(access).first_name, 'Olivia')
+
+    def test_student_profile_is_loaded_on_access(self):
+        """Test that a student's profile is still available."""
+        access = ClaimsRefreshToken.for_user(self.student).access_token
+
+        user = self._authenticate(access)
+
+        self.assertEqual(user.profile.student_id_external, '6610545545')
+        self.assertEqual(AccessToken(str(access))['student_profile_id'], self.student_profile.id)
+
+    def test_profile_change_invalidates_claims(self):
+        """Test that tokens issued before a profile change see the new data."""
+        access = ClaimsRefreshToken.for_user(self.organizer).access_token
+
+        self.organizer_profile.organization_name = 'Renamed Organization'
+        self.organizer_profile.save()
+
+        user = self._authenticate(access)
+        self.assertEqual(user.organizer_profile.organization_name, 'Renamed Organization')
+
+    def test_role_change_invalidates_claims(self):
+        """Test that a demoted user loses the role in their token straight away."""
+        self.organizer.role = UserRoles.ADMIN
+        self.organizer.save()
+        cache.clear()
+        access = ClaimsRefreshToken.for_user(self.organizer).access_token
+
+        self.organizer.role = UserRoles.ORGANIZER
+        self.organizer.save()
+
+        self.assertEqual(self._authenticate(access).role, UserRoles.ORGANIZER)
+
+    def test_deactivated_user_is_rejected(self):
+        """Test that deactivation takes effect before the access token expires."""
+        refresh = ClaimsRefreshToken.for_user(self.organizer)
+        access = refresh.access_token
+        url = reverse('user-detail', kwargs={'pk': self.organizer.id})
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {access}')
+        self.assertEqual(self.client.get(url).status_code, status.HTTP_200_OK)
+
+        self.organizer.is_active = False
+        self.organizer.save()
+
+        self.assertEqual(self.client.get(url).status_code, status.HTTP_401_UNAUTHORIZED)
+        response = APIClient().post(reverse('token_refresh'), {'refresh': str(refresh)}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_refresh_issues_current_claims(self):
+        """Test that refreshing reads the claims from the database."""
+        refresh = str(ClaimsRefreshToken.for_user(self.organizer))
+        self.organizer_profile.organization_name = 'Renamed Organization'
+        self.organizer_profile.save()
+
+        response = self.client.post(reverse('token_refresh'), {'refresh': refresh}, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        access = AccessToken(response.data['access'])
+        self.assertEqual(access['organizer_profile']['organization_name'], 'Renamed Organization')
+
+    def test_tokens_without_claims_are_accepted(self):
+        """Test that access tokens issued before claims were added still work."""
+        access = RefreshToken.for_user(self.organizer).access_token
+
+        user = self._authenticate(access)
+
+        self.assertEqual(user.role, UserRoles.ORGANIZER)
+        self.assertEqual(user.organizer_profile, self.organizer_profile)
+
+    def test_login_does_not_invalidate_claims(self):
+        """Test that recording the last login keeps the new tokens trusted."""
+        access = ClaimsRefreshToken.for_user(self.organizer).access_token
+
+        update_last_login(None, self.organizer)
+
+        with self.assertNumQueries(0):
+            self._authenticate(access)
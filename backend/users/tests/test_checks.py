@@ -0,0 +1,25 @@
+"""
+Test cases for the users app system checks.
+"""
+from django.test import SimpleTestCase, override_settings
+
+from users.checks import check_shared_cache
+
+
+class SharedCacheCheckTestCase(SimpleTestCase):
+    """Test cases for the shared cache deploy check."""
+
+    @override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+    def test_process_local_cache_is_reported(self):
+        """Test that a per-process cache is an error in deployments."""
+        errors = check_shared_cache(None)
+
+        self.assertEqual([error.id for error in errors], ['users.E001'])
+
+    @override_settings(CACHES={'default': {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': 'redis://localhost:6379/0',
+    }})
+    def test_shared_cache_passes(self):
+        """Test that Redis satisfies the check."""
+        self.assertEqual(check_shared_cache(None), [])
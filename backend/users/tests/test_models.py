@@ -117,10 +117,34 @@ class UserModelTest(TestCase):
         self.assertEqual(user.last_name, "Doe")
 
     def test_email_normalization(self):
-        """Test that email is normalized."""
-        email = "Test@Example.COM"
+        """Test that email is stored trimmed and lowercased."""
+        email = " Test@Example.COM "
         user = User.objects.create_user(email=email, password=self.password)
-        self.assertEqual(user.email, "Test@example.com")
+        self.assertEqual(user.email, "test@example.com")
+
+    def test_email_lookup_ignores_case(self):
+        """Test that users are found by email whatever its case."""
+        user = User.objects.create_user(email="test@example.com", password=self.password)
+
+        self.assertEqual(User.objects.with_email("TEST@Example.com ").get(), user)
+        self.assertEqual(User.objects.get_by_natural_key("Test@Example.com"), user)
+
+    def test_email_is_normalized_on_save(self):
+        """Test that emails changed after creation are normalized too."""
+        user = User.objects.create_user(email="test@example.com", password=self.password)
+
+        user.email = "New@Example.com"
+        user.save()
+
+        user.refresh_from_db()
+        self.assertEqual(user.email, "new@example.com")
+
+    def test_emails_differing_by_case_are_rejected(self):
+        """Test that the lower(email) constraint rejects case variants."""
+        User.objects.create_user(email="test@example.com", password=self.password)
+
+        with self.assertRaises(IntegrityError):
+            User.objects.bulk_create([User(email="TEST@example.com")])
 
     def test_user_timestamps(self):
         """Test that timestamps are set correctly."""
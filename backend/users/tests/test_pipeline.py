@@ -3,9 +3,13 @@ Test cases for OAuth pipeline functions.
 These tests verify the business logic in pipeline functions.
 OAuth integration is tested by the social-auth library itself.
 """
+from unittest.mock import Mock
+from urllib.parse import parse_qs, urlparse
+
 from django.test import TestCase
 from users.models import User
-from users.pipeline import ensure_user_role, get_client_url
+from users.tokens import read_oauth_registration_token
+from users.pipeline import ensure_user_role, get_client_url, require_existing_user
 from config.constants import UserRoles
 
 
@@ -125,6 +129,38 @@ class EnsureUserRoleTest(TestCase):
         self.assertFalse(user.is_superuser)
 
 
+class RequireExistingUserTest(TestCase):
+    """Test cases for require_existing_user pipeline function."""
+
+    def test_existing_user_matched_ignoring_case(self):
+        """Test that a Google email in another case finds the existing account."""
+        user = User.objects.create_user(email='student@ku.th', password='testpass123')
+
+        result = require_existing_user(
+            strategy=None,
+            details={'email': 'Student@KU.th'},
+            backend=None
+        )
+
+        self.assertEqual(result['user'], user)
+
+    def test_new_user_gets_signed_registration_token(self):
+        """Test that unknown emails are sent to registration with signed details."""
+        strategy = Mock(redirect=lambda url: url)
+        backend = Mock()
+        backend.name = 'google-oauth2'
+        details = {'email': 'new@ku.th', 'first_name': 'New'}
+
+        url = require_existing_user(strategy=strategy, details=details, backend=backend)
+
+        query = parse_qs(urlparse(url).query)
+        self.assertEqual(query['email'], ['new@ku.th'])
+        session = read_oauth_registration_token(query['oauth_session'][0])
+        self.assertEqual(session['email'], 'new@ku.th')
+        self.assertEqual(session['details'], details)
+        self.assertEqual(session['backend'], 'google-oauth2')
+
+
 class GetClientUrlTest(TestCase):
     """Test cases for get_client_url helper function."""
 
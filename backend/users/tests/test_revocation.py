@@ -0,0 +1,154 @@
+"""
+Test cases for refresh token revocation.
+"""
+import uuid
+from datetime import timedelta
+from io import StringIO
+from unittest.mock import patch
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.exceptions import TokenError
+
+from users.authentication import ClaimsRefreshToken
+from users.models import RevokedToken, User
+from users.revocation import BloomFilter, _revoked_filter, is_revoked, revoke
+
+
+class BloomFilterTestCase(TestCase):
+    """Test cases for the Bloom filter."""
+
+    def test_added_items_are_found(self):
+        """Test that the filter has no false negatives and few false positives."""
+        bloom = BloomFilter(1000)
+        added = [uuid.uuid4().hex for _ in range(1000)]
+        for item in added:
+            bloom.add(item)
+
+        self.assertTrue(all(item in bloom for item in added))
+        false_positives = sum(uuid.uuid4().hex in bloom for _ in range(1000))
+        self.assertLess(false_positives, 50)
+
+
+class RevocationTestCase(TestCase):
+    """Test cases for revoking and checking JTIs."""
+
+    def setUp(self):
+        """Start every test with an empty cache and a filter loaded from the table."""
+        cache.clear()
+        _revoked_filter.reset()
+        self.expires_at = timezone.now() + timedelta(days=1)
+
+    def test_revoked_token_is_found(self):
+        """Test that a revoked JTI is reported as revoked and others are not."""
+        revoke('revoked-jti', self.expires_at)
+
+        self.assertTrue(is_revoked('revoked-jti'))
+        self.assertFalse(is_revoked('other-jti'))
+        self.assertTrue(RevokedToken.objects.filter(jti='revoked-jti').exists())
+
+    def test_revocation_survives_cache_flush(self):
+        """Test that the table is used when the cache lost the revocation."""
+        revoke('revoked-jti', self.expires_at)
+        cache.clear()
+        _revoked_filter.reset()
+
+        self.assertTrue(is_revoked('revoked-jti'))
+        with self.assertNumQueries(0):
+            # Cached again by the previous check
+            self.assertTrue(is_revoked('revoked-jti'))
+
+    def test_unrevoked_token_does_not_query(self):
+        """Test that the common case is answered by the filter and the cache."""
+        revoke('revoked-jti', self.expires_at)
+        is_revoked('warm-up')
+
+        with self.assertNumQueries(0):
+            self.assertFalse(is_revoked('other-jti'))
+
+    def test_token_is_revoked_once(self):
+        """Test that revoke reports whether this call revoked the token."""
+        self.assertTrue(revoke('revoked-jti', self.expires_at))
+        self.assertFalse(revoke('revoked-jti', self.expires_at))
+
+    def test_expired_token_is_not_stored(self):
+        """Test that revoking an expired token is a no-op."""
+        self.assertFalse(revoke('expired-jti', timezone.now() - timedelta(seconds=1)))
+
+        self.assertFalse(RevokedToken.objects.exists())
+
+    def test_prune_command_deletes_expired_rows(self):
+        """Test that only revocations of expired tokens are pruned."""
+        RevokedToken.objects.create(jti='expired-jti', expires_at=timezone.now() - timedelta(seconds=1))
+        revoke('revoked-jti', self.expires_at)
+        out = StringIO()
+
+        call_command('prune_revoked_tokens', stdout=out)
+
+        self.assertEqual(list(RevokedToken.objects.values_list('jti', flat=True)), ['revoked-jti'])
+        self.assertIn('Pruned 1', out.getvalue())
+
+
+class RefreshTokenRevocationTestCase(TestCase):
+    """Test cases for revocation through the token endpoints."""
+
+    def setUp(self):
+        """Set up a user with a refresh token."""
+        cache.clear()
+        _revoked_filter.reset()
+        self.user = User.objects.create_user(email='student@test.com', password='testpass123')
+        self.refresh = str(ClaimsRefreshToken.for_user(self.user))
+        self.client = APIClient()
+
+    def _refresh(self, refresh):
+        return self.client.post(reverse('token_refresh'), {'refresh': refresh}, format='json')
+
+    def test_rotated_token_cannot_be_reused(self):
+        """Test that the old refresh token is revoked when it is rotated."""
+        response = self._refresh(self.refresh)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        self.assertEqual(self._refresh(self.refresh).status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertEqual(self._refresh(response.data['refresh']).status_code, status.HTTP_200_OK)
+
+    def test_racing_rotations_redeem_token_once(self):
+        """Test that a refresh token verified by two requests is only rotated by one."""
+        first = ClaimsRefreshToken(self.refresh)
+        second = ClaimsRefreshToken(self.refresh)
+
+        first.blacklist()
+
+        with self.assertRaises(TokenError):
+            second.blacklist()
+
+    def test_rotation_fails_when_revocation_was_missed(self):
+        """Test that rotating fails even if the revocation check let the token through."""
+        self.assertEqual(self._refresh(self.refresh).status_code, status.HTTP_200_OK)
+
+        with patch('users.authentication.is_revoked', return_value=False):
+            response = self._refresh(self.refresh)
+
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_logout_revokes_refresh_token(self):
+        """Test that a logged out refresh token can no longer be refreshed."""
+        response = self.client.post(reverse('user-logout'), {'refresh': self.refresh}, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(self._refresh(self.refresh).status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_logout_with_invalid_token(self):
+        """Test that logging out needs a valid refresh token."""
+        for data in ({}, {'refresh': 'not-a-token'}):
+            with self.subTest(data=data):
+                response = self.client.post(reverse('user-logout'), data, format='json')
+                self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        self.client.post(reverse('user-logout'), {'refresh': self.refresh}, format='json')
+        response = self.client.post(reverse('user-logout'), {'refresh': self.refresh}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
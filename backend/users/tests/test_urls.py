@@ -40,6 +40,12 @@ class UserUrlsTest(SimpleTestCase):
         url = reverse('user-login')
         self.assertEqual(resolve(url).func.view_class, views.LoginView)
 
+    def test_logout_url_resolves(self):
+        """Test that logout URL resolves correctly."""
+        url = reverse('user-logout')
+        self.assertEqual(url, '/api/users/logout/')
+        self.assertEqual(resolve(url).func.view_class, views.LogoutView)
+
     def test_user_detail_url_with_different_ids(self):
         """Test user-detail URL with different ID values."""
         for user_id in [1, 10, 100, 999]:
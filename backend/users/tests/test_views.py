@@ -1,8 +1,13 @@
 """
 Comprehensive test cases for user views and API endpoints.
 """
+import re
+from io import StringIO
+from urllib.parse import parse_qs, urlparse
 from unittest.mock import patch, Mock
 import json
+from django.core import mail
+from django.core.management import call_command
 from django.test import TestCase, RequestFactory
 from django.urls import reverse
 from django.core.cache import cache
@@ -11,8 +16,10 @@ from rest_framework.test import APIClient
 from rest_framework_simplejwt.tokens import RefreshToken
 
 from users.models import User, StudentProfile, OrganizerProfile
+from users.tokens import make_oauth_registration_token
 from users.views import google_jwt_redirect, google_login
 from config.constants import UserRoles, OrganizationType
+from tasks.models import Task
 
 
 class UserRegisterViewTest(TestCase):
@@ -162,6 +169,23 @@ class UserRegisterViewTest(TestCase):
         self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
         self.assertIn('password', response.data)
 
+    def test_register_stores_lowercase_email(self):
+        """Test that emails are stored lowercased and case variants are rejected."""
+        data = {
+            'email': 'Student@Test.com',
+            'password': 'testpass123',
+            'role': UserRoles.STUDENT,
+            'student_id_external': '6610545545'
+        }
+        response = self.client.post(self.register_url, data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(User.objects.get().email, 'student@test.com')
+
+        data.update(email='STUDENT@test.com', student_id_external='6610545546')
+        response = self.client.post(self.register_url, data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('email', response.data)
+
 
 class LoginViewTest(TestCase):
     """Test cases for user login endpoint."""
@@ -190,6 +214,17 @@ class LoginViewTest(TestCase):
         self.assertIn('user', response.data)
         self.assertEqual(response.data['user']['email'], 'test@test.com')
 
+    def test_login_ignores_email_case(self):
+        """Test that login finds the user whatever case the email is typed in."""
+        data = {
+            'email': 'Test@TEST.com',
+            'password': 'testpass123'
+        }
+        response = self.client.post(self.login_url, data, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['user']['email'], 'test@test.com')
+
     def test_login_with_wrong_password_fails(self):
         """Test login with incorrect password fails."""
         data = {
@@ -535,24 +570,21 @@ class OAuthRegistrationViewTest(TestCase):
         """Set up test client and mock OAuth session data."""
         self.client = APIClient()
         self.oauth_register_url = reverse('oauth-register')
-        self.session_key = 'test-session-123'
-        
-        # Mock OAuth session data
-        self.session_data = {
-            'email': 'newuser@gmail.com',
-            'details': {
+
+        # OAuth details signed by the pipeline
+        self.session_key = make_oauth_registration_token(
+            'newuser@gmail.com',
+            {
                 'email': 'newuser@gmail.com',
                 'first_name': 'Test',
                 'last_name': 'User',
                 'picture': 'https://example.com/photo.jpg'
-            }
-        }
+            },
+            'google-oauth2'
+        )
 
     def test_oauth_registration_student_success(self):
         """Test successful OAuth registration for student."""
-        # Set up session
-        cache.set(f"oauth_session_{self.session_key}", self.session_data, timeout=600)
-        
         data = {
             'oauth_session': self.session_key,
             'email': 'newuser@gmail.com',
@@ -581,13 +613,13 @@ class OAuthRegistrationViewTest(TestCase):
         self.assertTrue(hasattr(user, 'profile'))
         self.assertEqual(user.profile.student_id_external, '6512345678')
         
-        # Verify session was cleared
-        self.assertIsNone(cache.get(f"oauth_session_{self.session_key}"))
+        # The token cannot register the email again
+        data['student_id_external'] = '6512345679'
+        response = self.client.post(self.oauth_register_url, data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
 
     def test_oauth_registration_organizer_success(self):
         """Test successful OAuth registration for organizer."""
-        cache.set(f"oauth_session_{self.session_key}", self.session_data, timeout=600)
-        
         data = {
             'oauth_session': self.session_key,
             'email': 'newuser@gmail.com',
@@ -637,8 +669,6 @@ class OAuthRegistrationViewTest(TestCase):
 
     def test_oauth_registration_email_mismatch(self):
         """Test OAuth registration with mismatched email fails."""
-        cache.set(f"oauth_session_{self.session_key}", self.session_data, timeout=600)
-        
         data = {
             'oauth_session': self.session_key,
             'email': 'different@gmail.com',  # Different from session
@@ -655,8 +685,6 @@ class OAuthRegistrationViewTest(TestCase):
 
     def test_oauth_registration_invalid_data(self):
         """Test OAuth registration with invalid data fails."""
-        cache.set(f"oauth_session_{self.session_key}", self.session_data, timeout=600)
-        
         data = {
             'oauth_session': self.session_key,
             'email': 'newuser@gmail.com',
@@ -672,8 +700,6 @@ class OAuthRegistrationViewTest(TestCase):
 
     def test_oauth_registration_student_without_student_id(self):
         """Test OAuth registration for student without student_id fails."""
-        cache.set(f"oauth_session_{self.session_key}", self.session_data, timeout=600)
-        
         data = {
             'oauth_session': self.session_key,
             'email': 'newuser@gmail.com',
@@ -695,12 +721,9 @@ class OAuthRegistrationViewTest(TestCase):
             role=UserRoles.STUDENT
         )
         
-        session_key = 'test-session-456'
-        session_data = {
-            'email': 'existing@gmail.com',
-            'details': {'email': 'existing@gmail.com'}
-        }
-        cache.set(f"oauth_session_{session_key}", session_data, timeout=600)
+        session_key = make_oauth_registration_token(
+            'existing@gmail.com', {'email': 'existing@gmail.com'}, 'google-oauth2'
+        )
         
         data = {
             'oauth_session': session_key,
@@ -716,16 +739,9 @@ class OAuthRegistrationViewTest(TestCase):
         self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
 
     def test_oauth_registration_session_persists_on_error(self):
-        """Test that OAuth session is NOT cleared on validation error."""
-        session_key = 'test-session-789'
-        session_data = {
-            'email': 'newuser@gmail.com',
-            'details': {'email': 'newuser@gmail.com'}
-        }
-        cache.set(f"oauth_session_{session_key}", session_data, timeout=600)
-        
+        """Test that the OAuth token can be retried after a validation error."""
         data = {
-            'oauth_session': session_key,
+            'oauth_session': self.session_key,
             'email': 'newuser@gmail.com',
             'password': '',  # Invalid
             'role': UserRoles.STUDENT,
@@ -735,8 +751,29 @@ class OAuthRegistrationViewTest(TestCase):
         response = self.client.post(self.oauth_register_url, data, format='json')
         
         self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
-        # Session should still exist for retry
-        self.assertIsNotNone(cache.get(f"oauth_session_{session_key}"))
+        # The same token works for the retry
+        data['password'] = 'temppass123'
+        response = self.client.post(self.oauth_register_url, data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+    def test_oauth_registration_tampered_or_expired_token(self):
+        """Test that modified and expired OAuth tokens are rejected."""
+        data = {
+            'oauth_session': self.session_key[:-2] + 'xx',
+            'email': 'newuser@gmail.com',
+            'password': 'temppass123',
+            'role': UserRoles.STUDENT,
+            'student_id_external': '6512345678'
+        }
+        response = self.client.post(self.oauth_register_url, data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('OAuth session expired or invalid', response.data['error'])
+
+        data['oauth_session'] = self.session_key
+        with self.settings(OAUTH_REGISTRATION_TIMEOUT=-1):
+            response = self.client.post(self.oauth_register_url, data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('OAuth session expired or invalid', response.data['error'])
 
 
 class GoogleJWTRedirectTest(TestCase):
@@ -791,6 +828,109 @@ class GoogleJWTRedirectTest(TestCase):
         self.assertEqual(data['user']['email'], 'test@test.com')
 
 
+class ForgotPasswordViewTest(TestCase):
+    """Test cases for the forgot password endpoint."""
+
+    def setUp(self):
+        """Set up test client and user."""
+        self.client = APIClient()
+        self.url = reverse('forgot-password')
+        self.user = User.objects.create_user(
+            email='test@test.com',
+            password='testpass123',
+            role=UserRoles.STUDENT
+        )
+
+    def tearDown(self):
+        cache.clear()
+
+    def test_forgot_password_enqueues_email(self):
+        """Test that the reset email is queued instead of sent during the request."""
+        response = self.client.post(self.url, {'email': 'Test@test.com'}, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(mail.outbox), 0)
+        queued = Task.objects.get()
+        self.assertEqual(queued.name, 'users.tasks.send_password_reset_email')
+        # The token is made by the worker, so it is not stored with the task
+        self.assertEqual(queued.payload, {'user_id': self.user.id})
+
+    def test_worker_sends_queued_email(self):
+        """Test that the worker delivers the queued reset email."""
+        self.client.post(self.url, {'email': 'test@test.com'}, format='json')
+
+        call_command('run_worker', '--once', '--concurrency=1', stdout=StringIO())
+
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(mail.outbox[0].to, ['test@test.com'])
+        self.assertIn('/reset-password?token=', mail.outbox[0].body)
+
+    def test_forgot_password_unknown_email(self):
+        """Test that unknown emails do not queue anything."""
+        response = self.client.post(self.url, {'email': 'nobody@test.com'}, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(Task.objects.exists())
+
+
+class ResetPasswordViewTest(TestCase):
+    """Test cases for the reset password endpoint."""
+
+    def setUp(self):
+        """Set up a user and the reset link they were emailed."""
+        self.client = APIClient()
+        self.url = reverse('reset-password')
+        self.user = User.objects.create_user(
+            email='test@test.com',
+            password='testpass123',
+            role=UserRoles.STUDENT
+        )
+        self.client.post(reverse('forgot-password'), {'email': 'test@test.com'}, format='json')
+        call_command('run_worker', '--once', '--concurrency=1', stdout=StringIO())
+        reset_url = re.search(r'http\S+', mail.outbox[0].body).group()
+        self.token = parse_qs(urlparse(reset_url).query)['token'][0]
+
+    def _reset(self, token, password='newpass12345'):
+        data = {'email': 'Test@test.com', 'token': token, 'password': password}
+        return self.client.post(self.url, data, format='json')
+
+    def test_reset_password_success(self):
+        """Test that the emailed token resets the password."""
+        response = self._reset(self.token)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.user.refresh_from_db()
+        self.assertTrue(self.user.check_password('newpass12345'))
+
+    def test_token_works_once(self):
+        """Test that a token stops working once the password has changed."""
+        self._reset(self.token)
+
+        response = self._reset(self.token, password='otherpass12345')
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.user.refresh_from_db()
+        self.assertTrue(self.user.check_password('newpass12345'))
+
+    def test_invalid_or_expired_token(self):
+        """Test that tampered and expired tokens are rejected."""
+        self.assertEqual(self._reset(self.token[:-2] + 'xx').status_code, status.HTTP_400_BAD_REQUEST)
+        with self.settings(PASSWORD_RESET_TIMEOUT=-1):
+            self.assertEqual(self._reset(self.token).status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_token_is_bound_to_user(self):
+        """Test that a token cannot reset another user's password."""
+        User.objects.create_user(email='other@test.com', password='testpass123')
+
+        response = self.client.post(
+            self.url,
+            {'email': 'other@test.com', 'token': self.token, 'password': 'newpass12345'},
+            format='json'
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
 class GoogleLoginTest(TestCase):
     """Test cases for Google login redirect."""
 
@@ -0,0 +1,43 @@
+"""
+Signed tokens handed to the browser between steps of a flow.
+
+They carry their own expiry and signature (SECRET_KEY), so any worker can
+check them without shared server-side state. Password reset uses Django's
+default_token_generator for the same reason.
+"""
+from django.conf import settings
+from django.core import signing
+
+OAUTH_REGISTRATION_SALT = 'users.oauth_registration'
+
+
+def make_oauth_registration_token(email: str, details: dict, backend: str) -> str:
+    """
+    Sign the OAuth account details a new user registers with.
+
+    Args:
+        email: Email address from the OAuth provider
+        details: User details from the provider
+        backend: Name of the social auth backend
+
+    Returns:
+        URL-safe token for the registration page
+    """
+    return signing.dumps(
+        {'email': email, 'details': details, 'backend': backend},
+        salt=OAUTH_REGISTRATION_SALT,
+        compress=True
+    )
+
+
+def read_oauth_registration_token(token: str) -> dict:
+    """
+    Return the details signed by make_oauth_registration_token.
+
+    The token can be used until OAUTH_REGISTRATION_TIMEOUT passes; once an
+    account with the email exists, registering with it again fails.
+
+    Raises:
+        signing.BadSignature: If the token was tampered with or has expired
+    """
+    return signing.loads(token, salt=OAUTH_REGISTRATION_SALT, max_age=settings.OAUTH_REGISTRATION_TIMEOUT)
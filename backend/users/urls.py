@@ -1,13 +1,14 @@
 from django.urls import path
 from .views import (
     UserRegisterView, UserListView, UserDetailView, UserUpdateView, UserDeleteView, 
-    google_jwt_redirect, LoginView, OAuthRegistrationView, ForgotPasswordView, ResetPasswordView
+    google_jwt_redirect, LoginView, LogoutView, OAuthRegistrationView, ForgotPasswordView, ResetPasswordView
 )
 
 urlpatterns = [
     path("register/", UserRegisterView.as_view(), name="user-register"),
     path("oauth-register/", OAuthRegistrationView.as_view(), name="oauth-register"),
     path("login/", LoginView.as_view(), name="user-login"),
+    path("logout/", LogoutView.as_view(), name="user-logout"),
     path("forgot-password/", ForgotPasswordView.as_view(), name="forgot-password"),
     path("reset-password/", ResetPasswordView.as_view(), name="reset-password"),
     path("list/", UserListView.as_view(), name="user-list"),
@@ -1,32 +1,33 @@
 from typing import Any
 from urllib.parse import urlencode
-import secrets
-import hashlib
 
 from django.conf import settings
 from django.core.validators import validate_email as django_validate_email
 from django.core.exceptions import ValidationError
 from django.contrib.auth import authenticate
 from django.contrib.auth.decorators import login_required
-from django.core.cache import cache
-from django.core.mail import send_mail
+from django.contrib.auth.tokens import default_token_generator
+from django.core import signing
 from django.http import JsonResponse
 from django.shortcuts import redirect
 from django.template.loader import render_to_string
-from django.utils import timezone
 from rest_framework import generics, status
 from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.request import Request
 from rest_framework.response import Response
 from rest_framework.views import APIView
-from rest_framework_simplejwt.tokens import RefreshToken
+from rest_framework_simplejwt.exceptions import TokenError
 from social_django.models import UserSocialAuth
 
 from config.constants import StatusMessages
 from config.permissions import IsAdmin, IsOwnerOrAdmin
+from config.throttling import LoginEmailThrottle, LoginIPThrottle
 from config.utils import get_client_url
+from .authentication import ClaimsRefreshToken
 from .models import User
 from .serializers import UserRegisterSerializer, UserSerializer
+from .tasks import send_password_reset_email
+from .tokens import read_oauth_registration_token
 
 
 class UserRegisterView(generics.CreateAPIView):
@@ -73,6 +74,7 @@ class LoginView(APIView):
     """API view for user login with email and password."""
 
     permission_classes = [AllowAny]
+    throttle_classes = [LoginIPThrottle, LoginEmailThrottle]
 
     def post(self, request: Request) -> Response:
         """Authenticate user and return JWT tokens."""
@@ -97,7 +99,7 @@ class LoginView(APIView):
         user = authenticate(request, username=email, password=password)
 
         if user and user.is_active:
-            refresh = RefreshToken.for_user(user)
+            refresh = ClaimsRefreshToken.for_user(user)
             return Response({
                 'access': str(refresh.access_token),
                 'refresh': str(refresh),
@@ -110,6 +112,31 @@ class LoginView(APIView):
         )
 
 
+class LogoutView(APIView):
+    """API view for logging out by revoking a refresh token."""
+
+    permission_classes = [AllowAny]
+
+    def post(self, request: Request) -> Response:
+        """Revoke the given refresh token so it can no longer be refreshed."""
+        refresh = request.data.get('refresh')
+        if not refresh:
+            return Response(
+                {'error': 'Refresh token is required'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        try:
+            ClaimsRefreshToken(refresh).blacklist()
+        except TokenError:
+            return Response(
+                {'error': 'Invalid or expired refresh token'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        return Response({'success': True}, status=status.HTTP_200_OK)
+
+
 class OAuthRegistrationView(APIView):
     """API view for OAuth registration completion."""
 
@@ -124,9 +151,10 @@ class OAuthRegistrationView(APIView):
                 status=status.HTTP_400_BAD_REQUEST
             )
 
-        # Retrieve OAuth session data
-        session_data = cache.get(f"oauth_session_{oauth_session_key}")
-        if not session_data:
+        # Read the OAuth details signed by the pipeline
+        try:
+            session_data = read_oauth_registration_token(oauth_session_key)
+        except signing.BadSignature:
             return Response(
                 {'error': 'OAuth session expired or invalid'},
                 status=status.HTTP_400_BAD_REQUEST
@@ -136,7 +164,7 @@ class OAuthRegistrationView(APIView):
         serializer = UserRegisterSerializer(data=request.data)
         if serializer.is_valid():
             # Ensure email matches OAuth session
-            if serializer.validated_data.get('email') != session_data.get('email'):
+            if serializer.validated_data.get('email') != User.objects.normalize_email(session_data.get('email')):
                 return Response(
                     {'error': 'Email must match OAuth session'},
                     status=status.HTTP_400_BAD_REQUEST
@@ -158,11 +186,8 @@ class OAuthRegistrationView(APIView):
                 # If social auth creation fails, still return success for user creation
                 pass
 
-            # Clear the session
-            cache.delete(f"oauth_session_{oauth_session_key}")
-
             # Generate tokens and redirect
-            refresh = RefreshToken.for_user(user)
+            refresh = ClaimsRefreshToken.for_user(user)
             client_url = get_client_url()
 
             return Response({
@@ -183,7 +208,7 @@ class OAuthRegistrationView(APIView):
 def google_jwt_redirect(request) -> JsonResponse:
     """Issue JWT for authenticated user and redirect (or return JSON in test mode)."""
     user = request.user
-    refresh = RefreshToken.for_user(user)
+    refresh = ClaimsRefreshToken.for_user(user)
 
     # Optional testing mode: return JSON instead of redirect when ?json=1
     if request.GET.get('json') == '1':
@@ -239,7 +264,7 @@ class ForgotPasswordView(APIView):
 
         # Check if user exists
         try:
-            user = User.objects.get(email=email, is_active=True)
+            user = User.objects.with_email(email).get(is_active=True)
         except User.DoesNotExist:
             # Email not found in database
             return Response(
@@ -247,58 +272,9 @@ class ForgotPasswordView(APIView):
                 status=status.HTTP_400_BAD_REQUEST
             )
 
-        # Generate reset token
-        reset_token = secrets.token_urlsafe(32)
-        
-        # Create hash of token to store (more secure than storing plain token)
-        token_hash = hashlib.sha256(reset_token.encode()).hexdigest()
-        
-        # Store token in cache with expiration (1 hour)
-        cache_key = f"password_reset_{user.id}"
-        cache.set(cache_key, {
-            'token_hash': token_hash,
-            'email': email,
-            'created_at': timezone.now().isoformat()
-        }, timeout=getattr(settings, 'PASSWORD_RESET_TIMEOUT', 3600))
-
-        # Generate reset URL
-        client_url = getattr(settings, 'CLIENT_URL_DEV', 'http://localhost:3000')
-        reset_url = f"{client_url}/reset-password?token={reset_token}&email={email}"
-
-        # Send email
-        try:
-            subject = "Reset Your Password - KU Volunteer"
-            message = f"""
-Hello,
-
-You have requested to reset your password for your KU Volunteer account.
-
-Click the link below to reset your password:
-{reset_url}
-
-This link will expire in 1 hour.
-
-If you did not request this password reset, please ignore this email.
-
-Best regards,
-KU Volunteer Team
-"""
-            
-            send_mail(
-                subject=subject,
-                message=message,
-                from_email=settings.DEFAULT_FROM_EMAIL,
-                recipient_list=[email],
-                fail_silently=False,
-            )
-            
-        except Exception as e:
-            # Log the error but don't expose it to user
-            print(f"Email sending failed: {e}")
-            return Response(
-                {'error': 'Failed to send reset email. Please try again later.'},
-                status=status.HTTP_500_INTERNAL_SERVER_ERROR
-            )
+        # Send the email from a background worker so SMTP latency
+        # does not hold up the request
+        send_password_reset_email.enqueue(user_id=user.id)
 
         return Response(
             {'success': True, 'message': 'If your email exists in our system, you will receive a password reset link shortly.'},
@@ -334,33 +310,16 @@ class ResetPasswordView(APIView):
 
         # Get user
         try:
-            user = User.objects.get(email=email, is_active=True)
+            user = User.objects.with_email(email).get(is_active=True)
         except User.DoesNotExist:
             return Response(
                 {'error': 'Invalid or expired reset token'},
                 status=status.HTTP_400_BAD_REQUEST
             )
 
-        # Get cached token data
-        cache_key = f"password_reset_{user.id}"
-        cached_data = cache.get(cache_key)
-        
-        if not cached_data:
-            return Response(
-                {'error': 'Invalid or expired reset token'},
-                status=status.HTTP_400_BAD_REQUEST
-            )
-
-        # Verify token
-        token_hash = hashlib.sha256(token.encode()).hexdigest()
-        if cached_data['token_hash'] != token_hash:
-            return Response(
-                {'error': 'Invalid or expired reset token'},
-                status=status.HTTP_400_BAD_REQUEST
-            )
-
-        # Verify email matches
-        if cached_data['email'] != email:
+        # The token is bound to the current password hash and last login,
+        # so it stops working once the password has been reset
+        if not default_token_generator.check_token(user, token):
             return Response(
                 {'error': 'Invalid or expired reset token'},
                 status=status.HTTP_400_BAD_REQUEST
@@ -370,9 +329,6 @@ class ResetPasswordView(APIView):
         user.set_password(new_password)
         user.save()
 
-        # Clear the reset token
-        cache.delete(cache_key)
-
         return Response(
             {'success': True, 'message': 'Password has been reset successfully'},
             status=status.HTTP_200_OK
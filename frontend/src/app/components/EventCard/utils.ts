@@ -126,6 +126,7 @@ export function transformActivityToEvent(activity: Activity): EventCardData {
     location: activity.location ?? "Unknown Location",
     category: activity.categories ?? [],
     imgSrc:
+      activity.cover_image_variants?.thumb?.webp ||
       activity.cover_image_url ||
       activity.cover_image ||
       "/default-event.jpg",
@@ -28,7 +28,7 @@ const transformActivityToEvent = (activity: Activity) => {
 		dateEnd: activity.end_at ? activity.end_at.slice(0, 10) : new Date().toISOString().slice(0, 10),
 		location: activity.location || "Unknown Location",
 		category: activity.categories || [],
-		imgSrc: activity.cover_image_url ?? activity.cover_image ?? "/default-event.jpg",
+		imgSrc: activity.cover_image_variants?.thumb?.webp ?? activity.cover_image_url ?? activity.cover_image ?? "/default-event.jpg",
 		capacity: activity.max_participants || 0,
     status: activity.status || "unknown",
 	};
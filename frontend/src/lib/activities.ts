@@ -337,81 +337,37 @@ export const activitiesApi = {
 
     try {
       const token = localStorage.getItem('access_token');
-      await new Promise(resolve => setTimeout(resolve, 800));
-      
-      const existingPostersResp = await this.getPosterImages(activityId);
-      const existingOrders = new Set<number>();
-      
-      if (existingPostersResp.success && existingPostersResp.data && Array.isArray(existingPostersResp.data)) {
-        existingPostersResp.data.forEach((poster) => {
-          if (poster.order !== undefined && poster.order !== null) {
-            existingOrders.add(poster.order);
-          } else {
-          }
-        });
-      } else {
-      }
+      // One request for all files; the server assigns the free order slots
+      const form = new FormData();
+      pictures.forEach((pic) => form.append('images', pic));
 
-      const availableOrders: number[] = [];
-      for (let i = 1; i <= 4; i++) {
-        if (!existingOrders.has(i)) {
-          availableOrders.push(i);
-        }
-      }
-      
-      if (pictures.length > availableOrders.length) {
-        const error = `Cannot upload ${pictures.length} posters. Only ${availableOrders.length} slot(s) available.`;
-        return { success: false, error };
-      }
-      
-      for (let idx = 0; idx < pictures.length; idx++) {
-        const pic = pictures[idx];
-        const orderToUse = availableOrders[idx];
-        const singleForm = new FormData();
-        singleForm.append('image', pic);
-        singleForm.append('order', String(orderToUse));
-
-        const res = await fetch(`${ENV.API_BASE_URL}${API_ENDPOINTS.ACTIVITIES.POSTERS(activityId)}`, {
-          method: 'POST',
-          headers: {
-            ...(token ? { Authorization: `Bearer ${token}` } : {}),
-          },
-          body: singleForm,
-        });
+      const res = await fetch(`${ENV.API_BASE_URL}${API_ENDPOINTS.ACTIVITIES.POSTERS_BATCH(activityId)}`, {
+        method: 'POST',
+        headers: {
+          ...(token ? { Authorization: `Bearer ${token}` } : {}),
+        },
+        body: form,
+      });
 
-        const text = await res.text();
-        
-        let dataRes = null;
-        try {
-          dataRes = text ? JSON.parse(text) : null;
-        } catch {
-          
-          if (!res.ok) {
-            return { 
-              success: false, 
-              error: `Server returned ${res.status} ${res.statusText}. Response is not valid JSON. Check server logs.` 
-            };
-          }
-        }
-        
+      const text = await res.text();
+      let dataRes = null;
+      try {
+        dataRes = text ? JSON.parse(text) : null;
+      } catch {
         if (!res.ok) {
-          const errorMsg = dataRes?.detail || dataRes?.message || JSON.stringify(dataRes) || `Server error ${res.status}`;
-          
-          if (errorMsg.includes('unique') || errorMsg.includes('duplicate') || errorMsg.includes('already exists')) {
-            return { 
-              success: false, 
-              error: `Order conflict: Poster order ${orderToUse} already exists. This might be a timing issue. Please try again.` 
-            };
-          }
-          
-          return { success: false, error: errorMsg };
-        }        
-        if (idx < pictures.length - 1) {
-          await new Promise(resolve => setTimeout(resolve, 300));
+          return {
+            success: false,
+            error: `Server returned ${res.status} ${res.statusText}. Response is not valid JSON. Check server logs.`
+          };
         }
       }
-      
-      return { success: true, data: null };
+
+      if (!res.ok) {
+        const errorMsg = dataRes?.detail || dataRes?.message || JSON.stringify(dataRes) || `Server error ${res.status}`;
+        return { success: false, error: errorMsg };
+      }
+
+      return { success: true, data: dataRes };
     } catch (error) {
       return { success: false, error: error instanceof Error ? error.message : 'Network error' };
     }
@@ -38,6 +38,19 @@ export interface LoginResponse {
   user: User;
 }
 
+export interface ImageVariant {
+  width: number;
+  height: number;
+  webp: string;
+  jpeg: string;
+}
+
+// Resized versions of an uploaded image, keyed by size (empty until generated)
+export type ImageVariants = Partial<Record<'thumb' | 'card' | 'full', ImageVariant>>;
+
+// Variants are generated in the background after an upload
+export type ImageProcessingStatus = 'pending' | 'ready' | 'failed';
+
 export interface Activity {
   id: number;
   organizer_profile_id: number;
@@ -61,6 +74,8 @@ export interface Activity {
   capacity_reached: boolean;
   cover_image_url?: string;
   cover_image?: string;
+  cover_image_variants?: ImageVariants;
+  cover_image_status?: ImageProcessingStatus;
   deleted?: boolean;
   is_draft?: boolean;
   organizer?: string;